@@ -21,6 +21,7 @@ import time
 from typing import Any
 
 from android_world.env import interface
+from android_world.utils import tracing
 
 
 @dataclasses.dataclass()
@@ -98,6 +99,7 @@ class EnvironmentInteractingAgent(abc.ABC):
     """Resets the agent."""
     self.env.reset(go_home=go_home)
 
+  @tracing.traced('agent.get_post_transition_state')
   def get_post_transition_state(self) -> interface.State:
     """Convenience function to get the agent state after the transition."""
     if self._transition_pause is None:
@@ -15,7 +15,6 @@
 """Some LLM inference interface."""
 
 import abc
-import base64
 import io
 import os
 import time
@@ -26,6 +25,8 @@ from google.generativeai.types import answer_types
 from google.generativeai.types import content_types
 from google.generativeai.types import generation_types
 from google.generativeai.types import safety_types
+from android_world.utils import image_encoding
+from android_world.utils import tracing
 import numpy as np
 from PIL import Image
 import requests
@@ -34,10 +35,12 @@ import requests
 ERROR_CALLING_LLM = 'Error calling LLM'
 
 
+@tracing.traced('infer.array_to_jpeg_bytes')
 def array_to_jpeg_bytes(image: np.ndarray) -> bytes:
   """Converts a numpy array into a byte string for a JPEG image."""
-  image = Image.fromarray(image)
-  return image_to_jpeg_bytes(image)
+  return image_encoding.get_default_cache().encode(
+      image, image_encoding.EncodingOptions()
+  )
 
 
 def image_to_jpeg_bytes(image: Image.Image) -> bytes:
@@ -84,6 +87,17 @@ class MultimodalLlmWrapper(abc.ABC):
       Text output and raw output.
     """
 
+  def prefetch_images(self, images: list[np.ndarray]) -> None:
+    """Starts preparing images for a later `predict_mm` call, if supported.
+
+    Called while the agent builds its prompt; the images must not be modified
+    until they are sent.
+
+    Args:
+      images: The images of the upcoming call.
+    """
+    del images
+
 
 SAFETY_SETTINGS_BLOCK_NONE = {
     types.HarmCategory.HARM_CATEGORY_HARASSMENT: (
@@ -128,6 +142,11 @@ class GeminiGcpWrapper(LlmWrapper, MultimodalLlmWrapper):
       max_retry = 3
       print('Max_retry must be positive. Reset it to 3')
     self.max_retry = min(max_retry, 5)
+    # The settings the responses depend on, e.g. for `llm_replay`.
+    self.model_name = self.llm.model_name
+    self.temperature = temperature
+    self.top_p = top_p
+    self.enable_safety_checks = enable_safety_checks
 
   def predict(
       self,
@@ -149,6 +168,7 @@ class GeminiGcpWrapper(LlmWrapper, MultimodalLlmWrapper):
       #  Assume safe if the response is None or doesn't have candidates.
       return True
 
+  @tracing.traced('llm.gemini.predict_mm')
   def predict_mm(
       self,
       text_prompt: str,
@@ -272,7 +292,15 @@ class Gpt4Wrapper(LlmWrapper, MultimodalLlmWrapper):
 
   @classmethod
   def encode_image(cls, image: np.ndarray) -> str:
-    return base64.b64encode(array_to_jpeg_bytes(image)).decode('utf-8')
+    return image_encoding.get_default_cache().encode_base64(image)
+
+  @classmethod
+  def image_url(cls, image: np.ndarray) -> str:
+    """Returns the data URL of an image, encoded with the shared cache."""
+    return image_encoding.get_default_cache().encode_data_url(image)
+
+  def prefetch_images(self, images: list[np.ndarray]) -> None:
+    image_encoding.get_default_cache().prefetch(images)
 
   def predict(
       self,
@@ -280,6 +308,7 @@ class Gpt4Wrapper(LlmWrapper, MultimodalLlmWrapper):
   ) -> tuple[str, Optional[bool], Any]:
     return self.predict_mm(text_prompt, [])
 
+  @tracing.traced('llm.gpt4.predict_mm')
   def predict_mm(
       self, text_prompt: str, images: list[np.ndarray]
   ) -> tuple[str, Optional[bool], Any]:
@@ -301,13 +330,12 @@ class Gpt4Wrapper(LlmWrapper, MultimodalLlmWrapper):
     }
 
     # Gpt-4v supports multiple images, just need to insert them in the content
-    # list.
+    # list. Encodes them in parallel.
+    self.prefetch_images(images)
     for image in images:
       payload['messages'][0]['content'].append({
           'type': 'image_url',
-          'image_url': {
-              'url': f'data:image/jpeg;base64,{self.encode_image(image)}'
-          },
+          'image_url': {'url': self.image_url(image)},
       })
 
     counter = self.max_retry
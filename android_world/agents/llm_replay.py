@@ -0,0 +1,387 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Records LLM responses to disk and replays them.
+
+Wrapping the LLM of an agent in `ReplayLlmWrapper` allows rerunning an
+evaluation without calling the model, e.g. to measure or regression-test the
+environment and agent overhead at device speed and without network access:
+
+  llm = llm_replay.ReplayLlmWrapper(
+      infer.Gpt4Wrapper('gpt-4-turbo-2024-04-09'),
+      llm_replay.ResponseStore('/tmp/llm_responses'),
+      llm_replay.Mode.RECORD_IF_MISSING,
+  )
+
+Responses are keyed by a hash of the prompt and perceptual hashes of the
+images. Screenshots of the same screen differ in small details, such as the
+clock in the status bar, so exact image hashes would rarely match between
+runs. The prompts of the agents describe the UI elements on screen, which
+tells apart screens that look alike.
+"""
+
+import base64
+import enum
+import hashlib
+import io
+import json
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from absl import logging
+from android_world.agents import infer
+import numpy as np
+from PIL import Image
+
+_DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+_SUFFIX = '.json'
+_IMAGE_URL_PREFIX = 'data:image/'
+# Attributes of the LLM wrappers in `infer` that change their responses.
+_MODEL_ATTRIBUTES = ('model', 'model_name')
+_SETTING_ATTRIBUTES = ('temperature', 'top_p', 'enable_safety_checks')
+
+
+class Mode(enum.Enum):
+  """How a replay wrapper uses its store."""
+
+  # Always calls the model and stores its responses.
+  RECORD = 'record'
+  # Only replays stored responses; raises `ReplayMissError` on a miss.
+  REPLAY = 'replay'
+  # Replays stored responses and calls the model on a miss.
+  RECORD_IF_MISSING = 'record_if_missing'
+
+
+class ReplayMissError(LookupError):
+  """Raised when replaying a request that was not recorded."""
+
+
+def perceptual_hash(image: np.ndarray | Image.Image) -> str:
+  """Returns a difference hash of an image, robust to small changes.
+
+  Args:
+    image: An RGB(A) or grayscale image.
+
+  Returns:
+    The hash, as 16 hex digits.
+  """
+  if isinstance(image, np.ndarray):
+    image = Image.fromarray(image)
+  pixels = np.asarray(
+      image.convert('L').resize((9, 8), Image.Resampling.BILINEAR),
+      dtype=np.int16,
+  )
+  bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+  return f'{int("".join("1" if bit else "0" for bit in bits), 2):016x}'
+
+
+def request_key(namespace: str, prompt: Any, images: list[str]) -> str:
+  """Returns the store key of a request.
+
+  Args:
+    namespace: Tells apart models and settings, e.g. the model name.
+    prompt: The JSON serializable prompt, including any call options.
+    images: Perceptual hashes of the images, in order.
+  """
+  request = json.dumps(
+      {'namespace': namespace, 'prompt': prompt, 'images': images},
+      sort_keys=True,
+      default=repr,
+  )
+  return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+
+class ResponseStore:
+  """A size-bounded directory of responses, evicting the least recently used.
+
+  Attributes:
+    directory: Where the responses are stored, one JSON file per request.
+    max_bytes: The size above which old responses are evicted.
+  """
+
+  def __init__(self, directory: str, max_bytes: int = _DEFAULT_MAX_BYTES):
+    self.directory = directory
+    self.max_bytes = max_bytes
+    self._lock = threading.Lock()
+    os.makedirs(directory, exist_ok=True)
+
+  def _path(self, key: str) -> str:
+    return os.path.join(self.directory, key + _SUFFIX)
+
+  def get(self, key: str) -> dict[str, Any] | None:
+    """Returns the stored response, or None if there is none."""
+    path = self._path(key)
+    try:
+      with open(path) as f:
+        response = json.load(f)
+      # Marks the response as recently used.
+      os.utime(path)
+      return response
+    except (FileNotFoundError, json.JSONDecodeError):
+      return None
+
+  def put(self, key: str, response: dict[str, Any]) -> None:
+    """Stores a JSON serializable response."""
+    path = self._path(key)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as f:
+      json.dump(response, f, default=repr)
+    os.replace(tmp_path, path)
+    self._evict(keep=path)
+
+  def _evict(self, keep: str) -> None:
+    """Removes the least recently used responses until under the limit."""
+    with self._lock:
+      entries = []
+      total = 0
+      for entry in os.scandir(self.directory):
+        if not entry.name.endswith(_SUFFIX):
+          continue
+        try:
+          stat = entry.stat()
+        except FileNotFoundError:
+          continue  # Evicted by another process.
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+      entries.sort()
+      for _, size, path in entries:
+        if total <= self.max_bytes:
+          break
+        if path == keep:
+          continue
+        try:
+          os.remove(path)
+        except FileNotFoundError:
+          pass
+        total -= size
+
+
+def _to_json(raw_response: Any) -> Any:
+  """Returns a JSON serializable version of a raw LLM response."""
+  for method in ('json', 'to_dict'):
+    try:
+      return getattr(raw_response, method)()
+    except Exception:  # pylint: disable=broad-exception-caught
+      continue
+  return repr(raw_response)
+
+
+def default_namespace(llm: Any) -> str:
+  """Returns a namespace naming the model and sampling settings of an LLM.
+
+  Args:
+    llm: An LLM wrapper with a `model` or `model_name` attribute, and possibly
+      sampling settings such as `temperature`.
+
+  Returns:
+    E.g. `Gpt4Wrapper/gpt-4-turbo-2024-04-09/temperature=0.0`.
+
+  Raises:
+    ValueError: If the model of `llm` is unknown.
+  """
+  model = next(
+      (
+          getattr(llm, name)
+          for name in _MODEL_ATTRIBUTES
+          if getattr(llm, name, None)
+      ),
+      None,
+  )
+  if model is None:
+    raise ValueError(
+        f'Cannot tell the model of {type(llm).__name__}; pass a namespace.'
+    )
+  settings = [
+      f'{name}={getattr(llm, name)}'
+      for name in _SETTING_ATTRIBUTES
+      if hasattr(llm, name)
+  ]
+  return '/'.join([type(llm).__name__, str(model), *settings])
+
+
+def _lookup_or_call(
+    store: ResponseStore,
+    mode: Mode,
+    key: str,
+    call: Callable[[], tuple[dict[str, Any], bool]],
+) -> dict[str, Any]:
+  """Returns the stored response of a request, or calls the model.
+
+  Args:
+    store: The store of responses.
+    mode: How to use the store.
+    key: The key of the request.
+    call: Calls the model, returning the response and whether it succeeded.
+      Failed calls are not stored.
+
+  Returns:
+    The stored or new response.
+
+  Raises:
+    ReplayMissError: If replaying a request that was not recorded.
+  """
+  if mode != Mode.RECORD:
+    response = store.get(key)
+    if response is not None:
+      return response
+    if mode == Mode.REPLAY:
+      raise ReplayMissError(f'No recorded response for request {key}.')
+  response, succeeded = call()
+  if succeeded:
+    store.put(key, response)
+  else:
+    logging.warning('Not recording failed LLM call %s.', key)
+  return response
+
+
+class ReplayLlmWrapper(infer.LlmWrapper, infer.MultimodalLlmWrapper):
+  """Records the responses of an LLM, or replays them without calling it.
+
+  Failed calls, without a raw response, are not recorded. Replayed raw
+  responses are the JSON version of the original ones, e.g. the parsed body
+  of an OpenAI response.
+  """
+
+  def __init__(
+      self,
+      llm: infer.LlmWrapper | infer.MultimodalLlmWrapper,
+      store: ResponseStore,
+      mode: Mode = Mode.RECORD_IF_MISSING,
+      namespace: str | None = None,
+  ):
+    """Initializes the wrapper.
+
+    Args:
+      llm: The LLM to record.
+      store: Where responses are stored.
+      mode: How to use the store.
+      namespace: Tells apart the responses of different models and settings
+        sharing a store. Required if it can't be derived from `llm`, see
+        `default_namespace`.
+
+    Raises:
+      ValueError: If `namespace` is None and can't be derived from `llm`.
+    """
+    self.llm = llm
+    self.store = store
+    self.mode = mode
+    if namespace is None:
+      namespace = default_namespace(llm)
+    self.namespace = namespace
+
+  def predict(
+      self, text_prompt: str, **kwargs: Any
+  ) -> tuple[str, Optional[bool], Any]:
+    return self._predict(
+        'predict',
+        text_prompt,
+        [],
+        lambda: self.llm.predict(text_prompt, **kwargs),
+        kwargs,
+    )
+
+  def predict_mm(
+      self, text_prompt: str, images: list[np.ndarray], **kwargs: Any
+  ) -> tuple[str, Optional[bool], Any]:
+    return self._predict(
+        'predict_mm',
+        text_prompt,
+        images,
+        lambda: self.llm.predict_mm(text_prompt, images, **kwargs),
+        kwargs,
+    )
+
+  def prefetch_images(self, images: list[np.ndarray]) -> None:
+    # Replayed and possibly replayed requests do not need encoded images.
+    if self.mode == Mode.RECORD:
+      self.llm.prefetch_images(images)
+
+  def _predict(
+      self,
+      method: str,
+      text_prompt: str,
+      images: list[np.ndarray],
+      predict: Callable[[], tuple[str, Optional[bool], Any]],
+      kwargs: dict[str, Any],
+  ) -> tuple[str, Optional[bool], Any]:
+    key = request_key(
+        self.namespace,
+        {'method': method, 'text': text_prompt, 'kwargs': kwargs},
+        [perceptual_hash(image) for image in images],
+    )
+
+    def call() -> tuple[dict[str, Any], bool]:
+      text, is_safe, raw_response = predict()
+      response = {'text': text, 'is_safe': is_safe}
+      if raw_response is None:
+        # Keeps the failure visible to the agent, without storing it.
+        return response | {'raw_response': None}, False
+      return response | {'raw_response': _to_json(raw_response)}, True
+
+    response = _lookup_or_call(self.store, self.mode, key, call)
+    return response['text'], response['is_safe'], response['raw_response']
+
+
+def _payload_key(namespace: str, payload: Any) -> str:
+  """Returns the key of an OpenAI request, hashing its images perceptually."""
+  images = []
+
+  def strip_images(value: Any) -> Any:
+    if isinstance(value, dict):
+      return {k: strip_images(v) for k, v in value.items()}
+    if isinstance(value, list):
+      return [strip_images(v) for v in value]
+    if isinstance(value, str) and value.startswith(_IMAGE_URL_PREFIX):
+      data = base64.b64decode(value.split(',', 1)[1])
+      images.append(perceptual_hash(Image.open(io.BytesIO(data))))
+      return '<image>'
+    return value
+
+  return request_key(namespace, strip_images(payload), images)
+
+
+def replay_openai_request(
+    request_fn: Callable[..., dict[str, Any]],
+    store: ResponseStore,
+    mode: Mode = Mode.RECORD_IF_MISSING,
+    namespace: str = 'openai',
+) -> Callable[..., dict[str, Any]]:
+  """Wraps a function sending chat completion requests, e.g. for SeeAct.
+
+  Args:
+    request_fn: Sends a messages payload, returning the parsed response; see
+      `seeact_utils.execute_openai_request`.
+    store: Where responses are stored.
+    mode: How to use the store.
+    namespace: Tells apart the responses of different models.
+
+  Returns:
+    A function with the same signature, recording or replaying responses.
+  """
+
+  def wrapper(
+      messages_payload: list[dict[str, Any]], **kwargs: Any
+  ) -> dict[str, Any]:
+    key = _payload_key(
+        namespace, {'messages': messages_payload, 'kwargs': kwargs}
+    )
+
+    def call() -> tuple[dict[str, Any], bool]:
+      response = request_fn(messages_payload, **kwargs)
+      return response, 'choices' in response
+
+    return _lookup_or_call(store, mode, key, call)
+
+  return wrapper
@@ -0,0 +1,195 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.agents import infer
+from android_world.agents import llm_replay
+from android_world.agents import seeact_utils
+import numpy as np
+
+
+def _screenshot(seed: int = 0) -> np.ndarray:
+  """Returns an image of 8x9 gray blocks, each unlike its neighbors."""
+  steps = np.random.default_rng(seed).choice([-12, 12], (8, 9))
+  blocks = 128 + np.cumsum(steps, axis=1)
+  image = np.kron(blocks, np.ones((60, 60))).astype(np.uint8)
+  return np.repeat(image[:, :, None], 3, axis=2)
+
+
+class _FakeRawResponse:
+
+  def json(self):
+    return {'choices': [{'message': {'content': 'response'}}]}
+
+
+class LlmReplayTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.directory = self.enter_context(tempfile.TemporaryDirectory())
+    self.store = llm_replay.ResponseStore(self.directory)
+    self.llm = mock.create_autospec(infer.MultimodalLlmWrapper, instance=True)
+    self.llm.predict_mm.return_value = ('response', True, _FakeRawResponse())
+
+  def _wrapper(self, mode: llm_replay.Mode) -> llm_replay.ReplayLlmWrapper:
+    return llm_replay.ReplayLlmWrapper(self.llm, self.store, mode, 'model')
+
+  def test_replays_recorded_responses_without_calling_the_model(self):
+    screenshot = _screenshot()
+    recorded = self._wrapper(llm_replay.Mode.RECORD).predict_mm(
+        'prompt', [screenshot]
+    )
+
+    replayed = self._wrapper(llm_replay.Mode.REPLAY).predict_mm(
+        'prompt', [screenshot]
+    )
+
+    self.llm.predict_mm.assert_called_once()
+    self.assertEqual(recorded[:2], ('response', True))
+    self.assertEqual(
+        replayed,
+        ('response', True, {'choices': [{'message': {'content': 'response'}}]}),
+    )
+
+  def test_replay_raises_on_miss(self):
+    self._wrapper(llm_replay.Mode.RECORD).predict_mm('prompt', [])
+
+    with self.assertRaises(llm_replay.ReplayMissError):
+      self._wrapper(llm_replay.Mode.REPLAY).predict_mm('other prompt', [])
+    self.llm.predict_mm.assert_called_once()
+
+  def test_record_if_missing_calls_model_once(self):
+    wrapper = self._wrapper(llm_replay.Mode.RECORD_IF_MISSING)
+
+    wrapper.predict_mm('prompt', [])
+    wrapper.predict_mm('prompt', [])
+    wrapper.predict_mm('other prompt', [])
+
+    self.assertEqual(self.llm.predict_mm.call_count, 2)
+
+  def test_failed_calls_are_not_recorded(self):
+    self.llm.predict_mm.return_value = (infer.ERROR_CALLING_LLM, None, None)
+    wrapper = self._wrapper(llm_replay.Mode.RECORD_IF_MISSING)
+
+    self.assertEqual(
+        wrapper.predict_mm('prompt', []), (infer.ERROR_CALLING_LLM, None, None)
+    )
+    wrapper.predict_mm('prompt', [])
+
+    self.assertEqual(self.llm.predict_mm.call_count, 2)
+    self.assertEmpty(os.listdir(self.directory))
+
+  def test_key_tolerates_small_image_changes(self):
+    screenshot = _screenshot()
+    changed = screenshot.copy()
+    changed[2:8, 400:420] += 10  # E.g. the clock in the status bar.
+    changed = changed // 2 * 2  # E.g. compression artifacts.
+
+    self.assertEqual(
+        llm_replay.perceptual_hash(screenshot),
+        llm_replay.perceptual_hash(changed),
+    )
+    self.assertNotEqual(
+        llm_replay.perceptual_hash(screenshot),
+        llm_replay.perceptual_hash(_screenshot(seed=1)),
+    )
+
+  def test_evicts_least_recently_used(self):
+    store = llm_replay.ResponseStore(self.directory, max_bytes=80)
+    store.put('a', {'text': 'x' * 20})
+    store.put('b', {'text': 'x' * 20})
+    os.utime(store._path('a'), (0, 0))
+    os.utime(store._path('b'), (1, 1))
+    store.get('a')
+
+    store.put('c', {'text': 'x' * 20})
+
+    self.assertIsNotNone(store.get('a'))
+    self.assertIsNone(store.get('b'))
+    self.assertIsNotNone(store.get('c'))
+
+  def test_default_namespace_includes_model_and_settings(self):
+    with mock.patch.dict(os.environ, {'OPENAI_API_KEY': 'key'}):
+      cold = infer.Gpt4Wrapper('gpt-4-turbo-2024-04-09', temperature=0.0)
+      warm = infer.Gpt4Wrapper('gpt-4-turbo-2024-04-09', temperature=0.7)
+
+    self.assertEqual(
+        llm_replay.ReplayLlmWrapper(cold, self.store).namespace,
+        'Gpt4Wrapper/gpt-4-turbo-2024-04-09/temperature=0.0',
+    )
+    self.assertNotEqual(
+        llm_replay.default_namespace(cold), llm_replay.default_namespace(warm)
+    )
+
+  def test_default_namespace_of_gemini_names_its_model(self):
+    with mock.patch.dict(os.environ, {'GCP_API_KEY': 'key'}):
+      pro = infer.GeminiGcpWrapper('gemini-1.5-pro-latest')
+      flash = infer.GeminiGcpWrapper('gemini-1.5-flash-latest', top_p=0.5)
+
+    self.assertEqual(
+        llm_replay.default_namespace(pro),
+        'GeminiGcpWrapper/models/gemini-1.5-pro-latest/temperature=0.0'
+        '/top_p=0.95/enable_safety_checks=True',
+    )
+    self.assertNotEqual(
+        llm_replay.default_namespace(pro), llm_replay.default_namespace(flash)
+    )
+
+  def test_namespace_is_required_without_model(self):
+    llm = mock.create_autospec(infer.MultimodalLlmWrapper, instance=True)
+
+    with self.assertRaisesRegex(ValueError, 'pass a namespace'):
+      llm_replay.ReplayLlmWrapper(llm, self.store)
+
+  def test_replays_openai_requests(self):
+    request_fn = mock.create_autospec(
+        seeact_utils.execute_openai_request,
+        return_value={'choices': [{'message': {'content': 'response'}}]},
+    )
+    payload = seeact_utils.create_action_generation_messages_payload(
+        'system prompt', 'action prompt', _screenshot()
+    )
+    changed_payload = seeact_utils.create_action_generation_messages_payload(
+        'system prompt', 'action prompt', _screenshot() // 2 * 2
+    )
+
+    llm_replay.replay_openai_request(
+        request_fn, self.store, llm_replay.Mode.RECORD
+    )(payload)
+    response = llm_replay.replay_openai_request(
+        request_fn, self.store, llm_replay.Mode.REPLAY
+    )(changed_payload)
+
+    request_fn.assert_called_once()
+    self.assertEqual(response['choices'][0]['message']['content'], 'response')
+
+  def test_does_not_record_openai_errors(self):
+    request_fn = mock.create_autospec(
+        seeact_utils.execute_openai_request,
+        return_value={'error': {'message': 'rate limited'}},
+    )
+    replay = llm_replay.replay_openai_request(request_fn, self.store)
+
+    replay([])
+    replay([])
+
+    self.assertEqual(request_fn.call_count, 2)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -24,6 +24,8 @@ from android_world.agents import m3a_utils
 from android_world.env import interface
 from android_world.env import json_action
 from android_world.env import representation_utils
+from android_world.utils import image_encoding
+from android_world.utils import tracing
 
 PROMPT_PREFIX = (
     'You are an agent who can operate an Android phone on behalf of a user.'
@@ -366,6 +368,12 @@ class M3A(base_agent.EnvironmentInteractingAgent):
     self.history = []
 
   def step(self, goal: str) -> base_agent.AgentInteractionResult:
+    with image_encoding.record_stats() as encoding_stats:
+      result = self._step(goal)
+    result.data['image_encoding_cpu_sec'] = encoding_stats.cpu_sec
+    return result
+
+  def _step(self, goal: str) -> base_agent.AgentInteractionResult:
     step_data = {
         'raw_screenshot': None,
         'before_screenshot_with_som': None,
@@ -394,17 +402,17 @@ class M3A(base_agent.EnvironmentInteractingAgent):
     )
     step_data['raw_screenshot'] = state.pixels.copy()
     before_screenshot = state.pixels.copy()
-    for index, ui_element in enumerate(before_ui_elements):
-      if m3a_utils.validate_ui_element(ui_element, logical_screen_size):
-        m3a_utils.add_ui_element_mark(
-            before_screenshot,
-            ui_element,
-            index,
-            logical_screen_size,
-            physical_frame_boundary,
-            orientation,
-        )
+    with tracing.span('m3a.add_ui_element_marks'):
+      m3a_utils.add_ui_element_marks(
+          before_screenshot,
+          before_ui_elements,
+          logical_screen_size,
+          physical_frame_boundary,
+          orientation,
+      )
     step_data['before_screenshot_with_som'] = before_screenshot.copy()
+    # Encodes the screenshots while the prompt is built.
+    self.llm.prefetch_images([step_data['raw_screenshot'], before_screenshot])
 
     action_prompt = _action_selection_prompt(
         goal,
@@ -533,7 +541,8 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
           step_data,
       )
 
-    time.sleep(self.wait_after_action_seconds)
+    with tracing.span('m3a.wait_after_action'):
+      time.sleep(self.wait_after_action_seconds)
 
     state = self.env.get_state(wait_to_stabilize=False)
     logical_screen_size = self.env.logical_screen_size
@@ -544,22 +553,21 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
         after_ui_elements, logical_screen_size
     )
     after_screenshot = state.pixels.copy()
-    for index, ui_element in enumerate(after_ui_elements):
-      if m3a_utils.validate_ui_element(ui_element, logical_screen_size):
-        m3a_utils.add_ui_element_mark(
-            after_screenshot,
-            ui_element,
-            index,
-            logical_screen_size,
-            physical_frame_boundary,
-            orientation,
-        )
+    with tracing.span('m3a.add_ui_element_marks'):
+      m3a_utils.add_ui_element_marks(
+          after_screenshot,
+          after_ui_elements,
+          logical_screen_size,
+          physical_frame_boundary,
+          orientation,
+      )
 
     m3a_utils.add_screenshot_label(
         step_data['before_screenshot_with_som'], 'before'
     )
     m3a_utils.add_screenshot_label(after_screenshot, 'after')
-    step_data['after_screenshot_with_som'] = after_screenshot.copy()
+    step_data['after_screenshot_with_som'] = after_screenshot
+    self.llm.prefetch_images([before_screenshot, after_screenshot])
 
     summary_prompt = _summarize_prompt(
         action,
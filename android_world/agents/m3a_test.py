@@ -73,6 +73,7 @@ class M3AInteractionTest(absltest.TestCase):
     goal = 'do something'
     step_data = agent.step(goal)
     self.assertTrue(step_data.done)
+    self.assertEqual(step_data.data['image_encoding_cpu_sec'], 0.0)
 
   def test_step_method_with_invalid_action_output(self):
     env = test_utils.FakeAsyncEnv()
@@ -15,17 +15,27 @@
 """Utils for M3A."""
 
 import ast
-import base64
+import functools
 import json
 import math
 import re
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 from android_world.env import representation_utils
+from android_world.utils import image_encoding
 import cv2
 import numpy as np
 
 TRIGGER_SAFETY_CLASSIFIER = 'Triggered LLM safety classifier.'
 
+# Logical corners, as indices into (x_min, y_min, x_max, y_max), for each
+# orientation; see `_ui_element_logical_corner`.
+_LOGICAL_CORNER_INDICES = {
+    0: ((0, 1), (2, 3)),
+    1: ((0, 3), (2, 1)),
+    2: ((2, 3), (0, 1)),
+    3: ((2, 1), (0, 3)),
+}
+
 
 def _logical_to_physical(
     logical_coordinates: tuple[int, int],
@@ -216,6 +226,174 @@ def add_ui_element_mark(
     )
 
 
+def _logical_to_physical_batch(
+    x: np.ndarray,
+    y: np.ndarray,
+    logical_screen_size: tuple[int, int],
+    physical_frame_boundary: tuple[int, int, int, int],
+    orientation: int,
+) -> tuple[np.ndarray, np.ndarray]:
+  """Like `_logical_to_physical`, for arrays of integer coordinates."""
+  px0, py0, px1, py1 = physical_frame_boundary
+  px, py = px1 - px0, py1 - py0
+  lx, ly = logical_screen_size
+  # Casting truncates towards zero, like `int`.
+  if orientation == 0:
+    return (x * px / lx).astype(int) + px0, (y * py / ly).astype(int) + py0
+  if orientation == 1:
+    return px - (y * px / ly).astype(int) + px0, (x * py / lx).astype(int) + py0
+  if orientation == 2:
+    return (
+        px - (x * px / lx).astype(int) + px0,
+        py - (y * py / ly).astype(int) + py0,
+    )
+  if orientation == 3:
+    return (y * px / ly).astype(int) + px0, py - (x * py / lx).astype(int) + py0
+  raise ValueError('Unsupported orientation.')
+
+
+@functools.lru_cache(maxsize=2048)
+def _label_glyph(
+    text: str, font_scale: float, thickness: int, channels: int
+) -> tuple[np.ndarray, np.ndarray, int, int]:
+  """Renders a mark label once, like `cv2.putText` would draw it.
+
+  Args:
+    text: The label.
+    font_scale: The font scale passed to `cv2.putText`.
+    thickness: The thickness passed to `cv2.putText`.
+    channels: The number of channels of the screenshot.
+
+  Returns:
+    The mask of the text pixels, the black pixels to copy through it, and the
+    offset of its upper left corner from the text origin.
+  """
+  (width, height), baseline = cv2.getTextSize(
+      text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness
+  )
+  margin = 2 * thickness + 4
+  canvas = np.zeros(
+      (height + baseline + 2 * margin, width + 2 * margin), dtype=np.uint8
+  )
+  cv2.putText(
+      canvas,
+      text,
+      (margin, margin + height),
+      cv2.FONT_HERSHEY_SIMPLEX,
+      font_scale,
+      1,
+      thickness=thickness,
+  )
+  rows = np.flatnonzero(canvas.any(axis=1))
+  cols = np.flatnonzero(canvas.any(axis=0))
+  mask = canvas[rows[0] : rows[-1] + 1, cols[0] : cols[-1] + 1]
+  return (
+      mask,
+      np.zeros(mask.shape + (channels,), dtype=np.uint8),
+      int(cols[0]) - margin,
+      int(rows[0]) - margin - height,
+  )
+
+
+def add_ui_element_marks(
+    screenshot: np.ndarray,
+    ui_elements: Sequence[representation_utils.UIElement],
+    logical_screen_size: tuple[int, int],
+    physical_frame_boundary: tuple[int, int, int, int],
+    orientation: int,
+) -> None:
+  """Marks all valid UI elements in the screenshot, labeled by their index.
+
+  Draws the same pixels as calling `add_ui_element_mark` for each element that
+  passes `validate_ui_element`, but transforms all bounding boxes at once and
+  draws labels from a cache of rendered text.
+
+  Args:
+    screenshot: The screenshot as a numpy ndarray, modified in place.
+    ui_elements: The UI elements, marked with their index in this list.
+    logical_screen_size: The logical screen size.
+    physical_frame_boundary: The physical coordinates in portrait orientation
+      for the upper left and lower right corner for the frame.
+    orientation: The current screen orientation.
+  """
+  indices = [
+      index
+      for index, ui_element in enumerate(ui_elements)
+      if ui_element.bbox_pixels
+      and validate_ui_element(ui_element, logical_screen_size)
+  ]
+  if not indices:
+    return
+  if orientation not in _LOGICAL_CORNER_INDICES:
+    raise ValueError('Unsupported orientation.')
+  bboxes = np.array(
+      [
+          (
+              ui_elements[index].bbox_pixels.x_min,
+              ui_elements[index].bbox_pixels.y_min,
+              ui_elements[index].bbox_pixels.x_max,
+              ui_elements[index].bbox_pixels.y_max,
+          )
+          for index in indices
+      ],
+      dtype=np.float64,
+  ).astype(int)
+  x_scale = screenshot.shape[1] / physical_frame_boundary[2]
+  y_scale = screenshot.shape[0] / physical_frame_boundary[3]
+  corners = []
+  for x_index, y_index in _LOGICAL_CORNER_INDICES[orientation]:
+    x, y = _logical_to_physical_batch(
+        bboxes[:, x_index],
+        bboxes[:, y_index],
+        logical_screen_size,
+        physical_frame_boundary,
+        orientation,
+    )
+    corners.append(((x * x_scale).astype(int), (y * y_scale).astype(int)))
+  (x0s, y0s), (x1s, y1s) = corners
+
+  iso_scale = math.sqrt(x_scale * x_scale + y_scale * y_scale)
+  thickness = int(2 * iso_scale)
+  font_scale = 0.7 * iso_scale
+  # Offsets of the label box and text origin from the upper left corner.
+  box_top, box_bottom = int(1 * y_scale), int(25 * y_scale)
+  box_left, box_right = int(1 * x_scale), int(35 * x_scale)
+  text_dx, text_dy = int(1 * x_scale), int(20 * y_scale)
+  height, width = screenshot.shape[:2]
+
+  # Elements are drawn in order, as later marks may cover earlier ones.
+  for index, x0, y0, x1, y1 in zip(
+      indices, x0s.tolist(), y0s.tolist(), x1s.tolist(), y1s.tolist()
+  ):
+    cv2.rectangle(
+        screenshot, (x0, y0), (x1, y1), color=(0, 255, 0), thickness=thickness
+    )
+    # Same slicing as `add_ui_element_mark`, including for negative corners.
+    screenshot[
+        y0 + box_top : y0 + box_bottom, x0 + box_left : x0 + box_right
+    ] = 255
+    origin = (x0 + text_dx, y0 + text_dy)
+    mask, black, dx, dy = _label_glyph(
+        str(index), font_scale, thickness, screenshot.shape[2]
+    )
+    top, left = origin[1] + dy, origin[0] + dx
+    bottom, right = top + mask.shape[0], left + mask.shape[1]
+    if top < 1 or left < 1 or bottom >= height or right >= width:
+      # OpenCV rasterizes strokes touching the border slightly differently.
+      cv2.putText(
+          screenshot,
+          str(index),
+          origin,
+          cv2.FONT_HERSHEY_SIMPLEX,
+          font_scale,
+          (0, 0, 0),
+          thickness=thickness,
+      )
+      continue
+    # Writes through the view, which is much faster than boolean indexing.
+    cv2.copyTo(black, mask, screenshot[top:bottom, left:right])
+
+
 def add_screenshot_label(screenshot: np.ndarray, label: str):
   """Add a text label to the right bottom of the screenshot.
 
@@ -239,15 +417,15 @@ def add_screenshot_label(screenshot: np.ndarray, label: str):
 def encode_image_for_html(image: np.ndarray) -> str:
   """Encode image in numpy ndarray to html string with correct color channels.
 
+  Reuses the encoding sent to the LLM, if any, from the shared cache.
+
   Args:
     image: Image as a numpy ndarray.
 
   Returns:
     Encoded image to be used in html.
   """
-  return base64.b64encode(
-      cv2.imencode('.jpeg', cv2.cvtColor(image, cv2.COLOR_BGR2RGB))[1]
-  ).decode('utf-8')
+  return image_encoding.get_default_cache().encode_base64(image)
 
 
 def parse_reason_action_output(
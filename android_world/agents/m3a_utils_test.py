@@ -0,0 +1,99 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from absl.testing import absltest
+from absl.testing import parameterized
+from android_world.agents import m3a_utils
+from android_world.env import representation_utils
+import numpy as np
+
+
+def _random_ui_elements(
+    rng: np.random.Generator, n: int, width: int, height: int
+) -> list[representation_utils.UIElement]:
+  """Returns elements of all sizes, some invisible or beyond the screen."""
+  ui_elements = []
+  for _ in range(n):
+    x_min = rng.uniform(-100, width)
+    y_min = rng.uniform(-100, height)
+    ui_elements.append(
+        representation_utils.UIElement(
+            bbox_pixels=representation_utils.BoundingBox(
+                x_min=x_min,
+                x_max=x_min + rng.uniform(-10, 500),
+                y_min=y_min,
+                y_max=y_min + rng.uniform(-10, 300),
+            ),
+            is_visible=bool(rng.random() > 0.05),
+        )
+    )
+  ui_elements.append(representation_utils.UIElement(is_visible=True))
+  return ui_elements
+
+
+class AddUiElementMarksTest(parameterized.TestCase):
+
+  @parameterized.product(
+      orientation=[0, 1, 2, 3],
+      screen=[
+          # Screenshot shape, logical screen size, physical frame boundary.
+          ((240, 108, 3), (108, 240), (0, 0, 108, 240)),
+          ((120, 54, 3), (108, 240), (0, 0, 108, 240)),
+          ((108, 240, 3), (240, 108), (0, 0, 108, 240)),
+          ((240, 108, 3), (100, 230), (1, 2, 107, 239)),
+      ],
+  )
+  def test_matches_marking_each_element(self, orientation, screen):
+    shape, logical_screen_size, physical_frame_boundary = screen
+    rng = np.random.default_rng(orientation)
+    ui_elements = _random_ui_elements(rng, 150, shape[1], shape[0])
+    screenshot = rng.integers(0, 256, shape, dtype=np.uint8)
+    expected = screenshot.copy()
+    for index, ui_element in enumerate(ui_elements):
+      if m3a_utils.validate_ui_element(ui_element, logical_screen_size):
+        m3a_utils.add_ui_element_mark(
+            expected,
+            ui_element,
+            index,
+            logical_screen_size,
+            physical_frame_boundary,
+            orientation,
+        )
+
+    m3a_utils.add_ui_element_marks(
+        screenshot,
+        ui_elements,
+        logical_screen_size,
+        physical_frame_boundary,
+        orientation,
+    )
+
+    np.testing.assert_array_equal(screenshot, expected)
+
+  def test_no_valid_elements(self):
+    screenshot = np.zeros((24, 12, 3), dtype=np.uint8)
+
+    m3a_utils.add_ui_element_marks(
+        screenshot,
+        [representation_utils.UIElement(is_visible=False)],
+        (12, 24),
+        (0, 0, 12, 24),
+        0,
+    )
+
+    self.assertFalse(screenshot.any())
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -14,7 +14,7 @@
 
 """SeeAct agent for Android."""
 
-from typing import Any
+from typing import Any, Callable
 
 from android_world.agents import base_agent
 from android_world.agents import seeact_utils
@@ -122,8 +122,25 @@ def generate_seeact_prompts(
 class SeeAct(base_agent.EnvironmentInteractingAgent):
   """SeeAct agent for Android."""
 
-  def __init__(self, env: interface.AsyncEnv, name: str = "SeeAct"):
+  def __init__(
+      self,
+      env: interface.AsyncEnv,
+      name: str = "SeeAct",
+      request_fn: (
+          Callable[[list[dict[str, Any]]], dict[str, Any]] | None
+      ) = None,
+  ):
+    """Initializes a SeeAct agent.
+
+    Args:
+      env: The environment.
+      name: The agent name.
+      request_fn: Sends a messages payload to the model, returning the parsed
+        response; e.g. `llm_replay.replay_openai_request` to replay responses.
+        Defaults to `seeact_utils.execute_openai_request`.
+    """
     super().__init__(env, name)
+    self._request_fn = request_fn
     self._actions = []
     self.additional_guidelines = None
 
@@ -132,6 +149,11 @@ class SeeAct(base_agent.EnvironmentInteractingAgent):
     self.env.hide_automation_ui()
     self._actions.clear()
 
+  def _execute_request(self, payload: list[dict[str, Any]]) -> dict[str, Any]:
+    if self._request_fn is None:
+      return seeact_utils.execute_openai_request(payload)
+    return self._request_fn(payload)
+
   def set_task_guidelines(self, task_guidelines: list[str]) -> None:
     self.additional_guidelines = task_guidelines
 
@@ -172,7 +194,7 @@ class SeeAct(base_agent.EnvironmentInteractingAgent):
         sys_prompt, action_gen_prompt, state.pixels
     )
     result["action_gen_payload"] = payload
-    response = seeact_utils.execute_openai_request(payload)
+    response = self._execute_request(payload)
     action_gen_response = response["choices"][0]["message"]["content"]
     result["action_gen_response"] = action_gen_response
     if verbose:
@@ -192,7 +214,7 @@ class SeeAct(base_agent.EnvironmentInteractingAgent):
         action_ground_prompt,
     )
     result["action_ground_payload"] = payload
-    response = seeact_utils.execute_openai_request(payload)
+    response = self._execute_request(payload)
     action_ground_response = response["choices"][0]["message"]["content"]
     result["action_ground_response"] = action_ground_response
 
@@ -28,6 +28,7 @@ from absl import logging
 from android_world.agents import infer
 from android_world.env import json_action
 from android_world.env import representation_utils
+from android_world.utils import tracing
 from IPython import display
 from matplotlib.pylab import plt
 import numpy as np
@@ -178,7 +179,7 @@ def create_action_generation_messages_payload(
   Returns:
     JSON input for OpenAI API.
   """
-  base64_image = infer.Gpt4Wrapper.encode_image(image_array)
+  image_url = infer.Gpt4Wrapper.image_url(image_array)
   messages = [
       {
           "role": "system",
@@ -191,7 +192,7 @@ def create_action_generation_messages_payload(
               {
                   "type": "image_url",
                   "image_url": {
-                      "url": f"data:image/jpeg;base64,{base64_image}",
+                      "url": image_url,
                       "detail": "high",
                   },
               },
@@ -221,7 +222,7 @@ def create_grounding_messages_payload(
   Returns:
     JSON input for OpenAI API.
   """
-  base64_image = infer.Gpt4Wrapper.encode_image(image_array)
+  image_url = infer.Gpt4Wrapper.image_url(image_array)
   messages = [
       {
           "role": "system",
@@ -234,7 +235,7 @@ def create_grounding_messages_payload(
               {
                   "type": "image_url",
                   "image_url": {
-                      "url": f"data:image/jpeg;base64,{base64_image}",
+                      "url": image_url,
                       "detail": "high",
                   },
               },
@@ -294,6 +295,7 @@ def display_prompt(
   print(extra_text)
 
 
+@tracing.traced('llm.openai_request')
 def execute_openai_request(
     messages_payload: list[dict[str, Any]],
     model: str = _GPT_TURBO,
@@ -18,7 +18,6 @@ from android_world.agents import agent_utils
 from android_world.agents import base_agent
 from android_world.agents import infer
 from android_world.agents import m3a_utils
-from android_world.env import adb_utils
 from android_world.env import interface
 from android_world.env import json_action
 from android_world.env import representation_utils
@@ -406,8 +405,8 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
             ui_elements[converted_action.index],
             converted_action.index,
             logical_screen_size,
-            adb_utils.get_physical_frame_boundary(self.env.controller),
-            adb_utils.get_orientation(self.env.controller),
+            self.env.physical_frame_boundary,
+            self.env.orientation,
         )
 
     if converted_action.action_type == 'status':
@@ -18,14 +18,41 @@ import abc
 import datetime
 import gzip
 import io
+import json
 import os
 import pickle
+import shutil
+import tempfile
 from typing import Any
 
 from absl import logging
+from android_world.utils import frame_store
+from android_world.utils import step_log
+import numpy as np
 
 INSTANCE_SEPARATOR = '_'
 
+# Single-file task groups written by earlier versions of the checkpointer.
+_LEGACY_SUFFIX = '.pkl.gz'
+# Small per task group index holding every small field inline.
+_INDEX_SUFFIX = '.meta.pkl.gz'
+# Directories holding one chunk per large field of each episode, one per save
+# of a task group, named `<task_name>.<random>.bulk`.
+_BULK_SUFFIX = '.bulk'
+# Per episode trace, in the Chrome trace format; see `utils/tracing.py`.
+_TRACE_SUFFIX = '.trace.json'
+# Fields whose pickled size exceeds this many bytes are moved out of the index
+# into the bulk store; in practice this is the step data with screenshots.
+_BULK_FIELD_THRESHOLD_BYTES = 16 * 1024
+# Screenshots the step data refers to through `frame_store.FrameRef` handles
+# are saved in the bulk store as one gzipped `.npy` file each, copied as is
+# from the frame store.
+_FRAME_SUFFIX = '.npy.gz'
+# Directories where episodes write their steps as they run, one per attempt at
+# a task, named `<task_name>.<timestamp><random>.steps`; see
+# `utils/step_log.py`.
+_STEPS_SUFFIX = '.steps'
+
 Episode = dict[str, Any]
 
 
@@ -59,19 +86,115 @@ def _gzip_pickle(data: Any) -> bytes:
   Returns:
       A bytes object containing the gzipped pickled data.
   """
-  pickled_data = io.BytesIO()
-  pickle.dump(data, pickled_data)
+  return _gzip_bytes(pickle.dumps(data))
+
 
-  pickled_data.seek(0)  # Reset the stream position to the beginning
+def _gzip_bytes(data: bytes) -> bytes:
+  """Gzip compresses already pickled data in memory."""
   compressed_data = io.BytesIO()
   with gzip.GzipFile(
       fileobj=compressed_data, mode='wb', compresslevel=5
   ) as f_out:
-    f_out.write(pickled_data.getvalue())
+    f_out.write(data)
 
   return compressed_data.getvalue()
 
 
+def _write_atomically(file_path: str, content: bytes) -> None:
+  """Writes a file so readers never observe a partially written version."""
+  tmp_path = file_path + '.tmp'
+  with open(tmp_path, 'wb') as f:
+    f.write(content)
+  os.replace(tmp_path, file_path)
+
+
+class _FramePickler(pickle.Pickler):
+  """Pickles a field, saving the frames it refers to as separate files.
+
+  Frames are loaded and written one at a time, as the pickler reaches them.
+  Step data whose log is in the checkpoint directory is only referred to.
+
+  Attributes:
+    has_references: Whether the pickled field refers to frames or step logs.
+    step_logs: The names of the step logs the field refers to.
+  """
+
+  def __init__(
+      self,
+      file: io.BufferedIOBase,
+      checkpoint_directory: str,
+      bulk_directory: str | None = None,
+      prefix: str = '',
+  ):
+    """Initializes the pickler.
+
+    Args:
+      file: Where to write the pickle.
+      checkpoint_directory: The directory of the checkpoint.
+      bulk_directory: Where to save the frames, as `<prefix><n>.npy.gz`. If
+        None, frames are not saved and the pickle only measures the field.
+      prefix: The prefix of the frame file names.
+    """
+    super().__init__(file)
+    self._checkpoint_directory = os.path.abspath(checkpoint_directory)
+    self._bulk_directory = bulk_directory
+    self._prefix = prefix
+    self._n_frames = 0
+    self.has_references = False
+    self.step_logs = set()
+
+  def persistent_id(self, obj: Any) -> str | tuple[str, str] | None:
+    if (
+        isinstance(obj, step_log.StepData)
+        and os.path.dirname(os.path.abspath(obj.log.directory))
+        == self._checkpoint_directory
+    ):
+      self.has_references = True
+      log_name = os.path.basename(obj.log.directory)
+      self.step_logs.add(log_name)
+      return ('steps', log_name)
+    if not isinstance(obj, frame_store.FrameRef):
+      return None
+    self.has_references = True
+    if self._bulk_directory is None:
+      return ''
+    frame_name = f'{self._prefix}{self._n_frames}{_FRAME_SUFFIX}'
+    self._n_frames += 1
+    with open(obj.path, 'rb') as f:
+      _write_atomically(
+          os.path.join(self._bulk_directory, frame_name), f.read()
+      )
+    return frame_name
+
+
+def _read_step_log(directory: str) -> dict[str, list[Any]]:
+  """Reads the step data written by an episode, with its frames as arrays."""
+  if not os.path.isdir(directory):
+    raise FileNotFoundError(directory)
+  return step_log.StepLog(directory).step_data().to_dict()
+
+
+class _FrameUnpickler(pickle.Unpickler):
+  """Unpickles a field, reading the frames and step logs it refers to."""
+
+  def __init__(
+      self,
+      file: io.BufferedIOBase,
+      checkpoint_directory: str,
+      bulk_directory: str,
+  ):
+    super().__init__(file)
+    self._checkpoint_directory = checkpoint_directory
+    self._bulk_directory = bulk_directory
+
+  def persistent_load(self, pid: str | tuple[str, str]) -> Any:
+    if isinstance(pid, tuple):
+      _, log_name = pid
+      return _read_step_log(os.path.join(self._checkpoint_directory, log_name))
+    with gzip.open(os.path.join(self._bulk_directory, pid), 'rb') as f:
+      return np.load(f, allow_pickle=False)
+
+
 def _unzip_and_read_pickle(file_path: str) -> Any:
   """Reads a gzipped pickle file using 'with open', unzips, and unpickles it.
 
@@ -99,6 +222,30 @@ class Checkpointer(abc.ABC):
   def load(self, fields: list[str] | None = None) -> list[Episode]:
     """Loads all episodes from disk."""
 
+  def save_trace(self, trace: dict[str, Any], task_name: str) -> None:
+    """Saves the trace of a task's episode; by default it is dropped."""
+
+  def step_log_directory(self, task_name: str) -> str | None:
+    """Returns where a new episode of a task writes its steps as it runs.
+
+    By default, steps are written to a temporary directory.
+
+    Args:
+      task_name: The unique identifier for the task group.
+    """
+    del task_name
+    return None
+
+  def discard_unsaved_steps(self, task_name: str) -> None:
+    """Removes the steps of a task's episodes that were not saved.
+
+    E.g. of an episode rejected by the suite's check. By default, steps are
+    not kept.
+
+    Args:
+      task_name: The unique identifier for the task group.
+    """
+
 
 class IncrementalCheckpointer(Checkpointer):
   """Saves and loads the results of an evaluation run.
@@ -107,6 +254,24 @@ class IncrementalCheckpointer(Checkpointer):
   checkpointer to save the results of an evaluation run task by task, rather
   than saving the entire dataset at once.
 
+  Each task group is stored as a small index, `<task_name>.meta.pkl.gz`, that
+  holds every small field inline, plus a `<task_name>.<random>.bulk/` directory
+  with one gzipped pickle chunk per large field of each episode. Each save
+  writes a new directory and removes the previous one once the index refers to
+  the new one, so an interrupted save leaves the previous one intact. Loading a
+  subset of fields only reads the chunks those fields live in, so resuming
+  from episode metadata does not touch any screenshots. Task groups saved by older
+  versions as a single `<task_name>.pkl.gz` file are still loaded.
+
+  Episodes write their steps to a `<task_name>.<timestamp>*.steps/` directory
+  as they run, see `step_log_directory`, so saving an episode only refers to
+  its steps, whose screenshots are stored compressed. Saving a task group
+  removes the steps it does not refer to, e.g. of episodes that failed; until
+  then, steps of episodes interrupted before being saved are read by
+  `load_interrupted`. Screenshots held elsewhere as `frame_store.FrameRef`
+  handles are saved in the bulk directory, one file each. Either way, they are
+  loaded back as arrays.
+
   Attributes:
       directory: The directory to store the task data.
   """
@@ -122,45 +287,242 @@ class IncrementalCheckpointer(Checkpointer):
         task_episodes: The task's episodes to save.
         task_name: The unique identifier for the task group.
     """
-    filename = os.path.join(self.directory, f'{task_name}.pkl.gz')
-    with open(filename, 'wb') as f:
-      compressed = _gzip_pickle(task_episodes)
-      f.write(compressed)
+    # Chunks go to a new directory, so the saved index keeps referring to the
+    # previous chunks until it is replaced.
+    bulk_directory = None
+    index = []
+    for i, episode in enumerate(task_episodes):
+      inline, bulk, step_logs = {}, {}, set()
+      for field, value in episode.items():
+        pickled = io.BytesIO()
+        pickler = _FramePickler(pickled, self.directory)
+        pickler.dump(value)
+        step_logs |= pickler.step_logs
+        if (
+            not pickler.has_references
+            and pickled.tell() <= _BULK_FIELD_THRESHOLD_BYTES
+        ):
+          inline[field] = value
+          continue
+        chunk_name = f'{i}_{len(bulk)}.pkl.gz'
+        if bulk_directory is None:
+          bulk_directory = tempfile.mkdtemp(
+              suffix=_BULK_SUFFIX, prefix=task_name + '.', dir=self.directory
+          )
+        if pickler.has_references:
+          pickled = io.BytesIO()
+          _FramePickler(
+              pickled, self.directory, bulk_directory, f'{i}_{len(bulk)}_'
+          ).dump(value)
+        _write_atomically(
+            os.path.join(bulk_directory, chunk_name),
+            _gzip_bytes(pickled.getvalue()),
+        )
+        bulk[field] = chunk_name
+      index.append({
+          'order': list(episode),
+          'inline': inline,
+          'bulk': bulk,
+          'bulk_directory': (
+              os.path.basename(bulk_directory) if bulk else None
+          ),
+          'step_logs': sorted(step_logs),
+      })
+
+    # The index is written last so that it only ever refers to complete chunks,
+    # and what it no longer refers to is only removed once it is replaced.
+    filename = os.path.join(self.directory, task_name + _INDEX_SUFFIX)
+    _write_atomically(filename, _gzip_pickle(index))
+    self.discard_unsaved_steps(task_name)
+    for directory_name in self._bulk_directories(task_name):
+      if bulk_directory is None or directory_name != os.path.basename(
+          bulk_directory
+      ):
+        shutil.rmtree(
+            os.path.join(self.directory, directory_name), ignore_errors=True
+        )
+    legacy_filename = os.path.join(self.directory, task_name + _LEGACY_SUFFIX)
+    if os.path.exists(legacy_filename):
+      os.remove(legacy_filename)
     logging.info('Wrote task episodes for %s to %s', task_name, filename)
 
+  def _saved_step_logs(self, task_name: str) -> set[str]:
+    """Returns the names of the step logs the saved task group refers to."""
+    filename = os.path.join(self.directory, task_name + _INDEX_SUFFIX)
+    if not os.path.exists(filename):
+      return set()
+    return {
+        log_name
+        for entry in _unzip_and_read_pickle(filename)
+        for log_name in entry.get('step_logs', [])
+    }
+
+  def _step_logs(self, task_name: str) -> list[str]:
+    """Returns the names of the step logs of a task group's episodes."""
+    return [
+        name
+        for name in os.listdir(self.directory)
+        if name.endswith(_STEPS_SUFFIX)
+        and name[: -len(_STEPS_SUFFIX)].rsplit('.', 1)[0] == task_name
+    ]
+
+  def discard_unsaved_steps(self, task_name: str) -> None:
+    """Removes the step logs the saved task group does not refer to.
+
+    Args:
+      task_name: The unique identifier for the task group.
+    """
+    saved = self._saved_step_logs(task_name)
+    for log_name in self._step_logs(task_name):
+      if log_name not in saved:
+        shutil.rmtree(
+            os.path.join(self.directory, log_name), ignore_errors=True
+        )
+
+  def _bulk_directories(self, task_name: str) -> list[str]:
+    """Returns the names of the bulk directories of a task group.
+
+    I.e. `<task_name>.bulk`, written by earlier versions, and the
+    `<task_name>.<random>.bulk` directories of each save, including those of
+    saves interrupted before their index was written.
+
+    Args:
+      task_name: The unique identifier for the task group.
+    """
+    prefix = task_name + '.'
+    return [
+        name
+        for name in os.listdir(self.directory)
+        if name == task_name + _BULK_SUFFIX
+        or (
+            name.startswith(prefix)
+            and name.endswith(_BULK_SUFFIX)
+            and '.' not in name[len(prefix) : -len(_BULK_SUFFIX)]
+        )
+    ]
+
+  def step_log_directory(self, task_name: str) -> str:
+    """Returns a new directory in the checkpoint for an episode's steps.
+
+    Args:
+      task_name: The unique identifier for the task group.
+    """
+    timestamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    return tempfile.mkdtemp(
+        suffix=_STEPS_SUFFIX,
+        prefix=f'{task_name}.{timestamp}',
+        dir=self.directory,
+    )
+
+  def load_interrupted(self) -> dict[str, list[dict[str, list[Any]]]]:
+    """Loads the steps of episodes that were interrupted before being saved.
+
+    E.g. the steps taken before the run crashed, or before the episode raised.
+
+    Returns:
+      The step data of the interrupted episodes of each task group, in the
+      order they were run.
+    """
+    interrupted = {}
+    saved = {}
+    for log_name in sorted(os.listdir(self.directory)):
+      if not log_name.endswith(_STEPS_SUFFIX):
+        continue
+      task_name = log_name[: -len(_STEPS_SUFFIX)].rsplit('.', 1)[0]
+      if task_name not in saved:
+        saved[task_name] = self._saved_step_logs(task_name)
+      if log_name in saved[task_name]:
+        continue
+      interrupted.setdefault(task_name, []).append(
+          _read_step_log(os.path.join(self.directory, log_name))
+      )
+    return interrupted
+
+  def save_trace(self, trace: dict[str, Any], task_name: str) -> None:
+    """Saves a trace next to the task's episodes, as `<task_name>.trace.json`.
+
+    Args:
+        trace: The trace, in the Chrome trace format.
+        task_name: The unique identifier for the task group.
+    """
+    filename = os.path.join(self.directory, task_name + _TRACE_SUFFIX)
+    _write_atomically(filename, json.dumps(trace).encode('utf-8'))
+
   def load(self, fields: list[str] | None = None) -> list[Episode]:
-    """Loads all task groups from disk."""
-    # Keep same order as runtime.
-    directories = os.listdir(self.directory)
-    directories.sort(key=sort_key)
+    """Loads all task groups from disk.
 
+    Args:
+      fields: If provided, only these fields are loaded for each episode.
+
+    Returns:
+      The episodes of all task groups, in the order they were run.
+    """
     data = []
-    for filename in directories:
-      if filename.endswith('.pkl.gz'):
-        try:
-          task_group_id = filename[:-7]  # Remove ".pkl.gz" extension
-          task_group = self._load_task_group(task_group_id)
-          if fields is not None:
-            task_group = [
-                {field: episode[field] for field in fields}
-                for episode in task_group
-            ]
-          data.extend(task_group)
-        except Exception as e:  # pylint: disable=broad-exception-caught
-          logging.info('Unable to load %s with exception: %s', filename, e)
+    for task_group_id in self._task_group_ids():
+      try:
+        data.extend(self._load_task_group(task_group_id, fields))
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.info('Unable to load %s with exception: %s', task_group_id, e)
     return data
 
-  def _load_task_group(self, task_group_id: str) -> list[Episode]:
+  def _task_group_ids(self) -> list[str]:
+    """Returns the IDs of all stored task groups, in runtime order."""
+    task_group_ids = set()
+    for filename in os.listdir(self.directory):
+      if filename.endswith(_INDEX_SUFFIX):
+        task_group_ids.add(filename[: -len(_INDEX_SUFFIX)])
+      elif filename.endswith(_LEGACY_SUFFIX):
+        task_group_ids.add(filename[: -len(_LEGACY_SUFFIX)])
+    return sorted(task_group_ids, key=sort_key)
+
+  def _load_task_group(
+      self, task_group_id: str, fields: list[str] | None = None
+  ) -> list[Episode]:
     """Loads a single task group from disk."""
-    filename = os.path.join(self.directory, f'{task_group_id}.pkl.gz')
+    filename = os.path.join(self.directory, task_group_id + _INDEX_SUFFIX)
+    if not os.path.exists(filename):
+      return self._load_legacy_task_group(task_group_id, fields)
+
+    episodes = []
+    for entry in _unzip_and_read_pickle(filename):
+      bulk_directory = os.path.join(
+          self.directory,
+          entry.get('bulk_directory') or task_group_id + _BULK_SUFFIX,
+      )
+      episode = {}
+      for field in entry['order'] if fields is None else fields:
+        if field in entry['inline']:
+          episode[field] = entry['inline'][field]
+        elif field in entry['bulk']:
+          with gzip.open(
+              os.path.join(bulk_directory, entry['bulk'][field]), 'rb'
+          ) as f:
+            episode[field] = _FrameUnpickler(
+                f, self.directory, bulk_directory
+            ).load()
+        else:
+          raise KeyError(field)
+      episodes.append(episode)
+    return episodes
+
+  def _load_legacy_task_group(
+      self, task_group_id: str, fields: list[str] | None = None
+  ) -> list[Episode]:
+    """Loads a task group saved as a single gzipped pickle file."""
+    filename = os.path.join(self.directory, task_group_id + _LEGACY_SUFFIX)
     try:
-      return _unzip_and_read_pickle(filename)
+      task_group = _unzip_and_read_pickle(filename)
     except FileNotFoundError:
       logging.info(
           'File not readable: %s. It may not exist. Starting from empty state.',
           filename,
       )
       return []
+    if fields is not None:
+      task_group = [
+          {field: episode[field] for field in fields} for episode in task_group
+      ]
+    return task_group
 
 
 class NullCheckpointer(Checkpointer):
@@ -12,10 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
+import shutil
 import tempfile
+from unittest import mock
 from absl.testing import absltest
 from android_world import checkpointer
+from android_world.utils import frame_store
+from android_world.utils import step_log
+import numpy as np
 
 
 class CheckpointerTest(absltest.TestCase):
@@ -31,6 +37,15 @@ class CheckpointerTest(absltest.TestCase):
     super().tearDown()
     self.temp_dir.cleanup()
 
+  def _bulk_directory(self, task_name: str) -> str:
+    """Returns the only bulk directory of a task group."""
+    (directory_name,) = [
+        filename
+        for filename in os.listdir(self.temp_dir.name)
+        if filename.startswith(task_name + '.') and filename.endswith('.bulk')
+    ]
+    return os.path.join(self.temp_dir.name, directory_name)
+
   def test_save_and_load_valid_data(self) -> None:
     """Tests if save and load work as expected with valid data."""
     task_group1 = [{'key': 'value1'}]
@@ -85,6 +100,252 @@ class CheckpointerTest(absltest.TestCase):
     expected_data = [{'key1': 'value1'}]
     self.assertEqual(expected_data, loaded_data)
 
+  def test_large_fields_round_trip(self) -> None:
+    """Tests that fields moved to the bulk store are loaded back."""
+    screenshot = np.arange(64 * 1024, dtype=np.uint8).reshape(256, 256)
+    task_group = [
+        {'goal': 'g1', 'episode_data': {'screenshot': [screenshot]}},
+        {'goal': 'g2', 'episode_data': {'screenshot': []}},
+    ]
+    self.checkpointer.save_episodes(task_group, 'task_group')
+
+    loaded_data = self.checkpointer.load()
+
+    self.assertLen(loaded_data, 2)
+    self.assertEqual(list(loaded_data[0]), ['goal', 'episode_data'])
+    np.testing.assert_array_equal(
+        loaded_data[0]['episode_data']['screenshot'][0], screenshot
+    )
+    self.assertEqual(loaded_data[1], task_group[1])
+    self.assertTrue(os.path.isdir(self._bulk_directory('task_group')))
+
+  def test_frames_round_trip_as_arrays(self) -> None:
+    """Tests that frames referred to by handles are saved one file each."""
+    store = frame_store.FrameStore()
+    screenshots = [
+        np.full((256, 256), i, dtype=np.uint8) for i in range(3)
+    ]
+    task_group = [{
+        'goal': 'g',
+        'episode_data': {
+            'screenshot': [store.put(screenshot) for screenshot in screenshots],
+            'summary': ['a', 'b', 'c'],
+        },
+    }]
+    self.checkpointer.save_episodes(task_group, 'task_group')
+
+    loaded_data = self.checkpointer.load()
+
+    episode_data = loaded_data[0]['episode_data']
+    self.assertEqual(episode_data['summary'], ['a', 'b', 'c'])
+    for loaded, screenshot in zip(episode_data['screenshot'], screenshots):
+      self.assertIsInstance(loaded, np.ndarray)
+      np.testing.assert_array_equal(loaded, screenshot)
+    self.assertLen(
+        [
+            filename
+            for filename in os.listdir(self._bulk_directory('task_group'))
+            if filename.endswith('.npy.gz')
+        ],
+        3,
+    )
+
+  def _run_episode(self, task_name: str, n_steps: int) -> step_log.StepLog:
+    log = step_log.StepLog(self.checkpointer.step_log_directory(task_name))
+    for i in range(n_steps):
+      log.append({
+          'screenshot': np.full((256, 256), i, dtype=np.uint8),
+          'step_number': i,
+      })
+    return log
+
+  def test_step_logs_in_checkpoint_are_referred_to(self) -> None:
+    """Tests that saving an episode does not copy the steps it has written."""
+    log = self._run_episode('task_group', 3)
+    self.checkpointer.save_episodes(
+        [{'goal': 'g', 'episode_data': log.step_data()}], 'task_group'
+    )
+
+    loaded_data = self.checkpointer.load()
+
+    episode_data = loaded_data[0]['episode_data']
+    self.assertEqual(episode_data['step_number'], [0, 1, 2])
+    self.assertIsInstance(episode_data['screenshot'][2], np.ndarray)
+    np.testing.assert_array_equal(episode_data['screenshot'][2], 2)
+    bulk_directory = self._bulk_directory('task_group')
+    self.assertEqual(os.listdir(bulk_directory), ['0_0.pkl.gz'])
+    self.assertLess(
+        os.path.getsize(os.path.join(bulk_directory, '0_0.pkl.gz')), 100
+    )
+    self.assertEqual(self.checkpointer.load_interrupted(), {})
+
+  def test_saving_removes_superseded_step_logs(self) -> None:
+    """Tests that rerunning a task removes the steps of the previous run."""
+    first = self._run_episode('task_group', 1)
+    self.checkpointer.save_episodes(
+        [{'episode_data': first.step_data()}], 'task_group'
+    )
+    second = self._run_episode('task_group', 2)
+    self.checkpointer.save_episodes(
+        [{'episode_data': second.step_data()}], 'task_group'
+    )
+
+    self.assertFalse(os.path.exists(first.directory))
+    self.assertLen(
+        self.checkpointer.load()[0]['episode_data']['step_number'], 2
+    )
+
+  def test_saving_removes_step_logs_of_unsaved_episodes(self) -> None:
+    """Tests that steps of failed and rejected episodes are not kept."""
+    failed = self._run_episode('task_group', 1)
+    self.checkpointer.save_episodes(
+        [{'goal': 'g', 'exception_info': 'error'}], 'task_group'
+    )
+    rejected = self._run_episode('other_task_group', 1)
+    other = self._run_episode('task_group_2', 1)
+
+    self.checkpointer.discard_unsaved_steps('other_task_group')
+
+    self.assertFalse(os.path.exists(failed.directory))
+    self.assertFalse(os.path.exists(rejected.directory))
+    self.assertTrue(os.path.exists(other.directory))
+
+  def test_load_interrupted(self) -> None:
+    """Tests that steps of episodes that were not saved can be recovered."""
+    saved = self._run_episode('task_group', 1)
+    self.checkpointer.save_episodes(
+        [{'episode_data': saved.step_data()}], 'task_group'
+    )
+    self._run_episode('task_group', 2)
+    self._run_episode('other_task_group', 1)
+
+    interrupted = self.checkpointer.load_interrupted()
+
+    self.assertEqual(
+        {
+            task_name: [episode['step_number'] for episode in episodes]
+            for task_name, episodes in interrupted.items()
+        },
+        {'task_group': [[0, 1]], 'other_task_group': [[0]]},
+    )
+    self.assertLen(self.checkpointer.load(), 1)
+
+  def test_load_fields_does_not_read_bulk_data(self) -> None:
+    """Tests that loading metadata fields only reads the index."""
+    task_group = [{'goal': 'g', 'episode_data': np.zeros(1 << 20, np.uint8)}]
+    self.checkpointer.save_episodes(task_group, 'task_group')
+    shutil.rmtree(self._bulk_directory('task_group'))
+
+    loaded_data = self.checkpointer.load(fields=['goal'])
+
+    self.assertEqual([{'goal': 'g'}], loaded_data)
+
+  def test_interrupted_save_keeps_previous_task_group(self) -> None:
+    """Tests that a save failing before its index is written loses nothing."""
+    screenshot = np.arange(64 * 1024, dtype=np.uint8).reshape(256, 256)
+    self.checkpointer.save_episodes(
+        [{'goal': 'old', 'episode_data': screenshot}], 'task_group'
+    )
+    write_atomically = checkpointer._write_atomically
+
+    def fail_on_index(filename: str, data: bytes) -> None:
+      if filename.endswith('.meta.pkl.gz'):
+        raise OSError('Disk full')
+      write_atomically(filename, data)
+
+    with mock.patch.object(
+        checkpointer, '_write_atomically', side_effect=fail_on_index
+    ):
+      with self.assertRaises(OSError):
+        self.checkpointer.save_episodes(
+            [{'goal': 'new', 'episode_data': screenshot + 1}], 'task_group'
+        )
+
+    loaded_data = self.checkpointer.load()
+    self.assertEqual(loaded_data[0]['goal'], 'old')
+    np.testing.assert_array_equal(loaded_data[0]['episode_data'], screenshot)
+
+    self.checkpointer.save_episodes(
+        [{'goal': 'newer', 'episode_data': screenshot + 2}], 'task_group'
+    )
+
+    loaded_data = self.checkpointer.load()
+    self.assertEqual(loaded_data[0]['goal'], 'newer')
+    np.testing.assert_array_equal(
+        loaded_data[0]['episode_data'], screenshot + 2
+    )
+    # The directories of the old and the interrupted saves are removed.
+    self.assertLen(
+        [
+            filename
+            for filename in os.listdir(self.temp_dir.name)
+            if filename.endswith('.bulk')
+        ],
+        1,
+    )
+
+  def test_load_legacy_bulk_directory(self) -> None:
+    """Tests that indexes without a bulk directory name use `<task>.bulk`."""
+    screenshot = np.zeros((256, 256), dtype=np.uint8)
+    self.checkpointer.save_episodes(
+        [{'episode_data': screenshot}], 'task_group'
+    )
+    index_file = os.path.join(self.temp_dir.name, 'task_group.meta.pkl.gz')
+    index = checkpointer._unzip_and_read_pickle(index_file)
+    for entry in index:
+      del entry['bulk_directory']
+    with open(index_file, 'wb') as f:
+      f.write(checkpointer._gzip_pickle(index))
+    os.rename(
+        self._bulk_directory('task_group'),
+        os.path.join(self.temp_dir.name, 'task_group.bulk'),
+    )
+
+    loaded_data = self.checkpointer.load()
+
+    np.testing.assert_array_equal(loaded_data[0]['episode_data'], screenshot)
+
+  def test_load_legacy_task_groups(self) -> None:
+    """Tests that task groups saved as a single .pkl.gz are still read."""
+    legacy = [{'key': 'legacy', 'other': 1}]
+    with open(os.path.join(self.temp_dir.name, 'a_0.pkl.gz'), 'wb') as f:
+      f.write(checkpointer._gzip_pickle(legacy))
+    self.checkpointer.save_episodes([{'key': 'new', 'other': 2}], 'a_1')
+
+    loaded_data = self.checkpointer.load(fields=['key'])
+
+    self.assertEqual([{'key': 'legacy'}, {'key': 'new'}], loaded_data)
+
+  def test_save_replaces_legacy_task_group(self) -> None:
+    """Tests that saving a task group removes its legacy file."""
+    legacy_file = os.path.join(self.temp_dir.name, 'task_group.pkl.gz')
+    with open(legacy_file, 'wb') as f:
+      f.write(checkpointer._gzip_pickle([{'key': 'old'}]))
+
+    self.checkpointer.save_episodes([{'key': 'new'}], 'task_group')
+
+    self.assertFalse(os.path.exists(legacy_file))
+    self.assertEqual([{'key': 'new'}], self.checkpointer.load())
+
+  def test_load_sorts_by_instance_number(self) -> None:
+    """Tests that task groups are loaded in runtime order."""
+    for i in (10, 2, 1):
+      self.checkpointer.save_episodes([{'i': i}], f'task_{i}')
+
+    loaded_data = self.checkpointer.load()
+
+    self.assertEqual([{'i': 1}, {'i': 2}, {'i': 10}], loaded_data)
+
+  def test_save_trace(self) -> None:
+    trace = {'traceEvents': [{'name': 'step', 'ph': 'X', 'ts': 0, 'dur': 1}]}
+    self.checkpointer.save_episodes([{'key': 'value'}], 'task_group')
+
+    self.checkpointer.save_trace(trace, 'task_group')
+
+    with open(os.path.join(self.temp_dir.name, 'task_group.trace.json')) as f:
+      self.assertEqual(json.load(f), trace)
+    self.assertEqual([{'key': 'value'}], self.checkpointer.load())
+
 
 if __name__ == '__main__':
   absltest.main()
@@ -0,0 +1,335 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Ledger of the adb calls made through `AndroidWorldController`.
+
+Every call is recorded with its kind, e.g. "generic" or "tap", a normalized
+command, its request and response sizes, latency and status. Commands are
+normalized by replacing numbers and quoted strings, so that e.g. all taps
+share one row in the summary.
+
+Read-only commands, such as `whoami` or `settings get`, that repeat an
+identical earlier call within a short window are flagged as redundant; they
+are candidates for caching.
+
+Like `utils/tracing.py`, the ledger is off by default and calls are only
+recorded inside `record()`. `suite_utils` records a ledger per task and prints
+a summary for the whole suite.
+"""
+
+import bisect
+import contextlib
+import contextvars
+import dataclasses
+import re
+import threading
+from typing import Iterator
+
+from android_env.proto import adb_pb2
+
+# Repeats of an identical read-only call within this window are redundant.
+_REDUNDANCY_WINDOW_SEC = 2.0
+# Upper bounds, in seconds, of the latency histogram buckets.
+_LATENCY_BUCKETS_SEC = (0.01, 0.03, 0.1, 0.3, 1.0, 3.0)
+_MAX_COMMAND_LENGTH = 100
+
+_READ_ONLY_KINDS = frozenset(
+    {'get_current_activity', 'get_orientation', 'pull', 'dumpsys'}
+)
+# Shell commands, after `shell`, that do not change the device state.
+_READ_ONLY_SHELL_PREFIXES = (
+    'cat ',
+    'content query ',
+    'date ',
+    'dumpsys ',
+    'getprop ',
+    'id ',
+    'ls ',
+    'md5sum ',
+    'pm list ',
+    'pm path ',
+    'settings get ',
+    'settings list ',
+    'stat ',
+    'whoami ',
+    'wm density ',
+    'wm size ',
+)
+_QUOTED = re.compile(r"'[^']*'|\"[^\"]*\"")
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(\.\d+)?(?![\w.])')
+
+_enabled = False
+_active_ledger: contextvars.ContextVar['AdbLedger | None'] = (
+    contextvars.ContextVar('android_world_adb_ledger', default=None)
+)
+
+
+def enable(enabled: bool = True) -> None:
+  """Turns recording of adb calls on or off for the process."""
+  global _enabled
+  _enabled = enabled
+
+
+def is_enabled() -> bool:
+  return _enabled
+
+
+@dataclasses.dataclass(frozen=True)
+class AdbCall:
+  """An adb call made through the controller.
+
+  Attributes:
+    kind: The kind of request, e.g. "generic" or "tap".
+    command: The command, with numbers and quoted strings replaced.
+    exact_command: The command as issued, used to find repeated calls.
+    request_bytes: The size of the serialized request.
+    response_bytes: The size of the serialized response.
+    start_time: When the call was issued, from `time.perf_counter`.
+    latency_sec: The time taken by the call.
+    status: The name of the response status, e.g. "OK".
+    read_only: Whether the call does not change the device state.
+    redundant: Whether it is a read-only call repeating an identical call
+      shortly before.
+  """
+
+  kind: str
+  command: str
+  exact_command: str
+  request_bytes: int
+  response_bytes: int
+  start_time: float
+  latency_sec: float
+  status: str
+  read_only: bool
+  redundant: bool = False
+
+
+def _describe(request: adb_pb2.AdbRequest) -> tuple[str, str]:
+  """Returns the kind of a request and its command, without file contents."""
+  kind = request.WhichOneof('command') or 'unknown'
+  if kind == 'generic':
+    return kind, ' '.join(request.generic.args)
+  if kind in ('push', 'pull'):
+    return kind, f'{kind} {getattr(request, kind).path}'
+  if kind == 'install_apk':
+    return kind, f'install_apk {request.install_apk.filesystem.path}'.strip()
+  return kind, f'{kind} {getattr(request, kind)}'.strip()
+
+
+def normalize_command(command: str) -> str:
+  """Replaces the arguments that vary between similar commands."""
+  command = _QUOTED.sub('<s>', ' '.join(command.split()))
+  command = _NUMBER.sub('<n>', command)
+  return command[:_MAX_COMMAND_LENGTH]
+
+
+def _is_read_only(request: adb_pb2.AdbRequest, kind: str) -> bool:
+  if kind in _READ_ONLY_KINDS:
+    return True
+  if kind == 'settings':
+    return request.settings.HasField('get') or request.settings.HasField(
+        'list'
+    )
+  if kind == 'package_manager':
+    return request.package_manager.HasField('list')
+  if kind == 'generic':
+    args = list(request.generic.args)
+    if args[:1] != ['shell']:
+      return False
+    shell_command = ' '.join(args[1:]) + ' '
+    return shell_command.startswith(_READ_ONLY_SHELL_PREFIXES)
+  return False
+
+
+@dataclasses.dataclass
+class CommandStats:
+  """Aggregated calls of one normalized command.
+
+  Attributes:
+    kind: The kind of request.
+    command: The normalized command.
+    latencies_sec: The latency of each call.
+    total_bytes: The request and response sizes of all calls.
+    num_redundant: The number of redundant calls.
+    num_failed: The number of calls that did not return OK.
+  """
+
+  kind: str
+  command: str
+  latencies_sec: list[float] = dataclasses.field(default_factory=list)
+  total_bytes: int = 0
+  num_redundant: int = 0
+  num_failed: int = 0
+
+  def percentile(self, q: float) -> float:
+    latencies = sorted(self.latencies_sec)
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+  def histogram(self) -> list[int]:
+    """Returns the number of calls in each bucket of `_LATENCY_BUCKETS_SEC`.
+
+    The last bucket counts the calls slower than all bounds.
+    """
+    counts = [0] * (len(_LATENCY_BUCKETS_SEC) + 1)
+    for latency in self.latencies_sec:
+      counts[bisect.bisect_left(_LATENCY_BUCKETS_SEC, latency)] += 1
+    return counts
+
+
+class AdbLedger:
+  """Records adb calls and aggregates them by normalized command."""
+
+  def __init__(self, redundancy_window_sec: float = _REDUNDANCY_WINDOW_SEC):
+    self.redundancy_window_sec = redundancy_window_sec
+    self._calls: list[AdbCall] = []
+    # Last end time of each read-only call, by kind and exact command.
+    self._last_read: dict[tuple[str, str], float] = {}
+    self._lock = threading.Lock()
+
+  def add(
+      self,
+      request: adb_pb2.AdbRequest,
+      response: adb_pb2.AdbResponse,
+      start_time: float,
+      end_time: float,
+  ) -> AdbCall:
+    """Records a call, with times from `time.perf_counter`."""
+    kind, command = _describe(request)
+    read_only = _is_read_only(request, kind)
+    with self._lock:
+      redundant = False
+      if read_only:
+        last_end = self._last_read.get((kind, command))
+        redundant = (
+            last_end is not None
+            and start_time - last_end <= self.redundancy_window_sec
+        )
+        self._last_read[(kind, command)] = end_time
+      call = AdbCall(
+          kind=kind,
+          command=normalize_command(command),
+          exact_command=command,
+          request_bytes=request.ByteSize(),
+          response_bytes=response.ByteSize(),
+          start_time=start_time,
+          latency_sec=end_time - start_time,
+          status=adb_pb2.AdbResponse.Status.Name(response.status),
+          read_only=read_only,
+          redundant=redundant,
+      )
+      self._calls.append(call)
+    return call
+
+  def extend(self, other: 'AdbLedger') -> None:
+    """Adds the calls recorded by another ledger, e.g. of a single task."""
+    calls = other.calls
+    with self._lock:
+      self._calls.extend(calls)
+
+  @property
+  def calls(self) -> list[AdbCall]:
+    with self._lock:
+      return list(self._calls)
+
+  def stats(self) -> list[CommandStats]:
+    """Returns the calls grouped by command, by decreasing total latency."""
+    stats: dict[tuple[str, str], CommandStats] = {}
+    for call in self.calls:
+      key = (call.kind, call.command)
+      if key not in stats:
+        stats[key] = CommandStats(call.kind, call.command)
+      entry = stats[key]
+      entry.latencies_sec.append(call.latency_sec)
+      entry.total_bytes += call.request_bytes + call.response_bytes
+      entry.num_redundant += call.redundant
+      entry.num_failed += call.status != 'OK'
+    return sorted(
+        stats.values(), key=lambda s: sum(s.latencies_sec), reverse=True
+    )
+
+  def summary(self) -> str:
+    """Returns a one line summary of the calls."""
+    calls = self.calls
+    redundant = [call for call in calls if call.redundant]
+    transferred_bytes = sum(
+        call.request_bytes if call.kind == 'push' else call.response_bytes
+        for call in calls
+        if call.kind in ('push', 'pull')
+    )
+    return (
+        f'{len(calls)} adb calls taking'
+        f' {sum(call.latency_sec for call in calls):.1f}s, of which'
+        f' {len(redundant)} redundant taking'
+        f' {sum(call.latency_sec for call in redundant):.1f}s;'
+        f' {transferred_bytes / 1024:.1f} KiB of files pushed or pulled'
+    )
+
+  def render(self, top_n: int = 20) -> str:
+    """Returns a table of the commands with the largest total latency.
+
+    Args:
+      top_n: The number of commands to show.
+    """
+    buckets = '/'.join(
+        f'{bound * 1000:g}' if bound < 1 else f'{bound:g}s'
+        for bound in _LATENCY_BUCKETS_SEC
+    )
+    lines = [
+        self.summary(),
+        f'{"calls":>6} {"redund":>6} {"total s":>8} {"p50 ms":>7}'
+        f' {"p90 ms":>7} {"max ms":>7} {"KiB":>7}  histogram <{buckets}/+'
+        '  command',
+    ]
+    for entry in self.stats()[:top_n]:
+      lines.append(
+          f'{len(entry.latencies_sec):>6} {entry.num_redundant:>6}'
+          f' {sum(entry.latencies_sec):>8.2f}'
+          f' {entry.percentile(0.5) * 1000:>7.1f}'
+          f' {entry.percentile(0.9) * 1000:>7.1f}'
+          f' {max(entry.latencies_sec) * 1000:>7.1f}'
+          f' {entry.total_bytes / 1024:>7.1f}'
+          f'  {"/".join(map(str, entry.histogram()))}'
+          f'  {entry.command}'
+      )
+    return '\n'.join(lines)
+
+
+def log_call(
+    request: adb_pb2.AdbRequest,
+    response: adb_pb2.AdbResponse,
+    start_time: float,
+    end_time: float,
+) -> None:
+  """Adds a call to the ledger being recorded, if any."""
+  ledger = _active_ledger.get()
+  if ledger is not None:
+    ledger.add(request, response, start_time, end_time)
+
+
+@contextlib.contextmanager
+def record() -> Iterator[AdbLedger | None]:
+  """Records the adb calls of the current thread into a new ledger.
+
+  Yields:
+    The ledger, or None if recording is disabled.
+  """
+  if not _enabled:
+    yield None
+    return
+  ledger = AdbLedger()
+  token = _active_ledger.set(ledger)
+  try:
+    yield ledger
+  finally:
+    _active_ledger.reset(token)
@@ -0,0 +1,143 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from absl.testing import absltest
+from android_env import env_interface
+from android_env.proto import adb_pb2
+from android_world.env import adb_ledger
+from android_world.env import adb_utils
+from android_world.env import android_world_controller
+from android_world.utils import fake_adb_responses
+
+
+def _generic(command: str) -> adb_pb2.AdbRequest:
+  return adb_pb2.AdbRequest(
+      generic=adb_pb2.AdbRequest.GenericRequest(args=command.split(' '))
+  )
+
+
+_OK = adb_pb2.AdbResponse(status=adb_pb2.AdbResponse.Status.OK)
+
+
+class AdbLedgerTest(absltest.TestCase):
+
+  def test_normalize_command(self):
+    self.assertEqual(
+        adb_ledger.normalize_command("shell input tap 120 -3.5 'x y' a1"),
+        'shell input tap <n> <n> <s> a1',
+    )
+
+  def test_records_call_details(self):
+    ledger = adb_ledger.AdbLedger()
+    response = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.ADB_ERROR,
+        generic=adb_pb2.AdbResponse.GenericResponse(output=b'root'),
+    )
+
+    call = ledger.add(_generic('shell whoami'), response, 1.0, 1.25)
+
+    self.assertEqual(call.kind, 'generic')
+    self.assertEqual(call.command, 'shell whoami')
+    self.assertEqual(call.latency_sec, 0.25)
+    self.assertEqual(call.status, 'ADB_ERROR')
+    self.assertTrue(call.read_only)
+    self.assertFalse(call.redundant)
+    self.assertGreater(call.response_bytes, 0)
+
+  def test_push_command_omits_content(self):
+    ledger = adb_ledger.AdbLedger()
+    request = adb_pb2.AdbRequest(
+        push=adb_pb2.AdbRequest.Push(content=b'x' * 1000, path='/sdcard/a')
+    )
+
+    call = ledger.add(request, _OK, 0.0, 0.1)
+
+    self.assertEqual(call.command, 'push /sdcard/a')
+    self.assertFalse(call.read_only)
+    self.assertGreater(call.request_bytes, 1000)
+    self.assertEndsWith(ledger.summary(), '1.0 KiB of files pushed or pulled')
+
+  def test_flags_repeated_read_only_calls_within_window(self):
+    ledger = adb_ledger.AdbLedger(redundancy_window_sec=1.0)
+
+    calls = [
+        ledger.add(_generic('shell whoami'), _OK, 0.0, 0.1),
+        ledger.add(_generic('shell rm -f /a'), _OK, 0.2, 0.3),
+        ledger.add(_generic('shell rm -f /a'), _OK, 0.4, 0.5),
+        ledger.add(_generic('shell whoami'), _OK, 0.6, 0.7),
+        ledger.add(_generic('shell settings get global x'), _OK, 0.8, 0.9),
+        ledger.add(_generic('shell whoami'), _OK, 5.0, 5.1),
+    ]
+
+    self.assertEqual(
+        [call.redundant for call in calls],
+        [False, False, False, True, False, False],
+    )
+
+  def test_stats_and_render(self):
+    ledger = adb_ledger.AdbLedger()
+    ledger.add(_generic('shell input tap 1 2'), _OK, 0.0, 0.005)
+    ledger.add(_generic('shell input tap 3 4'), _OK, 1.0, 1.05)
+    ledger.add(_generic('shell whoami'), _OK, 2.0, 4.0)
+    other = adb_ledger.AdbLedger()
+    other.add(_generic('shell whoami'), _OK, 0.0, 1.0)
+    ledger.extend(other)
+
+    stats = ledger.stats()
+
+    self.assertEqual(
+        [entry.command for entry in stats],
+        ['shell whoami', 'shell input tap <n> <n>'],
+    )
+    self.assertEqual(stats[1].histogram(), [1, 0, 1, 0, 0, 0, 0])
+    self.assertEqual(stats[0].histogram(), [0, 0, 0, 0, 1, 1, 0])
+    rendered = ledger.render()
+    self.assertStartsWith(rendered, '4 adb calls taking 3.1s')
+    self.assertIn('shell input tap <n> <n>', rendered)
+
+  def test_records_only_when_enabled(self):
+    with adb_ledger.record() as ledger:
+      self.assertIsNone(ledger)
+
+    adb_ledger.enable()
+    self.addCleanup(adb_ledger.enable, False)
+    with adb_ledger.record() as ledger:
+      adb_ledger.log_call(_generic('shell whoami'), _OK, 0.0, 0.1)
+    adb_ledger.log_call(_generic('shell whoami'), _OK, 0.0, 0.1)
+
+    self.assertLen(ledger.calls, 1)
+
+  def test_controller_logs_adb_calls(self):
+    adb_ledger.enable()
+    self.addCleanup(adb_ledger.enable, False)
+    base_env = mock.create_autospec(env_interface.AndroidEnvInterface)
+    base_env.execute_adb_call.return_value = (
+        fake_adb_responses.create_successful_generic_response('')
+    )
+    controller = android_world_controller.AndroidWorldController(
+        base_env, a11y_method=android_world_controller.A11yMethod.NONE
+    )
+
+    with adb_ledger.record() as ledger:
+      adb_utils.issue_generic_request('shell whoami', controller)
+
+    self.assertEqual(
+        [call.command for call in ledger.calls], ['shell whoami']
+    )
+
+
+if __name__ == '__main__':
+  absltest.main()
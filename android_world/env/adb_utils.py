@@ -14,9 +14,11 @@
 
 """Utilties to interact with the environment using adb."""
 
+import dataclasses
 import json
 import os
 import re
+import threading
 import time
 from typing import Any, Callable, Collection, Iterable, Literal, Optional, TypeVar
 import unicodedata
@@ -24,6 +26,7 @@ from absl import logging
 from android_env import env_interface
 from android_env.components import errors
 from android_env.proto import adb_pb2
+from android_world.utils import tracing
 import immutabledict
 
 T = TypeVar('T')
@@ -574,18 +577,194 @@ def issue_generic_request(
   else:
     args_str = ' '.join(args)
 
-  response = env.execute_adb_call(
-      adb_pb2.AdbRequest(
-          generic=adb_pb2.AdbRequest.GenericRequest(args=args),
-          timeout_sec=timeout_sec,
-      )
-  )
+  with tracing.span('adb_utils.issue_generic_request', command=args_str):
+    response = env.execute_adb_call(
+        adb_pb2.AdbRequest(
+            generic=adb_pb2.AdbRequest.GenericRequest(args=args),
+            timeout_sec=timeout_sec,
+        )
+    )
   if response.status != adb_pb2.AdbResponse.Status.OK:
     logging.error('Failed to issue generic adb request: %r', args_str)
 
   return response
 
 
+@dataclasses.dataclass(frozen=True)
+class ShellResult:
+  """Result of a single command run as part of a `ShellBatch`.
+
+  Attributes:
+    command: The shell command.
+    exit_code: Exit code of the command, or None if it did not run, e.g.
+      because an earlier required command failed.
+    output: Combined stdout and stderr of the command.
+    error_message: Message used by `ShellBatch.check_ok` if the command
+      failed.
+  """
+
+  command: str
+  exit_code: Optional[int]
+  output: str
+  error_message: Optional[str] = None
+
+  @property
+  def ok(self) -> bool:
+    return self.exit_code == 0
+
+
+@dataclasses.dataclass(frozen=True)
+class _BatchedCommand:
+  command: str
+  error_message: Optional[str]
+  allow_failure: bool
+
+
+class ShellBatch:
+  """Runs several shell commands in a single `adb shell` invocation.
+
+  Each `issue_generic_request` is a full adb round trip, so device setup that
+  chains many small commands is dominated by per-call latency. A batch joins
+  the commands into one script and recovers the exit code and output of each
+  command from markers printed around it.
+
+  Example:
+  ~~~~~~~
+
+  with adb_utils.ShellBatch(env) as batch:
+    batch.add(['mkdir', '-p', path], 'Failed to create directory.')
+    batch.add(['chmod', '777', path])
+  batch.check_ok()  # Raises like `check_ok` for the first failed command.
+
+  By default, a failing command stops the batch and later commands are
+  reported as not run, like a chain of `check_ok` calls would. Commands added
+  with `allow_failure=True` never stop the batch.
+  """
+
+  def __init__(
+      self,
+      env: env_interface.AndroidEnvInterface,
+      timeout_sec: Optional[float] = _DEFAULT_TIMEOUT_SECS,
+  ):
+    self._env = env
+    self._timeout_sec = timeout_sec
+    self._commands: list[_BatchedCommand] = []
+    self.results: list[ShellResult] = []
+
+  def __enter__(self) -> 'ShellBatch':
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback) -> None:
+    if exc_type is None:
+      self.run()
+
+  def __len__(self) -> int:
+    return len(self._commands)
+
+  def add(
+      self,
+      command: Collection[str] | str,
+      error_message: Optional[str] = None,
+      allow_failure: bool = False,
+  ) -> int:
+    """Adds a shell command to the batch.
+
+    Args:
+      command: The shell command, either as a string or as a list of arguments
+        that are joined with spaces, like `issue_generic_request` does.
+      error_message: Message raised by `check_ok` if this command fails.
+      allow_failure: Whether later commands still run if this one fails.
+
+    Returns:
+      The index of the command's result in `results`.
+    """
+    if not isinstance(command, str):
+      command = ' '.join(command)
+    self._commands.append(
+        _BatchedCommand(command, error_message, allow_failure)
+    )
+    return len(self._commands) - 1
+
+  def _script(self, marker: str) -> str:
+    lines = []
+    for i, command in enumerate(self._commands):
+      lines.append(f'echo {marker}:{i}:start')
+      lines.append(f'{{ {command.command}\n}} 2>&1')
+      lines.append(f'rc=$?; echo; echo {marker}:{i}:$rc')
+      if not command.allow_failure:
+        lines.append('[ $rc -eq 0 ] || exit 0')
+    return '\n'.join(lines)
+
+  def run(self) -> list[ShellResult]:
+    """Runs all added commands with a single adb call.
+
+    Returns:
+      One result per added command, in the order they were added.
+    """
+    if not self._commands:
+      self.results = []
+      return self.results
+    marker = f'__aw_batch_{os.urandom(8).hex()}'
+    response = issue_generic_request(
+        ['shell', self._script(marker)], self._env, self._timeout_sec
+    )
+    output = response.generic.output.decode('utf-8', errors='replace')
+    self.results = _parse_batch_output(output, marker, self._commands)
+    return self.results
+
+  def check_ok(self) -> None:
+    """Raises RuntimeError for the first failed command that was required.
+
+    Raises:
+      RuntimeError: If a command without `allow_failure` failed or did not
+        run.
+    """
+    for command, result in zip(self._commands, self.results):
+      if command.allow_failure or result.ok:
+        continue
+      if result.error_message is not None:
+        raise RuntimeError(result.error_message)
+      raise RuntimeError(
+          f'ADB shell command {result.command!r} failed with exit code'
+          f' {result.exit_code}: {result.output}'
+      )
+
+
+def _parse_batch_output(
+    output: str, marker: str, commands: list[_BatchedCommand]
+) -> list[ShellResult]:
+  """Splits the output of a batch script into per command results."""
+  exit_codes: dict[int, int] = {}
+  outputs: dict[int, list[str]] = {}
+  current = None
+  for line in output.replace('\r', '').split('\n'):
+    if line.startswith(marker + ':'):
+      index, status = line[len(marker) + 1 :].split(':', 1)
+      if status == 'start':
+        current = int(index)
+        outputs[current] = []
+      else:
+        exit_codes[int(index)] = int(status)
+        current = None
+    elif current is not None:
+      outputs[current].append(line)
+  results = []
+  for i, command in enumerate(commands):
+    # Drop the newline echoed before the end marker.
+    lines = outputs.get(i, [])
+    if lines and not lines[-1]:
+      lines = lines[:-1]
+    results.append(
+        ShellResult(
+            command=command.command,
+            exit_code=exit_codes.get(i),
+            output='\n'.join(lines),
+            error_message=command.error_message,
+        )
+    )
+  return results
+
+
 def get_adb_activity(app_name: str) -> Optional[str]:
   """Get a mapping of regex patterns to ADB activities top Android apps."""
   for pattern, activity in _PATTERN_TO_ACTIVITY.items():
@@ -935,6 +1114,7 @@ def _toggle_svc(
     raise ValueError('Must be one of on or off.')
 
   cmd = 'enable' if on_or_off == 'on' else 'disable'
+  invalidate_network_state()
   return issue_generic_request(['shell', 'svc', service, cmd], env)
 
 
@@ -1040,6 +1220,7 @@ def toggle_airplane_mode(
   if on_or_off not in ('on', 'off'):
     raise ValueError('Must be one of on or off.')
   state = '1' if on_or_off == 'on' else '0'
+  invalidate_network_state()
   return issue_generic_request(
       ['shell', 'settings', 'put', 'global', 'airplane_mode_on', state], env
   )
@@ -1062,6 +1243,24 @@ def install_apk(
   issue_generic_request(['install', apk_location], env, timeout_sec=30.0)
 
 
+# Bumped whenever the network state of a device, e.g. airplane mode, is changed
+# through this module, so that cached checks of it can be invalidated.
+_network_state_generation = 0
+_network_state_lock = threading.Lock()
+
+
+def invalidate_network_state() -> None:
+  """Marks all cached checks of the network state as stale."""
+  global _network_state_generation
+  with _network_state_lock:
+    _network_state_generation += 1
+
+
+def get_network_state_generation() -> int:
+  """Returns a counter that changes whenever the network state is changed."""
+  return _network_state_generation
+
+
 def check_airplane_mode(env: env_interface.AndroidEnvInterface) -> bool:
   """Checks if airplane mode is enabled.
 
@@ -1191,6 +1390,7 @@ def change_orientation(
   issue_generic_request(
       command + ['user_rotation', _ORIENTATIONS[orientation]], env
   )
+  invalidate_screen_geometry()
 
 
 def set_clipboard_contents(
@@ -1607,6 +1807,80 @@ def get_screen_size(env: env_interface.AndroidEnvInterface) -> tuple[int, int]:
   )
 
 
+@dataclasses.dataclass(frozen=True)
+class ScreenGeometry:
+  """Snapshot of the screen geometry of a device.
+
+  Attributes:
+    logical_screen_size: The logical (width, height); see
+      `get_logical_screen_size`.
+    orientation: The orientation; see `get_orientation`.
+    physical_frame_boundary: The physical frame boundary; see
+      `get_physical_frame_boundary`.
+  """
+
+  logical_screen_size: tuple[int, int]
+  orientation: int
+  physical_frame_boundary: tuple[int, int, int, int]
+
+
+# Bumped whenever the screen geometry of a device is changed through this
+# module, so that cached `ScreenGeometry` snapshots can be invalidated.
+_screen_geometry_generation = 0
+_screen_geometry_lock = threading.Lock()
+
+
+def invalidate_screen_geometry() -> None:
+  """Marks all cached screen geometry snapshots as stale."""
+  global _screen_geometry_generation
+  with _screen_geometry_lock:
+    _screen_geometry_generation += 1
+
+
+def get_screen_geometry_generation() -> int:
+  """Returns a counter that changes whenever the screen geometry is changed."""
+  return _screen_geometry_generation
+
+
+def _parse_logical_screen_size(raw_output: str) -> tuple[int, int] | None:
+  """Parses the first non-empty logicalFrame from `dumpsys input` output."""
+  pattern = r'logicalFrame=\[0, 0, (\d+), (\d+)\]'
+  for m in re.findall(pattern, raw_output):
+    if int(m[0]) == 0 and int(m[1]) == 0:
+      continue
+    return (int(m[0]), int(m[1]))
+  return None
+
+
+def _parse_physical_frame(
+    raw_output: str,
+) -> tuple[int, int, int, int] | None:
+  """Parses the first non-empty physicalFrame from `dumpsys input` output."""
+  pattern = r'physicalFrame=\[(\d+), (\d+), (\d+), (\d+)\]'
+  for m in re.findall(pattern, raw_output):
+    frame = tuple(int(v) for v in m)
+    if not any(frame):
+      continue
+    return frame
+  return None
+
+
+def _frame_to_portrait(
+    frame: tuple[int, int, int, int], orientation: int
+) -> tuple[int, int, int, int]:
+  if orientation == 0 or orientation == 2:
+    return frame
+  return (frame[1], frame[0], frame[3], frame[2])
+
+
+def _parse_orientation(raw_output: str) -> int | None:
+  """Parses mCurrentRotation from `dumpsys window` output."""
+  pattern = r'mCurrentRotation=ROTATION_(\d+)'
+  for m in re.findall(pattern, raw_output):
+    return int(m) // 90
+  return None
+
+
 def get_logical_screen_size(
     env: env_interface.AndroidEnvInterface,
 ) -> tuple[int, int]:
@@ -1627,14 +1901,9 @@ def get_logical_screen_size(
       'shell dumpsys input | grep logicalFrame', env
   )
   if response.status:
-    raw_output = response.generic.output.decode('utf-8')
-    pattern = r'logicalFrame=\[0, 0, (\d+), (\d+)\]'
-    matches = re.findall(pattern, raw_output)
-    for m in matches:
-      if int(m[0]) == 0 and int(m[1]) == 0:
-        continue
-      width, height = (int(m[0]), int(m[1]))
-      return (width, height)
+    size = _parse_logical_screen_size(response.generic.output.decode('utf-8'))
+    if size is not None:
+      return size
   raise ValueError('Failed to get logical screen size.')
 
 
@@ -1654,21 +1923,9 @@ def get_physical_frame_boundary(
       'shell dumpsys input | grep physicalFrame', env
   )
   if response.status:
-    raw_output = response.generic.output.decode('utf-8')
-    pattern = r'physicalFrame=\[(\d+), (\d+), (\d+), (\d+)\]'
-    matches = re.findall(pattern, raw_output)
-    for m in matches:
-      if (
-          int(m[0]) == 0
-          and int(m[1]) == 0
-          and int(m[2]) == 0
-          and int(m[3]) == 0
-      ):
-        continue
-      orientation = get_orientation(env)
-      if orientation == 0 or orientation == 2:
-        return (int(m[0]), int(m[1]), int(m[2]), int(m[3]))
-      return (int(m[1]), int(m[0]), int(m[3]), int(m[2]))
+    frame = _parse_physical_frame(response.generic.output.decode('utf-8'))
+    if frame is not None:
+      return _frame_to_portrait(frame, get_orientation(env))
   raise ValueError('Failed to get physical frame boundary.')
 
 
@@ -1690,14 +1947,51 @@ def get_orientation(
       'shell dumpsys window | grep mCurrentRotation', env
   )
   if response.status:
-    raw_output = response.generic.output.decode('utf-8')
-    pattern = r'mCurrentRotation=ROTATION_(\d+)'
-    matches = re.findall(pattern, raw_output)
-    for m in matches:
-      return int(m) // 90
+    orientation = _parse_orientation(response.generic.output.decode('utf-8'))
+    if orientation is not None:
+      return orientation
   raise ValueError('Failed to get orientation.')
 
 
+def get_screen_geometry(
+    env: env_interface.AndroidEnvInterface,
+) -> ScreenGeometry:
+  """Returns the logical size, orientation and physical frame in one call.
+
+  Equivalent to calling `get_logical_screen_size`, `get_orientation` and
+  `get_physical_frame_boundary`, but issues a single adb shell command instead
+  of four.
+
+  Args:
+    env: The AndroidEnv interface.
+
+  Returns:
+    The screen geometry.
+
+  Raises:
+    ValueError: If any of the values cannot be parsed.
+  """
+  response = issue_generic_request(
+      [
+          'shell',
+          "dumpsys input | grep -E 'logicalFrame|physicalFrame';"
+          ' dumpsys window | grep mCurrentRotation',
+      ],
+      env,
+  )
+  raw_output = response.generic.output.decode('utf-8')
+  logical_screen_size = _parse_logical_screen_size(raw_output)
+  orientation = _parse_orientation(raw_output)
+  frame = _parse_physical_frame(raw_output)
+  if logical_screen_size is None or orientation is None or frame is None:
+    raise ValueError(f'Failed to get screen geometry from: {raw_output!r}')
+  return ScreenGeometry(
+      logical_screen_size=logical_screen_size,
+      orientation=orientation,
+      physical_frame_boundary=_frame_to_portrait(frame, orientation),
+  )
+
+
 def set_screen_size(
     width: int,
     height: int,
@@ -1723,7 +2017,9 @@ def set_screen_size(
   adb_command = ['shell', f'wm size {width}x{height}']
 
   # Issue the command and return the response
-  return issue_generic_request(adb_command, env)
+  response = issue_generic_request(adb_command, env)
+  invalidate_screen_geometry()
+  return response
 
 
 def retry(n: int) -> Callable[[Any], Any]:
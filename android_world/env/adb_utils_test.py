@@ -14,6 +14,7 @@
 
 """Tests for adb_utils."""
 
+import subprocess
 from unittest import mock
 
 from absl.testing import absltest
@@ -282,5 +283,119 @@ class TestScreenUtils(absltest.TestCase):
     )
 
 
+class ScreenGeometryTest(AdbTestSetup):
+
+  def _response(self, output: str) -> adb_pb2.AdbResponse:
+    response = adb_pb2.AdbResponse(status=adb_pb2.AdbResponse.Status.OK)
+    response.generic.output = output.encode('utf-8')
+    return response
+
+  def test_get_screen_geometry_landscape(self):
+    self.mock_issue_generic_request.return_value = self._response(
+        'logicalFrame=[0, 0, 0, 0]\n'
+        'logicalFrame=[0, 0, 2400, 1080]\n'
+        'physicalFrame=[0, 0, 2400, 1080]\n'
+        '  mCurrentRotation=ROTATION_90\n'
+    )
+
+    geometry = adb_utils.get_screen_geometry(self.mock_env)
+
+    self.assertEqual(
+        geometry,
+        adb_utils.ScreenGeometry(
+            logical_screen_size=(2400, 1080),
+            orientation=1,
+            physical_frame_boundary=(0, 0, 1080, 2400),
+        ),
+    )
+    self.mock_issue_generic_request.assert_called_once()
+
+  def test_get_screen_geometry_failure(self):
+    self.mock_issue_generic_request.return_value = self._response('')
+
+    with self.assertRaises(ValueError):
+      adb_utils.get_screen_geometry(self.mock_env)
+
+  def test_geometry_changes_bump_generation(self):
+    generation = adb_utils.get_screen_geometry_generation()
+
+    adb_utils.change_orientation('landscape', self.mock_env)
+    self.assertGreater(
+        adb_utils.get_screen_geometry_generation(), generation
+    )
+    generation = adb_utils.get_screen_geometry_generation()
+
+    adb_utils.set_screen_size(720, 1520, self.mock_env)
+    self.assertGreater(
+        adb_utils.get_screen_geometry_generation(), generation
+    )
+
+
+def _run_locally(request: adb_pb2.AdbRequest) -> adb_pb2.AdbResponse:
+  """Runs the script of an `adb shell` request with the local shell."""
+  assert request.generic.args[0] == 'shell'
+  completed = subprocess.run(
+      ['sh', '-c', ' '.join(request.generic.args[1:])],
+      capture_output=True,
+      check=False,
+  )
+  return adb_pb2.AdbResponse(
+      status=adb_pb2.AdbResponse.Status.OK,
+      generic=adb_pb2.AdbResponse.GenericResponse(output=completed.stdout),
+  )
+
+
+class ShellBatchTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.env = mock.create_autospec(env_interface.AndroidEnvInterface)
+    self.env.execute_adb_call.side_effect = _run_locally
+
+  def test_runs_all_commands_in_one_call(self):
+    with adb_utils.ShellBatch(self.env) as batch:
+      batch.add(['echo', 'hello'])
+      batch.add('printf "no newline"')
+      batch.add('echo error >&2; false', allow_failure=True)
+      batch.add('true')
+
+    self.env.execute_adb_call.assert_called_once()
+    self.assertEqual(
+        [(r.exit_code, r.output) for r in batch.results],
+        [(0, 'hello'), (0, 'no newline'), (1, 'error'), (0, '')],
+    )
+    batch.check_ok()
+
+  def test_stops_at_first_required_failure(self):
+    with adb_utils.ShellBatch(self.env) as batch:
+      batch.add('exit_code() { return 3; }; exit_code', 'Setup failed.')
+      batch.add('echo unreachable')
+
+    self.assertEqual(batch.results[0].exit_code, 3)
+    self.assertIsNone(batch.results[1].exit_code)
+    self.assertFalse(batch.results[1].ok)
+    with self.assertRaisesRegex(RuntimeError, 'Setup failed.'):
+      batch.check_ok()
+
+  def test_failed_adb_call_fails_all_commands(self):
+    self.env.execute_adb_call.side_effect = None
+    self.env.execute_adb_call.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.ADB_ERROR
+    )
+    with adb_utils.ShellBatch(self.env) as batch:
+      batch.add('true')
+
+    self.assertIsNone(batch.results[0].exit_code)
+    with self.assertRaises(RuntimeError):
+      batch.check_ok()
+
+  def test_empty_batch_does_not_call_adb(self):
+    with adb_utils.ShellBatch(self.env) as batch:
+      pass
+
+    self.assertEqual(batch.results, [])
+    self.env.execute_adb_call.assert_not_called()
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -16,7 +16,6 @@
 
 import contextlib
 import enum
-import os
 import time
 from typing import Any
 from typing import cast
@@ -25,12 +24,15 @@ from absl import logging
 from android_env import env_interface
 from android_env import loader
 from android_env.components import config_classes
+from android_env.proto import adb_pb2
 from android_env.proto.a11y import android_accessibility_forest_pb2
 from android_env.wrappers import a11y_grpc_wrapper
 from android_env.wrappers import base_wrapper
+from android_world.env import adb_ledger
 from android_world.env import adb_utils
 from android_world.env import representation_utils
 from android_world.utils import file_utils
+from android_world.utils import tracing
 import dm_env
 
 
@@ -55,17 +57,57 @@ def _has_wrapper(
     return False
 
 
+class NetworkStateTracker:
+  """Remembers that networking was verified to be on for a device.
+
+  The a11y tree is sent by the forwarder app over the network, so it cannot be
+  fetched in airplane mode. Rather than checking airplane mode before every
+  fetch, the check is cached until the network state is changed through
+  `adb_utils`, e.g. by `adb_utils.toggle_airplane_mode`, or a fetch fails.
+  """
+
+  def __init__(self):
+    self._verified_generation: int | None = None
+
+  def invalidate(self) -> None:
+    self._verified_generation = None
+
+  def ensure_networking(self, env: a11y_grpc_wrapper.A11yGrpcWrapper) -> None:
+    """Turns off airplane mode, unless it was verified to be off already."""
+    generation = adb_utils.get_network_state_generation()
+    if self._verified_generation == generation:
+      return
+    if adb_utils.retry(3)(adb_utils.check_airplane_mode)(env):
+      logging.warning(
+          'Airplane mode is on -- cannot retrieve a11y tree via gRPC. Turning'
+          ' it off...'
+      )
+      logging.info('Enabling networking...')
+      env.attempt_enable_networking()
+      adb_utils.invalidate_network_state()
+      generation = adb_utils.get_network_state_generation()
+      time.sleep(1.0)
+    self._verified_generation = generation
+
+
+@tracing.traced('get_a11y_tree')
 def get_a11y_tree(
     env: env_interface.AndroidEnvInterface,
     max_retries: int = 5,
-    sleep_duration: float = 1.0,
+    initial_sleep: float = 0.25,
+    max_sleep: float = 2.0,
+    network_state: NetworkStateTracker | None = None,
 ) -> android_accessibility_forest_pb2.AndroidAccessibilityForest:
   """Gets a11y tree.
 
   Args:
     env: AndroidEnv.
     max_retries: Maximum number of retries to get a11y tree.
-    sleep_duration: Time to sleep between each retry in seconds.
+    initial_sleep: Time to sleep after the first failed attempt, in seconds.
+      It doubles after each further failure, up to `max_sleep`.
+    max_sleep: Maximum time to sleep between attempts, in seconds.
+    network_state: Caches whether networking is on across calls. If not
+      provided, airplane mode is checked on every call.
 
   Returns:
     A11y tree.
@@ -78,29 +120,27 @@ def get_a11y_tree(
         'Must use a11y_grpc_wrapper.A11yGrpcWrapper to get the a11y tree.'
     )
   env = cast(a11y_grpc_wrapper.A11yGrpcWrapper, env)
-  if adb_utils.retry(3)(adb_utils.check_airplane_mode)(env):
-    logging.warning(
-        'Airplane mode is on -- cannot retrieve a11y tree via gRPC. Turning'
-        ' it off...'
-    )
-    logging.info('Enabling networking...')
-    env.attempt_enable_networking()
-    time.sleep(1.0)
-
-  forest: Optional[
-      android_accessibility_forest_pb2.AndroidAccessibilityForest
-  ] = None
-  for _ in range(max_retries):
+  if network_state is None:
+    network_state = NetworkStateTracker()
+  network_state.ensure_networking(env)
+
+  sleep_time = initial_sleep
+  for attempt in range(max_retries):
     try:
-      forest = env.accumulate_new_extras()['accessibility_tree'][-1]  # pytype:disable=attribute-error
-      return forest
+      return env.accumulate_new_extras()['accessibility_tree'][-1]  # pytype:disable=attribute-error
     except KeyError:
       logging.warning('Could not get a11y tree, retrying.')
-    time.sleep(sleep_duration)
+    if attempt == max_retries - 1:
+      break
+    if attempt == 0:
+      # Airplane mode may have been turned on behind our back, e.g. by the
+      # agent through the settings.
+      network_state.invalidate()
+      network_state.ensure_networking(env)
+    time.sleep(sleep_time)
+    sleep_time = min(sleep_time * 2, max_sleep)
 
-  if forest is None:
-    raise RuntimeError('Could not get a11y tree.')
-  return forest
+  raise RuntimeError('Could not get a11y tree.')
 
 
 _TASK_PATH = file_utils.convert_to_posix_path(
@@ -174,6 +214,7 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
     else:
       self._env = env
     self._a11y_method = a11y_method
+    self._network_state = NetworkStateTracker()
 
   @property
   def device_screen_size(self) -> tuple[int, int]:
@@ -204,11 +245,12 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
     ).env
     # pylint: enable=protected-access
     # pytype: enable=attribute-error
+    self._network_state.invalidate()
 
   def _get_a11y_forest(
       self,
   ) -> android_accessibility_forest_pb2.AndroidAccessibilityForest:
-    return get_a11y_tree(self._env)
+    return get_a11y_tree(self._env, network_state=self._network_state)
 
   def get_a11y_forest(
       self,
@@ -224,6 +266,37 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
       self.refresh_env()
       return self._get_a11y_forest()
 
+  def get_pending_a11y_event_count(self) -> int | None:
+    """Returns the number of a11y events not gathered yet.
+
+    These are the events the forwarder app sent since the a11y forest was last
+    fetched, which gathers them. Reading the count has no side effects: the
+    events are left on the local gRPC server for the next fetch, and it is not
+    a device round trip.
+
+    Returns:
+      The number of pending events or None if events are not available, e.g.
+      when using uiautomator.
+    """
+    if self._a11y_method != A11yMethod.A11Y_FORWARDER_APP:
+      return None
+    # pylint: disable=protected-access
+    # pytype: disable=attribute-error
+    return len(self._env._servicer._received_events)
+    # pytype: enable=attribute-error
+    # pylint: enable=protected-access
+
+  def trim_a11y_extras(self) -> None:
+    """Drops the a11y forests and events accumulated by earlier fetches.
+
+    Every forest fetch appends to the wrapper's accumulated extras, so repeated
+    polling grows them for the rest of the episode. After trimming, the next
+    fetch starts a fresh accumulation.
+    """
+    if self._a11y_method != A11yMethod.A11Y_FORWARDER_APP:
+      return
+    self._env.task_extras(latest_only=True)  # pytype:disable=attribute-error
+
   def get_ui_elements(self) -> list[representation_utils.UIElement]:
     """Returns the most recent UI elements from the device."""
     if self._a11y_method == A11yMethod.A11Y_FORWARDER_APP:
@@ -238,6 +311,19 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
     else:
       return []
 
+  @tracing.traced('controller.step')
+  def step(self, action: dict[str, Any]) -> dm_env.TimeStep:
+    return super().step(action)
+
+  def execute_adb_call(
+      self, adb_call: adb_pb2.AdbRequest
+  ) -> adb_pb2.AdbResponse:
+    with tracing.span(f'adb.{adb_call.WhichOneof("command")}'):
+      start = time.perf_counter()
+      response = super().execute_adb_call(adb_call)
+    adb_ledger.log_call(adb_call, response, start, time.perf_counter())
+    return response
+
   def _process_timestep(self, timestep: dm_env.TimeStep) -> dm_env.TimeStep:
     """Adds a11y tree info to the observation."""
     if self._a11y_method == A11yMethod.A11Y_FORWARDER_APP:
@@ -254,11 +340,15 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
     return timestep
 
   def pull_file(
-      self, remote_db_file_path: str, timeout_sec: Optional[float] = None
+      self,
+      remote_db_file_path: str,
+      timeout_sec: Optional[float] = None,
   ) -> contextlib._GeneratorContextManager[str]:
-    """Pulls a file from the device to a temporary directory.
+    """Pulls a SQLite database from the device to a temporary directory.
 
+    Only the database and its -wal, -shm and -journal files are transferred.
     The directory will be deleted when the context manager exits.
+
     Args:
       remote_db_file_path: The path to the file on the device.
       timeout_sec: Timeout in seconds for the adb calls.
@@ -266,9 +356,8 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
     Returns:
       The path to the temporary directory containing the file.
     """
-    remote_db_directory = os.path.dirname(remote_db_file_path)
-    return file_utils.tmp_directory_from_device(
-        remote_db_directory, self.env, timeout_sec
+    return file_utils.tmp_sqlite_db_from_device(
+        remote_db_file_path, self, timeout_sec
     )
 
   def push_file(
@@ -277,17 +366,13 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
       remote_db_file_path: str,
       timeout_sec: Optional[float] = None,
   ) -> None:
-    """Pushes a local file to the device."""
-
-    remote_db_directory = os.path.dirname(remote_db_file_path)
+    """Replaces a SQLite database on the device with a local one.
 
-    # First delete old .db, .db-wal, and .db-shm files.
-    file_utils.clear_directory(remote_db_directory, self)
-    file_utils.copy_data_to_device(
-        local_db_file_path,
-        remote_db_file_path,
-        self.env,
-        timeout_sec,
+    The old database and its -wal, -shm and -journal files are replaced
+    without touching the rest of the directory.
+    """
+    file_utils.replace_sqlite_db_on_device(
+        local_db_file_path, remote_db_file_path, self, timeout_sec
     )
 
 
@@ -61,23 +61,15 @@ class AndroidWorldControllerTest(absltest.TestCase):
     self.mock_copy_db = self.enter_context(
         mock.patch.object(
             file_utils,
-            'tmp_directory_from_device',
-            side_effect=file_test_utils.mock_tmp_directory_from_device,
+            'tmp_sqlite_db_from_device',
+            side_effect=file_test_utils.mock_tmp_sqlite_db_from_device,
         )
     )
-    self.mock_copy_data_to_device = self.enter_context(
+    self.mock_push_db = self.enter_context(
         mock.patch.object(
             file_utils,
-            'copy_data_to_device',
-            side_effect=file_test_utils.mock_copy_data_to_device,
-        )
-    )
-
-    self.mock_remove_files = self.enter_context(
-        mock.patch.object(
-            file_utils,
-            'clear_directory',
-            side_effect=file_test_utils.mock_remove_files,
+            'replace_sqlite_db_on_device',
+            side_effect=file_test_utils.mock_replace_sqlite_db_on_device,
         )
     )
 
@@ -161,6 +153,32 @@ class AndroidWorldControllerTest(absltest.TestCase):
     self.assertEqual(forest, 'success')
     mock_refresh_env.assert_called_once()
 
+  def test_get_pending_a11y_event_count(self):
+    mock_base_env = mock.Mock(spec=env_interface.AndroidEnvInterface)
+    env = android_world_controller.AndroidWorldController(mock_base_env)
+    env._env._servicer = mock.Mock(_received_events=['a', 'b'])
+
+    self.assertEqual(env.get_pending_a11y_event_count(), 2)
+    self.assertEqual(env.get_pending_a11y_event_count(), 2)
+    env._env.accumulate_new_extras.assert_not_called()
+
+  def test_trim_a11y_extras(self):
+    mock_base_env = mock.Mock(spec=env_interface.AndroidEnvInterface)
+    env = android_world_controller.AndroidWorldController(mock_base_env)
+
+    env.trim_a11y_extras()
+
+    env._env.task_extras.assert_called_once_with(latest_only=True)
+
+  def test_get_pending_a11y_event_count_without_forwarder(self):
+    mock_base_env = mock.Mock(spec=env_interface.AndroidEnvInterface)
+    env = android_world_controller.AndroidWorldController(
+        mock_base_env,
+        a11y_method=android_world_controller.A11yMethod.UIAUTOMATOR,
+    )
+
+    self.assertIsNone(env.get_pending_a11y_event_count())
+
   def test_pull_file(self):
     file_contents = 'test file contents'
     remote_file_path = create_file_with_contents(file_contents)
@@ -174,9 +192,7 @@ class AndroidWorldControllerTest(absltest.TestCase):
       )
       self.assertEqual(open(remote_file_path, 'r').read(), local_file.read())
 
-    self.mock_copy_db.assert_called_once_with(
-        os.path.dirname(remote_file_path), env._env, None
-    )
+    self.mock_copy_db.assert_called_once_with(remote_file_path, env, None)
 
   def test_push_file(self):
     old_file_contents = 'test file contents'
@@ -189,6 +205,93 @@ class AndroidWorldControllerTest(absltest.TestCase):
     env.push_file(new_file, remote_file_path, None)
 
     self.assertEqual(open(remote_file_path, 'r').read(), new_file_contents)
+    self.mock_push_db.assert_called_once_with(
+        new_file, remote_file_path, env, None
+    )
+
+
+class GetA11yTreeTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.enter_context(
+        mock.patch.object(
+            android_world_controller, '_has_wrapper', return_value=True
+        )
+    )
+    self.mock_check_airplane_mode = self.enter_context(
+        mock.patch.object(
+            adb_utils, 'check_airplane_mode', return_value=False
+        )
+    )
+    self.mock_sleep = self.enter_context(
+        mock.patch.object(android_world_controller.time, 'sleep')
+    )
+    self.env = mock.create_autospec(a11y_grpc_wrapper.A11yGrpcWrapper)
+    self.env.accumulate_new_extras.return_value = {
+        'accessibility_tree': ['forest']
+    }
+    self.network_state = android_world_controller.NetworkStateTracker()
+
+  def test_checks_airplane_mode_once(self):
+    for _ in range(3):
+      self.assertEqual(
+          android_world_controller.get_a11y_tree(
+              self.env, network_state=self.network_state
+          ),
+          'forest',
+      )
+
+    self.mock_check_airplane_mode.assert_called_once()
+    self.mock_sleep.assert_not_called()
+
+  def test_rechecks_after_network_state_changes(self):
+    android_world_controller.get_a11y_tree(
+        self.env, network_state=self.network_state
+    )
+    adb_utils.invalidate_network_state()
+
+    android_world_controller.get_a11y_tree(
+        self.env, network_state=self.network_state
+    )
+
+    self.assertEqual(self.mock_check_airplane_mode.call_count, 2)
+
+  def test_failed_fetch_turns_off_airplane_mode(self):
+    android_world_controller.get_a11y_tree(
+        self.env, network_state=self.network_state
+    )
+    self.mock_check_airplane_mode.return_value = True
+    self.env.accumulate_new_extras.side_effect = [
+        {},
+        {},
+        {'accessibility_tree': ['forest']},
+    ]
+
+    forest = android_world_controller.get_a11y_tree(
+        self.env, network_state=self.network_state
+    )
+
+    self.assertEqual(forest, 'forest')
+    self.assertEqual(self.mock_check_airplane_mode.call_count, 2)
+    self.env.attempt_enable_networking.assert_called_once()
+    # One second after enabling networking, then the backoff.
+    self.mock_sleep.assert_has_calls(
+        [mock.call(1.0), mock.call(0.25), mock.call(0.5)]
+    )
+
+  def test_raises_after_retries_with_growing_backoff(self):
+    self.env.accumulate_new_extras.return_value = {}
+
+    with self.assertRaisesRegex(RuntimeError, 'Could not get a11y tree'):
+      android_world_controller.get_a11y_tree(
+          self.env, max_retries=5, network_state=self.network_state
+      )
+
+    self.assertEqual(
+        self.mock_sleep.call_args_list,
+        [mock.call(0.25), mock.call(0.5), mock.call(1.0), mock.call(2.0)],
+    )
 
 
 if __name__ == '__main__':
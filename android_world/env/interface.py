@@ -15,17 +15,22 @@
 """Environment interface for real-time interaction Android."""
 
 import abc
+import collections
 import dataclasses
+import enum
+import hashlib
 import time
 from typing import Any, Optional, Self
 
 from absl import logging
 from android_env.components import action_type
+from android_env.proto.a11y import android_accessibility_forest_pb2
 from android_world.env import actuation
 from android_world.env import adb_utils
 from android_world.env import android_world_controller
 from android_world.env import json_action
 from android_world.env import representation_utils
+from android_world.utils import tracing
 import dm_env
 import numpy as np
 
@@ -70,6 +75,37 @@ class State:
     return cls(pixels, forest, elements)
 
 
+class StabilizationMode(enum.Enum):
+  """How `get_state(wait_to_stabilize=True)` decides that the UI is stable."""
+
+  # Poll at a fixed interval until the UI elements are equal for a number of
+  # consecutive observations.
+  POLLING = 'polling'
+
+  # Poll with exponential backoff, comparing a content hash of the a11y forest.
+  # Returns early once the forest is unchanged and the a11y forwarder reported
+  # no new events since the previous observation.
+  ADAPTIVE = 'adaptive'
+
+
+@dataclasses.dataclass(frozen=True)
+class StabilizationStats:
+  """Statistics of a single wait for the UI to stabilize.
+
+  Attributes:
+    mode: The stabilization mode used.
+    time_to_stable: Time in seconds spent waiting.
+    num_observations: Number of observations fetched from the device.
+    is_stable: False if the timeout was reached before the UI was stable. None
+      if unknown, which is the case for `StabilizationMode.POLLING`.
+  """
+
+  mode: StabilizationMode
+  time_to_stable: float
+  num_observations: int
+  is_stable: bool | None
+
+
 class AsyncEnv(abc.ABC):
   """Interface for interacting with a real-time Android device.
 
@@ -114,6 +150,9 @@ class AsyncEnv(abc.ABC):
   def display_message(self, message: str, header: str = '') -> None:
     """Displays a message on the screen."""
 
+  def invalidate_screen_geometry(self) -> None:
+    """Drops any cached screen geometry, e.g. after a task changed the screen."""
+
   @abc.abstractmethod
   def ask_question(
       self, question: str, timeout_seconds: float = -1.0
@@ -196,6 +235,42 @@ class AsyncEnv(abc.ABC):
     """
 
 
+def _forest_is_landscape(forest: Any) -> bool | None:
+  """Infers from the window bounds in the forest if the screen is landscape.
+
+  This is used as a cheap probe for rotations that happen without going through
+  `adb_utils`, e.g. when an app forces its own orientation.
+
+  Args:
+    forest: The a11y forest.
+
+  Returns:
+    Whether the windows span a landscape area, or None if unknown.
+  """
+  if not isinstance(
+      forest, android_accessibility_forest_pb2.AndroidAccessibilityForest
+  ):
+    return None
+  if not forest.windows:
+    return None
+  width = max(w.bounds_in_screen.right for w in forest.windows)
+  height = max(w.bounds_in_screen.bottom for w in forest.windows)
+  if width == height:
+    return None
+  return width > height
+
+
+def _hash_state(state: State) -> bytes:
+  """Returns a content hash of the a11y forest or, if absent, UI elements."""
+  if isinstance(
+      state.forest, android_accessibility_forest_pb2.AndroidAccessibilityForest
+  ):
+    content = state.forest.SerializeToString(deterministic=True)
+  else:
+    content = repr(state.ui_elements).encode()
+  return hashlib.blake2b(content, digest_size=16).digest()
+
+
 def _process_timestep(timestep: dm_env.TimeStep) -> State:
   """Parses timestep observation and returns State."""
   return State(
@@ -216,20 +291,44 @@ class AsyncAndroidEnv(AsyncEnv):
   interaction_cache = ''
 
   def __init__(
-      self, controller: android_world_controller.AndroidWorldController
+      self,
+      controller: android_world_controller.AndroidWorldController,
+      probe_rotation: bool = True,
+      stabilization_mode: StabilizationMode = StabilizationMode.POLLING,
   ):
+    """Initializes the environment.
+
+    Args:
+      controller: The controller for the device.
+      probe_rotation: Whether to check the window bounds of every observed
+        forest for rotations and drop the cached screen geometry if the screen
+        was rotated.
+      stabilization_mode: How to wait for the UI to stabilize when calling
+        `get_state(wait_to_stabilize=True)`.
+    """
     self._controller = controller
     self._prior_state = None
+    self.stabilization_mode = stabilization_mode
+    # Recent waits for the UI to stabilize; useful to tune the parameters.
+    self._stabilization_history = collections.deque(maxlen=1000)
+    self._num_observations = 0
     # Variable used to temporarily save interactions between agent and user.
     # Like when agent use answer action to answer user questions, we
     # use this to save the agent response. Or later on when agent has the
     # ability to ask user question, user's answer will be saved here as well.
     self.interaction_cache = ''
+    # Logical size, orientation and physical frame rarely change, but reading
+    # them costs several adb round trips; they are cached as one snapshot.
+    self._probe_rotation = probe_rotation
+    self._screen_geometry: adb_utils.ScreenGeometry | None = None
+    self._screen_geometry_generation = -1
+    self._screen_geometry_stats = collections.Counter()
 
   @property
   def controller(self) -> android_world_controller.AndroidWorldController:
     return self._controller
 
+  @tracing.traced('env.reset')
   def reset(self, go_home: bool = False) -> State:
     if go_home:
       adb_utils.press_home_button(self.controller)
@@ -238,7 +337,15 @@ class AsyncAndroidEnv(AsyncEnv):
     return _process_timestep(self.controller.reset())
 
   def _get_state(self):
-    return _process_timestep(self.controller.step(_get_no_op_action()))
+    self._num_observations += 1
+    state = _process_timestep(self.controller.step(_get_no_op_action()))
+    if self._probe_rotation and self._screen_geometry is not None:
+      landscape = _forest_is_landscape(state.forest)
+      width, height = self._screen_geometry.logical_screen_size
+      if landscape is not None and landscape != (width > height):
+        self._screen_geometry_stats['rotation_probe_invalidations'] += 1
+        self._screen_geometry = None
+    return state
 
   def _get_stable_state(
       self,
@@ -289,11 +396,125 @@ class AsyncAndroidEnv(AsyncEnv):
 
     return current_state  # pylint: disable=undefined-variable
 
+  def _get_adaptive_stable_state(
+      self,
+      stability_threshold: int = 3,
+      initial_sleep: float = 0.05,
+      max_sleep: float = 0.5,
+      backoff: float = 2.0,
+      timeout: float = 6.0,
+  ) -> tuple[State, bool]:
+    """Waits for the UI to stabilize using content hashes and a11y events.
+
+    The UI is considered stable once the hash of the a11y forest is the same
+    for `stability_threshold` consecutive observations, or as soon as it is
+    unchanged across an interval in which the a11y forwarder reported no new
+    events, provided it reported any during the wait. The wait between
+    observations starts at `initial_sleep` and is multiplied by `backoff` after
+    every unchanged observation, up to `max_sleep`; it is reset whenever the UI
+    changes.
+
+    Args:
+      stability_threshold: Number of consecutive observations with identical
+        content required when no a11y events are available.
+      initial_sleep: Initial time in seconds between observations.
+      max_sleep: Maximum time in seconds between observations.
+      backoff: Factor by which the sleep grows after each unchanged
+        observation.
+      timeout: Maximum time in seconds to wait for UI to become stable before
+        giving up.
+
+    Returns:
+      The current state and whether it is stable.
+    """
+    if stability_threshold <= 0:
+      raise ValueError('Stability threshold must be a positive integer.')
+    try:
+      return self._poll_until_stable(
+          stability_threshold, initial_sleep, max_sleep, backoff, timeout
+      )
+    finally:
+      # The polls only need the latest forest; drop what they accumulated.
+      self.controller.trim_a11y_extras()
+
+  def _poll_until_stable(
+      self,
+      stability_threshold: int,
+      initial_sleep: float,
+      max_sleep: float,
+      backoff: float,
+      timeout: float,
+  ) -> tuple[State, bool]:
+    """Polls the UI until it is stable; see `_get_adaptive_stable_state`."""
+    deadline = time.time() + timeout
+    # Each observation gathers the events that arrived before it, so the
+    # pending events are those since the previous observation.
+    pending_events = self.controller.get_pending_a11y_event_count()
+    events_available = bool(pending_events)
+    current_state = self._get_state()
+    prior_hash = _hash_state(current_state)
+    stable_checks = 1
+    sleep_time = initial_sleep
+    while stable_checks < stability_threshold:
+      remaining = deadline - time.time()
+      if remaining <= 0:
+        return current_state, False
+      time.sleep(min(sleep_time, remaining))
+
+      pending_events = self.controller.get_pending_a11y_event_count()
+      events_available = events_available or bool(pending_events)
+      no_new_events = events_available and pending_events == 0
+      current_state = self._get_state()
+      current_hash = _hash_state(current_state)
+      if current_hash == prior_hash:
+        stable_checks += 1
+        if no_new_events:
+          break
+        sleep_time = min(sleep_time * backoff, max_sleep)
+      else:
+        stable_checks = 1
+        prior_hash = current_hash
+        sleep_time = initial_sleep
+    return current_state, True
+
+  def _record_stabilization(
+      self,
+      state: State,
+      start_time: float,
+      start_observations: int,
+      is_stable: bool | None,
+  ) -> None:
+    stats = StabilizationStats(
+        mode=self.stabilization_mode,
+        time_to_stable=time.time() - start_time,
+        num_observations=self._num_observations - start_observations,
+        is_stable=is_stable,
+    )
+    self._stabilization_history.append(stats)
+    if state.auxiliaries is not None:
+      state.auxiliaries['stabilization'] = stats
+
+  @property
+  def stabilization_history(self) -> list[StabilizationStats]:
+    """Returns statistics of the most recent waits for the UI to stabilize."""
+    return list(self._stabilization_history)
+
+  @tracing.traced('env.get_state')
   def get_state(self, wait_to_stabilize: bool = False) -> State:
-    if wait_to_stabilize:
-      return self._get_stable_state()
-    return self._get_state()
+    if not wait_to_stabilize:
+      return self._get_state()
+    start_time = time.time()
+    start_observations = self._num_observations
+    if self.stabilization_mode == StabilizationMode.ADAPTIVE:
+      state, is_stable = self._get_adaptive_stable_state()
+    else:
+      state, is_stable = self._get_stable_state(), None
+    self._record_stabilization(
+        state, start_time, start_observations, is_stable
+    )
+    return state
 
+  @tracing.traced('env.execute_action')
   def execute_action(self, action: json_action.JSONAction) -> None:
     if action.action_type == json_action.ANSWER:
       self.interaction_cache = action.text
@@ -304,12 +525,15 @@ class AsyncAndroidEnv(AsyncEnv):
       # Do nothing if it is a termination action.
       return
     state = self.get_state(wait_to_stabilize=False)
-    actuation.execute_adb_action(
-        action,
-        state.ui_elements,
-        self.logical_screen_size,
-        self.controller,
-    )
+    with tracing.span(
+        'actuation.execute_adb_action', action=action.action_type
+    ):
+      actuation.execute_adb_action(
+          action,
+          state.ui_elements,
+          self.logical_screen_size,
+          self.controller,
+      )
 
   def hide_automation_ui(self) -> None:
     """Hides the coordinates on screen."""
@@ -342,9 +566,41 @@ class AsyncAndroidEnv(AsyncEnv):
   def device_screen_size(self) -> tuple[int, int]:
     return self.controller.device_screen_size
 
+  @property
+  def screen_geometry(self) -> adb_utils.ScreenGeometry:
+    """Returns the screen geometry, fetching it from the device if stale."""
+    generation = adb_utils.get_screen_geometry_generation()
+    if (
+        self._screen_geometry is None
+        or generation != self._screen_geometry_generation
+    ):
+      self._screen_geometry_stats['misses'] += 1
+      with tracing.span('adb_utils.get_screen_geometry'):
+        self._screen_geometry = adb_utils.get_screen_geometry(self.controller)
+      self._screen_geometry_generation = generation
+    else:
+      self._screen_geometry_stats['hits'] += 1
+    return self._screen_geometry
+
+  @property
+  def screen_geometry_cache_stats(self) -> dict[str, int]:
+    """Returns hit, miss and invalidation counts of the geometry cache."""
+    return {
+        'hits': self._screen_geometry_stats['hits'],
+        'misses': self._screen_geometry_stats['misses'],
+        'invalidations': self._screen_geometry_stats['invalidations'],
+        'rotation_probe_invalidations': self._screen_geometry_stats[
+            'rotation_probe_invalidations'
+        ],
+    }
+
+  def invalidate_screen_geometry(self) -> None:
+    self._screen_geometry_stats['invalidations'] += 1
+    self._screen_geometry = None
+
   @property
   def logical_screen_size(self) -> tuple[int, int]:
-    return adb_utils.get_logical_screen_size(self.controller)
+    return self.screen_geometry.logical_screen_size
 
   def close(self) -> None:
     try:
@@ -354,8 +610,8 @@ class AsyncAndroidEnv(AsyncEnv):
 
   @property
   def orientation(self) -> int:
-    return adb_utils.get_orientation(self.controller)
+    return self.screen_geometry.orientation
 
   @property
   def physical_frame_boundary(self) -> tuple[int, int, int, int]:
-    return adb_utils.get_physical_frame_boundary(self.controller)
+    return self.screen_geometry.physical_frame_boundary
@@ -15,6 +15,8 @@
 from unittest import mock
 
 from absl.testing import absltest
+from android_env.proto.a11y import android_accessibility_forest_pb2
+from android_world.env import adb_utils
 from android_world.env import interface
 from android_world.env import representation_utils
 import numpy as np
@@ -87,5 +89,168 @@ class InterfaceTest(absltest.TestCase):
     )
 
 
+class AdaptiveStabilizationTest(absltest.TestCase):
+
+  def _state(self, text: str) -> interface.State:
+    return interface.State(
+        ui_elements=[representation_utils.UIElement(text=text)],
+        pixels=np.empty([1, 2, 3]),
+        forest=None,
+        auxiliaries={},
+    )
+
+  @mock.patch("time.sleep", return_value=None)
+  def test_stable_after_threshold_without_events(self, mock_sleep):
+    controller = mock.MagicMock()
+    controller.get_pending_a11y_event_count.return_value = None
+    env = interface.AsyncAndroidEnv(
+        controller, stabilization_mode=interface.StabilizationMode.ADAPTIVE
+    )
+    states = [self._state("A"), self._state("B")] + [
+        self._state("B") for _ in range(3)
+    ]
+    env._get_state = mock.MagicMock(side_effect=states)
+
+    state = env.get_state(wait_to_stabilize=True)
+
+    self.assertIs(state, states[3])
+    self.assertEqual(
+        [c.args[0] for c in mock_sleep.call_args_list], [0.05, 0.05, 0.1]
+    )
+    stats = env.stabilization_history[-1]
+    self.assertTrue(stats.is_stable)
+    self.assertIs(state.auxiliaries["stabilization"], stats)
+
+  @mock.patch("time.sleep", return_value=None)
+  def test_returns_early_when_no_new_events(self, unused_mock_sleep):
+    controller = mock.MagicMock()
+    controller.get_pending_a11y_event_count.side_effect = [5, 0]
+    env = interface.AsyncAndroidEnv(
+        controller, stabilization_mode=interface.StabilizationMode.ADAPTIVE
+    )
+    states = [self._state("A"), self._state("A")]
+    env._get_state = mock.MagicMock(side_effect=states)
+
+    state = env.get_state(wait_to_stabilize=True)
+
+    self.assertIs(state, states[1])
+    self.assertEqual(env._get_state.call_count, 2)
+    controller.trim_a11y_extras.assert_called_once()
+
+  def test_timeout(self):
+    controller = mock.MagicMock()
+    controller.get_pending_a11y_event_count.return_value = None
+    env = interface.AsyncAndroidEnv(controller)
+    env._get_state = mock.MagicMock(
+        side_effect=[self._state(str(i)) for i in range(1000)]
+    )
+
+    _, is_stable = env._get_adaptive_stable_state(
+        initial_sleep=0.01, timeout=0.1
+    )
+
+    self.assertFalse(is_stable)
+
+  def test_hash_uses_forest_content(self):
+    forest = android_accessibility_forest_pb2.AndroidAccessibilityForest()
+    forest.windows.add().id = 1
+    other_forest = android_accessibility_forest_pb2.AndroidAccessibilityForest()
+    other_forest.windows.add().id = 2
+
+    self.assertEqual(
+        interface._hash_state(interface.State(np.empty([1]), forest, [])),
+        interface._hash_state(interface.State(np.empty([1]), forest, [])),
+    )
+    self.assertNotEqual(
+        interface._hash_state(interface.State(np.empty([1]), forest, [])),
+        interface._hash_state(interface.State(np.empty([1]), other_forest, [])),
+    )
+
+
+class ScreenGeometryCacheTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.mock_get_screen_geometry = mock.patch.object(
+        adb_utils, "get_screen_geometry"
+    ).start()
+    self.mock_get_screen_geometry.return_value = adb_utils.ScreenGeometry(
+        logical_screen_size=(1080, 2400),
+        orientation=0,
+        physical_frame_boundary=(0, 0, 1080, 2400),
+    )
+    self.env = interface.AsyncAndroidEnv(mock.MagicMock())
+
+  def tearDown(self):
+    super().tearDown()
+    mock.patch.stopall()
+
+  def _forest(
+      self, width: int, height: int
+  ) -> android_accessibility_forest_pb2.AndroidAccessibilityForest:
+    forest = android_accessibility_forest_pb2.AndroidAccessibilityForest()
+    window = forest.windows.add()
+    window.bounds_in_screen.right = width
+    window.bounds_in_screen.bottom = height
+    return forest
+
+  def test_geometry_is_fetched_once(self):
+    self.assertEqual(self.env.logical_screen_size, (1080, 2400))
+    self.assertEqual(self.env.orientation, 0)
+    self.assertEqual(self.env.physical_frame_boundary, (0, 0, 1080, 2400))
+
+    self.mock_get_screen_geometry.assert_called_once()
+    self.assertEqual(self.env.screen_geometry_cache_stats["hits"], 2)
+    self.assertEqual(self.env.screen_geometry_cache_stats["misses"], 1)
+
+  def test_explicit_invalidation(self):
+    _ = self.env.orientation
+    self.env.invalidate_screen_geometry()
+    _ = self.env.orientation
+
+    self.assertEqual(self.mock_get_screen_geometry.call_count, 2)
+    self.assertEqual(self.env.screen_geometry_cache_stats["invalidations"], 1)
+
+  def test_adb_geometry_change_invalidates(self):
+    _ = self.env.orientation
+    adb_utils.change_orientation("landscape", mock.MagicMock())
+    _ = self.env.orientation
+
+    self.assertEqual(self.mock_get_screen_geometry.call_count, 2)
+
+  def test_rotation_probe_invalidates(self):
+    _ = self.env.orientation
+    self.env.controller.step.return_value = mock.MagicMock(
+        observation={
+            "pixels": np.empty([1, 2, 3]),
+            "forest": self._forest(2400, 1080),
+            "ui_elements": [],
+        }
+    )
+
+    self.env.get_state()
+    _ = self.env.orientation
+
+    self.assertEqual(self.mock_get_screen_geometry.call_count, 2)
+    self.assertEqual(
+        self.env.screen_geometry_cache_stats["rotation_probe_invalidations"], 1
+    )
+
+  def test_rotation_probe_keeps_matching_geometry(self):
+    _ = self.env.orientation
+    self.env.controller.step.return_value = mock.MagicMock(
+        observation={
+            "pixels": np.empty([1, 2, 3]),
+            "forest": self._forest(1080, 2400),
+            "ui_elements": [],
+        }
+    )
+
+    self.env.get_state()
+    _ = self.env.orientation
+
+    self.mock_get_screen_geometry.assert_called_once()
+
+
 if __name__ == "__main__":
   absltest.main()
@@ -20,7 +20,10 @@ Interface.
 """
 
 import abc
+import base64
+import hashlib
 import os
+import threading
 import time
 from typing import Iterable
 from absl import logging
@@ -36,8 +39,96 @@ APP_DATA = file_utils.convert_to_posix_path(os.path.dirname(__file__),
 'app_data')
 
 
+# If set, files are read from this directory when present, without any
+# network access. This allows setting up devices offline.
+_APP_DATA_DIR_ENV = "ANDROID_WORLD_APP_DATA_DIR"
+_DOWNLOAD_TIMEOUT_SEC = 600
+_CHECKSUM_SUFFIX = ".md5"
+
+
+def _md5(path: str) -> str:
+  digest = hashlib.md5()
+  with open(path, "rb") as f:
+    for chunk in iter(lambda: f.read(1 << 20), b""):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+def _expected_md5(response: requests.Response) -> str | None:
+  """Returns the MD5 that GCS reports for a download, if any."""
+  for part in response.headers.get("x-goog-hash", "").split(","):
+    name, _, value = part.strip().partition("=")
+    if name == "md5":
+      return base64.b64decode(value).hex()
+  return None
+
+
+def _is_valid_cached_file(path: str) -> bool:
+  """Returns whether a cached file exists and matches its recorded checksum."""
+  if not os.path.isfile(path):
+    return False
+  try:
+    with open(path + _CHECKSUM_SUFFIX) as f:
+      expected = f.read().strip()
+  except FileNotFoundError:
+    return True  # Cached before checksums were recorded.
+  if _md5(path) == expected:
+    return True
+  logging.warning("Cached file %s is corrupt, downloading it again.", path)
+  return False
+
+
+def _download(remote_url: str, full_path: str) -> None:
+  """Downloads a file, verifies its checksum and moves it into place."""
+  tmp_path = f"{full_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+  try:
+    with requests.get(
+        remote_url, stream=True, timeout=_DOWNLOAD_TIMEOUT_SEC
+    ) as response:
+      if response.status_code != 200:
+        raise RuntimeError(
+            f"Failed to download file_name from {remote_url}, status code:"
+            f" {response.status_code}"
+        )
+      digest = hashlib.md5()
+      with open(tmp_path, "wb") as file:
+        for chunk in response.iter_content(chunk_size=1 << 20):
+          digest.update(chunk)
+          file.write(chunk)
+      expected = _expected_md5(response)
+    if expected is not None and digest.hexdigest() != expected:
+      raise RuntimeError(
+          f"Checksum mismatch for {remote_url}: expected {expected}, got"
+          f" {digest.hexdigest()}."
+      )
+    with open(full_path + _CHECKSUM_SUFFIX, "w") as f:
+      f.write(digest.hexdigest())
+    os.replace(tmp_path, full_path)
+  finally:
+    if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+
+
 def download_app_data(file_name: str) -> str:
-  """Downloads file from a GCS bucket, if not cached, and installs it."""
+  """Downloads file from a GCS bucket, if not cached, and installs it.
+
+  Files found in the directory set by `ANDROID_WORLD_APP_DATA_DIR` are used
+  directly. Downloads are verified against the checksum reported by GCS, and
+  cached files are verified against the checksum recorded when downloading
+  them.
+
+  Args:
+    file_name: The name of the file in the bucket.
+
+  Returns:
+    The local path of the file.
+  """
+  app_data_dir = os.environ.get(_APP_DATA_DIR_ENV)
+  if app_data_dir:
+    local_path = file_utils.convert_to_posix_path(app_data_dir, file_name)
+    if os.path.isfile(local_path):
+      logging.info("Using %s from %s", file_name, app_data_dir)
+      return local_path
   cache_dir = file_utils.convert_to_posix_path(
       file_utils.get_local_tmp_directory(), "android_world", "app_data"
   )
@@ -46,17 +137,9 @@ def download_app_data(file_name: str) -> str:
   )
   full_path = file_utils.convert_to_posix_path(cache_dir, file_name)
   os.makedirs(cache_dir, exist_ok=True)
-  if not os.path.isfile(full_path):
+  if not _is_valid_cached_file(full_path):
     logging.info("Downloading file_name %s to cache %s", file_name, cache_dir)
-    response = requests.get(remote_url)
-    if response.status_code == 200:
-      with open(full_path, "wb") as file:
-        file.write(response.content)
-    else:
-      raise RuntimeError(
-          f"Failed to download file_name from {remote_url}, status code:"
-          f" {response.status_code}"
-      )
+    _download(remote_url, full_path)
   else:
     logging.info("File already %s exists in cache %s", file_name, cache_dir)
   return full_path
@@ -75,6 +158,10 @@ class AppSetup(abc.ABC):
   # The short name of the app, as used by adb_utils.
   app_name = ""
 
+  # Other files `setup` downloads with `download_app_data`, so they can be
+  # fetched ahead of time.
+  data_file_names: tuple[str, ...] = ()
+
   @classmethod
   def package_name(cls) -> str:
     return adb_utils.extract_package_name(
@@ -550,6 +637,7 @@ class OsmAndApp(AppSetup):
   DEVICE_MAPS_PATH = "/storage/emulated/0/Android/data/net.osmand/files/"
 
   MAP_NAMES = ("Liechtenstein_europe.obf",)
+  data_file_names = MAP_NAMES
 
   apk_names = ("net.osmand-4.6.13.apk",)
   app_name = "osmand"
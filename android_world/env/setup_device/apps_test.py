@@ -0,0 +1,98 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import hashlib
+import os
+import tempfile
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.env.setup_device import apps
+from android_world.utils import file_utils
+import requests
+
+
+def _response(content: bytes, md5: bytes | None = None, status_code=200):
+  response = mock.MagicMock()
+  response.__enter__.return_value = response
+  response.status_code = status_code
+  response.iter_content.return_value = [content[:3], content[3:]]
+  md5 = hashlib.md5(content).digest() if md5 is None else md5
+  response.headers = {
+      'x-goog-hash': f'crc32c=AAAAAA==,md5={base64.b64encode(md5).decode()}'
+  }
+  return response
+
+
+class DownloadAppDataTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.tmp_dir = self.enter_context(tempfile.TemporaryDirectory())
+    self.enter_context(
+        mock.patch.object(
+            file_utils, 'get_local_tmp_directory', return_value=self.tmp_dir
+        )
+    )
+    self.enter_context(mock.patch.dict(os.environ))
+    os.environ.pop('ANDROID_WORLD_APP_DATA_DIR', None)
+    self.mock_get = self.enter_context(mock.patch.object(requests, 'get'))
+
+  def test_downloads_and_reuses_cached_file(self):
+    self.mock_get.return_value = _response(b'apk content')
+
+    path = apps.download_app_data('app.apk')
+    apps.download_app_data('app.apk')
+
+    self.mock_get.assert_called_once()
+    with open(path, 'rb') as f:
+      self.assertEqual(f.read(), b'apk content')
+
+  def test_checksum_mismatch_raises_and_leaves_no_file(self):
+    self.mock_get.return_value = _response(b'truncated', md5=b'0' * 16)
+
+    with self.assertRaisesRegex(RuntimeError, 'Checksum mismatch'):
+      apps.download_app_data('app.apk')
+
+    self.assertEmpty(
+        os.listdir(os.path.join(self.tmp_dir, 'android_world', 'app_data'))
+    )
+
+  def test_corrupt_cached_file_is_downloaded_again(self):
+    self.mock_get.return_value = _response(b'apk content')
+    path = apps.download_app_data('app.apk')
+    with open(path, 'wb') as f:
+      f.write(b'corrupt')
+
+    apps.download_app_data('app.apk')
+
+    self.assertEqual(self.mock_get.call_count, 2)
+    with open(path, 'rb') as f:
+      self.assertEqual(f.read(), b'apk content')
+
+  def test_uses_local_app_data_dir_without_network(self):
+    local_dir = self.enter_context(tempfile.TemporaryDirectory())
+    with open(os.path.join(local_dir, 'app.apk'), 'wb') as f:
+      f.write(b'local apk')
+    os.environ['ANDROID_WORLD_APP_DATA_DIR'] = local_dir
+
+    path = apps.download_app_data('app.apk')
+
+    self.assertEqual(path, os.path.join(local_dir, 'app.apk'))
+    self.mock_get.assert_not_called()
+
+
+if __name__ == '__main__':
+  absltest.main()
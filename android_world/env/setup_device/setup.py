@@ -21,7 +21,9 @@ It does the following:
   and basic automation.
 """
 
-import os
+from concurrent import futures
+import dataclasses
+import time
 from typing import Type
 
 from absl import logging
@@ -131,12 +133,6 @@ def setup_app(app: Type[apps.AppSetup], env: interface.AsyncEnv) -> None:
   app_snapshot.save_snapshot(app.app_name, env.controller)
 
 
-def install_app_if_not_installed(app_name: str, env: interface.AsyncEnv):
-  """Installs the apk of an app only if the apk is not installed."""
-  path = apps.download_app_data(apk)
-  adb_utils.install_apk(path, raw_env)
-
-
 def maybe_install_app(
     app: Type[apps.AppSetup], env: interface.AsyncEnv
 ) -> None:
@@ -158,17 +154,66 @@ def maybe_install_app(
     raise RuntimeError(f"Failed to download and install APK for {app.app_name}")
 
 
+# Concurrent downloads of APKs and app data. Only downloads run concurrently:
+# installs and setups share the device's controller and adb connection.
+_MAX_DOWNLOAD_WORKERS = 8
+
+
+@dataclasses.dataclass
+class AppSetupTiming:
+  """Time spent setting up an app, in seconds."""
+
+  app_name: str
+  download_sec: float = 0.0
+  install_sec: float = 0.0
+  setup_sec: float = 0.0
+
+
+def _prefetch_app_data(app: Type[apps.AppSetup]) -> float:
+  """Downloads the files of an app into the cache, returning the time taken."""
+  start = time.perf_counter()
+  # Other APKs are fallbacks for different architectures, fetched on demand.
+  for file_name in (*app.apk_names[:1], *app.data_file_names):
+    apps.download_app_data(file_name)
+  return time.perf_counter() - start
+
+
+def _timed_setup_app(
+    app: Type[apps.AppSetup], env: interface.AsyncEnv, timing: AppSetupTiming
+) -> None:
+  start = time.perf_counter()
+  setup_app(app, env)
+  timing.setup_sec = time.perf_counter() - start
+
+
+def _log_timings(timings: list[AppSetupTiming]) -> None:
+  lines = [f"{'app':<20} {'download':>9} {'install':>9} {'setup':>9}"]
+  for t in timings:
+    lines.append(
+        f"{t.app_name:<20} {t.download_sec:>8.1f}s {t.install_sec:>8.1f}s"
+        f" {t.setup_sec:>8.1f}s"
+    )
+  logging.info("App setup timings:\n%s", "\n".join(lines))
+
+
 def setup_apps(
     env: interface.AsyncEnv,
     app_list: tuple[Type[apps.AppSetup], ...] | None = None,
-) -> None:
+) -> list[AppSetupTiming]:
   """Sets up apps for Android World.
 
+  APKs and app data are downloaded concurrently, while apps are installed and
+  set up one after another, each as soon as its files are available.
+
   Args:
     env: The Android environment.
     app_list: The list of apps to setup. If not specified, the default list of
       apps will be used.
 
+  Returns:
+    The time spent on each app. Downloads overlap with the other steps, so the
+    times do not add up to the total.
+
   Raises:
     RuntimeError: If cannot install APK.
   """
@@ -183,6 +228,23 @@ def setup_apps(
   )
   if app_list is None:
     app_list = _APPS
-  for app in app_list:
-    maybe_install_app(app, env)
-    setup_app(app, env)
+  timings = [AppSetupTiming(app.app_name) for app in app_list]
+  with futures.ThreadPoolExecutor(
+      _MAX_DOWNLOAD_WORKERS, thread_name_prefix="app_download"
+  ) as downloads:
+    prefetches = [downloads.submit(_prefetch_app_data, app) for app in app_list]
+    for app, prefetch, timing in zip(app_list, prefetches, timings):
+      try:
+        timing.download_sec = prefetch.result()
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        # Installing retries the download and reports the failure.
+        logging.warning("Failed to prefetch files of %s: %s", app.app_name, e)
+
+      start = time.perf_counter()
+      maybe_install_app(app, env)
+      timing.install_sec = time.perf_counter() - start
+
+      _timed_setup_app(app, env, timing)
+
+  _log_timings(timings)
+  return timings
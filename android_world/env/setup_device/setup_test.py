@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 from unittest import mock
 
 from absl.testing import absltest
@@ -57,6 +58,9 @@ class SetupTest(absltest.TestCase):
     self.mock_issue_generic_request = self.enter_context(
         mock.patch.object(adb_utils, "issue_generic_request")
     )
+    self.mock_download_app_data = self.enter_context(
+        mock.patch.object(apps, "download_app_data")
+    )
 
   @mock.patch.object(tools, "AndroidToolController")
   @mock.patch.object(setup, "download_and_install_apk")
@@ -78,6 +82,59 @@ class SetupTest(absltest.TestCase):
       mock_app_setups[app_class].assert_any_call(env)
       mock_save_snapshot.assert_any_call(app_class.app_name, env.controller)
 
+  @mock.patch.object(setup, "download_and_install_apk")
+  @mock.patch.object(app_snapshot, "save_snapshot")
+  def test_setup_apps_prefetches_and_reports_timings(
+      self, unused_save_snapshot, unused_install_apk
+  ):
+    env = mock.create_autospec(interface.AsyncEnv)
+    app_list = (apps.OsmAndApp, apps.FilesApp, apps.ClockApp)
+    for app_class in app_list:
+      self.enter_context(mock.patch.object(app_class, "setup"))
+
+    timings = setup.setup_apps(env, app_list)
+
+    self.assertEqual(
+        [timing.app_name for timing in timings], [app.app_name for app in app_list]
+    )
+    # Only OsmAnd has an APK and data files; the others are pre-installed.
+    self.assertCountEqual(
+        self.mock_download_app_data.call_args_list,
+        [
+            mock.call(apps.OsmAndApp.apk_names[0]),
+            mock.call(apps.OsmAndApp.MAP_NAMES[0]),
+        ],
+    )
+
+  @mock.patch.object(setup, "download_and_install_apk")
+  @mock.patch.object(app_snapshot, "save_snapshot")
+  def test_setup_apps_runs_setups_in_order_on_calling_thread(
+      self, unused_save_snapshot, unused_install_apk
+  ):
+    env = mock.create_autospec(interface.AsyncEnv)
+    app_list = (apps.FilesApp, apps.ClockApp, apps.SettingsApp)
+    setups = []
+
+    def record_setup(app_class):
+      def record(env):
+        del env
+        setups.append((app_class, threading.current_thread()))
+
+      return record
+
+    for app_class in app_list:
+      self.enter_context(
+          mock.patch.object(
+              app_class, "setup", side_effect=record_setup(app_class)
+          )
+      )
+
+    setup.setup_apps(env, app_list)
+
+    self.assertEqual(
+        setups, [(app, threading.current_thread()) for app in app_list]
+    )
+
 
 class _App(apps.AppSetup):
 
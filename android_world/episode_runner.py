@@ -14,11 +14,14 @@
 
 """Runs an agent on the environment."""
 
+from collections.abc import Mapping
 import dataclasses
 from typing import Any, Callable, Optional
 from android_world import constants
 from android_world.agents import base_agent
 from android_world.env import interface
+from android_world.utils import step_log
+from android_world.utils import tracing
 import termcolor
 
 
@@ -28,13 +31,13 @@ class EpisodeResult:
 
   Attributes:
     done: Whether the agent indicated the task is complete.
-    step_data: Environment and agent data for each step.
+    step_data: Environment and agent data for each step, as a dict of lists.
     env_reward: Reward returned by environment, if applicable.
     aux_data: Additional data from the episode which may be used for metrics.
   """
 
   done: bool
-  step_data: dict[str, Any]
+  step_data: Mapping[str, Any]
   env_reward: Optional[float] = None
   aux_data: Optional[dict[str, Any]] = None
 
@@ -53,6 +56,12 @@ def run_episode(
   run until it determines a task is complete, if the max number of
   steps is reached, of if the termination_fn is True.
 
+  Each step is written to disk as soon as it is taken, see `step_log`, so an
+  interrupted episode can be partially recovered and memory use does not grow
+  with the number of steps. The agent's step data is not modified. The
+  returned step data reads the steps back from disk when accessed, with their
+  screenshots as arrays.
+
   Args:
     goal: The goal instruction for the agent.
     agent: The agent to run on the environment.
@@ -76,23 +85,25 @@ def run_episode(
   agent.reset(start_on_home_screen)
   agent.set_max_steps(max_n_steps)
 
-  output = []
+  steps = step_log.create()
   for step_n in range(max_n_steps):
-    result = agent.step(goal)
+    with tracing.span('agent.step', step=step_n):
+      result = agent.step(goal)
     print_fn('Completed step {:d}.'.format(step_n + 1))
     assert constants.STEP_NUMBER not in result.data
-    output.append(result.data | {constants.STEP_NUMBER: step_n})
+    with tracing.span('episode_runner.write_step'):
+      steps.append(result.data | {constants.STEP_NUMBER: step_n})
     if termination_fn(agent.env):
       print_fn('Environment ends episode.')
       return EpisodeResult(
           done=True,
-          step_data=_transpose_lod_to_dol(output),
+          step_data=steps.step_data(),
       )
     elif result.done:
       print_fn('Agent indicates task is done.')
       return EpisodeResult(
           done=result.done,
-          step_data=_transpose_lod_to_dol(output),
+          step_data=steps.step_data(),
       )
   print_fn(
       termcolor.colored(
@@ -100,28 +111,8 @@ def run_episode(
           'red',
       )
   )
-  return EpisodeResult(
-      done=result.done, step_data=_transpose_lod_to_dol(output)  # pylint: disable=undefined-variable
-  )
-
-
-def _transpose_lod_to_dol(data: list[dict[str, Any]]) -> dict[str, list[Any]]:
-  """Transposes a list of dictionaries to a dictionary of lists.
-
-  Args:
-    data: A list of dictionaries.
-
-  Returns:
-    A dictionary where each key is from the input dictionaries and each value is
-    a list of values for that key.
-  """
-  result = {}
-  for d in data:
-    for key, value in d.items():
-      if key not in result:
-        result[key] = []
-      result[key].append(value)
-  return result
+  # The agent did not indicate it was done, or the episode would have ended.
+  return EpisodeResult(done=False, step_data=steps.step_data())
 
 
 def transpose_dol_to_lod(data: dict[str, list[Any]]) -> list[dict[str, Any]]:
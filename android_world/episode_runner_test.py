@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import tempfile
 from typing import Any
 from unittest import mock
 from absl.testing import absltest
@@ -19,6 +21,8 @@ from android_world import constants
 from android_world import episode_runner
 from android_world.agents import base_agent
 from android_world.env import interface
+from android_world.utils import step_log
+import numpy as np
 
 
 class FakeEnvironmentInteractingAgent(base_agent.EnvironmentInteractingAgent):
@@ -89,6 +93,39 @@ class EpisodeRunnerTest(absltest.TestCase):
 
     mock_agent.env.reset.assert_called_with(go_home=True)
 
+  def test_screenshots_are_moved_to_disk(self):
+    screenshot = np.ones((240, 108, 3), dtype=np.uint8)
+    step_data = {'screenshot': screenshot, 'summary': 'summary'}
+    agent = FakeEnvironmentInteractingAgent(
+        self.env, 'fake_agent', return_done=True, return_data=step_data
+    )
+
+    result = episode_runner.run_episode('test_goal', agent)
+
+    frame = result.step_data['screenshot'][0]
+    self.assertIsInstance(frame, np.ndarray)
+    np.testing.assert_array_equal(frame, screenshot)
+    self.assertLen(os.listdir(result.step_data.log.frames.directory), 2)
+    # The agent's own step data is left as is.
+    self.assertIs(step_data['screenshot'], screenshot)
+    self.assertEqual(result.step_data['summary'], ['summary'])
+
+  def test_steps_are_written_as_they_are_taken(self):
+    directory = os.path.join(tempfile.mkdtemp(), 'steps')
+    agent = FakeEnvironmentInteractingAgent(
+        self.env, 'fake_agent', return_data={'summary': 'summary'}
+    )
+    step = agent.step
+    agent.step = mock.Mock(side_effect=[step('goal'), RuntimeError('crash')])
+
+    with step_log.write_to(directory), self.assertRaises(RuntimeError):
+      episode_runner.run_episode('test_goal', agent, max_n_steps=3)
+
+    self.assertEqual(
+        step_log.StepLog(directory).step_data().to_dict(),
+        {'summary': ['summary'], constants.STEP_NUMBER: [0]},
+    )
+
 
 if __name__ == '__main__':
   absltest.main()
@@ -12,34 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Registers the task classes."""
-
-import types
-from typing import Any, Final
-
-from android_world.task_evals import task_eval
-from android_world.task_evals.composite import markor_sms
-from android_world.task_evals.composite import system as system_composite
-from android_world.task_evals.information_retrieval import information_retrieval
-from android_world.task_evals.information_retrieval import information_retrieval_registry
-from android_world.task_evals.miniwob import miniwob_registry
-from android_world.task_evals.single import audio_recorder
-from android_world.task_evals.single import browser
-from android_world.task_evals.single import camera
-from android_world.task_evals.single import clock
-from android_world.task_evals.single import contacts
-from android_world.task_evals.single import expense
-from android_world.task_evals.single import files
-from android_world.task_evals.single import markor
-from android_world.task_evals.single import osmand
-from android_world.task_evals.single import recipe
-from android_world.task_evals.single import retro_music
-from android_world.task_evals.single import simple_draw_pro
-from android_world.task_evals.single import simple_gallery_pro
-from android_world.task_evals.single import sms
-from android_world.task_evals.single import system
-from android_world.task_evals.single import vlc
-from android_world.task_evals.single.calendar import calendar
+"""Registers the task classes.
+
+Task classes are resolved lazily by name: importing this module does not import
+the task implementations or their dependencies. A task's module is imported
+the first time its class is looked up, or when a whole family is iterated.
+"""
+
+import collections
+from collections.abc import Callable, Iterator, MutableMapping
+import functools
+import importlib
+from typing import Any, Final, TYPE_CHECKING
+
+from android_world.task_evals.information_retrieval import task_proto_cache
+
+if TYPE_CHECKING:
+  from android_world.task_evals import task_eval
+
+# Package that the task paths in the registry index are relative to.
+_TASK_PACKAGE = 'android_world.task_evals'
 
 
 def get_information_retrieval_task_path() -> None:
@@ -56,6 +48,124 @@ def get_families() -> list[str]:
   ]
 
 
+def _import_attribute(path: str) -> Any:
+  """Imports `module.attribute`, relative to the task_evals package."""
+  module_name, attribute = path.rsplit('.', 1)
+  module = importlib.import_module(f'{_TASK_PACKAGE}.{module_name}')
+  return getattr(module, attribute)
+
+
+class LazyTaskRegistry(MutableMapping):
+  """Maps task names to task classes, importing each class on first access.
+
+  The registry is built from an index mapping each task name to a function
+  that loads its class. The index itself is only built when the registry is
+  first used. Listing names, counting and membership tests use the index only
+  and do not import any task.
+  """
+
+  def __init__(
+      self,
+      build_index: Callable[[], dict[str, Callable[[], Any]]],
+  ):
+    """Initializes the registry.
+
+    Args:
+      build_index: Returns a mapping from task name to a function that returns
+        the task's class.
+    """
+    self._build_index = build_index
+    self._index: dict[str, Callable[[], Any] | None] | None = None
+    self._classes: dict[str, Any] = {}
+
+  def _get_index(self) -> dict[str, Callable[[], Any] | None]:
+    if self._index is None:
+      self._index = dict(self._build_index())
+    return self._index
+
+  def __getitem__(self, name: str) -> 'type[task_eval.TaskEval]':
+    if name not in self._classes:
+      load = self._get_index()[name]
+      self._classes[name] = load()
+    return self._classes[name]
+
+  def __setitem__(
+      self, name: str, task_class: 'type[task_eval.TaskEval]'
+  ) -> None:
+    self._get_index()[name] = None
+    self._classes[name] = task_class
+
+  def __delitem__(self, name: str) -> None:
+    del self._get_index()[name]
+    self._classes.pop(name, None)
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(self._get_index())
+
+  def __len__(self) -> int:
+    return len(self._get_index())
+
+  def __contains__(self, name: object) -> bool:
+    return name in self._get_index()
+
+
+def _android_index() -> dict[str, Callable[[], Any]]:
+  return {
+      path.rsplit('.', 1)[1]: functools.partial(_import_attribute, path)
+      for path in TaskRegistry._TASKS  # pylint: disable=protected-access
+  }
+
+
+@functools.cache
+def _information_retrieval_classes() -> dict[str, Any]:
+  """Builds all information retrieval task classes."""
+  registry_module = importlib.import_module(
+      f'{_TASK_PACKAGE}.information_retrieval.information_retrieval_registry'
+  )
+  return registry_module.InformationRetrievalRegistry(
+      filename=get_information_retrieval_task_path()
+  ).registry
+
+
+def _information_retrieval_class(name: str) -> Any:
+  return _information_retrieval_classes()[name]
+
+
+def _information_retrieval_index() -> dict[str, Callable[[], Any]]:
+  # Only the task names are needed, which the cached task proto provides
+  # without importing the task implementations.
+  return {
+      task.name: functools.partial(_information_retrieval_class, task.name)
+      for task in task_proto_cache.load_tasks().tasks
+  }
+
+
+def _module_registry_index(path: str) -> dict[str, Callable[[], Any]]:
+  """Indexes a registry dict defined in a task module, on first use."""
+  registry = _import_attribute(path)
+  return {
+      name: functools.partial(registry.__getitem__, name) for name in registry
+  }
+
+
+class _TaskNames:
+  """Task names with "." notation, for autocomplete in Colab."""
+
+  def __init__(self, *registries: MutableMapping):
+    self._registries = registries
+
+  def _names(self) -> set[str]:
+    return {name for registry in self._registries for name in registry}
+
+  def __getattr__(self, name: str) -> str:
+    if not name.startswith('_') and name in self._names():
+      return name
+    raise AttributeError(name)
+
+  def __dir__(self) -> list[str]:
+    return sorted(self._names())
+
+
 class TaskRegistry:
   """Registry of tasks."""
 
@@ -70,14 +180,22 @@ class TaskRegistry:
 
   # Task registries; they contain a mapping from each task name to its class,
   # to construct instances of a task.
-  ANDROID_TASK_REGISTRY = {}
-  INFORMATION_RETRIEVAL_TASK_REGISTRY = (
-      information_retrieval_registry.InformationRetrievalRegistry[
-          information_retrieval.InformationRetrieval
-      ](filename=get_information_retrieval_task_path()).registry
+  ANDROID_TASK_REGISTRY = LazyTaskRegistry(_android_index)
+  INFORMATION_RETRIEVAL_TASK_REGISTRY = LazyTaskRegistry(
+      _information_retrieval_index
   )
 
-  MINIWOB_TASK_REGISTRY = miniwob_registry.TASK_REGISTRY
+  MINIWOB_TASK_REGISTRY = LazyTaskRegistry(
+      functools.partial(
+          _module_registry_index, 'miniwob.miniwob_registry.TASK_REGISTRY'
+      )
+  )
+  _MINIWOB_TASK_REGISTRY_SUBSET = LazyTaskRegistry(
+      functools.partial(
+          _module_registry_index,
+          'miniwob.miniwob_registry.TASK_REGISTRY_SUBSET',
+      )
+  )
 
   def get_registry(self, family: str) -> Any:
     """Gets the task registry for the given family.
@@ -92,131 +210,136 @@ class TaskRegistry:
       ValueError: If provided family doesn't exist.
     """
     if family == self.ANDROID_WORLD_FAMILY:
-      return {
-          **self.ANDROID_TASK_REGISTRY,
-          **self.INFORMATION_RETRIEVAL_TASK_REGISTRY,
-      }
+      # Writes go to the first, private mapping, like they did to the merged
+      # dict this used to return.
+      return collections.ChainMap(
+          {},
+          self.INFORMATION_RETRIEVAL_TASK_REGISTRY,
+          self.ANDROID_TASK_REGISTRY,
+      )
     elif family == self.ANDROID_FAMILY:
       return self.ANDROID_TASK_REGISTRY
     elif family == self.MINIWOB_FAMILY:
       return self.MINIWOB_TASK_REGISTRY
     elif family == self.MINIWOB_FAMILY_SUBSET:
-      return miniwob_registry.TASK_REGISTRY_SUBSET
+      return self._MINIWOB_TASK_REGISTRY_SUBSET
     elif family == self.INFORMATION_RETRIEVAL_FAMILY:
       return self.INFORMATION_RETRIEVAL_TASK_REGISTRY
     else:
       raise ValueError(f'Unsupported family: {family}')
 
+  # Paths of the task classes, relative to the task_evals package. The class
+  # name is the task name.
   _TASKS = (
       # keep-sorted start
-      audio_recorder.AudioRecorderRecordAudio,
-      audio_recorder.AudioRecorderRecordAudioWithFileName,
-      browser.BrowserDraw,
-      browser.BrowserMaze,
-      browser.BrowserMultiply,
-      calendar.SimpleCalendarAddOneEvent,
-      calendar.SimpleCalendarAddOneEventInTwoWeeks,
-      calendar.SimpleCalendarAddOneEventRelativeDay,
-      calendar.SimpleCalendarAddOneEventTomorrow,
-      calendar.SimpleCalendarAddRepeatingEvent,
-      calendar.SimpleCalendarDeleteEvents,
-      calendar.SimpleCalendarDeleteEventsOnRelativeDay,
-      calendar.SimpleCalendarDeleteOneEvent,
-      camera.CameraTakePhoto,
-      camera.CameraTakeVideo,
-      clock.ClockStopWatchPausedVerify,
-      clock.ClockStopWatchRunning,
-      clock.ClockTimerEntry,
-      contacts.ContactsAddContact,
-      contacts.ContactsNewContactDraft,
-      expense.ExpenseAddMultiple,
-      expense.ExpenseAddMultipleFromGallery,
-      expense.ExpenseAddMultipleFromMarkor,
-      expense.ExpenseAddSingle,
-      expense.ExpenseDeleteDuplicates,
-      expense.ExpenseDeleteDuplicates2,
-      expense.ExpenseDeleteMultiple,
-      expense.ExpenseDeleteMultiple2,
-      expense.ExpenseDeleteSingle,
-      files.FilesDeleteFile,
-      files.FilesMoveFile,
-      markor.MarkorAddNoteHeader,
-      markor.MarkorChangeNoteContent,
-      markor.MarkorCreateFolder,
-      markor.MarkorCreateNote,
-      markor.MarkorCreateNoteFromClipboard,
-      markor.MarkorDeleteAllNotes,
-      markor.MarkorDeleteNewestNote,
-      markor.MarkorDeleteNote,
-      markor.MarkorEditNote,
-      markor.MarkorMergeNotes,
-      markor.MarkorMoveNote,
-      markor.MarkorTranscribeReceipt,
-      markor.MarkorTranscribeVideo,
-      # Markor composite tasks.
-      markor_sms.MarkorCreateNoteAndSms,
-      # OsmAnd.
-      osmand.OsmAndFavorite,
-      osmand.OsmAndMarker,
-      osmand.OsmAndTrack,
-      recipe.RecipeAddMultipleRecipes,
-      recipe.RecipeAddMultipleRecipesFromImage,
-      recipe.RecipeAddMultipleRecipesFromMarkor,
-      recipe.RecipeAddMultipleRecipesFromMarkor2,
-      recipe.RecipeAddSingleRecipe,
-      recipe.RecipeDeleteDuplicateRecipes,
-      recipe.RecipeDeleteDuplicateRecipes2,
-      recipe.RecipeDeleteDuplicateRecipes3,
-      recipe.RecipeDeleteMultipleRecipes,
-      recipe.RecipeDeleteMultipleRecipesWithConstraint,
-      recipe.RecipeDeleteMultipleRecipesWithNoise,
-      recipe.RecipeDeleteSingleRecipe,
-      recipe.RecipeDeleteSingleWithRecipeWithNoise,
-      retro_music.RetroCreatePlaylist,
-      retro_music.RetroPlayingQueue,
-      retro_music.RetroPlaylistDuration,
-      retro_music.RetroSavePlaylist,
-      simple_draw_pro.SimpleDrawProCreateDrawing,
-      simple_gallery_pro.SaveCopyOfReceiptTaskEval,
-      sms.SimpleSmsReply,
-      sms.SimpleSmsReplyMostRecent,
-      sms.SimpleSmsResend,
-      sms.SimpleSmsSend,
-      sms.SimpleSmsSendClipboardContent,
-      sms.SimpleSmsSendReceivedAddress,
-      system.OpenAppTaskEval,
-      system.SystemBluetoothTurnOff,
-      system.SystemBluetoothTurnOffVerify,
-      system.SystemBluetoothTurnOn,
-      system.SystemBluetoothTurnOnVerify,
-      system.SystemBrightnessMax,
-      system.SystemBrightnessMaxVerify,
-      system.SystemBrightnessMin,
-      system.SystemBrightnessMinVerify,
-      system.SystemCopyToClipboard,
-      system.SystemWifiTurnOff,
-      system.SystemWifiTurnOffVerify,
-      system.SystemWifiTurnOn,
-      system.SystemWifiTurnOnVerify,
-      system_composite.TurnOffWifiAndTurnOnBluetooth,
-      system_composite.TurnOnWifiAndOpenApp,
+      'composite.markor_sms.MarkorCreateNoteAndSms',
+      'composite.system.TurnOffWifiAndTurnOnBluetooth',
+      'composite.system.TurnOnWifiAndOpenApp',
+      'single.audio_recorder.AudioRecorderRecordAudio',
+      'single.audio_recorder.AudioRecorderRecordAudioWithFileName',
+      'single.browser.BrowserDraw',
+      'single.browser.BrowserMaze',
+      'single.browser.BrowserMultiply',
+      'single.calendar.calendar.SimpleCalendarAddOneEvent',
+      'single.calendar.calendar.SimpleCalendarAddOneEventInTwoWeeks',
+      'single.calendar.calendar.SimpleCalendarAddOneEventRelativeDay',
+      'single.calendar.calendar.SimpleCalendarAddOneEventTomorrow',
+      'single.calendar.calendar.SimpleCalendarAddRepeatingEvent',
+      'single.calendar.calendar.SimpleCalendarDeleteEvents',
+      'single.calendar.calendar.SimpleCalendarDeleteEventsOnRelativeDay',
+      'single.calendar.calendar.SimpleCalendarDeleteOneEvent',
+      'single.camera.CameraTakePhoto',
+      'single.camera.CameraTakeVideo',
+      'single.clock.ClockStopWatchPausedVerify',
+      'single.clock.ClockStopWatchRunning',
+      'single.clock.ClockTimerEntry',
+      'single.contacts.ContactsAddContact',
+      'single.contacts.ContactsNewContactDraft',
+      'single.expense.ExpenseAddMultiple',
+      'single.expense.ExpenseAddMultipleFromGallery',
+      'single.expense.ExpenseAddMultipleFromMarkor',
+      'single.expense.ExpenseAddSingle',
+      'single.expense.ExpenseDeleteDuplicates',
+      'single.expense.ExpenseDeleteDuplicates2',
+      'single.expense.ExpenseDeleteMultiple',
+      'single.expense.ExpenseDeleteMultiple2',
+      'single.expense.ExpenseDeleteSingle',
+      'single.files.FilesDeleteFile',
+      'single.files.FilesMoveFile',
+      'single.markor.MarkorAddNoteHeader',
+      'single.markor.MarkorChangeNoteContent',
+      'single.markor.MarkorCreateFolder',
+      'single.markor.MarkorCreateNote',
+      'single.markor.MarkorCreateNoteFromClipboard',
+      'single.markor.MarkorDeleteAllNotes',
+      'single.markor.MarkorDeleteNewestNote',
+      'single.markor.MarkorDeleteNote',
+      'single.markor.MarkorEditNote',
+      'single.markor.MarkorMergeNotes',
+      'single.markor.MarkorMoveNote',
+      'single.markor.MarkorTranscribeReceipt',
+      'single.markor.MarkorTranscribeVideo',
+      'single.osmand.OsmAndFavorite',
+      'single.osmand.OsmAndMarker',
+      'single.osmand.OsmAndTrack',
+      'single.recipe.RecipeAddMultipleRecipes',
+      'single.recipe.RecipeAddMultipleRecipesFromImage',
+      'single.recipe.RecipeAddMultipleRecipesFromMarkor',
+      'single.recipe.RecipeAddMultipleRecipesFromMarkor2',
+      'single.recipe.RecipeAddSingleRecipe',
+      'single.recipe.RecipeDeleteDuplicateRecipes',
+      'single.recipe.RecipeDeleteDuplicateRecipes2',
+      'single.recipe.RecipeDeleteDuplicateRecipes3',
+      'single.recipe.RecipeDeleteMultipleRecipes',
+      'single.recipe.RecipeDeleteMultipleRecipesWithConstraint',
+      'single.recipe.RecipeDeleteMultipleRecipesWithNoise',
+      'single.recipe.RecipeDeleteSingleRecipe',
+      'single.recipe.RecipeDeleteSingleWithRecipeWithNoise',
+      'single.retro_music.RetroCreatePlaylist',
+      'single.retro_music.RetroPlayingQueue',
+      'single.retro_music.RetroPlaylistDuration',
+      'single.retro_music.RetroSavePlaylist',
+      'single.simple_draw_pro.SimpleDrawProCreateDrawing',
+      'single.simple_gallery_pro.SaveCopyOfReceiptTaskEval',
+      'single.sms.SimpleSmsReply',
+      'single.sms.SimpleSmsReplyMostRecent',
+      'single.sms.SimpleSmsResend',
+      'single.sms.SimpleSmsSend',
+      'single.sms.SimpleSmsSendClipboardContent',
+      'single.sms.SimpleSmsSendReceivedAddress',
+      'single.system.OpenAppTaskEval',
+      'single.system.SystemBluetoothTurnOff',
+      'single.system.SystemBluetoothTurnOffVerify',
+      'single.system.SystemBluetoothTurnOn',
+      'single.system.SystemBluetoothTurnOnVerify',
+      'single.system.SystemBrightnessMax',
+      'single.system.SystemBrightnessMaxVerify',
+      'single.system.SystemBrightnessMin',
+      'single.system.SystemBrightnessMinVerify',
+      'single.system.SystemCopyToClipboard',
+      'single.system.SystemWifiTurnOff',
+      'single.system.SystemWifiTurnOffVerify',
+      'single.system.SystemWifiTurnOn',
+      'single.system.SystemWifiTurnOnVerify',
       # keep-sorted end
       # VLC media player tasks.
-      vlc.VlcCreatePlaylist,
-      vlc.VlcCreateTwoPlaylists,
+      'single.vlc.VlcCreatePlaylist',
+      'single.vlc.VlcCreateTwoPlaylists',
       # Phone operations are flaky and the root cause is not known. Disabling
       # until resolution.
-      # phone.MarkorCallApartment,
-      # phone.PhoneAnswerCall,
-      # phone.PhoneCallTextSender,
-      # phone.PhoneMakeCall,
-      # phone.PhoneRedialNumber,
-      # phone.PhoneReturnMissedCall,
-      # sms.SimpleSmsSendAfterCall,
+      # 'single.phone.MarkorCallApartment',
+      # 'single.phone.PhoneAnswerCall',
+      # 'single.phone.PhoneCallTextSender',
+      # 'single.phone.PhoneMakeCall',
+      # 'single.phone.PhoneRedialNumber',
+      # 'single.phone.PhoneReturnMissedCall',
+      # 'single.sms.SimpleSmsSendAfterCall',
   )
 
   def register_task(
-      self, task_registry: dict[Any, Any], task_class: type[task_eval.TaskEval]
+      self,
+      task_registry: MutableMapping[str, Any],
+      task_class: 'type[task_eval.TaskEval]',
   ) -> None:
     """Registers the task class.
 
@@ -226,17 +349,9 @@ class TaskRegistry:
     """
     task_registry[task_class.__name__] = task_class
 
-  def __init__(self):
-    for task in self._TASKS:
-      self.register_task(self.ANDROID_TASK_REGISTRY, task)
-
   # Add names with "." notation for autocomplete in Colab.
-  names = types.SimpleNamespace(**{
-      k: k
-      for k in {
-          **ANDROID_TASK_REGISTRY,
-          **INFORMATION_RETRIEVAL_TASK_REGISTRY,
-          **MINIWOB_TASK_REGISTRY,
-          **MINIWOB_TASK_REGISTRY,
-      }
-  })
+  names = _TaskNames(
+      ANDROID_TASK_REGISTRY,
+      INFORMATION_RETRIEVAL_TASK_REGISTRY,
+      MINIWOB_TASK_REGISTRY,
+  )
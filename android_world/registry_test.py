@@ -0,0 +1,155 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import inspect
+import pkgutil
+import subprocess
+import sys
+from unittest import mock
+
+from absl.testing import absltest
+from android_world import registry
+from android_world.task_evals import composite
+from android_world.task_evals import single
+from android_world.task_evals import task_eval
+from android_world.task_evals.single import sms
+
+# Task classes that are defined in the task modules but deliberately left out
+# of the registry: base classes and the tasks that need a phone call.
+_UNREGISTERED_TASKS = frozenset({
+    'BrowserTask',
+    'GenericTaskEval',
+    'MarkorCallApartment',
+    'PhoneAnswerCall',
+    'PhoneCallTextSender',
+    'PhoneMakeCall',
+    'PhoneRedialNumber',
+    'PhoneReturnMissedCall',
+    'SimpleSmsSendAfterCall',
+})
+
+
+def _defined_task_classes() -> dict[str, type[task_eval.TaskEval]]:
+  """Imports the task modules and returns the concrete task classes."""
+  task_classes = {}
+  for package in (composite, single):
+    for module_info in pkgutil.walk_packages(
+        package.__path__, package.__name__ + '.'
+    ):
+      if module_info.name.endswith('_test'):
+        continue
+      module = importlib.import_module(module_info.name)
+      for name, value in vars(module).items():
+        if (
+            inspect.isclass(value)
+            and issubclass(value, task_eval.TaskEval)
+            and value.__module__ == module.__name__
+            and not inspect.isabstract(value)
+            and not name.startswith('_')
+        ):
+          task_classes[name] = value
+  return task_classes
+
+
+class LazyTaskRegistryTest(absltest.TestCase):
+
+  def test_index_is_built_on_first_use(self):
+    build_index = mock.Mock(return_value={'Task': lambda: sms.SimpleSmsSend})
+    task_registry = registry.LazyTaskRegistry(build_index)
+    build_index.assert_not_called()
+
+    self.assertIn('Task', task_registry)
+    self.assertLen(task_registry, 1)
+    build_index.assert_called_once()
+
+  def test_classes_are_loaded_on_access_once(self):
+    load = mock.Mock(return_value=sms.SimpleSmsSend)
+    task_registry = registry.LazyTaskRegistry(lambda: {'Task': load})
+
+    self.assertEqual(list(task_registry), ['Task'])
+    load.assert_not_called()
+    self.assertIs(task_registry['Task'], sms.SimpleSmsSend)
+    self.assertIs(task_registry['Task'], sms.SimpleSmsSend)
+    load.assert_called_once()
+
+  def test_register_task(self):
+    task_registry = registry.LazyTaskRegistry(dict)
+
+    registry.TaskRegistry().register_task(task_registry, sms.SimpleSmsSend)
+
+    self.assertEqual(dict(task_registry), {'SimpleSmsSend': sms.SimpleSmsSend})
+
+  def test_unknown_task_raises_key_error(self):
+    with self.assertRaises(KeyError):
+      _ = registry.LazyTaskRegistry(dict)['Unknown']
+
+
+class TaskRegistryTest(absltest.TestCase):
+
+  def test_index_resolves_to_named_classes(self):
+    android_registry = registry.TaskRegistry().get_registry(
+        registry.TaskRegistry.ANDROID_FAMILY
+    )
+
+    for name, task_class in android_registry.items():
+      self.assertEqual(task_class.__name__, name)
+
+  def test_index_matches_task_modules(self):
+    task_classes = _defined_task_classes()
+    android_registry = registry.TaskRegistry().get_registry(
+        registry.TaskRegistry.ANDROID_FAMILY
+    )
+
+    self.assertCountEqual(
+        list(android_registry), set(task_classes) - _UNREGISTERED_TASKS
+    )
+    for name in android_registry:
+      self.assertIs(android_registry[name], task_classes[name])
+
+  def test_android_world_family_merges_families(self):
+    task_registry = registry.TaskRegistry()
+
+    android_world = task_registry.get_registry(
+        task_registry.ANDROID_WORLD_FAMILY
+    )
+
+    self.assertCountEqual(
+        list(android_world),
+        list(task_registry.ANDROID_TASK_REGISTRY)
+        + list(task_registry.INFORMATION_RETRIEVAL_TASK_REGISTRY),
+    )
+    self.assertIs(android_world['SimpleSmsSend'], sms.SimpleSmsSend)
+
+  def test_names(self):
+    self.assertEqual(registry.TaskRegistry.names.SimpleSmsSend, 'SimpleSmsSend')
+    with self.assertRaises(AttributeError):
+      _ = registry.TaskRegistry.names.NotATask
+
+  def test_import_does_not_load_tasks(self):
+    code = (
+        'import sys\n'
+        'from android_world import registry\n'
+        'names = list(registry.TaskRegistry().get_registry("android_world"))\n'
+        'assert names\n'
+        'loaded = [m for m in sys.modules if m.startswith('
+        '"android_world.task_evals.single")]\n'
+        'assert not loaded, loaded\n'
+    )
+
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+if __name__ == '__main__':
+  absltest.main()
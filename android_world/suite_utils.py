@@ -15,24 +15,31 @@
 """Utilities for evaluating automation agents."""
 
 import collections
+from concurrent import futures
+import dataclasses
 import datetime
+import functools
 import hashlib
 import logging
 import os
 import random
+import threading
 import time
 import traceback
-from typing import Any, Callable, Type, TypeVar
+from typing import Any, Callable, Sequence, Type, TypeVar
 
 from android_env import env_interface
 from android_world import checkpointer as checkpointer_lib
 from android_world import constants
 from android_world import episode_runner
 from android_world.agents import base_agent
+from android_world.env import adb_ledger
 from android_world.env import adb_utils
 from android_world.env import interface
 from android_world.task_evals import task_eval
 from android_world.task_evals.miniwob import miniwob_base
+from android_world.utils import step_log
+from android_world.utils import tracing
 from fuzzywuzzy import process
 import numpy as np
 import pandas as pd
@@ -41,6 +48,8 @@ import pandas as pd
 _FIXED_SEED = 123
 _TASK_TEMPLATE_COLUMN = 'task_template'
 _TASK_PROMPT_COLUMN = 'task_prompt'
+# Default number of newly run episodes between full results tables.
+_SUMMARY_EVERY_N_EPISODES = 10
 TaskEvalType = TypeVar('TaskEvalType', bound=task_eval.TaskEval)
 
 
@@ -153,7 +162,11 @@ def create_suite(
     )
 
   suite = {}
-  for name, task_type in task_registry.items():
+  for name in task_registry:
+    if tasks is not None and name not in tasks:
+      # Registries may load task classes lazily; don't load unused ones.
+      continue
+    task_type = task_registry[name]
     current = []
     for i in range(n_task_combinations):
       if use_identical_params:
@@ -242,10 +255,13 @@ def _run_task(
   """
   start = time.time()
   try:
-    task.initialize_task(env)
+    with tracing.span('task.initialize_task', task=task.name):
+      task.initialize_task(env)
     _log_and_print('Running task %s with goal "%s"', task.name, task.goal)
-    interaction_results = run_episode(task)
-    task_successful = task.is_successful(env)
+    with tracing.span('episode', task=task.name):
+      interaction_results = run_episode(task)
+    with tracing.span('task.is_successful'):
+      task_successful = task.is_successful(env)
   except Exception as e:  # pylint: disable=broad-exception-caught
     _log_and_print('%s\nSKIPPING %s.', '~' * 80, task.name)
     logging.exception(
@@ -285,10 +301,54 @@ def _run_task(
             constants.EpisodeConstants.SEED
         ],
     }
-    task.tear_down(env)
+    with tracing.span('task.tear_down'):
+      task.tear_down(env)
     return result
 
 
+class _RunProfile:
+  """Aggregates the traces and adb calls of the episodes of a suite run."""
+
+  def __init__(self):
+    self.trace_summary = tracing.TraceSummary()
+    self.adb_calls = adb_ledger.AdbLedger()
+
+  def print_summary(self) -> None:
+    if tracing.is_enabled():
+      _log_and_print('Time spent per span:\n%s', self.trace_summary.render())
+    if adb_ledger.is_enabled():
+      _log_and_print('ADB calls of the suite:\n%s', self.adb_calls.render())
+
+
+def _run_profiled_task(
+    task: TaskEvalType,
+    run_episode: Callable[[TaskEvalType], episode_runner.EpisodeResult],
+    env: interface.AsyncEnv,
+    demo_mode: bool,
+    instance_name: str,
+    checkpointer: checkpointer_lib.Checkpointer,
+    profile: _RunProfile,
+) -> dict[str, Any]:
+  """Runs a task, recording its trace and adb calls if enabled.
+
+  The episode writes its steps where the checkpointer says, as it runs.
+  """
+  with (
+      tracing.record() as trace,
+      adb_ledger.record() as adb_calls,
+      step_log.write_to(checkpointer.step_log_directory(instance_name)),
+  ):
+    episode = _run_task(task, run_episode, env, demo_mode=demo_mode)
+  if trace is not None:
+    checkpointer.save_trace(trace.to_chrome_trace(), instance_name)
+    profile.trace_summary.add(trace)
+  if adb_calls is not None:
+    _log_and_print('%s: %s', instance_name, adb_calls.summary())
+    logging.info('ADB calls of %s:\n%s', instance_name, adb_calls.render())
+    profile.adb_calls.extend(adb_calls)
+  return episode
+
+
 def _get_task_info(
     episodes: list[dict[str, Any]],
 ) -> tuple[dict[str, list[dict[str, Any]]], dict[str, list[dict[str, Any]]]]:
@@ -316,6 +376,143 @@ def _get_task_info(
   return completed, failed
 
 
+@dataclasses.dataclass(frozen=True)
+class _PendingInstance:
+  """A task instance waiting to be run by a worker.
+
+  Attributes:
+    order: Position of the instance in the suite; used to keep results in suite
+      order regardless of which worker finishes first.
+    instance_id: The index of the instance within its task template.
+    instance_name: The unique name used for checkpointing.
+    task: The task instance.
+  """
+
+  order: int
+  instance_id: int
+  instance_name: str
+  task: task_eval.TaskEval
+
+
+class _WorkStealingScheduler:
+  """Hands out task instances to a fixed pool of workers.
+
+  Every worker owns a deque of pending instances. Instances of the same task
+  template are initially assigned to the same worker, so consecutive episodes
+  on an emulator tend to reuse the same apps. A worker takes work from the front
+  of its own deque and, once that is empty, steals from the back of the longest
+  deque of another worker. This keeps all emulators busy until the very end of
+  the suite even though episode lengths vary widely.
+  """
+
+  def __init__(
+      self, templates: list[list[_PendingInstance]], num_workers: int
+  ):
+    if num_workers <= 0:
+      raise ValueError('Number of workers must be a positive integer.')
+    self._lock = threading.Lock()
+    self._deques = [collections.deque() for _ in range(num_workers)]
+    for i, instances in enumerate(templates):
+      self._deques[i % num_workers].extend(instances)
+
+  def next(self, worker_id: int) -> _PendingInstance | None:
+    """Returns the next instance for a worker or None if no work is left."""
+    with self._lock:
+      own = self._deques[worker_id]
+      if own:
+        return own.popleft()
+      victim = max(self._deques, key=len)
+      if victim:
+        return victim.pop()
+      return None
+
+
+def _is_null(value: Any) -> bool:
+  return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+@dataclasses.dataclass
+class _TemplateStats:
+  """Running statistics of the episodes of one task template."""
+
+  num_trials: int = 0
+  num_successful: float = 0.0
+  num_fail_trials: int = 0
+  total_runtime_s: float = 0.0
+
+
+class _EpisodeAggregator:
+  """Keeps running per task template results while a suite executes.
+
+  Updating the aggregator is constant time per episode, so progress can be
+  reported after every episode. The full results table, which is rebuilt from
+  all episodes by `process_episodes_fn`, is only rendered every
+  `summary_every_n_episodes` new episodes and once more at the end of the run.
+  """
+
+  def __init__(
+      self,
+      process_episodes_fn: Callable[..., Any],
+      summary_every_n_episodes: int,
+  ):
+    self._process_episodes_fn = process_episodes_fn
+    self._summary_every_n_episodes = summary_every_n_episodes
+    self._stats: dict[str, _TemplateStats] = collections.defaultdict(
+        _TemplateStats
+    )
+    self._num_new_episodes = 0
+    self._num_new_episodes_rendered = 0
+
+  def add(self, episode: dict[str, Any], is_new: bool = True) -> None:
+    """Adds an episode's metadata to the running statistics."""
+    template = episode.get(constants.EpisodeConstants.TASK_TEMPLATE)
+    if _is_null(template):
+      return
+    stats = self._stats[template]
+    is_successful = episode.get(constants.EpisodeConstants.IS_SUCCESSFUL)
+    if not _is_null(is_successful):
+      stats.num_trials += 1
+      stats.num_successful += float(is_successful)
+    run_time = episode.get(constants.EpisodeConstants.RUN_TIME)
+    if not _is_null(run_time):
+      stats.total_runtime_s += run_time
+    if not _is_null(episode.get(constants.EpisodeConstants.EXCEPTION_INFO)):
+      stats.num_fail_trials += 1
+    if not is_new:
+      return
+
+    self._num_new_episodes += 1
+    mean_success_rate = (
+        stats.num_successful / stats.num_trials if stats.num_trials else 0.0
+    )
+    _log_and_print(
+        '%s: %d trials, %.2f mean success rate, %d failed, %.1fs runtime',
+        template,
+        stats.num_trials,
+        mean_success_rate,
+        stats.num_fail_trials,
+        stats.total_runtime_s,
+    )
+
+  def maybe_render(self, episodes: list[dict[str, Any]]) -> None:
+    """Renders the full results table if the cadence is due."""
+    if (
+        self._summary_every_n_episodes > 0
+        and self._num_new_episodes % self._summary_every_n_episodes == 0
+    ):
+      self.render(episodes)
+
+  def render(self, episodes: list[dict[str, Any]]) -> None:
+    """Renders the full results table if new episodes were added since."""
+    if self._num_new_episodes != self._num_new_episodes_rendered:
+      self._process_episodes_fn(episodes, print_summary=True)
+      self._num_new_episodes_rendered = self._num_new_episodes
+
+
+def _get_instance_name(task: task_eval.TaskEval, instance_id: int) -> str:
+  return task.name + checkpointer_lib.INSTANCE_SEPARATOR + str(instance_id)
+
+
 def _run_task_suite(
     suite: Suite,
     run_episode: Callable[[task_eval.TaskEval], episode_runner.EpisodeResult],
@@ -326,6 +523,7 @@ def _run_task_suite(
     return_full_episode_data: bool = False,
     process_episodes_fn=None,
     check_episode_fn: Callable[[dict[str, Any]], bool] | None = None,
+    summary_every_n_episodes: int = _SUMMARY_EVERY_N_EPISODES,
 ) -> list[dict[str, Any]]:
   """Runs e2e system on suite.
 
@@ -341,6 +539,9 @@ def _run_task_suite(
     process_episodes_fn: The function to process episode data. Usually to
       compute metrics. Deafaults to process_episodes from this file.
     check_episode_fn: The function to check episode data.
+    summary_every_n_episodes: How often, in newly run episodes, the full
+      results table is rendered with `process_episodes_fn`. It is always
+      rendered once at the end; 0 renders it only at the end.
 
   Returns:
     Metadata for each episode, including the scripted reward.
@@ -360,6 +561,10 @@ def _run_task_suite(
   )
   if process_episodes_fn is None:
     process_episodes_fn = process_episodes
+  aggregator = _EpisodeAggregator(
+      process_episodes_fn, summary_every_n_episodes
+  )
+  profile = _RunProfile()
 
   if (completed_tasks or failed_tasks) and return_full_episode_data:
     raise ValueError(
@@ -373,17 +578,19 @@ def _run_task_suite(
     _log_and_print(msg + '\n' + '=' * len(msg))
 
     for i, instance in enumerate(instances):
-      instance_name = (
-          instance.name + checkpointer_lib.INSTANCE_SEPARATOR + str(i)
-      )
+      instance_name = _get_instance_name(instance, i)
       # Transferring from old checkpoint.
       if instance_name in completed_tasks:
         completed_episodes: list[dict[str, Any]] = completed_tasks[
             instance_name
         ]
         episodes_metadata.extend(completed_episodes)
+        for completed_episode in completed_episodes:
+          aggregator.add(completed_episode, is_new=False)
       if instance_name in failed_tasks:
         episodes_metadata.extend(failed_tasks[instance_name])
+        for failed_episode in failed_tasks[instance_name]:
+          aggregator.add(failed_episode, is_new=False)
       already_processed = (
           instance_name in completed_tasks and instance_name not in failed_tasks
       )
@@ -391,12 +598,21 @@ def _run_task_suite(
         _log_and_print('Skipping already processed task %s', instance_name)
         continue
 
-      episode = _run_task(instance, run_episode, env, demo_mode=demo_mode)
+      episode = _run_profiled_task(
+          instance,
+          run_episode,
+          env,
+          demo_mode,
+          instance_name,
+          checkpointer,
+          profile,
+      )
       if (
           episode.get(constants.EpisodeConstants.EXCEPTION_INFO) is None
           and check_episode_fn is not None
       ):
         if not check_episode_fn(episode):
+          checkpointer.discard_unsaved_steps(instance_name)
           continue
       episode[constants.EpisodeConstants.AGENT_NAME] = agent_name
       episode[constants.EpisodeConstants.INSTANCE_ID] = i
@@ -406,7 +622,8 @@ def _run_task_suite(
         full_episode_data.append(episode)
 
       episodes_metadata.append({k: episode[k] for k in metadata_fields})
-      process_episodes_fn(episodes_metadata, print_summary=True)
+      aggregator.add(episodes_metadata[-1])
+      aggregator.maybe_render(episodes_metadata)
 
       if episode[constants.EpisodeConstants.EXCEPTION_INFO] is not None:
         # Don't include episode in tally if execution/eval logic errored out.
@@ -417,9 +634,174 @@ def _run_task_suite(
         _update_scoreboard(correct, total, env.controller)
     print()
 
+  aggregator.render(episodes_metadata)
+  profile.print_summary()
   return full_episode_data if return_full_episode_data else episodes_metadata
 
 
+def _run_task_suite_parallel(
+    suite: Suite,
+    run_episode_fns: Sequence[
+        Callable[[task_eval.TaskEval], episode_runner.EpisodeResult]
+    ],
+    envs: Sequence[interface.AsyncEnv],
+    checkpointer: checkpointer_lib.Checkpointer = checkpointer_lib.NullCheckpointer(),
+    demo_mode: bool = False,
+    agent_name: str = '',
+    return_full_episode_data: bool = False,
+    process_episodes_fn=None,
+    check_episode_fn: Callable[[dict[str, Any]], bool] | None = None,
+    summary_every_n_episodes: int = _SUMMARY_EVERY_N_EPISODES,
+) -> list[dict[str, Any]]:
+  """Runs e2e system on suite using a pool of environments.
+
+  Each environment is driven by its own worker thread with its own e2e system.
+  Workers pull task instances from a shared work-stealing scheduler, so the
+  suite finishes as soon as the slowest single episode allows. Resuming,
+  checkpointing and the summary printed via `process_episodes_fn` behave the
+  same as in `_run_task_suite`; results are returned in suite order.
+
+  Args:
+    suite: The suite to run it on.
+    run_episode_fns: The e2e systems, one per environment.
+    envs: The environments the e2e systems run on.
+    checkpointer: See docstring from `run`.
+    demo_mode: Whether to display the scoreboard.
+    agent_name: The name of the agent.
+    return_full_episode_data: Whether to return full episode data instead of
+      just metadata.
+    process_episodes_fn: The function to process episode data. Usually to
+      compute metrics. Deafaults to process_episodes from this file.
+    check_episode_fn: The function to check episode data.
+    summary_every_n_episodes: How often, in newly run episodes, the full
+      results table is rendered with `process_episodes_fn`. It is always
+      rendered once at the end; 0 renders it only at the end.
+
+  Returns:
+    Metadata for each episode, including the scripted reward.
+
+  Raises:
+    ValueError: If the number of e2e systems and environments differ.
+  """
+  if len(run_episode_fns) != len(envs):
+    raise ValueError(
+        f'Got {len(run_episode_fns)} e2e systems for {len(envs)} environments.'
+    )
+  metadata_fields = [
+      constants.EpisodeConstants.GOAL,
+      constants.EpisodeConstants.TASK_TEMPLATE,
+      constants.EpisodeConstants.INSTANCE_ID,
+      constants.EpisodeConstants.IS_SUCCESSFUL,
+      constants.EpisodeConstants.EPISODE_LENGTH,
+      constants.EpisodeConstants.RUN_TIME,
+      constants.EpisodeConstants.EXCEPTION_INFO,
+      constants.EpisodeConstants.AUX_DATA,
+  ]
+  completed_tasks, failed_tasks = _get_task_info(
+      checkpointer.load(fields=metadata_fields)
+  )
+  if process_episodes_fn is None:
+    process_episodes_fn = process_episodes
+  aggregator = _EpisodeAggregator(
+      process_episodes_fn, summary_every_n_episodes
+  )
+  profile = _RunProfile()
+
+  if (completed_tasks or failed_tasks) and return_full_episode_data:
+    raise ValueError(
+        'Cannot return full episode data when resuming from a checkpoint.'
+    )
+
+  # Results are keyed by the suite position of their instance, so that the
+  # metadata handed to `process_episodes_fn` keeps the serial ordering.
+  episodes_metadata: dict[int, list[dict[str, Any]]] = {}
+  full_episode_data: dict[int, dict[str, Any]] = {}
+  templates = []
+  order = 0
+  for instances in suite.values():
+    pending = []
+    for i, instance in enumerate(instances):
+      instance_name = _get_instance_name(instance, i)
+      resumed = completed_tasks.get(instance_name, []) + failed_tasks.get(
+          instance_name, []
+      )
+      if resumed:
+        episodes_metadata[order] = list(resumed)
+        for resumed_episode in resumed:
+          aggregator.add(resumed_episode, is_new=False)
+      if instance_name in completed_tasks and instance_name not in failed_tasks:
+        _log_and_print('Skipping already processed task %s', instance_name)
+      else:
+        pending.append(_PendingInstance(order, i, instance_name, instance))
+      order += 1
+    templates.append(pending)
+
+  scheduler = _WorkStealingScheduler(templates, num_workers=len(envs))
+  lock = threading.Lock()
+  tally = {'correct': 0, 'total': 0}
+
+  def ordered_metadata() -> list[dict[str, Any]]:
+    return [
+        episode
+        for key in sorted(episodes_metadata)
+        for episode in episodes_metadata[key]
+    ]
+
+  def work(worker_id: int) -> None:
+    env = envs[worker_id]
+    while (item := scheduler.next(worker_id)) is not None:
+      _log_and_print(
+          '[worker %d] Running task: %s', worker_id, item.instance_name
+      )
+      episode = _run_profiled_task(
+          item.task,
+          run_episode_fns[worker_id],
+          env,
+          demo_mode,
+          item.instance_name,
+          checkpointer,
+          profile,
+      )
+      if (
+          episode.get(constants.EpisodeConstants.EXCEPTION_INFO) is None
+          and check_episode_fn is not None
+      ):
+        if not check_episode_fn(episode):
+          checkpointer.discard_unsaved_steps(item.instance_name)
+          continue
+      episode[constants.EpisodeConstants.AGENT_NAME] = agent_name
+      episode[constants.EpisodeConstants.INSTANCE_ID] = item.instance_id
+      checkpointer.save_episodes([episode], item.instance_name)
+
+      with lock:
+        if return_full_episode_data:
+          full_episode_data[item.order] = episode
+        episode_metadata = {k: episode[k] for k in metadata_fields}
+        episodes_metadata.setdefault(item.order, []).append(episode_metadata)
+        aggregator.add(episode_metadata)
+        aggregator.maybe_render(ordered_metadata())
+
+        if episode[constants.EpisodeConstants.EXCEPTION_INFO] is not None:
+          # Don't include episode in tally if execution/eval logic errored out.
+          continue
+        tally['correct'] += episode[constants.EpisodeConstants.IS_SUCCESSFUL]
+        tally['total'] += 1
+        if demo_mode:
+          _update_scoreboard(tally['correct'], tally['total'], env.controller)
+
+  with futures.ThreadPoolExecutor(max_workers=len(envs)) as executor:
+    workers = [executor.submit(work, i) for i in range(len(envs))]
+    for worker in workers:
+      # Surfaces exceptions raised outside of the per-task error handling.
+      worker.result()
+
+  aggregator.render(ordered_metadata())
+  profile.print_summary()
+  if return_full_episode_data:
+    return [full_episode_data[key] for key in sorted(full_episode_data)]
+  return ordered_metadata()
+
+
 def run(
     suite: Suite,
     agent: base_agent.EnvironmentInteractingAgent,
@@ -428,6 +810,7 @@ def run(
     return_full_episode_data: bool = False,
     process_episodes_fn=None,
     check_episode_fn: Callable[[dict[str, Any]], bool] | None = None,
+    summary_every_n_episodes: int = _SUMMARY_EVERY_N_EPISODES,
 ) -> list[dict[str, Any]]:
   """Create suite and runs eval suite.
 
@@ -445,11 +828,99 @@ def run(
     process_episodes_fn: The function to process episode data. Usually to
       compute metrics. Deafaults to process_episodes from this file.
     check_episode_fn: The function to check episode data.
+    summary_every_n_episodes: How often, in newly run episodes, the full
+      results table is rendered with `process_episodes_fn`. It is always
+      rendered once at the end; 0 renders it only at the end.
 
   Returns:
     Step-by-step data from each episode.
   """
 
+  if demo_mode:
+    _reset_scoreboard(agent)
+
+  results = _run_task_suite(
+      suite,
+      _make_run_episode(agent, demo_mode),
+      agent.env,
+      checkpointer=checkpointer,
+      demo_mode=demo_mode,
+      agent_name=agent.name,
+      return_full_episode_data=return_full_episode_data,
+      process_episodes_fn=process_episodes_fn,
+      check_episode_fn=check_episode_fn,
+      summary_every_n_episodes=summary_every_n_episodes,
+  )
+
+  return results
+
+
+def run_parallel(
+    suite: Suite,
+    agents: Sequence[base_agent.EnvironmentInteractingAgent],
+    checkpointer: checkpointer_lib.Checkpointer = checkpointer_lib.NullCheckpointer(),
+    demo_mode: bool = False,
+    return_full_episode_data: bool = False,
+    process_episodes_fn=None,
+    check_episode_fn: Callable[[dict[str, Any]], bool] | None = None,
+    summary_every_n_episodes: int = _SUMMARY_EVERY_N_EPISODES,
+) -> list[dict[str, Any]]:
+  """Runs eval suite on a pool of environments.
+
+  Same as `run`, but task instances are spread over several agents, each
+  interacting with its own environment; e.g. one per emulator created by
+  `env_launcher.load_and_setup_env` on distinct console and gRPC ports.
+
+  Args:
+    suite: The suite of tasks to run on.
+    agents: Agents that interact with the environments. Each agent must have
+      its own environment; they must not be shared between agents.
+    checkpointer: See docstring from `run`.
+    demo_mode: See docstring from `run`.
+    return_full_episode_data: Whether to return full episode data instead of
+      just metadata.
+    process_episodes_fn: The function to process episode data. Usually to
+      compute metrics. Deafaults to process_episodes from this file.
+    check_episode_fn: The function to check episode data.
+    summary_every_n_episodes: How often, in newly run episodes, the full
+      results table is rendered with `process_episodes_fn`. It is always
+      rendered once at the end; 0 renders it only at the end.
+
+  Returns:
+    Step-by-step data from each episode, in suite order.
+
+  Raises:
+    ValueError: If no agents are provided or agents share an environment.
+  """
+  if not agents:
+    raise ValueError('At least one agent must be provided.')
+  envs = [agent.env for agent in agents]
+  if len({id(env) for env in envs}) != len(envs):
+    raise ValueError('Each agent must interact with its own environment.')
+
+  if demo_mode:
+    for agent in agents:
+      _reset_scoreboard(agent)
+
+  return _run_task_suite_parallel(
+      suite,
+      [_make_run_episode(agent, demo_mode) for agent in agents],
+      envs,
+      checkpointer=checkpointer,
+      demo_mode=demo_mode,
+      agent_name=agents[0].name,
+      return_full_episode_data=return_full_episode_data,
+      process_episodes_fn=process_episodes_fn,
+      check_episode_fn=check_episode_fn,
+      summary_every_n_episodes=summary_every_n_episodes,
+  )
+
+
+def _make_run_episode(
+    agent: base_agent.EnvironmentInteractingAgent, demo_mode: bool
+) -> Callable[[task_eval.TaskEval], episode_runner.EpisodeResult]:
+  """Returns the e2e system that runs `agent` on a task."""
+
   def run_episode(task: task_eval.TaskEval) -> episode_runner.EpisodeResult:
     if demo_mode:
       _display_goal(agent.env, task)
@@ -465,27 +936,16 @@ def run(
         ),
     )
 
-  if demo_mode:
-    adb_utils.send_android_intent(
-        'broadcast',
-        'com.example.ACTION_UPDATE_SCOREBOARD',
-        agent.env.controller,
-        extras={'player_name': agent.name, 'scoreboard_value': '00/00'},
-    )
+  return run_episode
 
-  results = _run_task_suite(
-      suite,
-      run_episode,
-      agent.env,
-      checkpointer=checkpointer,
-      demo_mode=demo_mode,
-      agent_name=agent.name,
-      return_full_episode_data=return_full_episode_data,
-      process_episodes_fn=process_episodes_fn,
-      check_episode_fn=check_episode_fn,
-  )
 
-  return results
+def _reset_scoreboard(agent: base_agent.EnvironmentInteractingAgent) -> None:
+  adb_utils.send_android_intent(
+      'broadcast',
+      'com.example.ACTION_UPDATE_SCOREBOARD',
+      agent.env.controller,
+      extras={'player_name': agent.name, 'scoreboard_value': '00/00'},
+  )
 
 
 def _allocate_step_budget(task_complexity: float) -> int:
@@ -588,6 +1048,12 @@ def _update_scoreboard(
 
 def _extract_task_metadata() -> pd.DataFrame:
   """Extracts metadata from task_metadata.json."""
+  return _load_task_metadata().copy()
+
+
+@functools.cache
+def _load_task_metadata() -> pd.DataFrame:
+  """Reads task_metadata.json once per process."""
   name = 'task_metadata.json'
   filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
   df = pd.read_json(filepath)
@@ -15,6 +15,9 @@
 """Tests for suite utils."""
 
 import copy
+import json
+import os
+import tempfile
 import time
 from typing import Any
 from unittest import mock
@@ -29,8 +32,10 @@ from android_world.agents import base_agent
 from android_world.env import adb_utils
 from android_world.env import interface
 from android_world.utils import test_utils
+from android_world.utils import tracing
 import dm_env
 import numpy as np
+import pandas as pd
 
 
 class TestCreateSuite(parameterized.TestCase):
@@ -590,6 +595,109 @@ class RunTaskSuiteTest(absltest.TestCase):
         any_order=False,
     )
 
+  @mock.patch.object(time, 'sleep', autospec=True)
+  @mock.patch.object(interface, 'AsyncAndroidEnv')
+  @mock.patch.object(adb_utils, 'send_android_intent')
+  def test_summary_rendered_on_cadence_and_at_end(
+      self,
+      unused_mock_send_android_intent,
+      mock_env,
+      unused_mock_sleep,
+  ):
+    mock_env.get_state.return_value = (
+        dm_env.TimeStep(
+            observation={'pixels': np.zeros((3, 3, 3))},
+            reward=0,
+            discount=0,
+            step_type=dm_env.StepType.LAST,
+        ),
+        [],
+    )
+    mock_run_e2e = mock.MagicMock()
+    mock_run_e2e.return_value = episode_runner.EpisodeResult(
+        True, {'step_number': [0]}
+    )
+    suite = suite_utils.Suite(
+        FakeCurrentStateEval=[
+            test_utils.FakeCurrentStateEval(
+                test_utils.FakeCurrentStateEval.generate_random_params()
+            )
+            for _ in range(3)
+        ]
+    )
+    suite.suite_family = 'android'
+    rendered = []
+
+    def process_episodes_fn(episodes, print_summary):
+      self.assertTrue(print_summary)
+      rendered.append(len(episodes))
+
+    result = suite_utils._run_task_suite(
+        suite,
+        mock_run_e2e,
+        mock_env,
+        process_episodes_fn=process_episodes_fn,
+        summary_every_n_episodes=2,
+    )
+
+    self.assertLen(result, 3)
+    self.assertEqual(rendered, [2, 3])
+
+  @mock.patch.object(interface, 'AsyncAndroidEnv')
+  def test_traces_saved_per_episode_when_enabled(self, mock_env):
+    tracing.enable()
+    self.addCleanup(tracing.enable, False)
+    checkpoint_dir = self.enter_context(tempfile.TemporaryDirectory())
+
+    def run_e2e(unused_task):
+      with tracing.span('llm'):
+        pass
+      return episode_runner.EpisodeResult(True, {'step_number': [0]})
+
+    suite = suite_utils.Suite(
+        FakeCurrentStateEval=[
+            test_utils.FakeCurrentStateEval(
+                test_utils.FakeCurrentStateEval.generate_random_params()
+            )
+        ]
+    )
+    suite.suite_family = 'android'
+
+    suite_utils._run_task_suite(
+        suite,
+        run_e2e,
+        mock_env,
+        checkpointer=checkpointer.IncrementalCheckpointer(checkpoint_dir),
+        process_episodes_fn=lambda *args, **kwargs: None,
+    )
+
+    with open(
+        os.path.join(checkpoint_dir, 'FakeCurrentStateEval_0.trace.json')
+    ) as f:
+      trace = json.load(f)
+    self.assertContainsSubset(
+        {'task.initialize_task', 'episode', 'llm', 'task.is_successful'},
+        {event['name'] for event in trace['traceEvents']},
+    )
+
+  def test_task_metadata_is_read_once(self):
+    suite_utils._load_task_metadata.cache_clear()
+    episodes = [{
+        'task_template': 'ContactsAddContact',
+        'is_successful': 1.0,
+        'episode_length': 3,
+        'run_time': 1.0,
+    }]
+
+    with mock.patch.object(
+        pd, 'read_json', wraps=pd.read_json
+    ) as mock_read_json:
+      first = suite_utils.process_episodes(episodes)
+      second = suite_utils.process_episodes(episodes)
+
+    mock_read_json.assert_called_once()
+    pd.testing.assert_frame_equal(first, second)
+
   @mock.patch.object(time, 'sleep', autospec=True)
   @mock.patch.object(interface, 'AsyncAndroidEnv')
   @mock.patch.object(adb_utils, 'send_android_intent')
@@ -712,5 +820,134 @@ class RunTaskSuiteTest(absltest.TestCase):
     self.assertLen(result2, 1)
 
 
+class WorkStealingSchedulerTest(absltest.TestCase):
+
+  def _pending(self, order: int) -> suite_utils._PendingInstance:
+    return suite_utils._PendingInstance(
+        order, 0, f'Task_{order}', mock.MagicMock()
+    )
+
+  def test_templates_assigned_round_robin(self):
+    scheduler = suite_utils._WorkStealingScheduler(
+        [[self._pending(0), self._pending(1)], [self._pending(2)]],
+        num_workers=2,
+    )
+
+    self.assertEqual(scheduler.next(0).order, 0)
+    self.assertEqual(scheduler.next(1).order, 2)
+
+  def test_idle_worker_steals_from_back(self):
+    scheduler = suite_utils._WorkStealingScheduler(
+        [[self._pending(0), self._pending(1), self._pending(2)]],
+        num_workers=2,
+    )
+
+    self.assertEqual(scheduler.next(1).order, 2)
+    self.assertEqual(scheduler.next(0).order, 0)
+    self.assertEqual(scheduler.next(1).order, 1)
+    self.assertIsNone(scheduler.next(0))
+    self.assertIsNone(scheduler.next(1))
+
+  def test_invalid_num_workers(self):
+    with self.assertRaises(ValueError):
+      suite_utils._WorkStealingScheduler([], num_workers=0)
+
+
+class RunTaskSuiteParallelTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.suite = suite_utils.Suite(
+        **{
+            'FakeCurrentStateEval': [
+                test_utils.FakeCurrentStateEval(
+                    test_utils.FakeCurrentStateEval.generate_random_params()
+                ),
+                test_utils.FakeCurrentStateEval(
+                    test_utils.FakeCurrentStateEval.generate_random_params()
+                ),
+            ],
+            'FakeAdbEval': [
+                test_utils.FakeAdbEval(
+                    test_utils.FakeAdbEval.generate_random_params()
+                )
+            ],
+        },
+    )
+    self.suite.suite_family = 'android'
+    self.envs = [mock.MagicMock(), mock.MagicMock()]
+
+  def _run_e2e(self) -> mock.MagicMock:
+    run_e2e = mock.MagicMock()
+    run_e2e.return_value = episode_runner.EpisodeResult(
+        True, {'step_number': [0]}
+    )
+    return run_e2e
+
+  @mock.patch.object(checkpointer, 'Checkpointer')
+  def test_runs_every_instance_once(self, mock_checkpointer):
+    mock_checkpointer.load.return_value = []
+    run_e2e_fns = [self._run_e2e(), self._run_e2e()]
+
+    result = suite_utils._run_task_suite_parallel(
+        self.suite, run_e2e_fns, self.envs, mock_checkpointer
+    )
+
+    self.assertEqual(sum(fn.call_count for fn in run_e2e_fns), 3)
+    self.assertEqual(
+        [(r['task_template'], r['instance_id']) for r in result],
+        [
+            ('FakeCurrentStateEval', 0),
+            ('FakeCurrentStateEval', 1),
+            ('FakeAdbEval', 0),
+        ],
+    )
+    mock_checkpointer.save_episodes.assert_has_calls(
+        [
+            mock.call(mock.ANY, 'FakeCurrentStateEval_0'),
+            mock.call(mock.ANY, 'FakeCurrentStateEval_1'),
+            mock.call(mock.ANY, 'FakeAdbEval_0'),
+        ],
+        any_order=True,
+    )
+
+  @mock.patch.object(checkpointer, 'Checkpointer')
+  def test_resume_from_middle(self, mock_checkpointer):
+    mock_checkpointer.load.return_value = [
+        {
+            'instance_id': 0,
+            'is_successful': 0.0,
+            'goal': 'Current state eval',
+            'task_template': 'FakeCurrentStateEval',
+            'episode_length': 1,
+            'run_time': 0,
+        },
+    ]
+    run_e2e_fns = [self._run_e2e(), self._run_e2e()]
+
+    result = suite_utils._run_task_suite_parallel(
+        self.suite, run_e2e_fns, self.envs, mock_checkpointer
+    )
+
+    self.assertEqual(sum(fn.call_count for fn in run_e2e_fns), 2)
+    self.assertLen(result, 3)
+    self.assertEqual(result[0]['is_successful'], 0)
+    self.assertEqual(result[1]['is_successful'], 1)
+    self.assertEqual(result[2]['goal'], 'ADB eval')
+
+  def test_mismatched_envs_raises_value_error(self):
+    with self.assertRaises(ValueError):
+      suite_utils._run_task_suite_parallel(
+          self.suite, [self._run_e2e()], self.envs
+      )
+
+  def test_run_parallel_requires_distinct_envs(self):
+    env = test_utils.FakeAsyncEnv()
+    agents = [mock.MagicMock(env=env), mock.MagicMock(env=env)]
+
+    with self.assertRaises(ValueError):
+      suite_utils.run_parallel(self.suite, agents)
+
+
 if __name__ == '__main__':
   absltest.main()
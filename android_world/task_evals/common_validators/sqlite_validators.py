@@ -15,8 +15,9 @@
 """Base class for task evaluations interacting with SQLite-based Android apps."""
 
 import abc
+import contextlib
 import dataclasses
-from typing import Any
+from typing import Any, Iterator
 from typing import Optional
 from typing import Type
 from absl import logging
@@ -206,6 +207,9 @@ class SQLiteApp(task_eval.TaskEval, abc.ABC):
   table_name: str
   row_type: Type[sqlite_schema_utils.SQLiteRow]
 
+  # The session that batches database edits while the task is initialized.
+  _db_session: Optional[sqlite_utils.RemoteDbSession] = None
+
   def list_rows(
       self,
       env: interface.AsyncEnv,
@@ -221,6 +225,8 @@ class SQLiteApp(task_eval.TaskEval, abc.ABC):
         A list of row objects, each representing a row from the specified table
         in the database.
     """
+    if self._db_session is not None:
+      return self._db_session.query_rows(self.table_name, self.row_type)
     return sqlite_utils.get_rows_from_remote_device(
         self.table_name, self.db_path, self.row_type, env, timeout_sec
     )
@@ -231,6 +237,9 @@ class SQLiteApp(task_eval.TaskEval, abc.ABC):
       env: interface.AsyncEnv,
       timeout_sec: Optional[float] = None,
   ) -> None:
+    if self._db_session is not None:
+      self._db_session.insert_rows(rows, self.table_name, self.db_key)
+      return
     sqlite_utils.insert_rows_to_remote_db(
         rows,
         self.db_key,
@@ -243,6 +252,14 @@ class SQLiteApp(task_eval.TaskEval, abc.ABC):
 
   def _clear_db(self, env: interface.AsyncEnv) -> None:
     """Clears the app's SQLite database."""
+    if self._db_session is not None:
+      if not self._db_session.table_exists(self.table_name):
+        raise RuntimeError(
+            f"The SQLite database has no {self.table_name} table; it may not"
+            " have been created."
+        )
+      self._db_session.delete_all_rows(self.table_name)
+      return
     sqlite_utils.delete_all_rows_from_table(
         self.table_name, self.db_path, env, self.app_name_with_db
     )
@@ -254,13 +271,34 @@ class SQLiteApp(task_eval.TaskEval, abc.ABC):
           " not created."
       ) from e
 
+  @contextlib.contextmanager
+  def _batched_db_edits(self, env: interface.AsyncEnv) -> Iterator[None]:
+    """Routes database reads and writes through a single pull and push."""
+    with sqlite_utils.RemoteDbSession(
+        self.db_path, env, self.app_name_with_db
+    ) as db:
+      self._db_session = db
+      try:
+        yield
+      finally:
+        self._db_session = None
+
+  def _initialize_rows(self, env: interface.AsyncEnv) -> None:
+    """Sets up the task's rows, in the same session as the noise rows."""
+
   def initialize_task(self, env: interface.AsyncEnv) -> None:
     """Initializes the task environment."""
-    self._clear_db(env)  # In case the previous run crashed.
     super().initialize_task(env)
-    self._clear_db(env)
-    if NOISE_ROW_OBJECTS in self.params:
-      self.add_rows(self.params[NOISE_ROW_OBJECTS], env)
+    # Opens the app if it never created its database.
+    sqlite_utils.ensure_table_exists(
+        self.table_name, self.db_path, env, self.app_name_with_db
+    )
+    with self._batched_db_edits(env):
+      # Also removes the rows left by a previous run that crashed.
+      self._clear_db(env)
+      if NOISE_ROW_OBJECTS in self.params:
+        self.add_rows(self.params[NOISE_ROW_OBJECTS], env)
+      self._initialize_rows(env)
 
   def tear_down(self, env: interface.AsyncEnv):
     """Cleans up after task completion."""
@@ -277,9 +315,9 @@ class AddMultipleRows(SQLiteApp, abc.ABC):
     super().__init__(params)
     self.before = []
 
-  def initialize_task(self, env: interface.AsyncEnv) -> None:
-    """Initial setup for the task, if necessary."""
-    super().initialize_task(env)
+  def _initialize_rows(self, env: interface.AsyncEnv) -> None:
+    """Records the rows present before the task starts."""
+    super()._initialize_rows(env)
     self.before = self.list_rows(env)
 
   @abc.abstractmethod
@@ -345,9 +383,9 @@ class DeleteMultipleRows(SQLiteApp, abc.ABC):
           f" expected {self.n_rows + self.n_rows_noise}."
       )
 
-  def initialize_task(self, env: interface.AsyncEnv) -> None:
-    """Initial setup for the task, if necessary."""
-    super().initialize_task(env)
+  def _initialize_rows(self, env: interface.AsyncEnv) -> None:
+    """Adds the rows to delete and records the initial state."""
+    super()._initialize_rows(env)
     n_rows = 0
     if ROW_OBJECTS in self.params:
       self.add_rows(self.params[ROW_OBJECTS], env)
@@ -13,12 +13,16 @@
 # limitations under the License.
 
 import sqlite3
+from unittest import mock
 from absl.testing import absltest
+from android_world.env import adb_utils
+from android_world.task_evals import task_eval
 from android_world.task_evals.common_validators import sqlite_validators
 from android_world.task_evals.utils import sqlite_schema_utils
 from android_world.task_evals.utils import sqlite_test_utils
 from android_world.task_evals.utils import sqlite_utils
 from android_world.utils import datetime_utils
+from android_world.utils import file_test_utils
 
 
 def remove_event_by_event_id(db_path: str, event_id: int):
@@ -478,5 +482,81 @@ class TestVerifyPlaylist(absltest.TestCase):
     self.assertFalse(result)
 
 
+class _EventsApp(sqlite_validators.SQLiteApp):
+  """Adds the task's events to a calendar database."""
+
+  app_name_with_db = 'calendar'
+  db_key = 'id'
+  table_name = 'events'
+  row_type = sqlite_schema_utils.CalendarEvent
+  complexity = 1
+  app_names = ('calendar',)
+  schema = {}
+
+  def __init__(self, params, db_path: str):
+    super().__init__(params)
+    self.db_path = db_path
+
+  @classmethod
+  def generate_random_params(cls):
+    return {}
+
+  def _initialize_rows(self, env) -> None:
+    super()._initialize_rows(env)
+    self.add_rows(self.params[sqlite_validators.ROW_OBJECTS], env)
+
+
+class TestSQLiteAppInitializeTask(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.db_path = sqlite_test_utils.setup_test_db()
+    self.env = mock.MagicMock()
+    self.env.controller.pull_file.side_effect = (
+        lambda path, timeout_sec=None: (
+            file_test_utils.mock_tmp_sqlite_db_from_device(path, None)
+        )
+    )
+    self.env.controller.push_file.side_effect = (
+        lambda local_path, remote_path, timeout_sec=None: (
+            file_test_utils.mock_replace_sqlite_db_on_device(
+                local_path, remote_path, None
+            )
+        )
+    )
+    self.enter_context(mock.patch.object(task_eval.TaskEval, 'initialize_task'))
+    self.enter_context(mock.patch.object(adb_utils, 'close_app'))
+    self.mock_ensure_table_exists = self.enter_context(
+        mock.patch.object(sqlite_utils, 'ensure_table_exists')
+    )
+
+  def test_clears_and_adds_rows_in_one_pull_and_push(self):
+    noise, row = sqlite_test_utils.get_db_rows()[:2]
+    task = _EventsApp(
+        {
+            sqlite_validators.NOISE_ROW_OBJECTS: [noise],
+            sqlite_validators.ROW_OBJECTS: [row],
+        },
+        self.db_path,
+    )
+
+    task.initialize_task(self.env)
+
+    self.mock_ensure_table_exists.assert_called_once_with(
+        'events', self.db_path, self.env, 'calendar'
+    )
+    self.env.controller.pull_file.assert_called_once()
+    self.env.controller.push_file.assert_called_once()
+    titles = [
+        event.title
+        for event in sqlite_utils.execute_query(
+            'SELECT * FROM events;',
+            self.db_path,
+            sqlite_schema_utils.CalendarEvent,
+        )
+    ]
+    self.assertEqual(titles, [noise.title, row.title])
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -146,13 +146,12 @@ def setup_task_state(
       events.
     env: The android environment instance.
   """
-  utils.clear_calendar_db(env)
   events = []
   for event in relevant_state.events:
     events.append(create_event_from_proto(event))
   events += [generate_random_event(exclusion_conditions) for _ in range(75)]
   random.shuffle(events)
-  utils.add_events(events, env)
+  utils.replace_events(events, env)
 
 
 def generate_random_event(
@@ -19,13 +19,11 @@ the proto,
 we dynamically create a new task with the name of the task in the class name.
 """
 
-import os
 import random
 from typing import Any, Generic, Type, TypeVar
 from android_world.task_evals.information_retrieval import information_retrieval
+from android_world.task_evals.information_retrieval import task_proto_cache
 from android_world.task_evals.information_retrieval.proto import task_pb2
-from android_world.utils import file_utils
-from google.protobuf import text_format
 
 TaskType = TypeVar('TaskType', bound=information_retrieval.InformationRetrieval)
 
@@ -49,15 +47,7 @@ class InformationRetrievalRegistry(Generic[TaskType]):
     return self._task_registry
 
   def _read_tasks(self) -> task_pb2.Tasks:
-    proto = task_pb2.Tasks()
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    local_path = file_utils.convert_to_posix_path(
-        script_dir, 'proto', 'tasks.textproto'
-    )
-    with open(local_path, 'r') as f:
-      textproto_content = f.read()
-    text_format.Merge(textproto_content, proto)
-    return proto
+    return task_proto_cache.load_tasks()
 
   def __init__(
       self,
@@ -14,17 +14,14 @@
 
 """Utils for Joplin app."""
 
-import os
 import random
 
-from android_world.env import adb_utils
 from android_world.env import interface
 from android_world.task_evals.information_retrieval import proto_utils
 from android_world.task_evals.information_retrieval.proto import state_pb2
 from android_world.task_evals.information_retrieval.proto import task_pb2
 from android_world.task_evals.utils import sqlite_schema_utils
 from android_world.task_evals.utils import sqlite_utils
-from android_world.utils import file_utils
 
 _NOTES_TABLE = "notes"
 _NOTES_NORMALIZED_TABLE = "notes_normalized"
@@ -42,57 +39,53 @@ def setup_task_state(
 ) -> None:
   """Sets up the  state for the Joplin app.
 
+  The database is pulled once, and all folders and notes are written to it
+  before it is pushed back.
+
   Args:
     relevant_state: The state to set up.
     exclusion_conditions: The exclusion conditions to use when generating random
       notes.
     env: The Android environment interface for database interaction.
   """
-  clear_dbs(env)
-  notes = []
+  sqlite_utils.ensure_table_exists(_NOTES_TABLE, _DB_PATH, env, _APP_NAME)
+  with sqlite_utils.RemoteDbSession(_DB_PATH, env, _APP_NAME) as db:
+    _clear_tables(db)
+    notes = []
 
-  # Keep track of already created folders.
-  folder_mapping = {}
-  notes += _generate_random_notes(
-      100,
-      exclusion_conditions,
-      [note.folder for note in relevant_state.notes],
-      folder_mapping,
-      env,
-  )
-  for note in relevant_state.notes:
-    notes.append(_create_note_from_proto(note, folder_mapping, env))
-  random.shuffle(notes)
-  add_notes(notes, env)
+    # Keep track of already created folders.
+    folder_mapping = {}
+    notes += _generate_random_notes(
+        100,
+        exclusion_conditions,
+        [note.folder for note in relevant_state.notes],
+        folder_mapping,
+        db,
+    )
+    for note in relevant_state.notes:
+      notes.append(_create_note_from_proto(note, folder_mapping, db))
+    random.shuffle(notes)
+    _add_notes(notes, db)
 
 
 def clear_dbs(env: interface.AsyncEnv) -> None:
   """Clears Joplin databases."""
-  sqlite_utils.delete_all_rows_from_table(
-      _FOLDER_TABLE, _DB_PATH, env, _APP_NAME
-  )
-  sqlite_utils.delete_all_rows_from_table(
-      _NOTES_TABLE, _DB_PATH, env, _APP_NAME
-  )
-  sqlite_utils.delete_all_rows_from_table(
-      _NOTES_NORMALIZED_TABLE, _DB_PATH, env, _APP_NAME
-  )
-  adb_utils.close_app(_APP_NAME, env.controller)  # Register changes.
+  sqlite_utils.ensure_table_exists(_NOTES_TABLE, _DB_PATH, env, _APP_NAME)
+  with sqlite_utils.RemoteDbSession(_DB_PATH, env, _APP_NAME) as db:
+    _clear_tables(db)
+
+
+def _clear_tables(db: sqlite_utils.RemoteDbSession) -> None:
+  db.delete_all_rows(_FOLDER_TABLE)
+  db.delete_all_rows(_NOTES_TABLE)
+  db.delete_all_rows(_NOTES_NORMALIZED_TABLE)
 
 
 def _get_folder_to_id(
-    env: interface.AsyncEnv,
+    db: sqlite_utils.RemoteDbSession,
 ) -> dict[str, str]:
   """Gets a mapping from folder title to ID as represented in Folder table."""
-  with env.controller.pull_file(_DB_PATH) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(_DB_PATH)[1]
-    )
-    folder_info = sqlite_utils.execute_query(
-        f"select * from {_FOLDER_TABLE};",
-        local_db_path,
-        sqlite_schema_utils.JoplinFolder,
-    )
+  folder_info = db.query_rows(_FOLDER_TABLE, sqlite_schema_utils.JoplinFolder)
 
   result = {}
   for row in folder_info:
@@ -102,23 +95,15 @@ def _get_folder_to_id(
 
 def _add_folders(
     rows: list[sqlite_schema_utils.JoplinFolder],
-    env: interface.AsyncEnv,
+    db: sqlite_utils.RemoteDbSession,
 ) -> None:
-  """Inserts multiple folder rows into the remote Joplin database.
+  """Inserts multiple folder rows into the Joplin database.
 
   Args:
       rows: A list of JoplinFolder instances to be inserted.
-      env: The Android environment interface for database interaction.
+      db: The session on the Joplin database.
   """
-
-  sqlite_utils.insert_rows_to_remote_db(
-      rows,
-      _EXCLUDE_FIELD,
-      _FOLDER_TABLE,
-      _DB_PATH,
-      _APP_NAME,
-      env,
-  )
+  db.insert_rows(rows, _FOLDER_TABLE, _EXCLUDE_FIELD)
 
 
 def create_note(
@@ -130,15 +115,31 @@ def create_note(
     is_todo: int = False,
     todo_completed: bool = False,
 ) -> sqlite_schema_utils.JoplinNote:
-  """Generates random note."""
+  """Generates random note, creating its folder on the device if needed."""
+  with sqlite_utils.RemoteDbSession(_DB_PATH, env, _APP_NAME) as db:
+    return _create_note(
+        folder, title, body, folder_mapping, db, is_todo, todo_completed
+    )
+
+
+def _create_note(
+    folder: str,
+    title: str,
+    body: str,
+    folder_mapping: dict[str, str],
+    db: sqlite_utils.RemoteDbSession,
+    is_todo: int = False,
+    todo_completed: bool = False,
+) -> sqlite_schema_utils.JoplinNote:
+  """Generates random note, creating its folder in the session if needed."""
   if not folder_mapping:
-    folder_mapping.update(_get_folder_to_id(env))
+    folder_mapping.update(_get_folder_to_id(db))
 
   if folder not in folder_mapping:
     # Folder hasn't been created yet.
-    _add_folders([sqlite_schema_utils.JoplinFolder(folder)], env)
+    _add_folders([sqlite_schema_utils.JoplinFolder(folder)], db)
     folder_mapping.clear()
-    folder_mapping.update(_get_folder_to_id(env))
+    folder_mapping.update(_get_folder_to_id(db))
     if folder not in folder_mapping:
       raise ValueError("Something went wrong could not find or create folder.")
   parent_id = folder_mapping[folder]
@@ -156,22 +157,16 @@ def add_notes(
     env: interface.AsyncEnv,
 ) -> None:
   """Inserts multiple note rows into the remote Joplin database."""
-  sqlite_utils.insert_rows_to_remote_db(
-      rows,
-      None,
-      _NOTES_TABLE,
-      _DB_PATH,
-      _APP_NAME,
-      env,
-  )
-  sqlite_utils.insert_rows_to_remote_db(
-      _normalize_notes(rows),
-      None,
-      _NOTES_NORMALIZED_TABLE,
-      _DB_PATH,
-      _APP_NAME,
-      env,
-  )
+  with sqlite_utils.RemoteDbSession(_DB_PATH, env, _APP_NAME) as db:
+    _add_notes(rows, db)
+
+
+def _add_notes(
+    rows: list[sqlite_schema_utils.JoplinNote],
+    db: sqlite_utils.RemoteDbSession,
+) -> None:
+  db.insert_rows(rows, _NOTES_TABLE, None)
+  db.insert_rows(_normalize_notes(rows), _NOTES_NORMALIZED_TABLE, None)
 
 
 def _normalize_notes(
@@ -211,17 +206,17 @@ def list_notes(
 def _create_note_from_proto(
     note: state_pb2.Note,
     folder_mapping: dict[str, str],
-    env: interface.AsyncEnv,
+    db: sqlite_utils.RemoteDbSession,
 ) -> sqlite_schema_utils.JoplinNote:
   """Creates a JoplinNote object from a state_pb2.Note proto."""
   is_todo = note.is_todo.lower() == "true"
   todo_completed = note.todo_completed.lower() == "true"
-  return create_note(
+  return _create_note(
       note.folder,
       note.title,
       note.body,
       folder_mapping,
-      env,
+      db,
       is_todo,
       todo_completed,
   )
@@ -232,13 +227,13 @@ def _generate_random_notes(
     exclusion_conditions: list[task_pb2.ExclusionCondition],
     relevant_folders: list[str],
     folder_mapping: dict[str, str],
-    env: interface.AsyncEnv,
+    db: sqlite_utils.RemoteDbSession,
 ) -> list[sqlite_schema_utils.JoplinNote]:
   """Generates random notes with the given exclusion conditions."""
   return sqlite_schema_utils.get_random_items(
       num_notes,
       generate_item_fn=lambda: _generate_random_note(
-          relevant_folders, folder_mapping, env
+          relevant_folders, folder_mapping, db
       ),
       filter_fn=lambda x: _check_note_conditions(
           x, exclusion_conditions, folder_mapping
@@ -249,7 +244,7 @@ def _generate_random_notes(
 def _generate_random_note(
     relevant_folders: list[str],
     folder_mapping: dict[str, str],
-    env: interface.AsyncEnv,
+    db: sqlite_utils.RemoteDbSession,
 ):
   """Generates a single random sqlite_schema_utils.JoplinNote object."""
   new_note = state_pb2.Note()
@@ -269,7 +264,7 @@ def _generate_random_note(
 
   new_note.title = random_note["title"]
   new_note.body = random_note["body"]
-  note = _create_note_from_proto(new_note, folder_mapping, env)
+  note = _create_note_from_proto(new_note, folder_mapping, db)
   return note
 
 
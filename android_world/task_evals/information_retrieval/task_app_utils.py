@@ -43,13 +43,15 @@ def setup_task_state(
     exclusion_conditions: list[task_pb2.ExclusionCondition],
     env: interface.AsyncEnv,
 ) -> None:
-  clear_task_db(env)
   tasks = []
   for task in relevant_state.tasks_app_tasks:
     tasks.append(create_task_from_proto(task))
   tasks += generate_random_tasks(20, exclusion_conditions)
   random.shuffle(tasks)
-  add_tasks(tasks, env)
+  sqlite_utils.ensure_table_exists(_TASK_TABLE, _DB_PATH, env, _APP_NAME)
+  with sqlite_utils.RemoteDbSession(_DB_PATH, env, _APP_NAME) as db:
+    db.delete_all_rows(_TASK_TABLE)
+    db.insert_rows(tasks, _TASK_TABLE, _PRIMARY_KEY)
 
 
 def create_task_from_proto(
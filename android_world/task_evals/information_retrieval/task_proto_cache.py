@@ -0,0 +1,96 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Loads the information retrieval task definitions.
+
+Parsing `tasks.textproto` with `text_format` is slow, so the parsed tasks are
+cached as a binary-serialized `task_pb2.Tasks`. The cache is keyed by a hash of
+the textproto, so it is rebuilt whenever the textproto changes.
+
+This module only depends on the task proto, so task names can be listed
+without importing the task implementations.
+"""
+
+import functools
+import hashlib
+import os
+import tempfile
+
+from absl import logging
+from android_world.task_evals.information_retrieval.proto import task_pb2
+from google.protobuf import message
+from google.protobuf import text_format
+
+TASKS_TEXTPROTO_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'proto', 'tasks.textproto'
+)
+
+
+def _cache_directory() -> str:
+  return os.path.join(tempfile.gettempdir(), 'android_world')
+
+
+def _cache_path(textproto: bytes) -> str:
+  digest = hashlib.sha256(textproto).hexdigest()[:16]
+  return os.path.join(_cache_directory(), f'ir_tasks_{digest}.binpb')
+
+
+def _read_cache(path: str) -> task_pb2.Tasks | None:
+  try:
+    with open(path, 'rb') as f:
+      return task_pb2.Tasks.FromString(f.read())
+  except (OSError, message.DecodeError):
+    return None
+
+
+def _write_cache(path: str, tasks: task_pb2.Tasks) -> None:
+  """Writes the cache atomically, so readers never see a partial file."""
+  tmp_path = f'{path}.{os.getpid()}.tmp'
+  try:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(tmp_path, 'wb') as f:
+      f.write(tasks.SerializeToString())
+    os.replace(tmp_path, path)
+  except OSError as e:
+    # The cache is an optimization only.
+    logging.warning('Failed to cache the IR tasks at %s: %s', path, e)
+
+
+def read_tasks(textproto_path: str = TASKS_TEXTPROTO_PATH) -> task_pb2.Tasks:
+  """Reads the tasks from a textproto, going through the binary cache.
+
+  Args:
+    textproto_path: The path of the textproto defining the tasks.
+
+  Returns:
+    The parsed tasks.
+  """
+  with open(textproto_path, 'rb') as f:
+    textproto = f.read()
+  path = _cache_path(textproto)
+  tasks = _read_cache(path)
+  if tasks is None:
+    tasks = task_pb2.Tasks()
+    text_format.Merge(textproto.decode('utf-8'), tasks)
+    _write_cache(path, tasks)
+  return tasks
+
+
+@functools.cache
+def load_tasks() -> task_pb2.Tasks:
+  """Returns the default tasks, read once per process.
+
+  Callers must not modify the returned proto.
+  """
+  return read_tasks()
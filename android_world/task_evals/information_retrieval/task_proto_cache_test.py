@@ -0,0 +1,83 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.task_evals.information_retrieval import task_proto_cache
+from google.protobuf import text_format
+
+_TEXTPROTO = """
+tasks {
+  name: "FirstTask"
+  prompt: "First prompt"
+}
+"""
+
+
+class TaskProtoCacheTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.cache_dir = self.enter_context(tempfile.TemporaryDirectory())
+    self.enter_context(
+        mock.patch.object(
+            task_proto_cache, '_cache_directory', return_value=self.cache_dir
+        )
+    )
+    self.textproto_path = os.path.join(
+        self.enter_context(tempfile.TemporaryDirectory()), 'tasks.textproto'
+    )
+    with open(self.textproto_path, 'w') as f:
+      f.write(_TEXTPROTO)
+
+  def test_parses_once_then_reads_cache(self):
+    first = task_proto_cache.read_tasks(self.textproto_path)
+    with mock.patch.object(text_format, 'Merge') as mock_merge:
+      second = task_proto_cache.read_tasks(self.textproto_path)
+
+    mock_merge.assert_not_called()
+    self.assertEqual(first, second)
+    self.assertEqual([task.name for task in second.tasks], ['FirstTask'])
+    self.assertLen(os.listdir(self.cache_dir), 1)
+
+  def test_textproto_change_rebuilds_cache(self):
+    task_proto_cache.read_tasks(self.textproto_path)
+    with open(self.textproto_path, 'a') as f:
+      f.write('tasks { name: "SecondTask" }\n')
+
+    tasks = task_proto_cache.read_tasks(self.textproto_path)
+
+    self.assertEqual(
+        [task.name for task in tasks.tasks], ['FirstTask', 'SecondTask']
+    )
+
+  def test_corrupt_cache_is_rebuilt(self):
+    task_proto_cache.read_tasks(self.textproto_path)
+    (cache_file,) = os.listdir(self.cache_dir)
+    with open(os.path.join(self.cache_dir, cache_file), 'wb') as f:
+      f.write(b'\xff\xff not a proto')
+
+    tasks = task_proto_cache.read_tasks(self.textproto_path)
+
+    self.assertEqual([task.name for task in tasks.tasks], ['FirstTask'])
+
+  def test_default_tasks_match_textproto(self):
+    self.assertNotEmpty(task_proto_cache.load_tasks().tasks)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -25,6 +25,7 @@ from android_world.task_evals.single.calendar import calendar
 from android_world.task_evals.single.calendar import calendar_utils
 from android_world.task_evals.single.calendar import events_generator
 from android_world.task_evals.utils import sqlite_schema_utils
+from android_world.task_evals.utils import sqlite_utils
 from android_world.utils import app_snapshot
 from android_world.utils import datetime_utils
 from android_world.utils import file_utils
@@ -69,6 +70,9 @@ class CalendarEventTestSetup(parameterized.TestCase):
     self.mock_clear_db = mock.patch.object(
         sqlite_validators.SQLiteApp, "_clear_db"
     ).start()
+    self.mock_ensure_table_exists = mock.patch.object(
+        sqlite_utils, "ensure_table_exists"
+    ).start()
     self.mock_restore_snapshot = self.enter_context(
         mock.patch.object(app_snapshot, "restore_snapshot")
     )
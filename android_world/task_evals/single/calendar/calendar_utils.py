@@ -75,6 +75,28 @@ def add_events(
   )
 
 
+def replace_events(
+    events: list[sqlite_schema_utils.CalendarEvent],
+    env: interface.AsyncEnv,
+    timeout_sec: Optional[float] = None,
+) -> None:
+  """Replaces all events in the calendar database with a single round trip.
+
+  Args:
+      events: The list of Events the database will contain.
+      env: The Android environment interface.
+      timeout_sec: A timeout for the ADB operations.
+  """
+  sqlite_utils.ensure_table_exists(
+      EVENTS_TABLE, DB_PATH, env, 'simple calendar pro'
+  )
+  with sqlite_utils.RemoteDbSession(
+      DB_PATH, env, 'simple calendar pro', timeout_sec
+  ) as db:
+    db.delete_all_rows(EVENTS_TABLE)
+    db.insert_rows(events, EVENTS_TABLE, DB_KEY)
+
+
 def add_random_events(env: interface.AsyncEnv, n: int = 75) -> None:
   """Adds random events to calendar to increase task complexity."""
   events = [
@@ -22,6 +22,7 @@ from android_world.env import interface
 from android_world.task_evals.common_validators import sqlite_validators
 from android_world.task_evals.single import recipe
 from android_world.task_evals.utils import sqlite_schema_utils
+from android_world.task_evals.utils import sqlite_utils
 from android_world.utils import app_snapshot
 from android_world.utils import file_utils
 
@@ -138,6 +139,9 @@ class RecipeDeleteDuplicateRecipesTest(parameterized.TestCase):
     self.mock_clear_db = self.enter_context(
         mock.patch.object(sqlite_validators.SQLiteApp, '_clear_db')
     )
+    self.mock_ensure_table_exists = self.enter_context(
+        mock.patch.object(sqlite_utils, 'ensure_table_exists')
+    )
     self.mock_restore_snapshot = self.enter_context(
         mock.patch.object(app_snapshot, 'restore_snapshot')
     )
@@ -15,7 +15,6 @@
 """Tasks for Retro Music app."""
 
 import dataclasses
-import os
 import random
 from typing import Any
 from android_world.env import adb_utils
@@ -63,17 +62,13 @@ def _get_playlist_data(
     env: interface.AsyncEnv,
 ) -> list[sqlite_schema_utils.PlaylistInfo]:
   """Executes join query to fetch playlist file info."""
-  with env.controller.pull_file(
-      _PLAYLIST_DB_PATH, timeout_sec=3
-  ) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(_PLAYLIST_DB_PATH)[1]
-    )
-    return sqlite_utils.execute_query(
-        _get_playlist_info_query(),
-        local_db_path,
-        sqlite_schema_utils.PlaylistInfo,
-    )
+  return sqlite_utils.query_remote_db(
+      _get_playlist_info_query(),
+      _PLAYLIST_DB_PATH,
+      sqlite_schema_utils.PlaylistInfo,
+      env,
+      timeout_sec=3,
+  )
 
 
 def _get_playing_queue(env: interface.AsyncEnv) -> list[str]:
@@ -83,18 +78,14 @@ def _get_playing_queue(env: interface.AsyncEnv) -> list[str]:
   class Queue(sqlite_schema_utils.SQLiteRow):
     title: str
 
-  with env.controller.pull_file(
-      _PLAYBACK_DB_PATH, timeout_sec=3
-  ) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(_PLAYBACK_DB_PATH)[1]
-    )
-    result = sqlite_utils.execute_query(
-        'SELECT title from playing_queue;',
-        local_db_path,
-        Queue,
-    )
-    return [r.title for r in result]
+  result = sqlite_utils.query_remote_db(
+      'SELECT title from playing_queue;',
+      _PLAYBACK_DB_PATH,
+      Queue,
+      env,
+      timeout_sec=3,
+  )
+  return [r.title for r in result]
 
 
 def _clear_playlist_dbs(env: interface.AsyncEnv) -> None:
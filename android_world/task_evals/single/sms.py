@@ -218,12 +218,12 @@ class SimpleSmsSendReceivedAddress(sms_validators.SimpleSMSSendSms):
     super().initialize_task(env)
 
     name2_number = user_data_generation.generate_random_number()
-    contacts_utils.add_contact(
-        self.params["name1"], self.params["number"], env.controller
-    )
-    time.sleep(5.0)
-    contacts_utils.add_contact(
-        self.params["name2"], name2_number, env.controller
+    contacts_utils.add_contacts(
+        [
+            contacts_utils.Contact(self.params["name1"], self.params["number"]),
+            contacts_utils.Contact(self.params["name2"], name2_number),
+        ],
+        env.controller,
     )
 
     # Add text containing address from name2
@@ -272,10 +272,10 @@ class SimpleSmsResend(sms_validators.SimpleSMSSendSms):
     adb_utils.disable_headsup_notifications(env.controller)
     super().initialize_task(env)
 
-    contacts_utils.add_contact(
-        self.params["name"], self.params["number"], env.controller
+    contacts_utils.add_contacts(
+        [contacts_utils.Contact(self.params["name"], self.params["number"])],
+        env.controller,
     )
-    time.sleep(3.0)
     controller.send_sms(self.params["number"], self.params["message"])
 
     # Make sure conversation happens before the repeat message
@@ -395,8 +395,8 @@ class TestSimpleSmsSendReceivedAddress(test_utils.AdbEvalTestBase):
     ).start()
 
     # Mock controller methods
-    self.mock_add_contact = mock.patch.object(
-        contacts_utils, 'add_contact'
+    self.mock_add_contacts = mock.patch.object(
+        contacts_utils, 'add_contacts'
     ).start()
 
     # Mock adb_utils methods
@@ -448,10 +448,13 @@ class TestSimpleSmsSendReceivedAddress(test_utils.AdbEvalTestBase):
     task.initialize_task(env)
     self.mock_disable_notifications.assert_called_once()
     self.mock_initialize_sms_task.assert_called_once()
-    self.mock_add_contact.assert_has_calls([
-        mock.call(name1, name1_number, env.controller),
-        mock.call(name2, self.random_number, env.controller),
-    ])
+    self.mock_add_contacts.assert_called_once_with(
+        [
+            contacts_utils.Contact(name1, name1_number),
+            contacts_utils.Contact(name2, self.random_number),
+        ],
+        env.controller,
+    )
     self.mock_text_emulator.assert_called_with(
         env.controller, self.random_number, '100 Main Street'
     )
@@ -562,8 +565,8 @@ class TestMessagesResendTextMessage(test_utils.AdbEvalTestBase):
     ).start()
 
     # Mock controller methods
-    self.mock_add_contact = mock.patch.object(
-        contacts_utils, 'add_contact'
+    self.mock_add_contacts = mock.patch.object(
+        contacts_utils, 'add_contacts'
     ).start()
     self.mock_send_sms = mock.patch.object(
         tools.AndroidToolController, 'send_sms'
@@ -650,7 +653,9 @@ class TestMessagesResendTextMessage(test_utils.AdbEvalTestBase):
     task.initialize_task(env)
     self.mock_disable_notifications.assert_called_once()
     self.mock_initialize_sms_task.assert_called_once()
-    self.mock_add_contact.assert_called_with(name, number, env.controller)
+    self.mock_add_contacts.assert_called_once_with(
+        [contacts_utils.Contact(name, number)], env.controller
+    )
     # Check that initial message was sent
     self.mock_send_sms.assert_called_with(number, message)
     # Check that resend message was sent
@@ -14,7 +14,6 @@
 
 """Tasks for VLC player."""
 
-import os
 import random
 from typing import Any
 from android_world.env import interface
@@ -60,15 +59,13 @@ def _get_playlist_file_info(
     env: interface.AsyncEnv,
 ) -> list[sqlite_schema_utils.PlaylistInfo]:
   """Executes join query to fetch playlist file info."""
-  with env.controller.pull_file(_DB_PATH, timeout_sec=3) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(_DB_PATH)[1]
-    )
-    return sqlite_utils.execute_query(
-        _get_playlist_info_query(),
-        local_db_path,
-        sqlite_schema_utils.PlaylistInfo,
-    )
+  return sqlite_utils.query_remote_db(
+      _get_playlist_info_query(),
+      _DB_PATH,
+      sqlite_schema_utils.PlaylistInfo,
+      env,
+      timeout_sec=3,
+  )
 
 
 class _VLC(task_eval.TaskEval):
@@ -117,15 +117,15 @@ class VlcTestBase(parameterized.TestCase):
     self.mock_copy_db = self.enter_context(
         mock.patch.object(
             file_utils,
-            'tmp_directory_from_device',
-            side_effect=file_test_utils.mock_tmp_directory_from_device,
+            'tmp_sqlite_db_from_device',
+            side_effect=file_test_utils.mock_tmp_sqlite_db_from_device,
         )
     )
-    self.mock_copy_data_to_device = self.enter_context(
+    self.mock_push_db = self.enter_context(
         mock.patch.object(
             file_utils,
-            'copy_data_to_device',
-            side_effect=file_test_utils.mock_copy_data_to_device,
+            'replace_sqlite_db_on_device',
+            side_effect=file_test_utils.mock_replace_sqlite_db_on_device,
         )
     )
     self.mock_restore_snapshot = self.enter_context(
@@ -120,13 +120,20 @@ class TaskEval(abc.ABC):
       # any state.
       if app_name and app_name != "clipper":
         try:
-          app_snapshot.restore_snapshot(app_name, env.controller)
+          app_snapshot.restore_snapshot(
+              app_name, env.controller, incremental=True
+          )
         except RuntimeError as error:
           logging.warning("Skipping app snapshot loading : %s", error)
 
   def install_apps_if_not_installed(self, env: interface.AsyncEnv) -> None:
+    """Installs the APKs of the task's apps that are not installed yet."""
+    installed_packages = setup.get_installed_packages(env)
     for app_name in self.app_names:
-      setup.install_app_if_not_installed(app_name, env)
+      app = setup.get_app_mapping(app_name)
+      if app is None or app.package_name() in installed_packages:
+        continue
+      setup.maybe_install_app(app, env)
 
   @classmethod
   def set_device_time(cls, env: interface.AsyncEnv) -> None:
@@ -143,6 +150,8 @@ class TaskEval(abc.ABC):
     """Initializes the task."""
     # Reset the interaction cache so previous tasks don't affect this run:
     env.interaction_cache = ""
+    # Previous tasks may have left the screen in a different size/orientation.
+    env.invalidate_screen_geometry()
     self.initialize_device_time(env)
     self._initialize_apps(env)
     logging.info("Initializing %s", self.name)
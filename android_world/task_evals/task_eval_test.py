@@ -16,6 +16,8 @@ from typing import Any
 from unittest import mock
 from absl.testing import absltest
 from android_world.env import interface
+from android_world.env.setup_device import apps
+from android_world.env.setup_device import setup
 from android_world.task_evals import task_eval
 from android_world.utils import test_utils
 
@@ -82,6 +84,29 @@ class TestTaskEval(test_utils.AdbEvalTestBase):
   def test_goal_property(self):
     self.assertEqual(self.scripted_task.goal, "Mock task with test")
 
+  @mock.patch.object(setup, "_APPS", (apps.ContactsApp, apps.MarkorApp))
+  @mock.patch.object(setup, "maybe_install_app")
+  @mock.patch.object(setup, "get_installed_packages")
+  def test_install_apps_if_not_installed(
+      self, mock_get_installed_packages, mock_maybe_install_app
+  ):
+    task = MockTaskEval(self.params)
+    mock_get_installed_packages.return_value = frozenset(
+        {apps.ContactsApp.package_name()}
+    )
+
+    with mock.patch.object(
+        MockTaskEval,
+        "app_names",
+        new_callable=mock.PropertyMock,
+        return_value=("contacts", "markor", "MockApp"),
+    ):
+      task.install_apps_if_not_installed(self.mock_env)
+
+    mock_maybe_install_app.assert_called_once_with(
+        apps.MarkorApp, self.mock_env
+    )
+
   def test_tear_down(self):
     self.scripted_task.tear_down(self.mock_env)
     self.mock_close_recents.assert_called_once()
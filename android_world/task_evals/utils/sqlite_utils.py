@@ -14,10 +14,19 @@
 
 """Utility functions for interacting with SQLite database on an Android device."""
 
+import atexit
+import contextlib
+import dataclasses
 import os
+import shlex
+import shutil
 import sqlite3
+import tempfile
+import threading
 import time
-from typing import Optional, Type
+from typing import Any, Optional, Type
+import weakref
+from absl import logging
 from android_world.env import adb_utils
 from android_world.env import interface
 from android_world.task_evals.utils import sqlite_schema_utils
@@ -50,6 +59,252 @@ def execute_query(
   return rows
 
 
+# SQLite companion files whose changes are not reflected in the main file's
+# size or mtime until a checkpoint.
+_COMPANION_SUFFIXES = ('-wal', '-journal')
+
+
+@dataclasses.dataclass
+class _DatabaseMirror:
+  """A local copy of a remote database and the remote state it reflects."""
+
+  local_directory: str
+  local_db_path: str
+  # None if the remote state could not be inspected, so the copy is stale.
+  remote_signature: Optional[str]
+
+
+# Local mirrors of remote databases, per controller and remote path. Keyed
+# weakly on the controller so mirrors of closed environments can be collected.
+_mirrors: weakref.WeakKeyDictionary[object, dict[str, _DatabaseMirror]] = (
+    weakref.WeakKeyDictionary()
+)
+_mirrors_lock = threading.Lock()
+
+
+@atexit.register
+def _remove_all_mirrors() -> None:
+  with _mirrors_lock:
+    mirrors = [m for ms in _mirrors.values() for m in ms.values()]
+    _mirrors.clear()
+  for mirror in mirrors:
+    shutil.rmtree(mirror.local_directory, ignore_errors=True)
+
+
+def _remote_signature(
+    remote_db_file_path: str,
+    env: interface.AsyncEnv,
+    timeout_sec: Optional[float] = None,
+) -> Optional[str]:
+  """Returns the size and mtime of a remote database and its companion files.
+
+  Args:
+    remote_db_file_path: The database path on the remote device.
+    env: The environment.
+    timeout_sec: Optional timeout in seconds for the adb call.
+
+  Returns:
+    A string that changes whenever the database or its journal changes, or
+    None if the database does not exist or could not be inspected.
+  """
+  paths = [remote_db_file_path] + [
+      remote_db_file_path + suffix for suffix in _COMPANION_SUFFIXES
+  ]
+  batch = adb_utils.ShellBatch(env.controller, timeout_sec)
+  # Missing companion files are expected, so `stat` may fail; the listing of
+  # the files that do exist is still printed.
+  batch.add(
+      "stat -c '%s|%y|%n' "
+      + ' '.join(shlex.quote(path) for path in paths)
+      + ' 2>/dev/null',
+      allow_failure=True,
+  )
+  try:
+    (result,) = batch.run()
+  except (RuntimeError, ValueError) as e:
+    logging.warning('Failed to stat %s: %s', remote_db_file_path, e)
+    return None
+  lines = sorted(line for line in result.output.splitlines() if line)
+  if not any(line.endswith('|' + remote_db_file_path) for line in lines):
+    return None
+  return '\n'.join(lines)
+
+
+def invalidate_mirror(
+    remote_db_file_path: str, env: interface.AsyncEnv
+) -> None:
+  """Drops the local mirror of a remote database, if there is one.
+
+  Args:
+    remote_db_file_path: The database path on the remote device.
+    env: The environment.
+  """
+  with _mirrors_lock:
+    mirror = _mirrors.get(env.controller, {}).pop(remote_db_file_path, None)
+  if mirror is not None:
+    shutil.rmtree(mirror.local_directory, ignore_errors=True)
+
+
+def _sync_mirror(
+    remote_db_file_path: str,
+    env: interface.AsyncEnv,
+    timeout_sec: Optional[float] = None,
+) -> str:
+  """Returns the path to an up to date local copy of a remote database.
+
+  The database is only pulled if the remote file or its -wal/-journal files
+  changed size or mtime since the last pull; otherwise the previously pulled
+  copy is reused.
+
+  Args:
+    remote_db_file_path: The database path on the remote device.
+    env: The environment.
+    timeout_sec: Optional timeout in seconds for the adb calls.
+
+  Returns:
+    The path of the local database file.
+  """
+  signature = _remote_signature(remote_db_file_path, env, timeout_sec)
+  with _mirrors_lock:
+    mirror = _mirrors.get(env.controller, {}).get(remote_db_file_path)
+  if (
+      mirror is not None
+      and signature is not None
+      and mirror.remote_signature == signature
+      and os.path.exists(mirror.local_db_path)
+  ):
+    return mirror.local_db_path
+
+  invalidate_mirror(remote_db_file_path, env)
+  local_directory = tempfile.mkdtemp(prefix='android_world_db_')
+  try:
+    with env.controller.pull_file(
+        remote_db_file_path, timeout_sec
+    ) as pulled_directory:
+      shutil.copytree(pulled_directory, local_directory, dirs_exist_ok=True)
+  except Exception:
+    shutil.rmtree(local_directory, ignore_errors=True)
+    raise
+  mirror = _DatabaseMirror(
+      local_directory=local_directory,
+      local_db_path=file_utils.convert_to_posix_path(
+          local_directory, os.path.basename(remote_db_file_path)
+      ),
+      remote_signature=signature,
+  )
+  with _mirrors_lock:
+    _mirrors.setdefault(env.controller, {})[remote_db_file_path] = mirror
+  return mirror.local_db_path
+
+
+def query_remote_db(
+    query: str,
+    remote_db_file_path: str,
+    row_type: Type[sqlite_schema_utils.RowType],
+    env: interface.AsyncEnv,
+    timeout_sec: Optional[float] = None,
+) -> list[sqlite_schema_utils.RowType]:
+  """Runs a query against the local mirror of a remote database.
+
+  Consecutive queries against an unchanged database share a single pull.
+
+  Args:
+    query: The query to issue.
+    remote_db_file_path: The database path on the remote device.
+    row_type: The object type that will be created for each retrieved row.
+    env: The environment.
+    timeout_sec: Optional timeout in seconds for the adb calls.
+
+  Returns:
+    The rows returned by the query.
+  """
+  return execute_query(
+      query, _sync_mirror(remote_db_file_path, env, timeout_sec), row_type
+  )
+
+
+def query_on_device(
+    query: str,
+    remote_db_file_path: str,
+    env: interface.AsyncEnv,
+    timeout_sec: Optional[float] = None,
+) -> Optional[list[str]]:
+  """Runs a query with the device's sqlite3 binary, without pulling the file.
+
+  This is meant for cheap checks such as existence or counts, where the result
+  is a few plain values. Only read-only queries are supported: the database is
+  opened with `-readonly`, while the app may be using it. Reading a database in
+  write-ahead log mode may still create its -wal and -shm files; as sqlite3
+  runs as root, they are then given back to the owner of the database and
+  their security context is restored, so that the app can keep writing to it.
+
+  Args:
+    query: The query to issue.
+    remote_db_file_path: The database path on the remote device.
+    env: The environment.
+    timeout_sec: Optional timeout in seconds for the adb call.
+
+  Returns:
+    One line per result row, with columns separated by "|", or None if the
+    device has no sqlite3 binary or the query failed.
+  """
+  batch = adb_utils.ShellBatch(env.controller, timeout_sec)
+  batch.add('command -v sqlite3 >/dev/null')
+  db = shlex.quote(remote_db_file_path)
+  companions = ' '.join(
+      shlex.quote(remote_db_file_path + suffix)
+      for suffix in file_utils.SQLITE_COMPANION_SUFFIXES
+  )
+  query_index = batch.add(
+      f'[ -f {db} ] && owner=$(stat -c %u:%g {db}) &&'
+      f' {{ sqlite3 -readonly -batch {db} {shlex.quote(query)}; rc=$?;'
+      f' chown "$owner" {companions} 2>/dev/null;'
+      f' restorecon -D {companions} 2>/dev/null; [ $rc -eq 0 ]; }}'
+  )
+  try:
+    results = batch.run()
+  except (RuntimeError, ValueError) as e:
+    logging.warning('Failed to query %s on device: %s', remote_db_file_path, e)
+    return None
+  if not results[query_index].ok:
+    return None
+  return [line for line in results[query_index].output.splitlines() if line]
+
+
+def count_rows(
+    table_name: str,
+    remote_db_file_path: str,
+    env: interface.AsyncEnv,
+    timeout_sec: Optional[float] = None,
+) -> int:
+  """Counts the rows of a table in a SQLite database on a remote device.
+
+  The count is done on the device if it has a sqlite3 binary, and against the
+  local mirror of the database otherwise.
+
+  Args:
+    table_name: The name of the table.
+    remote_db_file_path: The path to the sqlite database on the device.
+    env: The environment.
+    timeout_sec: Optional timeout in seconds for the adb calls.
+
+  Returns:
+    The number of rows in the table.
+  """
+  query = f'SELECT COUNT(*) AS count FROM {table_name};'
+  lines = query_on_device(query, remote_db_file_path, env, timeout_sec)
+  if lines is not None and len(lines) == 1 and lines[0].isdigit():
+    return int(lines[0])
+  conn = sqlite3.connect(
+      _sync_mirror(remote_db_file_path, env, timeout_sec)
+  )
+  try:
+    (count,) = conn.execute(query).fetchone()
+  finally:
+    conn.close()
+  return count
+
+
 def get_rows_from_remote_device(
     table_name: str,
     remote_db_file_path: str,
@@ -60,8 +315,8 @@ def get_rows_from_remote_device(
 ) -> list[sqlite_schema_utils.RowType]:
   """Retrieves rows from a table in a SQLite database located on a remote Android device.
 
-  This function first copies the database from the remote device to a
-  temporary local directory.
+  Rows are read from a local mirror of the database, which is only pulled from
+  the device again if the remote database changed since the last pull.
 
   Args:
     table_name: The name of the table from which to retrieve rows.
@@ -81,21 +336,19 @@ def get_rows_from_remote_device(
   Raises:
     ValueError: If cannot query table.
   """
-  with env.controller.pull_file(
-      remote_db_file_path, timeout_sec
-  ) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(remote_db_file_path)[1]
-    )
-    for _ in range(n_retries):
-      try:
-        return execute_query(
-            f"SELECT * FROM {table_name};",
-            local_db_path,
-            row_type,
-        )
-      except sqlite3.OperationalError:
-        time.sleep(1.0)
+  for _ in range(n_retries):
+    try:
+      return query_remote_db(
+          f"SELECT * FROM {table_name};",
+          remote_db_file_path,
+          row_type,
+          env,
+          timeout_sec,
+      )
+    except sqlite3.OperationalError:
+      # The app may still be creating the database, so pull it again.
+      invalidate_mirror(remote_db_file_path, env)
+      time.sleep(1.0)
   raise ValueError(
       f"Failed to retrieve rows from {table_name} from"
       f" {remote_db_file_path} after {n_retries} retries. Try increasing the "
@@ -118,6 +371,14 @@ def table_exists(
   Returns:
     True if the table exists in the database.
   """
+  lines = query_on_device(
+      "SELECT name FROM sqlite_master WHERE type='table' AND"
+      f" name='{table_name}';",
+      remote_db_file_path,
+      env,
+  )
+  if lines is not None:
+    return bool(lines)
   try:
     get_rows_from_remote_device(
         table_name,
@@ -130,44 +391,186 @@ def table_exists(
     return False
 
 
-def delete_all_rows_from_table(
+def ensure_table_exists(
     table_name: str,
     remote_db_file_path: str,
     env: interface.AsyncEnv,
     app_name: str,
-    timeout_sec: Optional[float] = None,
 ) -> None:
-  """Deletes all rows from a specified table in a SQLite database on a remote Android device.
+  """Launches the app if a table is missing, as opening it may create the DB.
 
   Args:
-    table_name: Deletes all rows from the table.
+    table_name: The table that is expected to exist.
     remote_db_file_path: The path to the sqlite database on the device.
     env: The environment.
     app_name: The name of the app that owns the database.
-    timeout_sec: Timeout in seconds.
   """
   if not table_exists(table_name, remote_db_file_path, env):
-    # If the database was never created, opening the app may create it.
     adb_utils.launch_app(app_name, env.controller)
     time.sleep(7.0)
 
-  with env.controller.pull_file(
-      remote_db_file_path, timeout_sec
-  ) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(remote_db_file_path)[1]
+
+class RemoteDbSession:
+  """Edits a SQLite database on the device with a single pull and push.
+
+  The database is pulled on first use. Any number of queries and statements
+  then run against the local copy, in a single transaction. If the session
+  changed the database, it is pushed back once when the session exits without
+  an error, and the app owning it is closed so that it picks up the changes.
+  If the session exits with an error, the changes are discarded.
+
+  Example:
+  ~~~~~~~
+
+  with sqlite_utils.RemoteDbSession(db_path, env, app_name) as db:
+    db.delete_all_rows('events')
+    db.insert_rows(events, 'events', exclude_key='id')
+    rows = db.query_rows('events', sqlite_schema_utils.CalendarEvent)
+  """
+
+  def __init__(
+      self,
+      remote_db_file_path: str,
+      env: interface.AsyncEnv,
+      app_name: Optional[str] = None,
+      timeout_sec: Optional[float] = None,
+  ):
+    """Initializes the session.
+
+    Args:
+      remote_db_file_path: The path to the sqlite database on the device.
+      env: The environment.
+      app_name: The name of the app that owns the database. It is closed after
+        the database is pushed, to register the changes.
+      timeout_sec: Optional timeout in seconds for the database transfers.
+    """
+    self._remote_db_file_path = remote_db_file_path
+    self._env = env
+    self._app_name = app_name
+    self._timeout_sec = timeout_sec
+    self._exit_stack = contextlib.ExitStack()
+    self._connection: Optional[sqlite3.Connection] = None
+    self._local_db_path: Optional[str] = None
+    self._modified = False
+
+  def __enter__(self) -> "RemoteDbSession":
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback) -> None:
+    with self._exit_stack:
+      if self._connection is None:
+        return
+      if exc_type is None:
+        self._connection.commit()
+      self._connection.close()
+      if exc_type is None and self._modified:
+        self._push()
+
+  def _push(self) -> None:
+    self._env.controller.push_file(
+        self._local_db_path, self._remote_db_file_path, self._timeout_sec
     )
+    invalidate_mirror(self._remote_db_file_path, self._env)
+    if self._app_name is not None:
+      adb_utils.close_app(self._app_name, self._env.controller)
 
-    conn = sqlite3.connect(local_db_path)
-    cursor = conn.cursor()
-    delete_command = f"DELETE FROM {table_name}"
-    cursor.execute(delete_command)
-    conn.commit()
-    conn.close()
-    env.controller.push_file(local_db_path, remote_db_file_path, timeout_sec)
-    adb_utils.close_app(
-        app_name, env.controller
-    )  # Close app to register the changes.
+  def _get_connection(self) -> sqlite3.Connection:
+    """Returns a connection to the local copy, pulling it on first use."""
+    if self._connection is None:
+      local_db_directory = self._exit_stack.enter_context(
+          self._env.controller.pull_file(
+              self._remote_db_file_path, self._timeout_sec
+          )
+      )
+      self._local_db_path = file_utils.convert_to_posix_path(
+          local_db_directory, os.path.basename(self._remote_db_file_path)
+      )
+      self._connection = sqlite3.connect(self._local_db_path)
+      self._connection.row_factory = sqlite3.Row
+    return self._connection
+
+  def query(
+      self, query: str, row_type: Type[sqlite_schema_utils.RowType]
+  ) -> list[sqlite_schema_utils.RowType]:
+    """Runs a query, seeing the changes made earlier in the session.
+
+    Args:
+      query: The query to issue.
+      row_type: The object type that will be created for each retrieved row.
+
+    Returns:
+      The rows returned by the query.
+    """
+    raw_rows = self._get_connection().execute(query).fetchall()
+    return [row_type(**dict(row)) for row in raw_rows]  # pytype: disable=bad-return-type
+
+  def query_rows(
+      self, table_name: str, row_type: Type[sqlite_schema_utils.RowType]
+  ) -> list[sqlite_schema_utils.RowType]:
+    """Returns all rows of a table."""
+    return self.query(f"SELECT * FROM {table_name};", row_type)
+
+  def table_exists(self, table_name: str) -> bool:
+    """Returns whether the database has the table."""
+    return (
+        self._get_connection()
+        .execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?;",
+            (table_name,),
+        )
+        .fetchone()
+        is not None
+    )
+
+  def execute(self, statement: str, parameters: tuple[Any, ...] = ()) -> None:
+    """Runs a statement that changes the database."""
+    self._get_connection().execute(statement, parameters)
+    self._modified = True
+
+  def delete_all_rows(self, table_name: str) -> None:
+    """Deletes all rows from a table."""
+    self.execute(f"DELETE FROM {table_name}")
+
+  def insert_rows(
+      self,
+      rows: list[sqlite_schema_utils.RowType],
+      table_name: str,
+      exclude_key: str | None,
+  ) -> None:
+    """Inserts rows into a table.
+
+    Args:
+      rows: The rows to insert.
+      table_name: The name of the table to insert rows into.
+      exclude_key: Name of field to exclude adding to database. Typically an
+        auto incrementing key.
+    """
+    for row in rows:
+      insert_command, values = sqlite_schema_utils.insert_into_db(
+          row, table_name, exclude_key
+      )
+      self.execute(insert_command, values)
+
+
+def delete_all_rows_from_table(
+    table_name: str,
+    remote_db_file_path: str,
+    env: interface.AsyncEnv,
+    app_name: str,
+    timeout_sec: Optional[float] = None,
+) -> None:
+  """Deletes all rows from a specified table in a SQLite database on a remote Android device.
+
+  Args:
+    table_name: Deletes all rows from the table.
+    remote_db_file_path: The path to the sqlite database on the device.
+    env: The environment.
+    app_name: The name of the app that owns the database.
+    timeout_sec: Timeout in seconds.
+  """
+  ensure_table_exists(table_name, remote_db_file_path, env, app_name)
+  with RemoteDbSession(remote_db_file_path, env, app_name, timeout_sec) as db:
+    db.delete_all_rows(table_name)
 
 
 def insert_rows_to_remote_db(
@@ -191,22 +594,5 @@ def insert_rows_to_remote_db(
     env: The environment.
     timeout_sec: Optional timeout in seconds for the database copy operation.
   """
-  with env.controller.pull_file(
-      remote_db_file_path, timeout_sec
-  ) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(remote_db_file_path)[1]
-    )
-
-    conn = sqlite3.connect(local_db_path)
-    cursor = conn.cursor()
-    for row in rows:
-      insert_command, values = sqlite_schema_utils.insert_into_db(
-          row, table_name, exclude_key
-      )
-      cursor.execute(insert_command, values)
-    conn.commit()
-    conn.close()
-
-    env.controller.push_file(local_db_path, remote_db_file_path, timeout_sec)
-    adb_utils.close_app(app_name, env.controller)
+  with RemoteDbSession(remote_db_file_path, env, app_name, timeout_sec) as db:
+    db.insert_rows(rows, table_name, exclude_key)
@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
 import sqlite3
 from unittest import mock
 
@@ -25,6 +24,7 @@ from android_world.env import interface
 from android_world.task_evals.utils import sqlite_schema_utils
 from android_world.task_evals.utils import sqlite_test_utils
 from android_world.task_evals.utils import sqlite_utils
+from android_world.utils import fake_adb_responses
 from android_world.utils import file_test_utils
 from android_world.utils import file_utils
 
@@ -55,22 +55,15 @@ class SqliteUtilsTest(absltest.TestCase):
     self.mock_copy_db = self.enter_context(
         mock.patch.object(
             file_utils,
-            'tmp_directory_from_device',
-            side_effect=file_test_utils.mock_tmp_directory_from_device,
+            'tmp_sqlite_db_from_device',
+            side_effect=file_test_utils.mock_tmp_sqlite_db_from_device,
         )
     )
-    self.mock_copy_data_to_device = self.enter_context(
+    self.mock_push_db = self.enter_context(
         mock.patch.object(
             file_utils,
-            'copy_data_to_device',
-            side_effect=file_test_utils.mock_copy_data_to_device,
-        )
-    )
-    self.mock_remove_files = self.enter_context(
-        mock.patch.object(
-            file_utils,
-            'clear_directory',
-            side_effect=file_test_utils.mock_remove_files,
+            'replace_sqlite_db_on_device',
+            side_effect=file_test_utils.mock_replace_sqlite_db_on_device,
         )
     )
 
@@ -83,7 +76,7 @@ class SqliteUtilsTest(absltest.TestCase):
 
     self.assertEqual(result, expected_rows)
     self.mock_copy_db.assert_called_once_with(
-        os.path.dirname(self.remote_db_path), self.controller.env, None
+        self.remote_db_path, self.controller, None
     )
 
   @mock.patch.object(sqlite_utils, 'execute_query', autospec=True)
@@ -112,6 +105,66 @@ class SqliteUtilsTest(absltest.TestCase):
           self.async_env_mock,
       )
 
+  @mock.patch.object(adb_utils, 'close_app', autospec=True)
+  def test_session_pulls_and_pushes_once(self, mock_close_app):
+    new_row = sqlite_schema_utils.CalendarEvent(
+        start_ts=1672707600,
+        end_ts=1672714800,
+        title='A new row',
+        id=6,
+    )
+
+    with sqlite_utils.RemoteDbSession(
+        self.remote_db_path, self.async_env_mock, 'TestApp'
+    ) as db:
+      db.delete_all_rows(self.table_name)
+      db.insert_rows([new_row], self.table_name, exclude_key='id')
+      in_session = db.query_rows(self.table_name, self.row_type)
+
+    self.assertEqual(in_session, [new_row])
+    self.mock_copy_db.assert_called_once()
+    self.mock_push_db.assert_called_once()
+    mock_close_app.assert_called_once_with('TestApp', self.controller)
+    retrieved = sqlite_utils.get_rows_from_remote_device(
+        self.table_name, self.remote_db_path, self.row_type, self.async_env_mock
+    )
+    self.assertEqual(retrieved, [new_row])
+
+  @mock.patch.object(adb_utils, 'close_app', autospec=True)
+  def test_session_without_changes_does_not_push(self, mock_close_app):
+    with sqlite_utils.RemoteDbSession(
+        self.remote_db_path, self.async_env_mock, 'TestApp'
+    ) as db:
+      rows = db.query_rows(self.table_name, self.row_type)
+
+    self.assertEqual(rows, sqlite_test_utils.get_db_rows())
+    self.mock_push_db.assert_not_called()
+    mock_close_app.assert_not_called()
+
+  def test_unused_session_does_not_pull(self):
+    with sqlite_utils.RemoteDbSession(
+        self.remote_db_path, self.async_env_mock
+    ):
+      pass
+
+    self.mock_copy_db.assert_not_called()
+
+  @mock.patch.object(adb_utils, 'close_app', autospec=True)
+  def test_session_discards_changes_on_error(self, mock_close_app):
+    with self.assertRaises(ValueError):
+      with sqlite_utils.RemoteDbSession(
+          self.remote_db_path, self.async_env_mock, 'TestApp'
+      ) as db:
+        db.delete_all_rows(self.table_name)
+        raise ValueError('Setup failed.')
+
+    self.mock_push_db.assert_not_called()
+    mock_close_app.assert_not_called()
+    retrieved = sqlite_utils.get_rows_from_remote_device(
+        self.table_name, self.remote_db_path, self.row_type, self.async_env_mock
+    )
+    self.assertEqual(retrieved, sqlite_test_utils.get_db_rows())
+
   @mock.patch.object(adb_utils, 'close_app', autospec=True)
   def test_insert_rows_to_remote_db(self, mock_close_app):
     new_row = sqlite_schema_utils.CalendarEvent(
@@ -140,5 +193,101 @@ class SqliteUtilsTest(absltest.TestCase):
     self.assertEqual(retrieved, original_rows + [new_row])
 
 
+class RemoteDbMirrorTest(SqliteUtilsTest):
+
+  def setUp(self):
+    super().setUp()
+    self.stat_output = f'4096|2024-01-01 00:00:00.1|{self.remote_db_path}'
+    self.sqlite3_available = False
+    self.mock_issue_generic_request = self.enter_context(
+        mock.patch.object(
+            adb_utils,
+            'issue_generic_request',
+            side_effect=self._fake_request,
+        )
+    )
+
+  def _fake_request(self, args, env, timeout_sec=None):
+    del env, timeout_sec
+    script = args[1]
+    results = []
+    for command in fake_adb_responses.get_shell_batch_commands(script):
+      if command.startswith('stat '):
+        results.append((0, self.stat_output))
+      elif command.startswith('command -v sqlite3'):
+        results.append((0 if self.sqlite3_available else 1, ''))
+      elif 'sqlite3 -readonly -batch' in command:
+        results.append((0, 'events\n'))
+    return fake_adb_responses.create_shell_batch_response(script, results)
+
+  def test_unchanged_database_is_pulled_once(self):
+    for _ in range(3):
+      rows = sqlite_utils.get_rows_from_remote_device(
+          self.table_name,
+          self.remote_db_path,
+          self.row_type,
+          self.async_env_mock,
+      )
+
+    self.assertEqual(rows, sqlite_test_utils.get_db_rows())
+    self.mock_copy_db.assert_called_once()
+
+  def test_changed_database_is_pulled_again(self):
+    sqlite_utils.get_rows_from_remote_device(
+        self.table_name, self.remote_db_path, self.row_type, self.async_env_mock
+    )
+    self.stat_output += (
+        f'\n8|2024-01-01 00:00:01.0|{self.remote_db_path}-wal'
+    )
+    sqlite_utils.get_rows_from_remote_device(
+        self.table_name, self.remote_db_path, self.row_type, self.async_env_mock
+    )
+
+    self.assertEqual(self.mock_copy_db.call_count, 2)
+
+  def test_missing_database_is_not_cached(self):
+    self.stat_output = ''
+
+    for _ in range(2):
+      sqlite_utils.get_rows_from_remote_device(
+          self.table_name,
+          self.remote_db_path,
+          self.row_type,
+          self.async_env_mock,
+      )
+
+    self.assertEqual(self.mock_copy_db.call_count, 2)
+
+  def test_count_rows_falls_back_to_mirror(self):
+    count = sqlite_utils.count_rows(
+        self.table_name, self.remote_db_path, self.async_env_mock
+    )
+
+    self.assertLen(sqlite_test_utils.get_db_rows(), count)
+    self.mock_copy_db.assert_called_once()
+
+  def test_table_exists_queries_on_device(self):
+    self.sqlite3_available = True
+
+    self.assertTrue(
+        sqlite_utils.table_exists(
+            self.table_name, self.remote_db_path, self.async_env_mock
+        )
+    )
+    self.mock_copy_db.assert_not_called()
+    query = fake_adb_responses.get_shell_batch_commands(
+        self.mock_issue_generic_request.call_args.args[0][1]
+    )[1]
+    # Files sqlite3 creates as root are given back to the app.
+    self.assertIn(
+        f'chown "$owner" {self.remote_db_path}-wal {self.remote_db_path}-shm',
+        query,
+    )
+    self.assertIn(
+        f'restorecon -D {self.remote_db_path}-wal {self.remote_db_path}-shm',
+        query,
+    )
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -21,11 +21,13 @@ import os
 import random
 import re
 import string
+import zlib
 from android_env import env_interface
 from android_world.env import adb_utils
 from android_world.env import device_constants
 from android_world.env import interface
 from android_world.utils import file_utils
+from android_world.utils import fixture_cache
 import cv2
 import numpy as np
 from PIL import Image
@@ -161,24 +163,46 @@ def write_to_gallery(
     file_name: The name of the file to write. It will appear in Simple Gallery.
     env: The environment to write to.
   """
-
-  image = _draw_text(data)
-  temp_storage_location = file_utils.convert_to_posix_path(_TMP, file_name)
-  image.save(temp_storage_location)
-  file_utils.copy_data_to_device(
-      temp_storage_location,
-      device_constants.GALLERY_DATA,
-      env.controller,
+  _push_fixture(
+      fixture_cache.FixtureSpec(
+          "text_image", {"text": data}, os.path.splitext(file_name)[1]
+      ),
+      file_utils.convert_to_posix_path(
+          device_constants.GALLERY_DATA, file_name
+      ),
+      env,
   )
-  try:
-    os.remove(temp_storage_location)
-  except FileNotFoundError:
-    logging.warning(
-        "Local file %s not found, so cannot remove it.", temp_storage_location
-    )
   adb_utils.close_app("simple gallery", env.controller)
 
 
+def _push_fixture(
+    spec: fixture_cache.FixtureSpec,
+    remote_path: str,
+    env: interface.AsyncEnv,
+) -> None:
+  """Pushes a generated file to the device, reusing a cached copy if possible.
+
+  Args:
+    spec: Describes how to generate the file.
+    remote_path: The full path of the file on the device.
+    env: The environment to write to.
+  """
+  cache = fixture_cache.get_default_cache()
+  if cache is not None:
+    file_utils.copy_data_to_device(cache.get(spec), remote_path, env.controller)
+    return
+
+  local = file_utils.convert_to_posix_path(_TMP, spec.key + spec.suffix)
+  fixture_cache.generate(spec, local)
+  try:
+    file_utils.copy_data_to_device(local, remote_path, env.controller)
+  finally:
+    try:
+      os.remove(local)
+    except FileNotFoundError:
+      logging.warning("Local file %s not found, so cannot remove it.", local)
+
+
 def _copy_data_to_device(
     data: str, file_name: str, location: str, env: interface.AsyncEnv
 ):
@@ -216,6 +240,7 @@ def write_to_markor(
   adb_utils.close_app("markor", env.controller)
 
 
+@fixture_cache.register_generator("video")
 def _create_mpeg_with_messages(
     file_path: str,
     messages: list[str],
@@ -223,6 +248,7 @@ def _create_mpeg_with_messages(
     height: int = 240,
     fps: int = 30,
     display_time: int = 1,
+    seed: int | None = None,
 ) -> None:
   """Create a small MPEG video file with messages displayed on each frame.
 
@@ -234,6 +260,7 @@ def _create_mpeg_with_messages(
     height: The height of the video frames.
     fps: The frames per second for the video.
     display_time: The time in seconds each message is displayed.
+    seed: Seed for the background noise, making the file reproducible.
 
   Raises:
     RuntimeError: If the video file was not written to the device.
@@ -241,9 +268,10 @@ def _create_mpeg_with_messages(
   fourcc = cv2.VideoWriter_fourcc(*"mp4v")
   out = cv2.VideoWriter(file_path, fourcc, fps, (width, height))
   frames_per_message = display_time * fps
+  rng = np.random.default_rng(seed)
   for message in messages:
     for _ in range(frames_per_message):
-      frame = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+      frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
       cv2.putText(
           frame,
           message,
@@ -288,22 +316,23 @@ def write_video_file_to_device(
   if messages is None:
     messages = ["test" + str(random.randint(0, 1_000_000))]
 
-  _create_mpeg_with_messages(
-      file_utils.convert_to_posix_path(_TMP, file_name),
-      messages,
-      display_time=message_display_time,
-      width=width,
-      height=height,
-      fps=fps,
-  )
-
-  file_utils.copy_data_to_device(
-      file_utils.convert_to_posix_path(_TMP, file_name),
-      location,
-      env.controller,
+  params = {
+      "messages": messages,
+      "display_time": message_display_time,
+      "width": width,
+      "height": height,
+      "fps": fps,
+  }
+  # The noise only has to differ between videos with different content.
+  params["seed"] = zlib.crc32(repr(sorted(params.items())).encode("utf-8"))
+  _push_fixture(
+      fixture_cache.FixtureSpec("video", params, os.path.splitext(file_name)[1]),
+      file_utils.convert_to_posix_path(location, file_name),
+      env,
   )
 
 
+@fixture_cache.register_generator("mp3")
 def _create_test_mp3(
     file_path: str, artist: str, title: str, duration_milliseconds: int = 1000
 ) -> str:
@@ -341,22 +370,19 @@ def write_mp3_file_to_device(
     title: The title of the song.
     duration_milliseconds: The duration of the MP3 file in milliseconds.
   """
-  local = file_utils.convert_to_posix_path(_TMP, os.path.basename(remote_path))
-  _create_test_mp3(
-      local,
-      artist=artist,
-      title=title,
-      duration_milliseconds=duration_milliseconds,
-  )
-  file_utils.copy_data_to_device(
-      local,
+  _push_fixture(
+      fixture_cache.FixtureSpec(
+          "mp3",
+          {
+              "artist": artist,
+              "title": title,
+              "duration_milliseconds": duration_milliseconds,
+          },
+          os.path.splitext(remote_path)[1],
+      ),
       remote_path,
-      env.controller,
+      env,
   )
-  try:
-    os.remove(local)
-  except FileNotFoundError:
-    logging.warning("Local file %s not found, so cannot remove it.", local)
 
 
 def dict_to_notes(input_dict: dict[str, tuple[str, str]]) -> str:
@@ -455,6 +481,12 @@ def _draw_text(text: str, font_size: int = 24) -> Image.Image:
   return img
 
 
+@fixture_cache.register_generator("text_image")
+def _create_text_image(file_path: str, text: str) -> None:
+  """Writes an image showing the text, in the format given by the extension."""
+  _draw_text(text).save(file_path)
+
+
 def clear_internal_storage(env: interface.AsyncEnv) -> None:
   """Deletes all files from internal storage, leaving directory structure intact."""
   adb_command = [
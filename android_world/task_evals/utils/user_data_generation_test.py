@@ -13,9 +13,13 @@
 # limitations under the License.
 
 import tempfile
+from unittest import mock
 from absl.testing import absltest
+from android_world.env import adb_utils
+from android_world.env import device_constants
 from android_world.task_evals.utils import user_data_generation
 from android_world.utils import file_utils
+from android_world.utils import fixture_cache
 import cv2
 
 
@@ -60,5 +64,62 @@ class TestCreateMpegWithMessages(absltest.TestCase):
     self.assertEqual(total_frames, 300)
 
 
+class FixtureCachingTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.cache = fixture_cache.FixtureCache(
+        self.enter_context(tempfile.TemporaryDirectory()), max_bytes=10**8
+    )
+    self.enter_context(
+        mock.patch.object(
+            fixture_cache, "get_default_cache", return_value=self.cache
+        )
+    )
+    self.mock_copy_data_to_device = self.enter_context(
+        mock.patch.object(file_utils, "copy_data_to_device")
+    )
+    self.enter_context(mock.patch.object(adb_utils, "close_app"))
+    self.env = mock.MagicMock()
+
+  def test_repeated_gallery_image_is_rendered_once(self):
+    with mock.patch.object(
+        user_data_generation,
+        "_draw_text",
+        wraps=user_data_generation._draw_text,
+    ) as mock_draw_text:
+      user_data_generation.write_to_gallery("data", "a.jpg", self.env)
+      user_data_generation.write_to_gallery("data", "b.jpg", self.env)
+
+    mock_draw_text.assert_called_once()
+    (first_local, first_remote, _), (second_local, second_remote, _) = [
+        call.args for call in self.mock_copy_data_to_device.call_args_list
+    ]
+    self.assertEqual(first_local, second_local)
+    self.assertEqual(
+        first_remote,
+        file_utils.convert_to_posix_path(device_constants.GALLERY_DATA, "a.jpg"),
+    )
+    self.assertEqual(
+        second_remote,
+        file_utils.convert_to_posix_path(device_constants.GALLERY_DATA, "b.jpg"),
+    )
+
+  def test_video_is_reproducible(self):
+    user_data_generation.write_video_file_to_device(
+        "video.mp4", "/sdcard", self.env, messages=["hi"], width=16, height=16
+    )
+    local = self.mock_copy_data_to_device.call_args.args[0]
+    with open(local, "rb") as f:
+      cached = f.read()
+    other = file_utils.convert_to_posix_path(tempfile.mkdtemp(), "other.mp4")
+    spec = next(self.cache.specs())
+
+    fixture_cache.generate(spec, other)
+
+    with open(other, "rb") as f:
+      self.assertEqual(f.read(), cached)
+
+
 if __name__ == "__main__":
   absltest.main()
@@ -14,29 +14,320 @@
 
 """Utils for handling snapshots for apps."""
 
+import dataclasses
+import shlex
+
 from absl import logging
 from android_env import env_interface
+from android_env.proto import adb_pb2
 from android_world.env import adb_utils
 from android_world.env import device_constants
 from android_world.utils import file_utils
 
+# First line of every manifest; bump when the format changes so stale
+# manifests are rebuilt rather than misread.
+_MANIFEST_HEADER = "# android_world snapshot manifest v1"
+
+# Maximum number of shell commands chained into a single adb call when
+# applying a diff, to stay well below the device's argument length limit.
+_MAX_COMMANDS_PER_CALL = 64
+
+# Lists every entry below the current directory as `mode|size|mtime|path`.
+# `%A` is the `ls`-style permission string, so its first character encodes the
+# entry type ("-" regular file, "d" directory, "l" symlink).
+_STAT_COMMAND = "find . -mindepth 1 -exec stat -c '%A|%s|%Y|%n' {} +"
+
+
+@dataclasses.dataclass(frozen=True)
+class ManifestEntry:
+  """A single file system entry of an app data directory.
+
+  Attributes:
+    path: Path relative to the app data directory, e.g. "databases/foo.db".
+    kind: Entry type; "-" for regular files, "d" for directories and "l" for
+      symbolic links.
+    size: Size in bytes.
+    mtime: Modification time in seconds since the epoch.
+    md5: MD5 digest of the file contents. Only set for regular files in a
+      snapshot manifest.
+  """
+
+  path: str
+  kind: str
+  size: int
+  mtime: int
+  md5: str = ""
+
+
+@dataclasses.dataclass(frozen=True)
+class SnapshotDiff:
+  """Changes required to bring app data back in line with its snapshot.
+
+  Attributes:
+    to_copy: Paths that were modified, added to the snapshot or deleted from
+      the app data, and need to be copied back from the snapshot.
+    to_delete: Paths that exist in the app data but not in the snapshot.
+  """
+
+  to_copy: tuple[str, ...]
+  to_delete: tuple[str, ...]
+
+  @property
+  def is_empty(self) -> bool:
+    return not self.to_copy and not self.to_delete
+
+
+def _package_name(app_name: str) -> str:
+  return adb_utils.extract_package_name(adb_utils.get_adb_activity(app_name))
+
 
 def _app_data_path(app_name: str) -> str:
-  package_name = adb_utils.extract_package_name(
-      adb_utils.get_adb_activity(app_name)
+  return file_utils.convert_to_posix_path(
+      "/data/data/", _package_name(app_name)
   )
-  return file_utils.convert_to_posix_path("/data/data/", package_name)
 
 
 def _snapshot_path(app_name: str) -> str:
-  package_name = adb_utils.extract_package_name(
-      adb_utils.get_adb_activity(app_name)
+  return file_utils.convert_to_posix_path(
+      device_constants.SNAPSHOT_DATA, _package_name(app_name)
   )
+
+
+def _manifest_path(app_name: str) -> str:
   return file_utils.convert_to_posix_path(
-      device_constants.SNAPSHOT_DATA, package_name
+      device_constants.SNAPSHOT_DATA, f"{_package_name(app_name)}.manifest"
+  )
+
+
+def _normalize_path(path: str) -> str:
+  return path[2:] if path.startswith("./") else path
+
+
+def _parse_stat_listing(output: str) -> dict[str, ManifestEntry]:
+  """Parses the output of `_STAT_COMMAND` into manifest entries by path."""
+  entries = {}
+  for line in output.replace("\r", "").splitlines():
+    parts = line.split("|", 3)
+    if len(parts) != 4 or not parts[0]:
+      continue
+    mode, size, mtime, path = parts
+    try:
+      entry = ManifestEntry(
+          path=_normalize_path(path),
+          kind=mode[0],
+          size=int(size),
+          mtime=int(mtime),
+      )
+    except ValueError:
+      logging.warning("Skipping unparsable stat line: %s", line)
+      continue
+    entries[entry.path] = entry
+  return entries
+
+
+def _parse_md5_listing(output: str) -> dict[str, str]:
+  """Parses `md5sum` output into a mapping from relative path to digest."""
+  digests = {}
+  for line in output.replace("\r", "").splitlines():
+    parts = line.split(None, 1)
+    if len(parts) == 2:
+      digests[_normalize_path(parts[1])] = parts[0]
+  return digests
+
+
+def _serialize_manifest(entries: dict[str, ManifestEntry]) -> str:
+  lines = [_MANIFEST_HEADER]
+  for path in sorted(entries):
+    entry = entries[path]
+    lines.append(
+        f"{entry.kind}|{entry.size}|{entry.mtime}|{entry.md5}|{entry.path}"
+    )
+  return "\n".join(lines) + "\n"
+
+
+def _parse_manifest(content: str) -> dict[str, ManifestEntry] | None:
+  """Parses a manifest; returns None if it is missing or in an old format."""
+  lines = content.replace("\r", "").splitlines()
+  if not lines or lines[0] != _MANIFEST_HEADER:
+    return None
+  entries = {}
+  for line in lines[1:]:
+    parts = line.split("|", 4)
+    if len(parts) != 5:
+      return None
+    kind, size, mtime, md5, path = parts
+    entries[path] = ManifestEntry(
+        path=path, kind=kind, size=int(size), mtime=int(mtime), md5=md5
+    )
+  return entries
+
+
+def _clear_directory_command(directory_path: str) -> str:
+  """Shell command that empties a directory if it exists and has contents."""
+  path = shlex.quote(directory_path)
+  return f'[ ! -d {path} ] || [ -z "$(ls -1 {path})" ] || rm -r {path}/*'
+
+
+def _build_manifest(
+    app_name: str, env: env_interface.AndroidEnvInterface
+) -> dict[str, ManifestEntry]:
+  """Records size, mtime and content hash of every file in a snapshot."""
+  snapshot_path = shlex.quote(_snapshot_path(app_name))
+  with adb_utils.ShellBatch(env) as batch:
+    listing = batch.add(
+        f"cd {snapshot_path} && {_STAT_COMMAND}",
+        f"Failed to list files in {snapshot_path}.",
+    )
+    digests = batch.add(
+        f"cd {snapshot_path} && find . -type f -exec md5sum {{}} +",
+        f"Failed to hash files in {snapshot_path}.",
+    )
+  batch.check_ok()
+  md5s = _parse_md5_listing(batch.results[digests].output)
+  entries = {
+      path: dataclasses.replace(entry, md5=md5s.get(path, ""))
+      for path, entry in _parse_stat_listing(
+          batch.results[listing].output
+      ).items()
+  }
+  adb_utils.check_ok(
+      env.execute_adb_call(
+          adb_pb2.AdbRequest(
+              push=adb_pb2.AdbRequest.Push(
+                  content=_serialize_manifest(entries).encode(),
+                  path=_manifest_path(app_name),
+              )
+          )
+      ),
+      f"Failed to write {app_name} snapshot manifest.",
+  )
+  return entries
+
+
+def _md5_digests(
+    directory_path: str,
+    paths: list[str],
+    env: env_interface.AndroidEnvInterface,
+) -> dict[str, str]:
+  """Computes MD5 digests of files relative to a device directory."""
+  if not paths:
+    return {}
+  quoted = " ".join(shlex.quote(f"./{path}") for path in paths)
+  with adb_utils.ShellBatch(env) as batch:
+    batch.add(
+        f"cd {shlex.quote(directory_path)} && md5sum {quoted}",
+        allow_failure=True,
+    )
+  return _parse_md5_listing(batch.results[0].output)
+
+
+def _is_under(path: str, parents: set[str]) -> bool:
+  """Whether any proper ancestor of `path` is in `parents`."""
+  parent = path.rpartition("/")[0]
+  while parent:
+    if parent in parents:
+      return True
+    parent = parent.rpartition("/")[0]
+  return False
+
+
+def diff_against_manifest(
+    manifest: dict[str, ManifestEntry],
+    current: dict[str, ManifestEntry],
+    current_md5: dict[str, str] | None = None,
+) -> SnapshotDiff:
+  """Computes which app data entries differ from the snapshot.
+
+  Regular files whose size matches but whose mtime differs are treated as
+  unchanged if their content hash (from `current_md5`) matches the manifest.
+
+  Args:
+    manifest: Entries of the snapshot.
+    current: Entries currently present in the app data directory.
+    current_md5: Optional content hashes of current files, keyed by path.
+
+  Returns:
+    The paths to copy back from the snapshot and to delete. Entries below a
+    path that is already copied or deleted as a whole are omitted.
+  """
+  current_md5 = current_md5 or {}
+  to_copy, to_delete = set(), set()
+  for path, entry in manifest.items():
+    existing = current.get(path)
+    if existing is None:
+      to_copy.add(path)
+    elif existing.kind != entry.kind:
+      to_delete.add(path)
+      to_copy.add(path)
+    elif entry.kind == "d":
+      continue
+    elif existing.size != entry.size:
+      to_copy.add(path)
+    elif existing.mtime != entry.mtime:
+      if not entry.md5 or current_md5.get(path) != entry.md5:
+        to_copy.add(path)
+  for path in current:
+    if path not in manifest:
+      to_delete.add(path)
+
+  # Copying or deleting a directory covers everything below it.
+  copied_dirs = {p for p in to_copy if manifest[p].kind == "d"}
+  deleted_dirs = {p for p in to_delete if current[p].kind == "d"}
+  return SnapshotDiff(
+      to_copy=tuple(
+          sorted(p for p in to_copy if not _is_under(p, copied_dirs))
+      ),
+      to_delete=tuple(
+          sorted(p for p in to_delete if not _is_under(p, deleted_dirs))
+      ),
   )
 
 
+def _apply_diff(
+    diff: SnapshotDiff,
+    app_name: str,
+    env: env_interface.AndroidEnvInterface,
+) -> None:
+  """Deletes extra entries and copies changed ones back from the snapshot.
+
+  The commands are sent in chunks of `_MAX_COMMANDS_PER_CALL`, each chunk as a
+  single batched adb call.
+
+  Args:
+    diff: The changes to apply.
+    app_name: App whose data is restored.
+    env: Android environment.
+
+  Raises:
+    RuntimeError: If any entry could not be restored.
+  """
+  snapshot_path = _snapshot_path(app_name)
+  app_data_path = _app_data_path(app_name)
+  commands = []
+  for path in diff.to_delete:
+    dest = shlex.quote(f"{app_data_path}/{path}")
+    commands.append((f"rm -rf {dest}", f"Failed to delete {dest}."))
+  for path in diff.to_copy:
+    src = shlex.quote(f"{snapshot_path}/{path}")
+    dest = shlex.quote(f"{app_data_path}/{path}")
+    # Same permissions workaround as the full restore, limited to the
+    # rewritten entries.
+    commands.append((
+        f"rm -rf {dest} && cp -a {src} {dest} && restorecon -RD {dest} &&"
+        f" chmod -R 777 {dest}",
+        f"Failed to restore {dest} from snapshot.",
+    ))
+  for i in range(0, len(commands), _MAX_COMMANDS_PER_CALL):
+    with adb_utils.ShellBatch(env) as batch:
+      for command, error_message in commands[i : i + _MAX_COMMANDS_PER_CALL]:
+        batch.add(command, error_message)
+    batch.check_ok()
+
+
+def _clear_snapshot_metadata_command(app_name: str) -> str:
+  return f"rm -f {shlex.quote(_manifest_path(app_name))}"
+
+
 def clear_snapshot(
     app_name: str,
     env: env_interface.AndroidEnvInterface,
@@ -48,14 +339,21 @@ def clear_snapshot(
     env: Android environment.
   """
   snapshot_path = _snapshot_path(app_name)
-  file_utils.clear_directory(snapshot_path, env)
+  with adb_utils.ShellBatch(env) as batch:
+    batch.add(
+        _clear_directory_command(snapshot_path),
+        f"Failed to clear directory {snapshot_path}.",
+    )
+    batch.add(_clear_snapshot_metadata_command(app_name))
+  batch.check_ok()
 
 
 def save_snapshot(app_name: str, env: env_interface.AndroidEnvInterface):
   """Stores a snapshot of application data on the device.
 
   Only a single snapshot is stored at any given time. Repeated calls to
-  `save_snapshot()` overwrite any prior snapshot.
+  `save_snapshot()` overwrite any prior snapshot. A manifest of the snapshot
+  is stored alongside it for incremental restores.
 
   Args:
     app_name: App package to be snapshotted.
@@ -65,24 +363,97 @@ def save_snapshot(app_name: str, env: env_interface.AndroidEnvInterface):
     RuntimeError: on failed or incomplete snapshot.
   """
   snapshot_path = _snapshot_path(app_name)
+  app_data_path = _app_data_path(app_name)
+  with adb_utils.ShellBatch(env) as batch:
+    cleared = batch.add(
+        _clear_directory_command(snapshot_path), allow_failure=True
+    )
+    batch.add(_clear_snapshot_metadata_command(app_name), allow_failure=True)
+    source_exists = batch.add(f"[ -d {shlex.quote(app_data_path)} ]")
+    batch.add(
+        f"mkdir -p {shlex.quote(snapshot_path)}",
+        f"Failed to create directory {snapshot_path}.",
+    )
+    batch.add(
+        f"cp -a {shlex.quote(app_data_path)}/. {shlex.quote(snapshot_path)}/",
+        f"Failure copying {app_data_path} directory to {snapshot_path}.",
+    )
+  if not batch.results[cleared].ok:
+    logging.warning(
+        "Continuing to save %s snapshot after failing to clear prior snapshot.",
+        app_name,
+    )
+  if batch.results[source_exists].exit_code == 1:
+    logging.warning(
+        "Source directory %s does not exist, ignoring copy_dir.", app_data_path
+    )
+    return
+  batch.check_ok()
+
   try:
-    file_utils.clear_directory(snapshot_path, env)
+    _build_manifest(app_name, env)
   except RuntimeError:
-    logging.warn(
-        "Continuing to save %s snapshot after failing to clear prior snapshot.",
+    logging.warning(
+        "Failed to build %s snapshot manifest; it will be rebuilt on the next"
+        " incremental restore.",
         app_name,
     )
 
-  file_utils.copy_dir(_app_data_path(app_name), snapshot_path, env)
+
+def _restore_snapshot_full(
+    app_name: str, env: env_interface.AndroidEnvInterface
+) -> None:
+  """Replaces all application data with the stored snapshot."""
+  snapshot_path = _snapshot_path(app_name)
+  app_data_path = _app_data_path(app_name)
+  with adb_utils.ShellBatch(env) as batch:
+    cleared = batch.add(
+        _clear_directory_command(app_data_path), allow_failure=True
+    )
+    batch.add(
+        f"mkdir -p {shlex.quote(app_data_path)}",
+        f"Failed to create directory {app_data_path}.",
+    )
+    batch.add(
+        f"cp -a {shlex.quote(snapshot_path)}/. {shlex.quote(app_data_path)}/",
+        f"Failure copying {snapshot_path} directory to {app_data_path}.",
+    )
+    # File permissions, ownership, and security context may be lost during
+    # save and/or loading of the snapshot. As a workaround, restore the
+    # security context and open up full file permissions.
+    batch.add(
+        ["restorecon", "-RD", app_data_path],
+        "Failed to restore app data security context.",
+    )
+    batch.add(
+        ["chmod", "777", "-R", app_data_path],
+        "Failed to set app data permissions.",
+    )
+  if not batch.results[cleared].ok:
+    logging.warning(
+        "Continuing to restore %s snapshot after failing to clear application"
+        " data.",
+        app_name,
+    )
+  batch.check_ok()
 
 
-def restore_snapshot(app_name: str, env: env_interface.AndroidEnvInterface):
+def restore_snapshot(
+    app_name: str,
+    env: env_interface.AndroidEnvInterface,
+    incremental: bool = False,
+):
   """Loads a snapshot of application data.
 
   Args:
     app_name: App package that will have its data overwritten with the stored
       snapshot.
     env: Android environment.
+    incremental: If True, compares the app data against the snapshot manifest
+      and only rewrites entries that were modified, added or deleted. Entries
+      are compared by type, size, exact mtime and, where only the mtime moved,
+      content hash, so the check does not rely on the device clock moving
+      forward; tasks routinely set it back.
 
   Raises:
     RuntimeError: when there is no available snapshot or a failure occurs while
@@ -91,33 +462,56 @@ def restore_snapshot(app_name: str, env: env_interface.AndroidEnvInterface):
   adb_utils.close_app(app_name, env)
 
   snapshot_path = _snapshot_path(app_name)
-  if not file_utils.check_directory_exists(snapshot_path, env):
-    raise RuntimeError(f"Snapshot not found in {snapshot_path}.")
-
   app_data_path = _app_data_path(app_name)
-  try:
-    file_utils.clear_directory(app_data_path, env)
-  except RuntimeError:
-    logging.warn(
-        "Continuing to restore %s snapshot after failing to clear application"
-        " data.",
-        app_name,
+  # A single adb call checks the snapshot and, for incremental restores,
+  # lists the current app data and reads the manifest.
+  with adb_utils.ShellBatch(env) as batch:
+    batch.add(
+        f"[ -d {shlex.quote(snapshot_path)} ]",
+        f"Snapshot not found in {snapshot_path}.",
     )
+    if incremental:
+      state = batch.add(
+          f"cd {shlex.quote(app_data_path)} && {_STAT_COMMAND}",
+          allow_failure=True,
+      )
+      manifest = batch.add(
+          f"cat {shlex.quote(_manifest_path(app_name))}", allow_failure=True
+      )
+  batch.check_ok()
 
-  file_utils.copy_dir(snapshot_path, app_data_path, env)
-
-  # File permissions, ownership, and security context may be lost during save
-  # and/or loading of the snapshot. As a workaround, restore the security
-  # context and open up full file permissions.
-  adb_utils.check_ok(
-      adb_utils.issue_generic_request(
-          ["shell", "restorecon", "-RD", app_data_path], env
-      ),
-      "Failed to restore app data security context.",
+  if not incremental or not batch.results[state].ok:
+    _restore_snapshot_full(app_name, env)
+    return
+  entries = _parse_manifest(batch.results[manifest].output)
+  if entries is None:
+    logging.info("Building snapshot manifest for %s.", app_name)
+    entries = _build_manifest(app_name, env)
+  current = _parse_stat_listing(batch.results[state].output)
+  # Content hashes are only needed for files that look modified solely because
+  # their mtime moved.
+  touched = [
+      path
+      for path, entry in entries.items()
+      if entry.kind == "-"
+      and entry.md5
+      and path in current
+      and current[path].kind == "-"
+      and current[path].size == entry.size
+      and current[path].mtime != entry.mtime
+  ]
+  diff = diff_against_manifest(
+      entries, current, _md5_digests(app_data_path, touched, env)
   )
-  adb_utils.check_ok(
-      adb_utils.issue_generic_request(
-          ["shell", "chmod", "777", "-R", app_data_path], env
-      ),
-      "Failed to set app data permissions.",
+  if diff.is_empty:
+    logging.info(
+        "Skipping %s snapshot restore; app data is unchanged.", app_name
+    )
+    return
+  logging.info(
+      "Restoring %s snapshot: %d entries to copy, %d to delete.",
+      app_name,
+      len(diff.to_copy),
+      len(diff.to_delete),
   )
+  _apply_diff(diff, app_name, env)
@@ -0,0 +1,263 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.env import adb_utils
+from android_world.utils import app_snapshot
+from android_world.utils import fake_adb_responses
+
+_Entry = app_snapshot.ManifestEntry
+
+# Substring of the command listing the app data of an incremental restore.
+_LIST_APP_DATA = 'cd /data/data/net.osmand &&'
+
+
+class ManifestTest(absltest.TestCase):
+
+  def test_parse_stat_listing(self):
+    entries = app_snapshot._parse_stat_listing(
+        'drwxrwx--x|4096|1700000000|./databases\r\n'
+        '-rw-rw----|12|1700000001|./databases/notes.db\n'
+        'lrwxrwxrwx|20|1700000002|./lib\n'
+        '-rw-rw----|3|1700000003|./files/a|b.txt\n'
+    )
+
+    self.assertEqual(
+        entries['databases/notes.db'],
+        _Entry('databases/notes.db', '-', 12, 1700000001),
+    )
+    self.assertEqual(entries['databases'].kind, 'd')
+    self.assertEqual(entries['lib'].kind, 'l')
+    self.assertIn('files/a|b.txt', entries)
+
+  def test_manifest_round_trip(self):
+    entries = {
+        'databases': _Entry('databases', 'd', 4096, 1),
+        'databases/notes.db': _Entry('databases/notes.db', '-', 12, 2, 'abc'),
+    }
+
+    parsed = app_snapshot._parse_manifest(
+        app_snapshot._serialize_manifest(entries)
+    )
+
+    self.assertEqual(parsed, entries)
+
+  def test_parse_manifest_rejects_unknown_format(self):
+    self.assertIsNone(app_snapshot._parse_manifest(''))
+    self.assertIsNone(app_snapshot._parse_manifest('-|1|2|abc|x\n'))
+
+
+class DiffAgainstManifestTest(absltest.TestCase):
+
+  def test_unchanged(self):
+    manifest = {
+        'db': _Entry('db', 'd', 4096, 1),
+        'db/a.db': _Entry('db/a.db', '-', 10, 2, 'h'),
+    }
+    current = {
+        'db': _Entry('db', 'd', 8192, 5),
+        'db/a.db': _Entry('db/a.db', '-', 10, 2),
+    }
+
+    self.assertTrue(
+        app_snapshot.diff_against_manifest(manifest, current).is_empty
+    )
+
+  def test_modified_added_and_deleted(self):
+    manifest = {
+        'a': _Entry('a', '-', 10, 1, 'h1'),
+        'b': _Entry('b', '-', 10, 1, 'h2'),
+        'c': _Entry('c', '-', 10, 1, 'h3'),
+        'gone': _Entry('gone', '-', 1, 1, 'h4'),
+    }
+    current = {
+        'a': _Entry('a', '-', 11, 1),  # Size changed.
+        'b': _Entry('b', '-', 10, 9),  # Only mtime changed, same content.
+        'c': _Entry('c', '-', 10, 9),  # Same size, different content.
+        'new': _Entry('new', '-', 1, 9),
+    }
+
+    diff = app_snapshot.diff_against_manifest(
+        manifest, current, {'b': 'h2', 'c': 'other'}
+    )
+
+    self.assertEqual(diff.to_copy, ('a', 'c', 'gone'))
+    self.assertEqual(diff.to_delete, ('new',))
+
+  def test_directories_are_handled_as_a_whole(self):
+    manifest = {
+        'db': _Entry('db', 'd', 4096, 1),
+        'db/a.db': _Entry('db/a.db', '-', 10, 1, 'h'),
+    }
+    current = {
+        'cache': _Entry('cache', 'd', 4096, 1),
+        'cache/x': _Entry('cache/x', '-', 1, 1),
+    }
+
+    diff = app_snapshot.diff_against_manifest(manifest, current)
+
+    self.assertEqual(diff.to_copy, ('db',))
+    self.assertEqual(diff.to_delete, ('cache',))
+
+  def test_type_change_is_deleted_then_copied(self):
+    manifest = {'x': _Entry('x', '-', 1, 1, 'h')}
+    current = {'x': _Entry('x', 'l', 1, 1)}
+
+    diff = app_snapshot.diff_against_manifest(manifest, current)
+
+    self.assertEqual(diff.to_copy, ('x',))
+    self.assertEqual(diff.to_delete, ('x',))
+
+
+class RestoreSnapshotTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.env = mock.MagicMock()
+    self.mock_close_app = self.enter_context(
+        mock.patch.object(adb_utils, 'close_app')
+    )
+    self.mock_issue_generic_request = self.enter_context(
+        mock.patch.object(adb_utils, 'issue_generic_request')
+    )
+    self.mock_issue_generic_request.side_effect = self._fake_request
+    # Maps a substring of a shell command to its exit code and output.
+    self.device_responses: dict[str, tuple[int, str]] = {}
+    self.commands: list[list[str]] = []
+
+  def _fake_request(self, args, env, timeout_sec=None):
+    del env, timeout_sec
+    script = args[1]
+    commands = fake_adb_responses.get_shell_batch_commands(script)
+    self.commands.append(commands)
+    results = []
+    for command in commands:
+      result = next(
+          (
+              response
+              for key, response in self.device_responses.items()
+              if key in command
+          ),
+          (0, ''),
+      )
+      results.append(result)
+    return fake_adb_responses.create_shell_batch_response(script, results)
+
+  def test_incremental_skips_unchanged_app(self):
+    self.device_responses[_LIST_APP_DATA] = (0, '-rw-rw----|10|1|./a.db\n')
+    self.device_responses['cat '] = (
+        0,
+        app_snapshot._serialize_manifest({'a.db': _Entry('a.db', '-', 10, 1)}),
+    )
+
+    app_snapshot.restore_snapshot('osmand', self.env, incremental=True)
+
+    self.assertLen(self.commands, 1)
+    self.mock_close_app.assert_called_once()
+
+  def test_incremental_detects_writes_after_clock_moved_back(self):
+    # The task set the clock back, so the write left an mtime older than the
+    # snapshot's.
+    self.device_responses[_LIST_APP_DATA] = (0, '-rw-rw----|10|1|./a.db\n')
+    self.device_responses['cat '] = (
+        0,
+        app_snapshot._serialize_manifest(
+            {'a.db': _Entry('a.db', '-', 10, 5, 'h')}
+        ),
+    )
+    self.device_responses['md5sum'] = (0, 'other  ./a.db\n')
+
+    app_snapshot.restore_snapshot('osmand', self.env, incremental=True)
+
+    self.assertLen(self.commands, 3)
+    (copy,) = self.commands[2]
+    self.assertIn(
+        'cp -a /data/data/android_world/snapshots/net.osmand/a.db'
+        ' /data/data/net.osmand/a.db',
+        copy,
+    )
+
+  def test_missing_snapshot_raises(self):
+    self.device_responses['[ -d /data/data/android_world'] = (1, '')
+
+    with self.assertRaisesRegex(RuntimeError, 'Snapshot not found'):
+      app_snapshot.restore_snapshot('osmand', self.env, incremental=True)
+
+  def test_incremental_copies_only_changed_files(self):
+    self.device_responses[_LIST_APP_DATA] = (
+        0,
+        'drwxrwx--x|4096|5|./db\n'
+        '-rw-rw----|10|1|./db/a.db\n'
+        '-rw-rw----|20|5|./db/b.db\n'
+        '-rw-rw----|1|5|./db/b.db-journal\n',
+    )
+    self.device_responses['cat '] = (
+        0,
+        app_snapshot._serialize_manifest({
+            'db': _Entry('db', 'd', 4096, 1),
+            'db/a.db': _Entry('db/a.db', '-', 10, 1, 'h'),
+            'db/b.db': _Entry('db/b.db', '-', 10, 1, 'h'),
+        }),
+    )
+
+    app_snapshot.restore_snapshot('osmand', self.env, incremental=True)
+
+    self.assertLen(self.commands, 2)
+    delete, copy = self.commands[1]
+    self.assertEqual(delete, 'rm -rf /data/data/net.osmand/db/b.db-journal')
+    self.assertIn(
+        'cp -a /data/data/android_world/snapshots/net.osmand/db/b.db'
+        ' /data/data/net.osmand/db/b.db',
+        copy,
+    )
+    self.assertIn('restorecon -RD /data/data/net.osmand/db/b.db', copy)
+    self.env.execute_adb_call.assert_not_called()  # Manifest was reused.
+
+  def test_incremental_builds_missing_manifest(self):
+    self.device_responses[_LIST_APP_DATA] = (0, '-rw-rw----|10|1|./a.db\n')
+    self.device_responses['cat '] = (1, 'No such file or directory')
+    self.device_responses['md5sum'] = (0, 'h  ./a.db\n')
+    self.device_responses['stat -c'] = (0, '-rw-rw----|10|1|./a.db\n')
+    self.env.execute_adb_call.return_value = (
+        fake_adb_responses.create_successful_generic_response('')
+    )
+
+    app_snapshot.restore_snapshot('osmand', self.env, incremental=True)
+
+    push = self.env.execute_adb_call.call_args.args[0].push
+    self.assertEqual(
+        push.path, '/data/data/android_world/snapshots/net.osmand.manifest'
+    )
+    self.assertIn(b'-|10|1|h|a.db', push.content)
+    # Nothing is restored since nothing changed.
+    self.assertLen(self.commands, 2)
+
+  def test_full_restore_rewrites_everything(self):
+    app_snapshot.restore_snapshot('osmand', self.env)
+
+    self.assertLen(self.commands, 2)
+    full_restore = self.commands[1]
+    self.assertIn(
+        'cp -a /data/data/android_world/snapshots/net.osmand/.'
+        ' /data/data/net.osmand/',
+        full_restore,
+    )
+    self.assertIn('restorecon -RD /data/data/net.osmand', full_restore)
+    self.assertIn('chmod 777 -R /data/data/net.osmand', full_restore)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -16,8 +16,9 @@
 
 import dataclasses
 import re
+import shlex
 import time
-from typing import Iterator
+from typing import Iterator, Sequence
 
 from android_world.env import actuation
 from android_world.env import adb_utils
@@ -107,6 +108,83 @@ def list_contacts(
   )
 
 
+_RAW_CONTACTS_URI = "content://com.android.contacts/raw_contacts"
+_DATA_URI = "content://com.android.contacts/data"
+_NAME_MIMETYPE = "vnd.android.cursor.item/name"
+_PHONE_MIMETYPE = "vnd.android.cursor.item/phone_v2"
+_PHONE_TYPE_MOBILE = 2
+
+
+def _insert_contact_command(contact: Contact) -> str:
+  """Returns a shell command inserting a contact through the provider.
+
+  The raw contact is inserted first. `content insert` does not print the new
+  row ID, so it is read back as the highest raw contact ID before the name and
+  phone number rows are attached to it.
+
+  Args:
+    contact: The contact to insert.
+  """
+  name = shlex.quote(f"data1:s:{contact.name}")
+  number = shlex.quote(f"data1:s:{contact.number}")
+  return (
+      f"content insert --uri {_RAW_CONTACTS_URI}"
+      " --bind aggregation_mode:i:0"
+      " && raw_contact_id=$("
+      f"content query --uri {_RAW_CONTACTS_URI} --projection _id"
+      " --sort '_id DESC'"
+      r" | sed -n 's/.*_id=\([0-9]*\).*/\1/p' | head -n 1)"
+      ' && [ -n "$raw_contact_id" ]'
+      f" && content insert --uri {_DATA_URI}"
+      ' --bind "raw_contact_id:i:$raw_contact_id"'
+      f" --bind mimetype:s:{_NAME_MIMETYPE} --bind {name}"
+      f" && content insert --uri {_DATA_URI}"
+      ' --bind "raw_contact_id:i:$raw_contact_id"'
+      f" --bind mimetype:s:{_PHONE_MIMETYPE} --bind {number}"
+      f" --bind data2:i:{_PHONE_TYPE_MOBILE}"
+  )
+
+
+def add_contacts(
+    contacts: Sequence[Contact],
+    env: android_world_controller.AndroidWorldController,
+    timeout_sec: float | None = None,
+) -> None:
+  """Adds contacts directly through the contacts provider.
+
+  Unlike `add_contact`, this does not drive the Contacts UI, so many contacts
+  are added with a single adb call and no UI delays. The result is verified
+  with one `list_contacts` call.
+
+  Args:
+    contacts: The contacts to add.
+    env: The android environment to add the contacts to.
+    timeout_sec: Optional timeout for the adb call.
+
+  Raises:
+    RuntimeError: If a contact could not be inserted or is missing afterwards.
+  """
+  if not contacts:
+    return
+  with adb_utils.ShellBatch(env, timeout_sec) as batch:
+    for contact in contacts:
+      batch.add(
+          _insert_contact_command(contact),
+          f"Failed to add contact {contact.name}.",
+      )
+  batch.check_ok()
+
+  present = set(list_contacts(env))
+  missing = [
+      contact
+      for contact in contacts
+      if Contact(contact.name, clean_phone_number(contact.number))
+      not in present
+  ]
+  if missing:
+    raise RuntimeError(f"Contacts missing after insertion: {missing}")
+
+
 def clear_contacts(env: android_world_controller.AndroidWorldController):
   """Clears all contacts on the device."""
   adb_utils.clear_app_data("com.android.providers.contacts", env)
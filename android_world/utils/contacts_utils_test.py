@@ -20,6 +20,7 @@ from android_env.proto import adb_pb2
 from android_world.env import actuation
 from android_world.env import adb_utils
 from android_world.utils import contacts_utils
+from android_world.utils import fake_adb_responses
 
 
 @mock.patch.object(adb_utils, "issue_generic_request")
@@ -102,5 +103,76 @@ class TestContactsUtils(absltest.TestCase):
     mock_generic_request.assert_called_once_with(expected_adb_command, mock_env)
 
 
+
+class AddContactsTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.mock_env = mock.create_autospec(env_interface.AndroidEnvInterface)
+    self.mock_generic_request = self.enter_context(
+        mock.patch.object(adb_utils, "issue_generic_request")
+    )
+    self.mock_list_contacts = self.enter_context(
+        mock.patch.object(contacts_utils, "list_contacts")
+    )
+
+  def _batch_response(self, results):
+    def fake_request(args, env, timeout_sec=None):
+      del env, timeout_sec
+      return fake_adb_responses.create_shell_batch_response(args[1], results)
+
+    return fake_request
+
+  def test_adds_contacts_with_one_call(self):
+    contacts = [
+        contacts_utils.Contact("Emma Watson", "+1 (234) 567"),
+        contacts_utils.Contact("O'Brien", "98765"),
+    ]
+    self.mock_generic_request.side_effect = self._batch_response(
+        [(0, ""), (0, "")]
+    )
+    self.mock_list_contacts.return_value = [
+        contacts_utils.Contact("Emma Watson", "1234567"),
+        contacts_utils.Contact("O'Brien", "98765"),
+    ]
+
+    contacts_utils.add_contacts(contacts, self.mock_env)
+
+    self.mock_generic_request.assert_called_once()
+    self.mock_list_contacts.assert_called_once_with(self.mock_env)
+    commands = fake_adb_responses.get_shell_batch_commands(
+        self.mock_generic_request.call_args.args[0][1]
+    )
+    self.assertLen(commands, 2)
+    self.assertIn("--bind 'data1:s:Emma Watson'", commands[0])
+    self.assertIn("--bind 'data1:s:+1 (234) 567'", commands[0])
+    self.assertIn("'data1:s:O'\"'\"'Brien'", commands[1])
+
+  def test_raises_if_contact_is_missing(self):
+    self.mock_generic_request.side_effect = self._batch_response([(0, "")])
+    self.mock_list_contacts.return_value = []
+
+    with self.assertRaisesRegex(RuntimeError, "missing"):
+      contacts_utils.add_contacts(
+          [contacts_utils.Contact("Emma", "123")], self.mock_env
+      )
+
+  def test_raises_if_insert_fails(self):
+    self.mock_generic_request.side_effect = self._batch_response(
+        [(1, "Error while accessing provider")]
+    )
+
+    with self.assertRaisesRegex(RuntimeError, "Failed to add contact Emma"):
+      contacts_utils.add_contacts(
+          [contacts_utils.Contact("Emma", "123")], self.mock_env
+      )
+    self.mock_list_contacts.assert_not_called()
+
+  def test_no_contacts_is_noop(self):
+    contacts_utils.add_contacts([], self.mock_env)
+
+    self.mock_generic_request.assert_not_called()
+
+
 if __name__ == "__main__":
   absltest.main()
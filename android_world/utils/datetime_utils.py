@@ -20,7 +20,6 @@ import random
 import zoneinfo
 
 from android_env import env_interface
-from android_env.proto import adb_pb2
 from android_world.env import adb_utils
 from android_world.env import device_constants
 
@@ -110,17 +109,20 @@ def toggle_auto_settings(
     env: AndroidEnv instance.
     toggle: Whether to enable or disable the settings.
   """
-  adb_utils.put_settings(
-      adb_pb2.AdbRequest.SettingsRequest.Namespace.GLOBAL,
-      'auto_time',
-      toggle.value,
-      env,
+  with adb_utils.ShellBatch(env) as batch:
+    _add_toggle_auto_settings(batch, toggle)
+
+
+def _add_toggle_auto_settings(
+    batch: adb_utils.ShellBatch, toggle: Toggle
+) -> None:
+  batch.add(
+      ['settings', 'put', 'global', 'auto_time', toggle.value],
+      allow_failure=True,
   )
-  adb_utils.put_settings(
-      adb_pb2.AdbRequest.SettingsRequest.Namespace.GLOBAL,
-      'auto_time_zone',
-      toggle.value,
-      env,
+  batch.add(
+      ['settings', 'put', 'global', 'auto_time_zone', toggle.value],
+      allow_failure=True,
   )
 
 
@@ -136,9 +138,10 @@ def setup_datetime(env: env_interface.AndroidEnvInterface) -> None:
     env: AndroidEnv instance.
   """
   adb_utils.set_root_if_needed(env)
-  toggle_auto_settings(env, Toggle.OFF)
-  _enable_24_hour_format(env)
-  _set_timezone_to_utc(env)
+  with adb_utils.ShellBatch(env) as batch:
+    _add_toggle_auto_settings(batch, Toggle.OFF)
+    _add_enable_24_hour_format(batch)
+    _add_set_timezone_to_utc(batch)
 
 
 def set_datetime(
@@ -183,24 +186,20 @@ def advance_system_time(
   )
 
 
-def _enable_24_hour_format(env: env_interface.AndroidEnvInterface) -> None:
+def _add_enable_24_hour_format(batch: adb_utils.ShellBatch) -> None:
   """Sets to 24-hour time format to be consistent and region-independent."""
-  adb_utils.put_settings(
-      adb_pb2.AdbRequest.SettingsRequest.Namespace.SYSTEM,
-      'time_12_24',
-      '24',
-      env,
+  batch.add(
+      ['settings', 'put', 'system', 'time_12_24', '24'], allow_failure=True
   )
 
 
-def _set_timezone_to_utc(env: env_interface.AndroidEnvInterface) -> None:
+def _add_set_timezone_to_utc(batch: adb_utils.ShellBatch) -> None:
   """Sets the Android device's timezone to UTC.
 
   Args:
-      env: An instance of AndroidEnv interface.
+      batch: Batch the command is added to.
   """
-  adb_command = ['shell', 'service', 'call', 'alarm', '3', 's16', 'UTC']
-  adb_utils.issue_generic_request(adb_command, env)
+  batch.add(['service', 'call', 'alarm', '3', 's16', 'UTC'], allow_failure=True)
 
 
 def _set_datetime(
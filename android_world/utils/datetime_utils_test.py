@@ -22,40 +22,31 @@ from android_env import env_interface
 from android_env.proto import adb_pb2
 from android_world.env import adb_utils
 from android_world.utils import datetime_utils
+from android_world.utils import fake_adb_responses
 
 
 @mock.patch.object(adb_utils, 'issue_generic_request')
 class AdbDatetimeManagerTest(absltest.TestCase):
 
-  @mock.patch.object(adb_utils, 'put_settings')
+  @mock.patch.object(adb_utils, 'set_root_if_needed')
   def test_setup_datetime_environment(
-      self, mock_put_settings, unused_mock_issue_generic_request
+      self, unused_mock_set_root_if_needed, mock_issue_generic_request
   ):
     env_mock = mock.create_autospec(env_interface.AndroidEnvInterface)
 
     datetime_utils.setup_datetime(env_mock)
 
-    expected_calls = [
-        mock.call(
-            adb_pb2.AdbRequest.SettingsRequest.Namespace.GLOBAL,
-            'auto_time',
-            '0',
-            env_mock,
-        ),
-        mock.call(
-            adb_pb2.AdbRequest.SettingsRequest.Namespace.GLOBAL,
-            'auto_time_zone',
-            '0',
-            env_mock,
-        ),
-        mock.call(
-            adb_pb2.AdbRequest.SettingsRequest.Namespace.SYSTEM,
-            'time_12_24',
-            '24',
-            env_mock,
-        ),
-    ]
-    mock_put_settings.assert_has_calls(expected_calls, any_order=False)
+    mock_issue_generic_request.assert_called_once()
+    script = mock_issue_generic_request.call_args.args[0][1]
+    self.assertEqual(
+        fake_adb_responses.get_shell_batch_commands(script),
+        [
+            'settings put global auto_time 0',
+            'settings put global auto_time_zone 0',
+            'settings put system time_12_24 24',
+            'service call alarm 3 s16 UTC',
+        ],
+    )
 
   def test_advance_system_time(self, mock_issue_generic_request):
     env_mock = mock.create_autospec(env_interface.AndroidEnvInterface)
@@ -19,6 +19,9 @@ on the mock returning a response to an adb call. This module provides functions
 to construct these for common use cases.
 """
 
+import re
+from typing import Sequence
+
 from android_env.proto import adb_pb2
 from android_world.utils import file_utils
 
@@ -124,3 +127,26 @@ def create_copy_to_device_responses() -> list[adb_pb2.AdbResponse]:
       create_check_directory_exists_response(exists=True),
       create_successful_generic_response(""),
   ]
+
+
+def get_shell_batch_commands(script: str) -> list[str]:
+  """Returns the commands of a script built by `adb_utils.ShellBatch`."""
+  return re.findall(r"^\{ (.*?)\n\} 2>&1$", script, flags=re.M | re.S)
+
+
+def create_shell_batch_response(
+    script: str, results: Sequence[tuple[int, str]]
+) -> adb_pb2.AdbResponse:
+  """Returns an AdbResponse for a script built by `adb_utils.ShellBatch`.
+
+  Args:
+    script: The shell script sent by the batch.
+    results: Exit code and output of each command, in order. Commands without
+      a result are reported as not run.
+  """
+  marker = re.match(r"echo (\S+):0:start", script).group(1)
+  output = ""
+  for i, (exit_code, command_output) in enumerate(results):
+    output += f"{marker}:{i}:start\n{command_output}\n"
+    output += f"{marker}:{i}:{exit_code}\n"
+  return create_successful_generic_response(output)
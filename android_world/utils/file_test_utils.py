@@ -15,6 +15,7 @@
 """Utils for testing file util logic."""
 
 import contextlib
+import fnmatch
 import os
 import shutil
 import tempfile
@@ -28,21 +29,68 @@ def mock_tmp_directory_from_device(
     device_path: str,
     env: env_interface.AndroidEnvInterface,
     timeout_sec: float | None,
+    file_glob: str | None = None,
+    max_file_size_bytes: int | None = None,
+    bulk: bool = True,
 ):
   """Mocks `file_utils.tmp_directory_from_device` for unit testing."""
-  del env, timeout_sec
+  del env, timeout_sec, bulk
   with tempfile.TemporaryDirectory() as tmp_dir:
     parent_dir = file_utils.convert_to_posix_path(
         tmp_dir, os.path.split(os.path.split(device_path)[0])[1]
     )
     try:
       shutil.copytree(device_path, parent_dir)
+      for file_name in os.listdir(parent_dir):
+        file_path = os.path.join(parent_dir, file_name)
+        if not os.path.isfile(file_path):
+          continue
+        if (
+            file_glob is not None and not fnmatch.fnmatch(file_name, file_glob)
+        ) or (
+            max_file_size_bytes is not None
+            and os.path.getsize(file_path) > max_file_size_bytes
+        ):
+          os.remove(file_path)
       yield parent_dir
 
     finally:
       shutil.rmtree(parent_dir)
 
 
+@contextlib.contextmanager
+def mock_tmp_sqlite_db_from_device(
+    remote_db_path: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: float | None = None,
+):
+  """Mocks `file_utils.tmp_sqlite_db_from_device` for unit testing."""
+  del env, timeout_sec
+  with tempfile.TemporaryDirectory() as tmp_dir:
+    for path in [remote_db_path] + [
+        remote_db_path + suffix
+        for suffix in file_utils.SQLITE_COMPANION_SUFFIXES
+    ]:
+      if os.path.isfile(path):
+        shutil.copy(path, tmp_dir)
+    yield tmp_dir
+
+
+def mock_replace_sqlite_db_on_device(
+    local_db_path: str,
+    remote_db_path: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: float | None = None,
+):
+  """Mocks `file_utils.replace_sqlite_db_on_device` for unit testing."""
+  del env, timeout_sec
+  for suffix in file_utils.SQLITE_COMPANION_SUFFIXES:
+    if os.path.isfile(remote_db_path + suffix):
+      os.remove(remote_db_path + suffix)
+  os.makedirs(os.path.dirname(remote_db_path), exist_ok=True)
+  shutil.copy(local_db_path, remote_db_path)
+
+
 def mock_copy_data_to_device(
     local_db_path: str,
     remote_db_path: str,
@@ -81,3 +129,4 @@ def mock_remove_files(directory: str, env: env_interface.AndroidEnvInterface):
       os.unlink(file_path)
     elif os.path.isdir(file_path):
       shutil.rmtree(file_path)
+
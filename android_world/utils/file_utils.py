@@ -17,11 +17,16 @@
 import contextlib
 import dataclasses
 import datetime
+import fnmatch
+import io
 import os
 import pathlib
+import posixpath
 import random
+import shlex
 import shutil
 import string
+import tarfile
 import tempfile
 from typing import Iterator
 from typing import Optional
@@ -32,6 +37,19 @@ from android_env.components import errors
 from android_env.proto import adb_pb2
 from android_world.env import adb_utils
 from android_world.utils import fuzzy_match_lib
+from android_world.utils import tracing
+
+# Device directory for archives created when pulling directories in bulk.
+_DEVICE_TMP_DIRECTORY = "/data/local/tmp"
+# Longest tar command line sent to the device; larger selections are pulled
+# file by file instead.
+_MAX_ARCHIVE_COMMAND_LENGTH = 64 * 1024
+# An archive costs a tar, a pull and a removal on top of listing the files, so
+# smaller selections are pulled file by file instead.
+_MIN_ARCHIVE_FILES = 4
+_MIN_ARCHIVE_BYTES = 4 * 1024 * 1024
+# Files SQLite keeps next to a database, which hold part of its state.
+SQLITE_COMPANION_SUFFIXES = ("-wal", "-shm", "-journal")
 
 
 def get_local_tmp_directory() -> str:
@@ -112,23 +130,17 @@ def clear_directory(
   Raises:
     RuntimeError when directory exists a failure occured while deleting files.
   """
-  if not check_directory_exists(directory_path, env):
-    return
-
-  # Check if the folder is empty
-  res = adb_utils.issue_generic_request(
-      ["shell", "ls", "-1", directory_path], env
-  )
-  folder_contents = res.generic.output.decode().replace("\r", "").strip()
-
-  if folder_contents:
-    adb_utils.check_ok(
-        adb_utils.issue_generic_request(
-            ["shell", "rm", "-r", f"{directory_path}/*"],
-            env,
-        ),
+  path = shlex.quote(directory_path)
+  with adb_utils.ShellBatch(env) as batch:
+    exists = batch.add(f"[ -d {path} ]")
+    # Only clear the folder if it is not empty.
+    batch.add(
+        f'[ -z "$(ls -1 {path})" ] || rm -r {path}/*',
         f"Failed to clear directory {directory_path}.",
     )
+  if batch.results[exists].exit_code == 1:
+    return
+  batch.check_ok()
 
 
 def create_file(
@@ -208,21 +220,21 @@ def copy_dir(
     written to the destination path.
   """
 
-  if not check_directory_exists(source_path, env):
-    logging.warn(
+  source, dest = shlex.quote(source_path), shlex.quote(dest_path)
+  with adb_utils.ShellBatch(env) as batch:
+    source_exists = batch.add(f"[ -d {source} ]")
+    # Fails if the destination path exists as a file.
+    batch.add(f"mkdir -p {dest}", f"Failed to create directory {dest_path}.")
+    batch.add(
+        f"cp -a {source}/. {dest}/",
+        f"Failure copying {source_path} directory to {dest_path}.",
+    )
+  if batch.results[source_exists].exit_code == 1:
+    logging.warning(
         "Source directory %s does not exist, ignoring copy_dir.", source_path
     )
     return
-
-  if not check_directory_exists(dest_path, env):
-    mkdir(dest_path, env)  # RuntimeError raised if path exists as a file.
-
-  adb_utils.check_ok(
-      adb_utils.issue_generic_request(
-          ["shell", "cp", "-a", f"{source_path}/.", f"{dest_path}/"], env
-      ),
-      f"Failure copying {source_path} directory to {dest_path}.",
-  )
+  batch.check_ok()
 
 
 def check_file_or_folder_exists(
@@ -310,13 +322,24 @@ def tmp_directory_from_device(
     device_path: str,
     env: env_interface.AndroidEnvInterface,
     timeout_sec: Optional[float] = None,
+    file_glob: Optional[str] = None,
+    max_file_size_bytes: Optional[int] = None,
+    bulk: bool = True,
 ):
   """Copy a directory from the device to a local temporary directory using ADB.
 
+  By default, directories with many files are archived with `tar` on the device
+  and transferred with a single pull. Otherwise, or if that is not possible,
+  e.g. because `tar` fails or the file list is too long for one command line,
+  files are pulled one at a time.
+
   Args:
     device_path: The path of the directory on the Android device.
     env: The Android environment interface.
     timeout_sec: A timeout for the ADB operations.
+    file_glob: If set, only files whose name matches this glob are copied.
+    max_file_size_bytes: If set, only files up to this size are copied.
+    bulk: Whether to try transferring many files as a single archive.
 
   Yields:
     A temporary folder that contains files copied from the device that is
@@ -338,19 +361,23 @@ def tmp_directory_from_device(
     raise FileNotFoundError(f"{device_path} does not exist.")
   try:
     os.makedirs(tmp_directory, exist_ok=True)
-    files = get_file_list_with_metadata(device_path, env, timeout_sec)
-    for file in files:
-      pull_response = env.execute_adb_call(
-          adb_pb2.AdbRequest(
-              pull=adb_pb2.AdbRequest.Pull(path=file.full_path),
-              timeout_sec=timeout_sec,
-          )
-      )
-      adb_utils.check_ok(pull_response)
-      with open(
-          convert_to_posix_path(tmp_directory, file.file_name), "wb"
-      ) as f:
-        f.write(pull_response.pull.content)
+    files = [
+        file
+        for file in get_file_list_with_metadata(device_path, env, timeout_sec)
+        if (file_glob is None or fnmatch.fnmatch(file.file_name, file_glob))
+        and (
+            max_file_size_bytes is None
+            or file.file_size <= max_file_size_bytes
+        )
+    ]
+    archive = bulk and (
+        len(files) >= _MIN_ARCHIVE_FILES
+        or sum(file.file_size for file in files) >= _MIN_ARCHIVE_BYTES
+    )
+    if not archive or not _pull_files_as_archive(
+        files, device_path, tmp_directory, env, timeout_sec
+    ):
+      _pull_files(files, tmp_directory, env, timeout_sec)
 
     yield tmp_directory
 
@@ -365,6 +392,98 @@ def tmp_directory_from_device(
       )
 
 
+def _pull_files_as_archive(
+    files: list[FileWithMetadata],
+    device_path: str,
+    tmp_directory: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = None,
+) -> bool:
+  """Transfers files of a device directory as a single tar archive.
+
+  Args:
+    files: Files in `device_path` to transfer.
+    device_path: The directory on the device.
+    tmp_directory: Local directory the files are extracted to.
+    env: The Android environment interface.
+    timeout_sec: A timeout for the ADB operations.
+
+  Returns:
+    Whether all files were transferred. On False, nothing was extracted and the
+    caller should fall back to pulling files individually.
+  """
+  if not files:
+    return True
+  archive = convert_to_posix_path(
+      _DEVICE_TMP_DIRECTORY, f"android_world_{os.urandom(8).hex()}.tar"
+  )
+  names = " ".join(shlex.quote(f"./{file.file_name}") for file in files)
+  command = (
+      f"tar -cf {shlex.quote(archive)} -C {shlex.quote(device_path)} {names}"
+  )
+  if len(command) > _MAX_ARCHIVE_COMMAND_LENGTH:
+    return False
+
+  try:
+    with adb_utils.ShellBatch(env, timeout_sec) as batch:
+      batch.add(command)
+    if not batch.results[0].ok:
+      logging.info(
+          "Falling back to pulling files individually; tar failed: %s",
+          batch.results[0].output,
+      )
+      return False
+    pull_response = env.execute_adb_call(
+        adb_pb2.AdbRequest(
+            pull=adb_pb2.AdbRequest.Pull(path=archive),
+            timeout_sec=timeout_sec,
+        )
+    )
+  finally:
+    adb_utils.issue_generic_request(
+        ["shell", "rm", "-f", archive], env, timeout_sec
+    )
+  if pull_response.status != adb_pb2.AdbResponse.Status.OK:
+    return False
+
+  # android_env returns the whole archive in the pull response, so it is held
+  # in memory once; members are extracted from it without further copies.
+  try:
+    with tarfile.open(fileobj=io.BytesIO(pull_response.pull.content)) as tar:
+      for member in tar.getmembers():
+        if not member.isfile():
+          continue
+        # Only the base name is used, so members can't escape tmp_directory.
+        local_file = convert_to_posix_path(
+            tmp_directory, posixpath.basename(member.name)
+        )
+        with tar.extractfile(member) as src, open(local_file, "wb") as dst:
+          shutil.copyfileobj(src, dst)
+  except tarfile.TarError as e:
+    logging.info("Falling back to pulling files individually: %s", e)
+    return False
+  return True
+
+
+def _pull_files(
+    files: list[FileWithMetadata],
+    tmp_directory: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = None,
+) -> None:
+  """Pulls files one at a time, as the env may not be used from threads."""
+  for file in files:
+    pull_response = env.execute_adb_call(
+        adb_pb2.AdbRequest(
+            pull=adb_pb2.AdbRequest.Pull(path=file.full_path),
+            timeout_sec=timeout_sec,
+        )
+    )
+    adb_utils.check_ok(pull_response)
+    with open(convert_to_posix_path(tmp_directory, file.file_name), "wb") as f:
+      f.write(pull_response.pull.content)
+
+
 @contextlib.contextmanager
 def tmp_file_from_device(
     device_file: str,
@@ -420,6 +539,146 @@ def tmp_file_from_device(
       )
 
 
+@contextlib.contextmanager
+def tmp_sqlite_db_from_device(
+    remote_db_path: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = None,
+) -> Iterator[str]:
+  """Copies a SQLite database and only its companion files to a local tmp dir.
+
+  Unlike `tmp_directory_from_device` on the parent directory, no other file of
+  the directory is listed or transferred. The sizes of the database and of its
+  `-wal`, `-shm` and `-journal` files are read with a single shell call, and
+  the non-empty ones are pulled.
+
+  Args:
+    remote_db_path: The path of the database on the device.
+    env: The Android environment interface.
+    timeout_sec: A timeout for the ADB operations.
+
+  Yields:
+    A temporary directory containing the files, deleted after use. It is empty
+    if the database does not exist yet, e.g. because the app is still creating
+    it.
+
+  Raises:
+    RuntimeError: If there is an adb communication error.
+  """
+  tmp_directory = tempfile.mkdtemp()
+  try:
+    adb_utils.set_root_if_needed(env, timeout_sec)
+    remote_paths = [remote_db_path] + [
+        remote_db_path + suffix for suffix in SQLITE_COMPANION_SUFFIXES
+    ]
+    with adb_utils.ShellBatch(env, timeout_sec) as batch:
+      # Fails for the missing files, but still prints the existing ones.
+      stat_index = batch.add(
+          ["stat", "-c", shlex.quote("%s %n")]
+          + [shlex.quote(path) for path in remote_paths],
+          allow_failure=True,
+      )
+    sizes = {}
+    for line in batch.results[stat_index].output.splitlines():
+      size, _, path = line.partition(" ")
+      if path in remote_paths and size.isdigit():
+        sizes[path] = int(size)
+    files = [
+        FileWithMetadata(
+            file_name=posixpath.basename(path),
+            full_path=path,
+            file_size=sizes[path],
+            change_time=datetime.datetime.min,
+        )
+        for path in remote_paths
+        # An empty companion file, e.g. after a checkpoint, carries no state.
+        if path in sizes and (sizes[path] or path == remote_db_path)
+    ]
+    num_bytes = sum(file.file_size for file in files)
+    logging.info(
+        "Pulling %d bytes of %s to local tmp %s",
+        num_bytes,
+        remote_db_path,
+        tmp_directory,
+    )
+    with tracing.span(
+        "file_utils.pull_sqlite_db", path=remote_db_path, bytes=num_bytes
+    ):
+      _pull_files(files, tmp_directory, env, timeout_sec)
+
+    yield tmp_directory
+
+  finally:
+    try:
+      shutil.rmtree(tmp_directory)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+      logging.error(
+          "Failed to delete temporary directory: %s with error %s",
+          tmp_directory,
+          e,
+      )
+
+
+def replace_sqlite_db_on_device(
+    local_db_path: str,
+    remote_db_path: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = None,
+) -> None:
+  """Replaces a SQLite database on the device with a local one.
+
+  The database is pushed next to the old one under a temporary name, then
+  renamed over it, so the old database stays intact if the push fails. Its
+  companion files are removed in the same shell call as the rename; the app
+  would otherwise apply a stale write-ahead log to the new database. Other
+  files in the directory are left alone.
+
+  Args:
+    local_db_path: The local database, without pending write-ahead log.
+    remote_db_path: The path of the database on the device.
+    env: The Android environment interface.
+    timeout_sec: A timeout for the ADB operations.
+
+  Raises:
+    RuntimeError: If the database could not be pushed or replaced.
+  """
+  # Need root access to write to app data directories.
+  adb_utils.set_root_if_needed(env, timeout_sec)
+  tmp_remote_path = f"{remote_db_path}.{os.urandom(8).hex()}.tmp"
+  with tracing.span(
+      "file_utils.push_sqlite_db",
+      path=remote_db_path,
+      bytes=os.path.getsize(local_db_path),
+  ):
+    adb_utils.check_ok(
+        _push_file(local_db_path, tmp_remote_path, env, timeout_sec),
+        f"Failed to push {local_db_path} to {tmp_remote_path}.",
+    )
+  with adb_utils.ShellBatch(env, timeout_sec) as batch:
+    batch.add(["chmod", "777", shlex.quote(tmp_remote_path)])
+    batch.add(
+        ["rm", "-f"]
+        + [
+            shlex.quote(remote_db_path + suffix)
+            for suffix in SQLITE_COMPANION_SUFFIXES
+        ]
+    )
+    batch.add(
+        [
+            "mv",
+            "-f",
+            shlex.quote(tmp_remote_path),
+            shlex.quote(remote_db_path),
+        ],
+        f"Failed to replace {remote_db_path}.",
+    )
+  if not all(result.ok for result in batch.results):
+    adb_utils.issue_generic_request(
+        ["shell", "rm", "-f", shlex.quote(tmp_remote_path)], env, timeout_sec
+    )
+  batch.check_ok()
+
+
 def copy_file_to_device(
     local_file_path: str,
     remote_file_path: str,
@@ -427,6 +686,22 @@ def copy_file_to_device(
     timeout_sec: Optional[float] = None,
 ) -> adb_pb2.AdbResponse:
   """Copies a local file to a remote file."""
+  push_response = _push_file(
+      local_file_path, remote_file_path, env, timeout_sec
+  )
+  adb_utils.issue_generic_request(
+      ["shell", "chmod", "777", _escape_path(remote_file_path)], env
+  )
+  return push_response
+
+
+def _push_file(
+    local_file_path: str,
+    remote_file_path: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = None,
+) -> adb_pb2.AdbResponse:
+  """Pushes a local file to the device without changing its permissions."""
   with open(local_file_path, "rb") as f:
     file_contents = f.read()
     push_request = adb_pb2.AdbRequest(
@@ -435,14 +710,13 @@ def copy_file_to_device(
         ),
         timeout_sec=timeout_sec,
     )
-  push_response = env.execute_adb_call(push_request)
+  return env.execute_adb_call(push_request)
 
+
+def _escape_path(remote_file_path: str) -> str:
   # ' and whitespace are special characters in adb commands that need to be
   # escaped.
-  escaped_path = remote_file_path.replace(" ", r"\ ").replace("'", r"\'")
-
-  adb_utils.issue_generic_request(["shell", "chmod", "777", escaped_path], env)
-  return push_response
+  return remote_file_path.replace(" ", r"\ ").replace("'", r"\'")
 
 
 def copy_data_to_device(
@@ -477,17 +751,25 @@ def copy_data_to_device(
       )
     return copy_file_to_device(local_path, remote_path, env, timeout_sec)
 
-  # Copying a directory over, push every file separately.
-  for file_path in os.listdir(local_path):
-    current_response = copy_file_to_device(
-        convert_to_posix_path(local_path, file_path),
-        convert_to_posix_path(remote_path, os.path.basename(file_path)),
-        env,
-        timeout_sec,
-    )
-    if current_response.status != adb_pb2.AdbResponse.OK:
-      return current_response
-    response = current_response
+  # Copying a directory over, push every file separately and fix up all of
+  # their permissions with a single shell call.
+  with adb_utils.ShellBatch(env) as chmod_batch:
+    for file_path in os.listdir(local_path):
+      remote_file_path = convert_to_posix_path(
+          remote_path, os.path.basename(file_path)
+      )
+      current_response = _push_file(
+          convert_to_posix_path(local_path, file_path),
+          remote_file_path,
+          env,
+          timeout_sec,
+      )
+      chmod_batch.add(
+          ["chmod", "777", _escape_path(remote_file_path)], allow_failure=True
+      )
+      if current_response.status != adb_pb2.AdbResponse.OK:
+        return current_response
+      response = current_response
 
   return response
 
@@ -13,8 +13,10 @@
 # limitations under the License.
 
 import datetime
+import io
 import os
 import shutil
+import tarfile
 import tempfile
 from unittest import mock
 
@@ -22,6 +24,7 @@ from absl.testing import absltest
 from absl.testing import parameterized
 from android_env.proto import adb_pb2
 from android_world.env import adb_utils
+from android_world.utils import fake_adb_responses
 from android_world.utils import file_utils
 
 
@@ -59,6 +62,73 @@ class FilesTest(parameterized.TestCase):
     )
     self.assertFalse(result)
 
+  def _batch_responses(self, results):
+    def fake_request(args, env, timeout_sec=None):
+      del env, timeout_sec
+      script = ' '.join(args[1:])
+      if not fake_adb_responses.get_shell_batch_commands(script):
+        return fake_adb_responses.create_successful_generic_response('')
+      return fake_adb_responses.create_shell_batch_response(script, results)
+
+    return fake_request
+
+  def test_copy_dir_uses_single_call(self):
+    self.mock_issue_generic_request.side_effect = self._batch_responses(
+        [(0, ''), (0, ''), (0, '')]
+    )
+
+    file_utils.copy_dir('/src', '/dest $(id)', self.mock_env)
+
+    self.mock_issue_generic_request.assert_called_once()
+    script = self.mock_issue_generic_request.call_args.args[0][1]
+    self.assertEqual(
+        fake_adb_responses.get_shell_batch_commands(script),
+        [
+            '[ -d /src ]',
+            "mkdir -p '/dest $(id)'",
+            "cp -a /src/. '/dest $(id)'/",
+        ],
+    )
+
+  def test_copy_dir_missing_source_is_ignored(self):
+    self.mock_issue_generic_request.side_effect = self._batch_responses(
+        [(1, '')]
+    )
+
+    file_utils.copy_dir('/src', '/dest', self.mock_env)
+
+  def test_copy_dir_raises_on_copy_failure(self):
+    self.mock_issue_generic_request.side_effect = self._batch_responses(
+        [(0, ''), (0, ''), (1, 'cp: No space left on device')]
+    )
+
+    with self.assertRaisesRegex(RuntimeError, 'Failure copying /src'):
+      file_utils.copy_dir('/src', '/dest', self.mock_env)
+
+  def test_clear_directory_raises_on_failure(self):
+    self.mock_issue_generic_request.side_effect = self._batch_responses(
+        [(0, ''), (1, 'rm: Permission denied')]
+    )
+
+    with self.assertRaisesRegex(RuntimeError, 'Failed to clear directory'):
+      file_utils.clear_directory('/dir', self.mock_env)
+
+  def test_clear_directory_quotes_path(self):
+    self.mock_issue_generic_request.side_effect = self._batch_responses(
+        [(0, ''), (0, '')]
+    )
+
+    file_utils.clear_directory('/dir "`x`"', self.mock_env)
+
+    script = self.mock_issue_generic_request.call_args.args[0][1]
+    self.assertEqual(
+        fake_adb_responses.get_shell_batch_commands(script),
+        [
+            """[ -d '/dir "`x`"' ]""",
+            """[ -z "$(ls -1 '/dir "`x`"')" ] || rm -r '/dir "`x`"'/*""",
+        ],
+    )
+
   @mock.patch.object(os.path, 'exists')
   @mock.patch.object(file_utils, 'check_directory_exists')
   @mock.patch.object(shutil, 'rmtree')
@@ -97,19 +167,22 @@ class FilesTest(parameterized.TestCase):
         '/remotedir', self.mock_env
     ) as tmp_directory:
       self.assertEqual(tmp_local_directory, tmp_directory)
-      self.mock_env.execute_adb_call.assert_has_calls([
-          mock.call(
-              adb_pb2.AdbRequest(
-                  pull=adb_pb2.AdbRequest.Pull(
-                      path=file_utils.convert_to_posix_path(
-                          '/remotedir/', file_name
-                      )
-                  ),
-                  timeout_sec=None,
+      self.mock_env.execute_adb_call.assert_has_calls(
+          [
+              mock.call(
+                  adb_pb2.AdbRequest(
+                      pull=adb_pb2.AdbRequest.Pull(
+                          path=file_utils.convert_to_posix_path(
+                              '/remotedir/', file_name
+                          )
+                      ),
+                      timeout_sec=None,
+                  )
               )
-          )
-          for file_name in file_names
-      ])
+              for file_name in file_names
+          ],
+          any_order=True,
+      )
       self.assertCountEqual(os.listdir(tmp_directory), file_names)
       mock_rmtree.assert_not_called()
     mock_rmtree.assert_called_with(tmp_local_directory)
@@ -135,6 +208,212 @@ class FilesTest(parameterized.TestCase):
       ):
         pass
 
+  @mock.patch.object(file_utils, 'check_directory_exists', return_value=True)
+  @mock.patch.object(file_utils, 'get_file_list_with_metadata')
+  def test_tmp_directory_from_device_pulls_single_archive(
+      self, mock_get_file_list_with_metadata, unused_mock_check_directory
+  ):
+    names = ['a.md', 'b.md', 'c.md', 'd.md', 'e.md']
+    mock_get_file_list_with_metadata.return_value = [
+        file_utils.FileWithMetadata(
+            name, f'/remotedir/{name}', 2, datetime.datetime.now()
+        )
+        for name in names
+    ]
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w') as tar:
+      for name in names:
+        info = tarfile.TarInfo(f'./{name}')
+        info.size = 2
+        tar.addfile(info, io.BytesIO(b'hi'))
+    self.mock_env.execute_adb_call.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.OK,
+        pull=adb_pb2.AdbResponse.PullResponse(content=archive.getvalue()),
+    )
+    self.mock_issue_generic_request.side_effect = self._batch_responses(
+        [(0, '')]
+    )
+
+    with file_utils.tmp_directory_from_device(
+        '/remotedir', self.mock_env
+    ) as tmp_directory:
+      self.assertCountEqual(os.listdir(tmp_directory), names)
+      with open(os.path.join(tmp_directory, 'a.md'), 'rb') as f:
+        self.assertEqual(f.read(), b'hi')
+
+    self.mock_env.execute_adb_call.assert_called_once()
+    tar_command = fake_adb_responses.get_shell_batch_commands(
+        self.mock_issue_generic_request.call_args_list[-2].args[0][1]
+    )[0]
+    self.assertIn(
+        '-C /remotedir ./a.md ./b.md ./c.md ./d.md ./e.md', tar_command
+    )
+    self.assertEqual(
+        self.mock_issue_generic_request.call_args.args[0][:3],
+        ['shell', 'rm', '-f'],
+    )
+
+  @mock.patch.object(file_utils, 'check_directory_exists', return_value=True)
+  @mock.patch.object(file_utils, 'get_file_list_with_metadata')
+  def test_tmp_directory_from_device_filters_files(
+      self, mock_get_file_list_with_metadata, unused_mock_check_directory
+  ):
+    mock_get_file_list_with_metadata.return_value = [
+        file_utils.FileWithMetadata(
+            name, f'/remotedir/{name}', size, datetime.datetime.now()
+        )
+        for name, size in [('a.md', 2), ('b.md', 2), ('c.jpg', 2), ('d.md', 9)]
+    ]
+    self.mock_env.execute_adb_call.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.OK,
+        pull=adb_pb2.AdbResponse.PullResponse(content=b'hi'),
+    )
+    self.mock_issue_generic_request.side_effect = self._batch_responses([])
+
+    with file_utils.tmp_directory_from_device(
+        '/remotedir', self.mock_env, file_glob='*.md', max_file_size_bytes=4
+    ) as tmp_directory:
+      self.assertCountEqual(os.listdir(tmp_directory), ['a.md', 'b.md'])
+
+    self.assertCountEqual(
+        [
+            call.args[0].pull.path
+            for call in self.mock_env.execute_adb_call.call_args_list
+        ],
+        ['/remotedir/a.md', '/remotedir/b.md'],
+    )
+
+  @mock.patch.object(file_utils, 'check_directory_exists', return_value=True)
+  @mock.patch.object(file_utils, 'get_file_list_with_metadata')
+  def test_tmp_directory_from_device_pulls_few_small_files_directly(
+      self, mock_get_file_list_with_metadata, unused_mock_check_directory
+  ):
+    mock_get_file_list_with_metadata.return_value = [
+        file_utils.FileWithMetadata(
+            name, f'/remotedir/{name}', 2, datetime.datetime.now()
+        )
+        for name in ['a.db', 'a.db-wal']
+    ]
+    self.mock_env.execute_adb_call.side_effect = (
+        lambda request: adb_pb2.AdbResponse(
+            status=adb_pb2.AdbResponse.Status.OK,
+            pull=adb_pb2.AdbResponse.PullResponse(
+                content=request.pull.path.encode()
+            ),
+        )
+    )
+    self.mock_issue_generic_request.side_effect = self._batch_responses([])
+
+    with file_utils.tmp_directory_from_device(
+        '/remotedir', self.mock_env
+    ) as tmp_directory:
+      self.assertCountEqual(os.listdir(tmp_directory), ['a.db', 'a.db-wal'])
+
+    self.assertCountEqual(
+        [
+            call.args[0].pull.path
+            for call in self.mock_env.execute_adb_call.call_args_list
+        ],
+        ['/remotedir/a.db', '/remotedir/a.db-wal'],
+    )
+    # Only setting root; no archive is created or removed.
+    for call in self.mock_issue_generic_request.call_args_list:
+      self.assertNotIn('tar', ' '.join(call.args[0]))
+      self.assertNotEqual(call.args[0][:2], ['shell', 'rm'])
+
+  def test_tmp_sqlite_db_from_device_pulls_only_database_files(self):
+    self.mock_issue_generic_request.side_effect = self._batch_responses([
+        (1, '12 /d/a.db\n0 /d/a.db-wal\n3 /d/a.db-shm\nstat: /d/a.db-journal'),
+    ])
+    self.mock_env.execute_adb_call.side_effect = (
+        lambda request: adb_pb2.AdbResponse(
+            status=adb_pb2.AdbResponse.Status.OK,
+            pull=adb_pb2.AdbResponse.PullResponse(
+                content=request.pull.path.encode()
+            ),
+        )
+    )
+
+    with file_utils.tmp_sqlite_db_from_device(
+        '/d/a.db', self.mock_env
+    ) as tmp_directory:
+      # The write-ahead log is empty, so it carries no state.
+      self.assertCountEqual(os.listdir(tmp_directory), ['a.db', 'a.db-shm'])
+      with open(os.path.join(tmp_directory, 'a.db'), 'rb') as f:
+        self.assertEqual(f.read(), b'/d/a.db')
+
+    self.assertEqual(
+        fake_adb_responses.get_shell_batch_commands(
+            self.mock_issue_generic_request.call_args.args[0][1]
+        ),
+        ["stat -c '%s %n' /d/a.db /d/a.db-wal /d/a.db-shm /d/a.db-journal"],
+    )
+
+  def test_tmp_sqlite_db_from_device_missing_database(self):
+    self.mock_issue_generic_request.side_effect = self._batch_responses(
+        [(1, 'stat: /d/a.db: No such file or directory')]
+    )
+
+    with file_utils.tmp_sqlite_db_from_device(
+        '/d/a.db', self.mock_env
+    ) as tmp_directory:
+      self.assertEmpty(os.listdir(tmp_directory))
+
+    self.mock_env.execute_adb_call.assert_not_called()
+
+  @mock.patch.object(adb_utils, 'set_root_if_needed')
+  def test_replace_sqlite_db_on_device(self, mock_set_root_if_needed):
+    local_db = os.path.join(tempfile.mkdtemp(), 'a.db')
+    create_file_with_contents(local_db, b'new database')
+    self.mock_env.execute_adb_call.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.OK
+    )
+    self.mock_issue_generic_request.side_effect = self._batch_responses(
+        [(0, ''), (0, ''), (0, '')]
+    )
+
+    file_utils.replace_sqlite_db_on_device(local_db, '/d/a.db', self.mock_env)
+
+    mock_set_root_if_needed.assert_called_once_with(self.mock_env, None)
+    push = self.mock_env.execute_adb_call.call_args.args[0].push
+    self.assertEqual(push.content, b'new database')
+    self.assertRegex(push.path, r'^/d/a\.db\.[0-9a-f]+\.tmp$')
+    self.mock_issue_generic_request.assert_called_once()
+    self.assertEqual(
+        fake_adb_responses.get_shell_batch_commands(
+            self.mock_issue_generic_request.call_args.args[0][1]
+        ),
+        [
+            f'chmod 777 {push.path}',
+            'rm -f /d/a.db-wal /d/a.db-shm /d/a.db-journal',
+            f'mv -f {push.path} /d/a.db',
+        ],
+    )
+
+  @mock.patch.object(adb_utils, 'set_root_if_needed')
+  def test_replace_sqlite_db_on_device_removes_pushed_file_on_failure(
+      self, unused_mock_set_root_if_needed
+  ):
+    local_db = os.path.join(tempfile.mkdtemp(), 'a.db')
+    create_file_with_contents(local_db, b'new database')
+    self.mock_env.execute_adb_call.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.OK
+    )
+    self.mock_issue_generic_request.side_effect = self._batch_responses(
+        [(0, ''), (0, ''), (1, 'mv: Read-only file system')]
+    )
+
+    with self.assertRaisesRegex(RuntimeError, 'Failed to replace /d/a.db'):
+      file_utils.replace_sqlite_db_on_device(
+          local_db, '/d/a.db', self.mock_env
+      )
+
+    push = self.mock_env.execute_adb_call.call_args.args[0].push
+    self.assertEqual(
+        self.mock_issue_generic_request.call_args.args[0],
+        ['shell', 'rm', '-f', push.path],
+    )
+
   def test_copy_data_to_device_copies_file(self):
     """Test if copy_data_to_device correctly copies a single file."""
     file_contents = b'test file contents'
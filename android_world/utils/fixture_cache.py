@@ -0,0 +1,261 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Content-addressed local cache for generated media fixtures.
+
+Tasks push generated videos, songs and images to the device on every
+initialization. Encoding them dominates setup time, yet the same parameters
+come up again across seeds and repeated runs. Fixtures are therefore stored
+locally under a hash of the generator name and its parameters, so a repeated
+fixture only needs to be pushed.
+
+Each fixture is stored next to a small JSON file describing how it was made.
+This makes the cache self-describing: `export_manifest` lists the fixtures a
+suite run used, and `scripts/warm_fixture_cache.py` regenerates them ahead of
+the next run, e.g. on a fresh worker.
+
+The cache is bounded in size. When it grows past the limit, the least
+recently used fixtures are evicted.
+
+The cache location and size are read from the `ANDROID_WORLD_FIXTURE_CACHE_DIR`
+and `ANDROID_WORLD_FIXTURE_CACHE_MB` environment variables. Setting the size
+to 0 disables caching.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+from absl import logging
+
+# Bump when a generator changes its output, so stale fixtures are not reused.
+_VERSION = 1
+_DEFAULT_MAX_MB = 2048
+_SPEC_SUFFIX = '.json'
+_TMP_PREFIX = '.tmp_'
+
+_CACHE_DIR_ENV = 'ANDROID_WORLD_FIXTURE_CACHE_DIR'
+_CACHE_MB_ENV = 'ANDROID_WORLD_FIXTURE_CACHE_MB'
+
+# Maps a fixture kind to the function writing it: fn(path, **params).
+_GENERATORS: dict[str, Callable[..., None]] = {}
+
+
+@dataclasses.dataclass(frozen=True)
+class FixtureSpec:
+  """Describes how a fixture is generated.
+
+  Attributes:
+    kind: The registered generator that creates the fixture.
+    params: JSON serializable keyword arguments for the generator.
+    suffix: The file extension, which some encoders use to pick a format.
+  """
+
+  kind: str
+  params: Mapping[str, Any]
+  suffix: str = ''
+
+  @functools.cached_property
+  def key(self) -> str:
+    return hashlib.sha256(self.to_json().encode('utf-8')).hexdigest()
+
+  def to_json(self) -> str:
+    return json.dumps(
+        {
+            'version': _VERSION,
+            'kind': self.kind,
+            'params': self.params,
+            'suffix': self.suffix,
+        },
+        sort_keys=True,
+    )
+
+  @classmethod
+  def from_json(cls, data: str) -> 'FixtureSpec':
+    spec = json.loads(data)
+    return cls(spec['kind'], spec['params'], spec['suffix'])
+
+
+def register_generator(
+    kind: str,
+) -> Callable[[Callable[..., None]], Callable[..., None]]:
+  """Registers a function that writes a fixture to a path.
+
+  Args:
+    kind: The name of the fixture kind, used in `FixtureSpec.kind`.
+
+  Returns:
+    A decorator registering the function.
+  """
+
+  def decorator(fn: Callable[..., None]) -> Callable[..., None]:
+    _GENERATORS[kind] = fn
+    return fn
+
+  return decorator
+
+
+def generate(spec: FixtureSpec, path: str) -> None:
+  """Writes the fixture described by `spec` to `path`, without caching it."""
+  if spec.kind not in _GENERATORS:
+    raise ValueError(f'No generator registered for fixture kind {spec.kind}.')
+  _GENERATORS[spec.kind](path, **spec.params)
+
+
+class FixtureCache:
+  """A size-bounded, least recently used cache of fixture files."""
+
+  def __init__(self, directory: str, max_bytes: int):
+    self.directory = directory
+    self.max_bytes = max_bytes
+    self._lock = threading.Lock()
+    os.makedirs(directory, exist_ok=True)
+
+  def path(self, spec: FixtureSpec) -> str:
+    return os.path.join(self.directory, spec.key + spec.suffix)
+
+  def get(self, spec: FixtureSpec) -> str:
+    """Returns the path of the cached fixture, generating it on a miss.
+
+    Args:
+      spec: The fixture to get.
+
+    Returns:
+      A local path to the fixture. It must not be modified, and stays valid
+      until it is evicted by a later `get`.
+    """
+    path = self.path(spec)
+    try:
+      # Marks the fixture as recently used.
+      os.utime(path)
+      return path
+    except FileNotFoundError:
+      pass
+
+    # Generators may pick the encoding from the extension, so keep it last.
+    tmp_path = os.path.join(
+        self.directory,
+        f'{_TMP_PREFIX}{spec.key}_{os.getpid()}_{threading.get_ident()}'
+        f'{spec.suffix}',
+    )
+    try:
+      generate(spec, tmp_path)
+      with open(path + _SPEC_SUFFIX, 'w') as f:
+        f.write(spec.to_json())
+      os.replace(tmp_path, path)
+    finally:
+      if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    self._evict(keep=path)
+    return path
+
+  def _entries(self) -> list[os.DirEntry[str]]:
+    return [
+        entry
+        for entry in os.scandir(self.directory)
+        if entry.is_file()
+        and not entry.name.startswith(_TMP_PREFIX)
+        and not entry.name.endswith(_SPEC_SUFFIX)
+    ]
+
+  def _evict(self, keep: str) -> None:
+    """Removes the least recently used fixtures until under the size limit."""
+    with self._lock:
+      entries = []
+      total = 0
+      for entry in self._entries():
+        try:
+          stat = entry.stat()
+        except FileNotFoundError:
+          continue  # Evicted by another process.
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+      entries.sort()
+      for _, size, path in entries:
+        if total <= self.max_bytes:
+          break
+        if path == keep:
+          continue
+        for evicted in (path, path + _SPEC_SUFFIX):
+          try:
+            os.remove(evicted)
+          except FileNotFoundError:
+            pass
+        total -= size
+        logging.info('Evicted fixture %s from the cache.', path)
+
+  def specs(self) -> Iterator[FixtureSpec]:
+    """Yields the specs of all cached fixtures."""
+    for entry in self._entries():
+      try:
+        with open(entry.path + _SPEC_SUFFIX) as f:
+          yield FixtureSpec.from_json(f.read())
+      except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        continue
+
+  def export_manifest(self, path: str) -> int:
+    """Writes the specs of all cached fixtures to a JSON lines file.
+
+    Args:
+      path: The manifest file to write.
+
+    Returns:
+      The number of specs written.
+    """
+    specs = sorted(spec.to_json() for spec in self.specs())
+    with open(path, 'w') as f:
+      f.writelines(spec + '\n' for spec in specs)
+    return len(specs)
+
+
+def read_manifest(path: str) -> list[FixtureSpec]:
+  """Reads the specs written by `FixtureCache.export_manifest`."""
+  with open(path) as f:
+    return [FixtureSpec.from_json(line) for line in f if line.strip()]
+
+
+def warm(cache: FixtureCache, specs: Iterable[FixtureSpec]) -> int:
+  """Generates the fixtures that are missing from the cache.
+
+  Args:
+    cache: The cache to fill.
+    specs: The fixtures to generate.
+
+  Returns:
+    The number of fixtures that were generated.
+  """
+  generated = 0
+  for spec in specs:
+    if not os.path.exists(cache.path(spec)):
+      cache.get(spec)
+      generated += 1
+  return generated
+
+
+@functools.cache
+def get_default_cache() -> FixtureCache | None:
+  """Returns the process-wide cache, or None if caching is disabled."""
+  max_mb = int(os.environ.get(_CACHE_MB_ENV, _DEFAULT_MAX_MB))
+  if max_mb <= 0:
+    return None
+  directory = os.environ.get(
+      _CACHE_DIR_ENV,
+      os.path.join(tempfile.gettempdir(), 'android_world', 'fixtures'),
+  )
+  return FixtureCache(directory, max_mb * 1024 * 1024)
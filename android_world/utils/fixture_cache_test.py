@@ -0,0 +1,132 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import time
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.utils import fixture_cache
+
+_calls: list[str] = []
+
+
+@fixture_cache.register_generator('test_text')
+def _write_text(path: str, text: str, size: int = 0) -> None:
+  _calls.append(text)
+  with open(path, 'w') as f:
+    f.write(text + ' ' * size)
+
+
+class FixtureCacheTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.directory = self.enter_context(tempfile.TemporaryDirectory())
+    self.cache = fixture_cache.FixtureCache(self.directory, max_bytes=1000)
+    _calls.clear()
+
+  def test_spec_key_depends_on_params_and_suffix(self):
+    spec = fixture_cache.FixtureSpec('test_text', {'text': 'a'}, '.txt')
+
+    self.assertEqual(
+        spec.key,
+        fixture_cache.FixtureSpec('test_text', {'text': 'a'}, '.txt').key,
+    )
+    self.assertNotEqual(
+        spec.key,
+        fixture_cache.FixtureSpec('test_text', {'text': 'b'}, '.txt').key,
+    )
+    self.assertNotEqual(
+        spec.key,
+        fixture_cache.FixtureSpec('test_text', {'text': 'a'}, '.md').key,
+    )
+
+  def test_get_generates_once(self):
+    spec = fixture_cache.FixtureSpec('test_text', {'text': 'hello'}, '.txt')
+
+    first = self.cache.get(spec)
+    second = self.cache.get(spec)
+
+    self.assertEqual(first, second)
+    self.assertEqual(_calls, ['hello'])
+    self.assertTrue(first.endswith('.txt'))
+    with open(first) as f:
+      self.assertEqual(f.read(), 'hello')
+
+  def test_evicts_least_recently_used(self):
+    old = fixture_cache.FixtureSpec('test_text', {'text': 'old', 'size': 400})
+    used = fixture_cache.FixtureSpec('test_text', {'text': 'used', 'size': 400})
+    new = fixture_cache.FixtureSpec('test_text', {'text': 'new', 'size': 400})
+    self.cache.get(old)
+    self.cache.get(used)
+    past = time.time() - 100
+    os.utime(self.cache.path(old), (past, past))
+    os.utime(self.cache.path(used), (past + 1, past + 1))
+    self.cache.get(used)  # Marks it as recently used.
+
+    self.cache.get(new)
+
+    self.assertFalse(os.path.exists(self.cache.path(old)))
+    self.assertFalse(os.path.exists(self.cache.path(old) + '.json'))
+    self.assertTrue(os.path.exists(self.cache.path(used)))
+    self.assertTrue(os.path.exists(self.cache.path(new)))
+
+  def test_failed_generation_leaves_no_files(self):
+    spec = fixture_cache.FixtureSpec('test_text', {'text': 'x', 'bad': 1})
+
+    with self.assertRaises(TypeError):
+      self.cache.get(spec)
+
+    self.assertEmpty(os.listdir(self.directory))
+
+  def test_unknown_kind_raises(self):
+    with self.assertRaisesRegex(ValueError, 'No generator registered'):
+      self.cache.get(fixture_cache.FixtureSpec('unknown', {}))
+
+  def test_manifest_round_trip_warms_cache(self):
+    specs = [
+        fixture_cache.FixtureSpec('test_text', {'text': 'a'}, '.txt'),
+        fixture_cache.FixtureSpec('test_text', {'text': 'b'}, '.txt'),
+    ]
+    for spec in specs:
+      self.cache.get(spec)
+    manifest = os.path.join(
+        self.enter_context(tempfile.TemporaryDirectory()), 'manifest.jsonl'
+    )
+    self.assertEqual(self.cache.export_manifest(manifest), 2)
+    other = fixture_cache.FixtureCache(
+        self.enter_context(tempfile.TemporaryDirectory()), max_bytes=1000
+    )
+
+    self.assertEqual(
+        fixture_cache.warm(other, fixture_cache.read_manifest(manifest)), 2
+    )
+    self.assertEqual(
+        fixture_cache.warm(other, fixture_cache.read_manifest(manifest)), 0
+    )
+    self.assertCountEqual(
+        [spec.key for spec in other.specs()], [spec.key for spec in specs]
+    )
+
+  def test_default_cache_can_be_disabled(self):
+    fixture_cache.get_default_cache.cache_clear()
+    self.addCleanup(fixture_cache.get_default_cache.cache_clear)
+    with mock.patch.dict(os.environ, {'ANDROID_WORLD_FIXTURE_CACHE_MB': '0'}):
+      self.assertIsNone(fixture_cache.get_default_cache())
+
+
+if __name__ == '__main__':
+  absltest.main()
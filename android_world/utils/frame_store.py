@@ -0,0 +1,138 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Keeps the screenshots of an episode on disk rather than in memory.
+
+Agents return screenshots in the data of every step, and the episode runner
+keeps that data until the episode is saved, so long episodes hold hundreds of
+MB per worker. `FrameStore` writes the arrays of the step data to an
+episode-scoped directory, and returns a copy of the step data with `FrameRef`
+handles in their place, which only load an array when it is used:
+
+  store = frame_store.FrameStore()
+  spilled = store.spill(step_data)
+  screenshot = np.asarray(spilled['raw_screenshot'])
+
+The directory is removed once the store and all its handles are garbage
+collected. Pickling a handle pickles the array it refers to, so episodes holding
+handles can be pickled as before; `checkpointer.IncrementalCheckpointer` instead
+saves each frame as its own file, loading one at a time.
+"""
+
+import gzip
+import itertools
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Any
+
+import numpy as np
+
+# Smaller arrays are kept in memory, where they cost less than a file.
+_MIN_SPILL_BYTES = 64 * 1024
+# Screenshots compress well even at the fastest level, which keeps writing a
+# frame cheap next to taking a step.
+_COMPRESS_LEVEL = 1
+
+
+class FrameRef:
+  """A handle to an array stored in a `FrameStore`.
+
+  Attributes:
+    path: The gzipped `.npy` file holding the array.
+    shape: The shape of the array.
+    dtype: The dtype of the array.
+  """
+
+  __slots__ = ('_store', 'path', 'shape', 'dtype')
+
+  def __init__(
+      self,
+      store: 'FrameStore',
+      path: str,
+      shape: tuple[int, ...],
+      dtype: np.dtype,
+  ):
+    # Keeps the store, and so its directory, alive while the handle is used.
+    self._store = store
+    self.path = path
+    self.shape = shape
+    self.dtype = dtype
+
+  def load(self) -> np.ndarray:
+    """Reads the array from disk."""
+    with gzip.open(self.path, 'rb') as f:
+      return np.load(f, allow_pickle=False)
+
+  def __array__(self, dtype=None, copy=None) -> np.ndarray:
+    del copy  # Loading always makes a new array.
+    array = self.load()
+    return array if dtype is None else array.astype(dtype, copy=False)
+
+  def __reduce__(self):
+    return self.load().__reduce__()
+
+  def __repr__(self) -> str:
+    return f'FrameRef(shape={self.shape}, dtype={self.dtype})'
+
+
+class FrameStore:
+  """Stores arrays as gzipped `.npy` files in a directory.
+
+  Attributes:
+    directory: Where the arrays are stored.
+  """
+
+  def __init__(self, directory: str | None = None):
+    """Initializes the store.
+
+    Args:
+      directory: Where to store the arrays. Defaults to a temporary directory,
+        removed once the store and its handles are no longer used.
+    """
+    if directory is None:
+      self.directory = tempfile.mkdtemp(prefix='android_world_frames_')
+      weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+    else:
+      self.directory = directory
+      os.makedirs(directory, exist_ok=True)
+    self._ids = itertools.count(len(os.listdir(self.directory)))
+
+  def put(self, array: np.ndarray) -> FrameRef:
+    """Writes an array to disk and returns a handle to it."""
+    path = os.path.join(self.directory, f'{next(self._ids)}.npy.gz')
+    with gzip.open(path, 'wb', compresslevel=_COMPRESS_LEVEL) as f:
+      np.save(f, array, allow_pickle=False)
+    return FrameRef(self, path, array.shape, array.dtype)
+
+  def spill(self, data: dict[str, Any]) -> dict[str, Any]:
+    """Writes the large arrays among the values of `data` to disk.
+
+    Args:
+      data: E.g. the data of an agent step. It is not modified. Arrays of
+        objects are kept.
+
+    Returns:
+      A copy of `data` with handles in place of the large arrays.
+    """
+    spilled = dict(data)
+    for key, value in data.items():
+      if (
+          isinstance(value, np.ndarray)
+          and value.nbytes >= _MIN_SPILL_BYTES
+          and not value.dtype.hasobject
+      ):
+        spilled[key] = self.put(value)
+    return spilled
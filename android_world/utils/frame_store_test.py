@@ -0,0 +1,85 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import os
+import pickle
+
+from absl.testing import absltest
+from android_world.utils import frame_store
+import numpy as np
+
+
+def _screenshot() -> np.ndarray:
+  return np.random.default_rng(0).integers(
+      0, 256, (240, 108, 3), dtype=np.uint8
+  )
+
+
+class FrameStoreTest(absltest.TestCase):
+
+  def test_spills_large_arrays_of_a_copy(self):
+    store = frame_store.FrameStore()
+    screenshot = _screenshot()
+    step_data = {
+        'raw_screenshot': screenshot,
+        'small': np.zeros(4),
+        'summary': 'text',
+        'missing': None,
+    }
+
+    spilled = store.spill(step_data)
+
+    frame = spilled['raw_screenshot']
+    self.assertIsInstance(frame, frame_store.FrameRef)
+    self.assertEqual((frame.shape, frame.dtype), (screenshot.shape, np.uint8))
+    np.testing.assert_array_equal(np.asarray(frame), screenshot)
+    self.assertIsInstance(spilled['small'], np.ndarray)
+    self.assertEqual(spilled['summary'], 'text')
+    self.assertIsNone(spilled['missing'])
+    self.assertIs(step_data['raw_screenshot'], screenshot)
+
+  def test_frames_are_compressed(self):
+    screenshot = np.zeros((240, 108, 3), dtype=np.uint8)
+
+    frame = frame_store.FrameStore().put(screenshot)
+
+    self.assertLess(os.path.getsize(frame.path), screenshot.nbytes // 10)
+    np.testing.assert_array_equal(frame.load(), screenshot)
+
+  def test_pickles_as_array(self):
+    screenshot = _screenshot()
+    frame = frame_store.FrameStore().put(screenshot)
+
+    unpickled = pickle.loads(pickle.dumps([frame]))
+
+    self.assertIsInstance(unpickled[0], np.ndarray)
+    np.testing.assert_array_equal(unpickled[0], screenshot)
+
+  def test_removes_directory_once_unused(self):
+    store = frame_store.FrameStore()
+    directory = store.directory
+    frame = store.put(_screenshot())
+    del store
+    gc.collect()
+    self.assertTrue(os.path.isdir(directory))
+
+    del frame
+    gc.collect()
+
+    self.assertFalse(os.path.exists(directory))
+
+
+if __name__ == '__main__':
+  absltest.main()
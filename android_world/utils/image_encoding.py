@@ -0,0 +1,280 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Encodes screenshots once, for LLM requests and reports alike.
+
+Within a step, agents send the same screenshot in several requests, e.g. M3A
+sends the marked screenshot both to select the action and to summarize it, and
+the episode reports encode the screenshots once more. `EncodedImageCache`
+keeps the encodings of recent images, keyed by a hash of their content, so each
+image is only encoded once per set of options.
+
+Images may be encoded in the background with `prefetch`, e.g. while the agent
+builds its prompt. Prefetched images must not be modified until they are
+encoded; encoding them again, with `encode`, waits for the background encoding.
+
+The CPU time spent encoding is reported by `record_stats`:
+
+  with image_encoding.record_stats() as stats:
+    agent.step(goal)
+  print(stats.cpu_sec)
+"""
+
+import base64
+import collections
+import contextlib
+import contextvars
+import dataclasses
+import functools
+import hashlib
+import io
+import threading
+import time
+from concurrent import futures
+from typing import Iterator, Sequence
+
+from android_world.utils import tracing
+import numpy as np
+from PIL import Image
+
+_DEFAULT_MAX_ENTRIES = 16
+_DEFAULT_MAX_WORKERS = 2
+
+
+@dataclasses.dataclass(frozen=True)
+class EncodingOptions:
+  """How images are encoded.
+
+  Attributes:
+    format: The PIL image format, e.g. 'JPEG', 'PNG' or 'WEBP'.
+    quality: The quality of lossy formats; None uses the PIL default.
+    max_side: If set, larger images are downscaled so that their longest side
+      has this length, keeping their aspect ratio.
+  """
+
+  format: str = 'JPEG'
+  quality: int | None = None
+  max_side: int | None = None
+
+  @property
+  def mime_type(self) -> str:
+    return f'image/{self.format.lower()}'
+
+
+@dataclasses.dataclass
+class EncodingStats:
+  """Counts the encodings requested from a cache.
+
+  Attributes:
+    hits: Requests served by an earlier or pending encoding.
+    misses: Requests that encoded an image.
+    cpu_sec: The CPU time spent encoding, in any thread.
+  """
+
+  hits: int = 0
+  misses: int = 0
+  cpu_sec: float = 0.0
+
+
+_active_stats: contextvars.ContextVar[EncodingStats | None] = (
+    contextvars.ContextVar('image_encoding_stats', default=None)
+)
+
+
+@contextlib.contextmanager
+def record_stats() -> Iterator[EncodingStats]:
+  """Counts the encodings requested in this context, e.g. in an agent step.
+
+  Background encodings are counted in the context that requested them.
+
+  Yields:
+    The stats, updated as images are encoded.
+  """
+  stats = EncodingStats()
+  token = _active_stats.set(stats)
+  try:
+    yield stats
+  finally:
+    _active_stats.reset(token)
+
+
+def encode(image: np.ndarray, options: EncodingOptions) -> bytes:
+  """Encodes an image, without caching.
+
+  Args:
+    image: An RGB(A) or grayscale image.
+    options: How to encode the image.
+
+  Returns:
+    The encoded image.
+  """
+  pil_image = Image.fromarray(image)
+  if options.max_side and max(pil_image.size) > options.max_side:
+    scale = options.max_side / max(pil_image.size)
+    pil_image = pil_image.resize(
+        (
+            max(1, round(pil_image.width * scale)),
+            max(1, round(pil_image.height * scale)),
+        ),
+        Image.Resampling.BILINEAR,
+    )
+  kwargs = {} if options.quality is None else {'quality': options.quality}
+  in_mem_file = io.BytesIO()
+  pil_image.save(in_mem_file, format=options.format, **kwargs)
+  return in_mem_file.getvalue()
+
+
+def _content_key(image: np.ndarray) -> tuple[str, tuple[int, ...], str]:
+  image = np.ascontiguousarray(image)
+  return hashlib.sha1(image.data).hexdigest(), image.shape, image.dtype.str
+
+
+class EncodedImageCache:
+  """Keeps the encodings of the most recently used images.
+
+  Attributes:
+    options: The options used when none are given.
+    max_entries: How many encodings are kept.
+  """
+
+  def __init__(
+      self,
+      options: EncodingOptions = EncodingOptions(),
+      max_entries: int = _DEFAULT_MAX_ENTRIES,
+      max_workers: int = _DEFAULT_MAX_WORKERS,
+  ):
+    self.options = options
+    self.max_entries = max_entries
+    self._max_workers = max_workers
+    self._lock = threading.Lock()
+    self._entries: collections.OrderedDict[tuple[object, ...], bytes] = (
+        collections.OrderedDict()
+    )
+    self._pending: dict[tuple[object, ...], futures.Future[bytes]] = {}
+    self._executor: futures.ThreadPoolExecutor | None = None
+    self._stats = EncodingStats()
+
+  def stats(self) -> EncodingStats:
+    """Returns the stats of all encodings requested from the cache."""
+    with self._lock:
+      return dataclasses.replace(self._stats)
+
+  def encode(
+      self, image: np.ndarray, options: EncodingOptions | None = None
+  ) -> bytes:
+    """Returns the encoded image, encoding it if it is not cached.
+
+    Args:
+      image: An RGB(A) or grayscale image.
+      options: How to encode the image; defaults to `self.options`.
+    """
+    options = options or self.options
+    image = np.asarray(image)  # E.g. a screenshot stored on disk.
+    key = (*_content_key(image), options)
+    with self._lock:
+      data = self._entries.get(key)
+      future = self._pending.get(key)
+      if data is not None or future is not None:
+        self._count(hits=1)
+      if data is not None:
+        self._entries.move_to_end(key)
+        return data
+    if future is not None:
+      return future.result()
+    return self._encode(key, image, options)
+
+  def encode_base64(
+      self, image: np.ndarray, options: EncodingOptions | None = None
+  ) -> str:
+    """Returns the encoded image, in base64."""
+    return base64.b64encode(self.encode(image, options)).decode('utf-8')
+
+  def encode_data_url(
+      self, image: np.ndarray, options: EncodingOptions | None = None
+  ) -> str:
+    """Returns the encoded image as a data URL, e.g. for an OpenAI request."""
+    options = options or self.options
+    return (
+        f'data:{options.mime_type};base64,{self.encode_base64(image, options)}'
+    )
+
+  def prefetch(
+      self,
+      images: Sequence[np.ndarray],
+      options: EncodingOptions | None = None,
+  ) -> None:
+    """Starts encoding images in the background.
+
+    The images must not be modified until they are encoded.
+
+    Args:
+      images: The images to encode.
+      options: How to encode the images; defaults to `self.options`.
+    """
+    options = options or self.options
+    for image in images:
+      key = (*_content_key(image), options)
+      with self._lock:
+        if key in self._entries or key in self._pending:
+          continue
+        if self._executor is None:
+          self._executor = futures.ThreadPoolExecutor(
+              self._max_workers, thread_name_prefix='image_encoding'
+          )
+        # Runs in a copy of the context, so that the encoding is counted and
+        # traced where it was requested.
+        self._pending[key] = self._executor.submit(
+            contextvars.copy_context().run,
+            self._encode,
+            key,
+            image,
+            options,
+        )
+
+  def _count(
+      self, hits: int = 0, misses: int = 0, cpu_sec: float = 0.0
+  ) -> None:
+    """Updates the stats of the cache and of the context; needs the lock."""
+    for stats in (self._stats, _active_stats.get()):
+      if stats is not None:
+        stats.hits += hits
+        stats.misses += misses
+        stats.cpu_sec += cpu_sec
+
+  def _encode(
+      self, key: tuple[object, ...], image: np.ndarray, options: EncodingOptions
+  ) -> bytes:
+    """Encodes an image and caches it."""
+    try:
+      with tracing.span('image_encoding.encode', format=options.format):
+        start = time.thread_time()
+        data = encode(image, options)
+        cpu_sec = time.thread_time() - start
+    except Exception:
+      with self._lock:
+        self._pending.pop(key, None)
+      raise
+    with self._lock:
+      self._pending.pop(key, None)
+      self._count(misses=1, cpu_sec=cpu_sec)
+      self._entries[key] = data
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+    return data
+
+
+@functools.cache
+def get_default_cache() -> EncodedImageCache:
+  """Returns the process-wide cache, shared by the LLM wrappers and reports."""
+  return EncodedImageCache()
@@ -0,0 +1,106 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import io
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.utils import image_encoding
+import numpy as np
+from PIL import Image
+
+
+def _image(seed: int = 0) -> np.ndarray:
+  return np.random.default_rng(seed).integers(
+      0, 256, (64, 32, 3), dtype=np.uint8
+  )
+
+
+class EncodedImageCacheTest(absltest.TestCase):
+
+  def test_encodes_each_image_once(self):
+    cache = image_encoding.EncodedImageCache()
+    image = _image()
+
+    with image_encoding.record_stats() as stats:
+      first = cache.encode(image)
+      second = cache.encode(image.copy())
+
+    self.assertEqual(first, second)
+    self.assertEqual(
+        first, image_encoding.encode(image, image_encoding.EncodingOptions())
+    )
+    self.assertEqual((stats.hits, stats.misses), (1, 1))
+    self.assertGreater(stats.cpu_sec, 0)
+    self.assertEqual(cache.stats(), stats)
+
+  def test_options_are_part_of_the_key(self):
+    cache = image_encoding.EncodedImageCache()
+    image = _image()
+
+    jpeg = cache.encode(image)
+    png = cache.encode_data_url(
+        image, image_encoding.EncodingOptions(format='PNG')
+    )
+
+    self.assertEqual(cache.stats().misses, 2)
+    self.assertStartsWith(png, 'data:image/png;base64,')
+    decoded = Image.open(io.BytesIO(base64.b64decode(png.split(',')[1])))
+    np.testing.assert_array_equal(np.asarray(decoded), image)
+    self.assertNotEqual(jpeg, base64.b64decode(png.split(',')[1]))
+
+  def test_downscales_to_max_side(self):
+    options = image_encoding.EncodingOptions(max_side=16, quality=50)
+
+    encoded = image_encoding.encode(_image(), options)
+
+    self.assertEqual(Image.open(io.BytesIO(encoded)).size, (8, 16))
+
+  def test_evicts_least_recently_used(self):
+    cache = image_encoding.EncodedImageCache(max_entries=2)
+    cache.encode(_image(0))
+    cache.encode(_image(1))
+    cache.encode(_image(0))
+
+    cache.encode(_image(2))
+    cache.encode(_image(0))
+    cache.encode(_image(1))
+
+    self.assertEqual((cache.stats().hits, cache.stats().misses), (2, 4))
+
+  def test_prefetch_encodes_in_background(self):
+    cache = image_encoding.EncodedImageCache()
+    images = [_image(0), _image(1)]
+    encode = image_encoding.encode
+
+    with image_encoding.record_stats() as stats:
+      with mock.patch.object(
+          image_encoding, 'encode', side_effect=encode
+      ) as mock_encode:
+        cache.prefetch(images)
+        cache.prefetch(images)
+        encoded = [cache.encode(image) for image in images]
+
+    self.assertEqual(mock_encode.call_count, 2)
+    self.assertEqual(
+        encoded,
+        [encode(image, image_encoding.EncodingOptions()) for image in images],
+    )
+    self.assertEqual((stats.hits, stats.misses), (2, 2))
+    self.assertGreater(stats.cpu_sec, 0)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,242 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Writes the steps of an episode to disk as soon as they are taken.
+
+`episode_runner.run_episode` appends the data of each step to a `StepLog`
+instead of keeping it in memory. The log is a directory holding the
+screenshots of the steps, see `frame_store`, and a file of gzipped pickles,
+one per step, so that the steps of an interrupted episode can be read back up
+to the last complete one.
+
+The dict-of-lists step data of an episode is a `StepData` view of its log,
+which reads the steps from disk when a field is first accessed, and loads the
+screenshots of a field as arrays each time the field is accessed.
+
+By default, logs are written to a temporary directory. The suite runner writes
+them next to the checkpoint instead, by running episodes in a `write_to`
+context:
+
+  with step_log.write_to(checkpointer.step_log_directory(task_name)):
+    run_episode(task)
+"""
+
+from collections.abc import Iterator, Mapping
+import contextlib
+import contextvars
+import gzip
+import io
+import os
+import pickle
+from typing import Any
+
+from absl import logging
+from android_world.utils import frame_store
+import numpy as np
+
+_STEPS_FILENAME = 'steps.pkl.gz'
+
+_active_directory: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    'step_log_directory', default=None
+)
+
+
+@contextlib.contextmanager
+def write_to(directory: str | None) -> Iterator[None]:
+  """Makes `create` write logs to `directory` in this context.
+
+  Args:
+    directory: Where to write the log of the next episode. If None, logs are
+      written to a temporary directory.
+
+  Yields:
+    Nothing.
+  """
+  token = _active_directory.set(directory)
+  try:
+    yield
+  finally:
+    _active_directory.reset(token)
+
+
+class _StepPickler(pickle.Pickler):
+  """Pickles a step, referring to its frames by file name."""
+
+  def persistent_id(
+      self, obj: Any
+  ) -> tuple[str, tuple[int, ...], str] | None:
+    if not isinstance(obj, frame_store.FrameRef):
+      return None
+    return os.path.basename(obj.path), obj.shape, obj.dtype.str
+
+
+class _StepUnpickler(pickle.Unpickler):
+  """Unpickles a step, with handles to its frames."""
+
+  def __init__(self, file: io.BufferedIOBase, frames: frame_store.FrameStore):
+    super().__init__(file)
+    self._frames = frames
+
+  def persistent_load(
+      self, pid: tuple[str, tuple[int, ...], str]
+  ) -> frame_store.FrameRef:
+    filename, shape, dtype = pid
+    return frame_store.FrameRef(
+        self._frames,
+        os.path.join(self._frames.directory, filename),
+        shape,
+        np.dtype(dtype),
+    )
+
+
+class StepLog:
+  """An append-only record of the steps of an episode, kept on disk.
+
+  Only the names of the fields of the steps are kept in memory.
+
+  Attributes:
+    directory: Where the steps are stored.
+    frames: The store of the screenshots of the steps.
+  """
+
+  def __init__(self, directory: str | None = None):
+    """Opens a log, reading the steps already in it, if any.
+
+    Args:
+      directory: Where the steps are stored. Defaults to a temporary
+        directory, removed once the log and its step data are no longer used.
+    """
+    self.frames = frame_store.FrameStore(directory)
+    self.directory = self.frames.directory
+    self._path = os.path.join(self.directory, _STEPS_FILENAME)
+    # The fields of the steps, in order of appearance.
+    self._fields: dict[str, None] = {}
+    self._n_steps = 0
+    # The steps read by `read`, until the next `append`.
+    self._read_steps: list[dict[str, Any]] | None = None
+    for step in self.steps():
+      self._add_fields(step)
+
+  def __len__(self) -> int:
+    return self._n_steps
+
+  @property
+  def fields(self) -> list[str]:
+    """The fields of the steps, in order of appearance."""
+    return list(self._fields)
+
+  def _add_fields(self, step: dict[str, Any]) -> None:
+    self._n_steps += 1
+    self._fields.update(dict.fromkeys(step))
+
+  def append(self, step: dict[str, Any]) -> None:
+    """Writes a step to disk.
+
+    Its large arrays are written to the frame store; `step` is not modified.
+
+    Args:
+      step: The data of the step.
+    """
+    step = self.frames.spill(step)
+    pickled = io.BytesIO()
+    _StepPickler(pickled).dump(step)
+    # Each step is a complete gzip member, so that a step interrupted while
+    # being written does not corrupt the previous ones.
+    with open(self._path, 'ab') as f:
+      f.write(gzip.compress(pickled.getvalue(), compresslevel=1))
+    self._add_fields(step)
+    self._read_steps = None
+
+  def steps(self) -> Iterator[dict[str, Any]]:
+    """Reads the steps from disk, in order, with handles to their frames."""
+    if not os.path.exists(self._path):
+      return
+    with gzip.open(self._path, 'rb') as f:
+      while True:
+        try:
+          yield _StepUnpickler(f, self.frames).load()
+        except EOFError:
+          return
+        except (gzip.BadGzipFile, pickle.UnpicklingError) as e:
+          logging.warning('Ignoring incomplete step in %s: %s', self._path, e)
+          return
+
+  def read(self) -> list[dict[str, Any]]:
+    """Returns the steps, reading them from disk once until the next `append`.
+
+    The steps are shared between calls and must not be modified.
+    """
+    if self._read_steps is None:
+      self._read_steps = list(self.steps())
+    return self._read_steps
+
+  def step_data(self) -> 'StepData':
+    """Returns the steps as a dict of lists, read from disk when accessed."""
+    return StepData(self)
+
+
+def _load(value: Any) -> Any:
+  return value.load() if isinstance(value, frame_store.FrameRef) else value
+
+
+class StepData(Mapping[str, list[Any]]):
+  """A dict-of-lists view of the steps of a log.
+
+  Maps each field to its values in the steps having it. The first access reads
+  the log from disk, see `StepLog.read`. The screenshots stay on disk until a
+  field holding them is accessed, and are then loaded as arrays. Pickling the
+  view pickles a dict of lists, with the screenshots.
+  """
+
+  def __init__(self, log: StepLog):
+    self.log = log
+
+  def __getitem__(self, field: str) -> list[Any]:
+    if field not in self.log.fields:
+      raise KeyError(field)
+    return [_load(step[field]) for step in self.log.read() if field in step]
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(self.log.fields)
+
+  def __len__(self) -> int:
+    return len(self.log.fields)
+
+  def to_dict(self, load_frames: bool = True) -> dict[str, list[Any]]:
+    """Reads all fields at once.
+
+    Args:
+      load_frames: Whether to load the screenshots as arrays, or to return
+        their `frame_store.FrameRef` handles.
+
+    Returns:
+      The values of each field.
+    """
+    result = {field: [] for field in self}
+    for step in self.log.read():
+      for field, value in step.items():
+        result[field].append(_load(value) if load_frames else value)
+    return result
+
+  def __reduce__(self):
+    # Handles pickle as their arrays, one at a time.
+    return dict, (self.to_dict(load_frames=False),)
+
+  def __repr__(self) -> str:
+    return f'StepData({len(self.log)} steps, fields={list(self)})'
+
+
+def create() -> StepLog:
+  """Returns a new log, written where `write_to` says."""
+  return StepLog(_active_directory.get())
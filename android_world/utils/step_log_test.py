@@ -0,0 +1,122 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+import tempfile
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.utils import frame_store
+from android_world.utils import step_log
+import numpy as np
+
+
+def _screenshot(value: int) -> np.ndarray:
+  return np.full((240, 108, 3), value, dtype=np.uint8)
+
+
+class StepLogTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.directory = os.path.join(tempfile.mkdtemp(), 'steps')
+
+  def test_step_data_is_read_from_disk(self):
+    log = step_log.StepLog(self.directory)
+    log.append({'screenshot': _screenshot(1), 'summary': 'a'})
+    log.append({'screenshot': _screenshot(2), 'extra': 1})
+
+    step_data = log.step_data()
+
+    self.assertLen(log, 2)
+    self.assertEqual(list(step_data), ['screenshot', 'summary', 'extra'])
+    self.assertEqual(step_data['summary'], ['a'])
+    self.assertEqual(step_data['extra'], [1])
+    screenshots = step_data['screenshot']
+    self.assertIsInstance(screenshots[1], np.ndarray)
+    np.testing.assert_array_equal(screenshots[1], _screenshot(2))
+    self.assertIsInstance(
+        step_data.to_dict(load_frames=False)['screenshot'][1],
+        frame_store.FrameRef,
+    )
+    with self.assertRaises(KeyError):
+      _ = step_data['missing']
+
+  def test_reads_log_once_until_next_append(self):
+    log = step_log.StepLog(self.directory)
+    for i in range(3):
+      log.append({'screenshot': _screenshot(i), 'step_number': i})
+    step_data = log.step_data()
+
+    with mock.patch.object(log, 'steps', wraps=log.steps) as mock_steps:
+      for i in range(3):
+        self.assertEqual(step_data['step_number'][i], i)
+        np.testing.assert_array_equal(
+            step_data['screenshot'][i], _screenshot(i)
+        )
+      self.assertEqual(mock_steps.call_count, 1)
+
+      log.append({'step_number': 3})
+
+      self.assertEqual(step_data['step_number'], [0, 1, 2, 3])
+      self.assertLen(step_data.to_dict()['screenshot'], 3)
+      self.assertEqual(mock_steps.call_count, 2)
+
+  def test_pickles_as_dict_of_lists(self):
+    log = step_log.StepLog()
+    log.append({'screenshot': _screenshot(1), 'summary': 'a'})
+
+    unpickled = pickle.loads(pickle.dumps(log.step_data()))
+
+    self.assertEqual(list(unpickled), ['screenshot', 'summary'])
+    np.testing.assert_array_equal(unpickled['screenshot'][0], _screenshot(1))
+    self.assertEqual(unpickled['summary'], ['a'])
+
+  def test_reopening_skips_incomplete_step(self):
+    log = step_log.StepLog(self.directory)
+    log.append({'summary': 'a'})
+    log.append({'summary': 'b'})
+    path = os.path.join(self.directory, 'steps.pkl.gz')
+    with open(path, 'rb') as f:
+      content = f.read()
+    # E.g. the run crashed while writing the second step.
+    with open(path, 'wb') as f:
+      f.write(content[:-10])
+
+    reopened = step_log.StepLog(self.directory)
+
+    self.assertLen(reopened, 1)
+    self.assertEqual(dict(reopened.step_data()), {'summary': ['a']})
+
+  def test_append_does_not_modify_step(self):
+    screenshot = _screenshot(1)
+    step = {'screenshot': screenshot}
+
+    step_log.StepLog(self.directory).append(step)
+
+    self.assertEqual(step, {'screenshot': screenshot})
+    self.assertIs(step['screenshot'], screenshot)
+
+  def test_create_writes_where_requested(self):
+    with step_log.write_to(self.directory):
+      log = step_log.create()
+    temporary_log = step_log.create()
+
+    self.assertEqual(log.directory, self.directory)
+    self.assertNotEqual(temporary_log.directory, self.directory)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -169,6 +169,9 @@ class AdbEvalTestBase(absltest.TestCase):
     self.mock_add_contact = mock.patch.object(
         contacts_utils, 'add_contact'
     ).start()
+    self.mock_add_contacts = mock.patch.object(
+        contacts_utils, 'add_contacts'
+    ).start()
     self.mock_list_contacts = mock.patch.object(
         contacts_utils, 'list_contacts'
     ).start()
@@ -210,10 +213,12 @@ class FakeAsyncEnv(interface.AsyncAndroidEnv):
   """Fake environment for testing."""
 
   def __init__(self):
-    self._reset_called = True
-    self._controller = mock.create_autospec(
-        android_world_controller.AndroidWorldController, instance=True
+    super().__init__(
+        mock.create_autospec(
+            android_world_controller.AndroidWorldController, instance=True
+        )
     )
+    self._reset_called = True
 
   @property
   def controller(self) -> android_world_controller.AndroidWorldController:
@@ -251,3 +256,11 @@ class FakeAsyncEnv(interface.AsyncAndroidEnv):
   @property
   def logical_screen_size(self) -> tuple[int, int]:
     return (100, 100)
+
+  @property
+  def orientation(self) -> int:
+    return 0
+
+  @property
+  def physical_frame_boundary(self) -> tuple[int, int, int, int]:
+    return (0, 0, 100, 100)
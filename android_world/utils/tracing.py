@@ -0,0 +1,207 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Lightweight tracing of where episodes spend their time.
+
+Code is instrumented with spans, either with the `span` context manager or the
+`traced` decorator:
+
+  with tracing.span('adb', command='shell ls'):
+    ...
+
+  @tracing.traced('agent.step')
+  def step(self, goal): ...
+
+Spans are only recorded inside `record()`, which collects them into a `Trace`
+for the current thread; `suite_utils` records one trace per episode and writes
+it in the Chrome trace format, which can be opened in chrome://tracing or
+https://ui.perfetto.dev.
+
+Tracing is off by default. While it is disabled, or outside of `record()`, a
+span costs a single context variable lookup.
+"""
+
+import collections
+import contextlib
+import contextvars
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Iterator, TypeVar
+
+_T = TypeVar('_T')
+
+_enabled = False
+_active_trace: contextvars.ContextVar['Trace | None'] = contextvars.ContextVar(
+    'android_world_trace', default=None
+)
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def enable(enabled: bool = True) -> None:
+  """Turns recording of traces on or off for the process."""
+  global _enabled
+  _enabled = enabled
+
+
+def is_enabled() -> bool:
+  return _enabled
+
+
+class Trace:
+  """Spans recorded while the trace was active."""
+
+  def __init__(self):
+    self._events: list[dict[str, Any]] = []
+    self._lock = threading.Lock()
+    self._start = time.perf_counter()
+
+  def add(
+      self, name: str, start: float, end: float, args: dict[str, Any]
+  ) -> None:
+    """Adds a span, with start and end times from `time.perf_counter`."""
+    event = {
+        'name': name,
+        'ph': 'X',
+        'ts': (start - self._start) * 1e6,
+        'dur': (end - start) * 1e6,
+        'pid': os.getpid(),
+        'tid': threading.get_ident(),
+    }
+    if args:
+      event['args'] = {key: str(value) for key, value in args.items()}
+    with self._lock:
+      self._events.append(event)
+
+  @property
+  def events(self) -> list[dict[str, Any]]:
+    with self._lock:
+      return list(self._events)
+
+  def to_chrome_trace(self) -> dict[str, Any]:
+    """Returns the trace in the Chrome trace event format."""
+    return {'traceEvents': self.events, 'displayTimeUnit': 'ms'}
+
+  def durations(self) -> dict[str, list[float]]:
+    """Returns the durations in seconds of the spans, grouped by name."""
+    durations = collections.defaultdict(list)
+    for event in self.events:
+      durations[event['name']].append(event['dur'] / 1e6)
+    return dict(durations)
+
+
+class _Span:
+  """Adds itself to a trace when exited."""
+
+  __slots__ = ('_trace', '_name', '_args', '_start')
+
+  def __init__(self, trace: Trace, name: str, args: dict[str, Any]):
+    self._trace = trace
+    self._name = name
+    self._args = args
+    self._start = 0.0
+
+  def __enter__(self) -> None:
+    self._start = time.perf_counter()
+
+  def __exit__(self, *unused_exc_info) -> None:
+    self._trace.add(self._name, self._start, time.perf_counter(), self._args)
+
+
+def span(name: str, **args: Any) -> contextlib.AbstractContextManager[None]:
+  """Returns a context manager timing its body as a span.
+
+  Args:
+    name: The name of the span. Spans are aggregated by name.
+    **args: Details shown with the span in the trace viewer.
+  """
+  trace = _active_trace.get()
+  if trace is None:
+    return _NULL_SPAN
+  return _Span(trace, name, args)
+
+
+def traced(name: str) -> Callable[[Callable[..., _T]], Callable[..., _T]]:
+  """Returns a decorator recording each call of a function as a span."""
+
+  def decorator(fn: Callable[..., _T]) -> Callable[..., _T]:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> _T:
+      trace = _active_trace.get()
+      if trace is None:
+        return fn(*args, **kwargs)
+      with _Span(trace, name, {}):
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+  return decorator
+
+
+@contextlib.contextmanager
+def record() -> Iterator[Trace | None]:
+  """Records the spans of the current thread into a new trace.
+
+  Yields:
+    The trace, or None if tracing is disabled.
+  """
+  if not _enabled:
+    yield None
+    return
+  trace = Trace()
+  token = _active_trace.set(trace)
+  try:
+    yield trace
+  finally:
+    _active_trace.reset(token)
+
+
+class TraceSummary:
+  """Aggregates the spans of many traces, e.g. of all episodes of a suite."""
+
+  def __init__(self):
+    self._durations: dict[str, list[float]] = collections.defaultdict(list)
+    self._lock = threading.Lock()
+
+  def add(self, trace: Trace) -> None:
+    with self._lock:
+      for name, durations in trace.durations().items():
+        self._durations[name].extend(durations)
+
+  def render(self, top_n: int = 20) -> str:
+    """Returns a table of the spans with the largest total time.
+
+    Spans nest, so the time of a span includes the time of its children.
+
+    Args:
+      top_n: The number of spans to show.
+    """
+    with self._lock:
+      rows = sorted(
+          self._durations.items(), key=lambda item: sum(item[1]), reverse=True
+      )[:top_n]
+    width = max([len('span')] + [len(name) for name, _ in rows])
+    lines = [
+        f'{"span":<{width}} {"calls":>7} {"total s":>9} {"mean ms":>9}'
+        f' {"max ms":>9}'
+    ]
+    for name, durations in rows:
+      total = sum(durations)
+      lines.append(
+          f'{name:<{width}} {len(durations):>7} {total:>9.2f}'
+          f' {total / len(durations) * 1000:>9.1f}'
+          f' {max(durations) * 1000:>9.1f}'
+      )
+    return '\n'.join(lines)
@@ -0,0 +1,106 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from absl.testing import absltest
+from android_world.utils import tracing
+
+
+@tracing.traced('double')
+def _double(x: int) -> int:
+  return 2 * x
+
+
+class TracingTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    tracing.enable()
+    self.addCleanup(tracing.enable, False)
+
+  def test_records_nothing_when_disabled(self):
+    tracing.enable(False)
+
+    with tracing.record() as trace:
+      with tracing.span('outer'):
+        self.assertEqual(_double(2), 4)
+
+    self.assertIsNone(trace)
+
+  def test_spans_outside_of_record_are_dropped(self):
+    with tracing.span('outside'):
+      pass
+    self.assertEqual(_double(1), 2)
+
+    with tracing.record() as trace:
+      pass
+
+    self.assertEmpty(trace.events)
+
+  def test_records_spans_in_chrome_trace_format(self):
+    with tracing.record() as trace:
+      with tracing.span('outer', command='shell ls'):
+        self.assertEqual(_double(2), 4)
+
+    events = trace.to_chrome_trace()['traceEvents']
+    self.assertEqual([event['name'] for event in events], ['double', 'outer'])
+    double, outer = events
+    self.assertEqual(outer['ph'], 'X')
+    self.assertEqual(outer['args'], {'command': 'shell ls'})
+    self.assertNotIn('args', double)
+    self.assertGreaterEqual(double['ts'], outer['ts'])
+    self.assertLessEqual(double['dur'], outer['dur'])
+
+  def test_span_is_recorded_when_body_raises(self):
+    with tracing.record() as trace:
+      with self.assertRaises(ValueError):
+        with tracing.span('failing'):
+          raise ValueError()
+
+    self.assertEqual(list(trace.durations()), ['failing'])
+
+  def test_traces_are_per_thread(self):
+    def record_in_thread():
+      with tracing.span('other thread'):
+        pass
+
+    with tracing.record() as trace:
+      thread = threading.Thread(target=record_in_thread)
+      thread.start()
+      thread.join()
+      with tracing.span('this thread'):
+        pass
+
+    self.assertEqual(list(trace.durations()), ['this thread'])
+
+  def test_summary_sorts_by_total_time(self):
+    summary = tracing.TraceSummary()
+    trace = tracing.Trace()
+    trace.add('fast', 0.0, 0.1, {})
+    trace.add('slow', 0.0, 1.0, {})
+    trace.add('fast', 1.0, 1.1, {})
+    summary.add(trace)
+    summary.add(trace)
+
+    lines = summary.render().splitlines()
+
+    self.assertLen(lines, 3)
+    self.assertTrue(lines[1].startswith('slow'))
+    self.assertEqual(lines[2].split()[:3], ['fast', '4', '0.40'])
+    self.assertLen(summary.render(top_n=1).splitlines(), 2)
+
+
+if __name__ == '__main__':
+  absltest.main()
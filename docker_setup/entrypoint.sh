@@ -3,5 +3,7 @@
 # Start Emulator
 #============================================
 ./docker_setup/start_emu_headless.sh && \
-adb root && \
+for ((i = 0; i < ${ANDROID_WORLD_NUM_EMULATORS:-1}; i++)); do
+  adb -s "emulator-$((5554 + 2 * i))" root || exit 1
+done && \
 python3 -m server.android_server
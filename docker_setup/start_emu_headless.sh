@@ -10,6 +10,8 @@ YE='\033[1;33m'
 NC='\033[0m' # No Color
 
 emulator_name=${EMULATOR_NAME}
+# Emulator i listens on console port 5554 + 2i and gRPC port 8554 + i.
+num_emulators=${ANDROID_WORLD_NUM_EMULATORS:-1}
 
 function check_hardware_acceleration() {
     if [[ "$HW_ACCEL_OVERRIDE" != "" ]]; then
@@ -38,9 +40,14 @@ function check_hardware_acceleration() {
 hw_accel_flag=$(check_hardware_acceleration)
 
 function launch_emulator () {
-  adb devices | grep emulator | cut -f1 | xargs -I {} adb -s "{}" emu kill
+  local port=$1
+  local grpc_port=$2
   # options="@${emulator_name} -no-window -no-snapshot -noaudio -no-boot-anim -memory 2048 ${hw_accel_flag} -camera-back none  -grpc 8554"
-  options="@${emulator_name} -no-window -no-snapshot -no-boot-anim -memory 2048 ${hw_accel_flag} -grpc 8554"
+  options="@${emulator_name} -no-window -no-snapshot -no-boot-anim -memory 2048 ${hw_accel_flag} -port ${port} -grpc ${grpc_port}"
+  if [[ $num_emulators -gt 1 ]]; then
+    # Several instances of the same AVD can only run read-only.
+    options="${options} -read-only"
+  fi
   if [[ "$OSTYPE" == *linux* ]]; then
     echo "${OSTYPE}: emulator ${options} -gpu off"
     nohup emulator $options -gpu off &
@@ -58,6 +65,7 @@ function launch_emulator () {
 
 
 function check_emulator_status () {
+  local serial=$1
   printf "${G}==> ${BL}Checking emulator booting up status 🧐${NC}\n"
   start_time=$(date +%s)
   spinner=( "⠹" "⠺" "⠼" "⠶" "⠦" "⠧" "⠇" "⠏" )
@@ -66,12 +74,12 @@ function check_emulator_status () {
   timeout=${EMULATOR_TIMEOUT:-300}
 
   while true; do
-    result=$(adb shell getprop sys.boot_completed 2>&1)
+    result=$(adb -s "$serial" shell getprop sys.boot_completed 2>&1)
 
     if [ "$result" == "1" ]; then
       printf "\e[K${G}==> \u2713 Emulator is ready : '$result'           ${NC}\n"
       adb devices -l
-      adb shell input keyevent 82
+      adb -s "$serial" shell input keyevent 82
       return 0  # Return a 0 to indicate emulator has booted successfully
     elif [ "$result" == "" ]; then
       printf "${YE}==> Emulator is partially Booted! 😕 ${spinner[$i]} ${NC}\r"
@@ -92,26 +100,35 @@ function check_emulator_status () {
 
 
 function disable_animation() {
-  adb shell "settings put global window_animation_scale 0.0"
-  adb shell "settings put global transition_animation_scale 0.0"
-  adb shell "settings put global animator_duration_scale 0.0"
+  local serial=$1
+  adb -s "$serial" shell "settings put global window_animation_scale 0.0"
+  adb -s "$serial" shell "settings put global transition_animation_scale 0.0"
+  adb -s "$serial" shell "settings put global animator_duration_scale 0.0"
 };
 
 function hidden_policy() {
-  adb shell "settings put global hidden_api_policy_pre_p_apps 1;settings put global hidden_api_policy_p_apps 1;settings put global hidden_api_policy 1"
+  local serial=$1
+  adb -s "$serial" shell "settings put global hidden_api_policy_pre_p_apps 1;settings put global hidden_api_policy_p_apps 1;settings put global hidden_api_policy 1"
 };
 
-launch_emulator
+adb devices | grep emulator | cut -f1 | xargs -I {} adb -s "{}" emu kill
+
+for ((emulator_index = 0; emulator_index < num_emulators; emulator_index++)); do
+  launch_emulator $((5554 + 2 * emulator_index)) $((8554 + emulator_index)) || exit 1
+done
 sleep 2
 
-if check_emulator_status; then
-  # Only run the below if the emulator is actually ready
-  sleep 1
-  disable_animation
-  sleep 1
-  hidden_policy
-  sleep 1
-else
-  echo "Emulator failed to start properly, exiting..."
-  exit 1
-fi
\ No newline at end of file
+for ((emulator_index = 0; emulator_index < num_emulators; emulator_index++)); do
+  serial="emulator-$((5554 + 2 * emulator_index))"
+  if check_emulator_status "$serial"; then
+    # Only run the below if the emulator is actually ready
+    sleep 1
+    disable_animation "$serial"
+    sleep 1
+    hidden_policy "$serial"
+    sleep 1
+  else
+    echo "Emulator $serial failed to start properly, exiting..."
+    exit 1
+  fi
+done
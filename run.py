@@ -32,12 +32,17 @@ from android_world import suite_utils
 from android_world.agents import base_agent
 from android_world.agents import human_agent
 from android_world.agents import infer
+from android_world.agents import llm_replay
 from android_world.agents import m3a
 from android_world.agents import random_agent
 from android_world.agents import seeact
+from android_world.agents import seeact_utils
 from android_world.agents import t3a
+from android_world.env import adb_ledger
 from android_world.env import env_launcher
 from android_world.env import interface
+from android_world.utils import image_encoding
+from android_world.utils import tracing
 
 logging.set_verbosity(logging.WARNING)
 
@@ -81,6 +86,19 @@ _DEVICE_CONSOLE_PORT = flags.DEFINE_integer(
     ' first connected device is port 5554, the second is 5556, and'
     ' so on.',
 )
+_DEVICE_CONSOLE_PORTS = flags.DEFINE_list(
+    'console_ports',
+    None,
+    'Console ports of several running Android devices. If set, the suite is'
+    ' run in parallel with one agent per device and `console_port` is'
+    ' ignored. Must be set together with `grpc_ports`.',
+)
+_DEVICE_GRPC_PORTS = flags.DEFINE_list(
+    'grpc_ports',
+    None,
+    'The gRPC ports of the devices in `console_ports`, in the same order. Each'
+    ' emulator must be launched with its own `-grpc` port.',
+)
 
 _SUITE_FAMILY = flags.DEFINE_enum(
     'suite_family',
@@ -137,6 +155,73 @@ _FIXED_TASK_SEED = flags.DEFINE_boolean(
     ' (n_task_combinations > 1).',
 )
 
+_UI_STABILIZATION = flags.DEFINE_enum(
+    'ui_stabilization',
+    interface.StabilizationMode.POLLING.value,
+    [mode.value for mode in interface.StabilizationMode],
+    'How to wait for the screen to stabilize after an action. "adaptive" polls'
+    ' with backoff and returns as soon as the a11y forest stops changing.',
+)
+
+_SUMMARY_EVERY_N_EPISODES = flags.DEFINE_integer(
+    'summary_every_n_episodes',
+    10,
+    'Print the full results table after every this many episodes; it is'
+    ' always printed at the end. Use 0 to only print it at the end.',
+)
+
+_TRACE = flags.DEFINE_boolean(
+    'trace',
+    False,
+    'Record where each episode spends its time. Traces are written next to'
+    ' the checkpoint as <task>.trace.json, in the Chrome trace format, and the'
+    ' spans with the largest total time are printed at the end.',
+)
+
+_ADB_LEDGER = flags.DEFINE_boolean(
+    'adb_ledger',
+    False,
+    'Record every adb call, print a summary per task and a table of the'
+    ' costliest commands at the end, flagging repeated read-only calls.',
+)
+
+_LLM_CACHE_DIR = flags.DEFINE_string(
+    'llm_cache_dir',
+    None,
+    'Directory where LLM responses are recorded and replayed from; see'
+    ' --llm_cache_mode.',
+)
+
+_LLM_CACHE_MODE = flags.DEFINE_enum(
+    'llm_cache_mode',
+    'off',
+    ['off'] + [mode.value for mode in llm_replay.Mode],
+    'How to use --llm_cache_dir: "record" calls the model and stores its'
+    ' responses, "replay" only replays stored responses, failing on a miss,'
+    ' and "record_if_missing" calls the model on a miss. Replaying allows'
+    ' rerunning an evaluation deterministically without calling the model.',
+)
+
+_IMAGE_FORMAT = flags.DEFINE_enum(
+    'image_format',
+    'JPEG',
+    ['JPEG', 'PNG', 'WEBP'],
+    'Format of the screenshots sent to OpenAI models and shown in reports.',
+)
+
+_IMAGE_QUALITY = flags.DEFINE_integer(
+    'image_quality',
+    None,
+    'Quality of JPEG and WEBP screenshots, from 1 to 100. Defaults to 75.',
+)
+
+_IMAGE_MAX_SIDE = flags.DEFINE_integer(
+    'image_max_side',
+    None,
+    'If set, screenshots sent to OpenAI models are downscaled so that their'
+    ' longest side has at most this many pixels.',
+)
+
 
 # MiniWoB is very lightweight and new screens/View Hierarchy load quickly.
 _MINIWOB_TRANSITION_PAUSE = 0.2
@@ -156,6 +241,19 @@ def _get_agent(
 ) -> base_agent.EnvironmentInteractingAgent:
   """Gets agent."""
   print('Initializing agent...')
+  store = None
+  mode = None
+  if _LLM_CACHE_MODE.value != 'off':
+    if not _LLM_CACHE_DIR.value:
+      raise ValueError('--llm_cache_mode requires --llm_cache_dir.')
+    store = llm_replay.ResponseStore(_LLM_CACHE_DIR.value)
+    mode = llm_replay.Mode(_LLM_CACHE_MODE.value)
+
+  def wrap(llm):
+    if store is None:
+      return llm
+    return llm_replay.ReplayLlmWrapper(llm, store, mode)
+
   agent = None
   if _AGENT_NAME.value == 'human_agent':
     agent = human_agent.HumanAgent(env)
@@ -164,20 +262,28 @@ def _get_agent(
   # Gemini.
   elif _AGENT_NAME.value == 'm3a_gemini_gcp':
     agent = m3a.M3A(
-        env, infer.GeminiGcpWrapper(model_name='gemini-1.5-pro-latest')
+        env, wrap(infer.GeminiGcpWrapper(model_name='gemini-1.5-pro-latest'))
     )
   elif _AGENT_NAME.value == 't3a_gemini_gcp':
     agent = t3a.T3A(
-        env, infer.GeminiGcpWrapper(model_name='gemini-1.5-pro-latest')
+        env, wrap(infer.GeminiGcpWrapper(model_name='gemini-1.5-pro-latest'))
     )
   # GPT.
   elif _AGENT_NAME.value == 't3a_gpt4':
-    agent = t3a.T3A(env, infer.Gpt4Wrapper('gpt-4-turbo-2024-04-09'))
+    agent = t3a.T3A(env, wrap(infer.Gpt4Wrapper('gpt-4-turbo-2024-04-09')))
   elif _AGENT_NAME.value == 'm3a_gpt4v':
-    agent = m3a.M3A(env, infer.Gpt4Wrapper('gpt-4-turbo-2024-04-09'))
+    agent = m3a.M3A(env, wrap(infer.Gpt4Wrapper('gpt-4-turbo-2024-04-09')))
   # SeeAct.
   elif _AGENT_NAME.value == 'seeact':
-    agent = seeact.SeeAct(env)
+    if store is None:
+      agent = seeact.SeeAct(env)
+    else:
+      agent = seeact.SeeAct(
+          env,
+          request_fn=llm_replay.replay_openai_request(
+              seeact_utils.execute_openai_request, store, mode
+          ),
+      )
 
   if not agent:
     raise ValueError(f'Unknown agent: {_AGENT_NAME.value}')
@@ -194,13 +300,51 @@ def _get_agent(
   return agent
 
 
+def _load_envs() -> list[interface.AsyncEnv]:
+  """Loads one environment per device."""
+  if not _DEVICE_CONSOLE_PORTS.value:
+    return [
+        env_launcher.load_and_setup_env(
+            console_port=_DEVICE_CONSOLE_PORT.value,
+            emulator_setup=_EMULATOR_SETUP.value,
+            adb_path=_ADB_PATH.value,
+        )
+    ]
+  grpc_ports = _DEVICE_GRPC_PORTS.value or []
+  if len(grpc_ports) != len(_DEVICE_CONSOLE_PORTS.value):
+    raise ValueError(
+        'console_ports and grpc_ports must have the same number of entries.'
+    )
+  return [
+      env_launcher.load_and_setup_env(
+          console_port=int(console_port),
+          emulator_setup=_EMULATOR_SETUP.value,
+          adb_path=_ADB_PATH.value,
+          grpc_port=int(grpc_port),
+      )
+      for console_port, grpc_port in zip(
+          _DEVICE_CONSOLE_PORTS.value, grpc_ports
+      )
+  ]
+
+
 def _main() -> None:
   """Runs eval suite and gets rewards back."""
-  env = env_launcher.load_and_setup_env(
-      console_port=_DEVICE_CONSOLE_PORT.value,
-      emulator_setup=_EMULATOR_SETUP.value,
-      adb_path=_ADB_PATH.value,
+  if _TRACE.value:
+    tracing.enable()
+  if _ADB_LEDGER.value:
+    adb_ledger.enable()
+  image_encoding.get_default_cache().options = image_encoding.EncodingOptions(
+      format=_IMAGE_FORMAT.value,
+      quality=_IMAGE_QUALITY.value,
+      max_side=_IMAGE_MAX_SIDE.value,
   )
+  envs = _load_envs()
+  for env in envs:
+    if isinstance(env, interface.AsyncAndroidEnv):
+      env.stabilization_mode = interface.StabilizationMode(
+          _UI_STABILIZATION.value
+      )
 
   n_task_combinations = _N_TASK_COMBINATIONS.value
   task_registry = registry.TaskRegistry()
@@ -213,13 +357,15 @@ def _main() -> None:
   )
   suite.suite_family = _SUITE_FAMILY.value
 
-  agent = _get_agent(env, _SUITE_FAMILY.value)
+  agents = [_get_agent(env, _SUITE_FAMILY.value) for env in envs]
 
-  if _SUITE_FAMILY.value.startswith('miniwob'):
-    # MiniWoB pages change quickly, don't need to wait for screen to stabilize.
-    agent.transition_pause = _MINIWOB_TRANSITION_PAUSE
-  else:
-    agent.transition_pause = None
+  for agent in agents:
+    if _SUITE_FAMILY.value.startswith('miniwob'):
+      # MiniWoB pages change quickly, don't need to wait for screen to
+      # stabilize.
+      agent.transition_pause = _MINIWOB_TRANSITION_PAUSE
+    else:
+      agent.transition_pause = None
 
   if _CHECKPOINT_DIR.value:
     checkpoint_dir = _CHECKPOINT_DIR.value
@@ -227,20 +373,32 @@ def _main() -> None:
     checkpoint_dir = checkpointer_lib.create_run_directory(_OUTPUT_PATH.value)
 
   print(
-      f'Starting eval with agent {_AGENT_NAME.value} and writing to'
-      f' {checkpoint_dir}'
-  )
-  suite_utils.run(
-      suite,
-      agent,
-      checkpointer=checkpointer_lib.IncrementalCheckpointer(checkpoint_dir),
-      demo_mode=False,
+      f'Starting eval with agent {_AGENT_NAME.value} on {len(envs)} device(s)'
+      f' and writing to {checkpoint_dir}'
   )
+  checkpointer = checkpointer_lib.IncrementalCheckpointer(checkpoint_dir)
+  if len(agents) == 1:
+    suite_utils.run(
+        suite,
+        agents[0],
+        checkpointer=checkpointer,
+        demo_mode=False,
+        summary_every_n_episodes=_SUMMARY_EVERY_N_EPISODES.value,
+    )
+  else:
+    suite_utils.run_parallel(
+        suite,
+        agents,
+        checkpointer=checkpointer,
+        demo_mode=False,
+        summary_every_n_episodes=_SUMMARY_EVERY_N_EPISODES.value,
+    )
   print(
       f'Finished running agent {_AGENT_NAME.value} on {_SUITE_FAMILY.value}'
       f' family. Wrote to {checkpoint_dir}.'
   )
-  env.close()
+  for env in envs:
+    env.close()
 
 
 def main(argv: Sequence[str]) -> None:
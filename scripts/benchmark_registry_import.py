@@ -0,0 +1,79 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks the cold start cost of the task registry.
+
+Each measurement runs in a fresh interpreter, like a new worker process or
+server would. Run from the repository root:
+
+python scripts/benchmark_registry_import.py --runs=10
+"""
+
+import statistics
+import subprocess
+import sys
+
+from absl import app
+from absl import flags
+
+_RUNS = flags.DEFINE_integer('runs', 5, 'Fresh interpreters per benchmark.')
+_TASK = flags.DEFINE_string(
+    'task', 'SimpleSmsSend', 'Task resolved by the single task benchmark.'
+)
+
+_SETUP = """
+import time
+start = time.perf_counter()
+from android_world import registry
+"""
+
+_BENCHMARKS = {
+    'import registry': '',
+    'list android_world tasks': (
+        "len(registry.TaskRegistry().get_registry('android_world'))"
+    ),
+    'resolve one task': (
+        "registry.TaskRegistry().get_registry('android_world')[{task!r}]"
+    ),
+}
+
+
+def _time_once(statement: str) -> float:
+  """Returns the seconds taken by the setup and statement in a new process."""
+  code = _SETUP + statement + '\nprint(time.perf_counter() - start)\n'
+  output = subprocess.run(
+      [sys.executable, '-c', code],
+      check=True,
+      capture_output=True,
+      text=True,
+  ).stdout
+  return float(output.strip().splitlines()[-1])
+
+
+def main(argv: list[str]) -> None:
+  if len(argv) > 1:
+    raise app.UsageError('Too many command-line arguments.')
+  for name, statement in _BENCHMARKS.items():
+    timings = [
+        _time_once(statement.format(task=_TASK.value))
+        for _ in range(_RUNS.value)
+    ]
+    print(
+        f'{name:<26} median {statistics.median(timings) * 1000:7.1f} ms'
+        f'  min {min(timings) * 1000:7.1f} ms'
+    )
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -0,0 +1,112 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks drawing the Set-of-Mark overlay of M3A on a screenshot.
+
+Compares marking elements one by one with `add_ui_element_mark` to the batch
+`add_ui_element_marks`, on a Pixel 6 sized screenshot. Run from the
+repository root:
+
+python scripts/benchmark_som_overlay.py --elements=10,100,500
+"""
+
+import timeit
+
+from absl import app
+from absl import flags
+from android_world.agents import m3a_utils
+from android_world.env import representation_utils
+import numpy as np
+
+_ELEMENTS = flags.DEFINE_list(
+    'elements', ['10', '100', '500'], 'Numbers of UI elements to mark.'
+)
+_RUNS = flags.DEFINE_integer('runs', 50, 'Overlays drawn per benchmark.')
+
+_SCREEN_SIZE = (1080, 2400)
+_PHYSICAL_FRAME_BOUNDARY = (0, 0, 1080, 2400)
+
+
+def _ui_elements(n: int) -> list[representation_utils.UIElement]:
+  rng = np.random.default_rng(0)
+  width, height = _SCREEN_SIZE
+  ui_elements = []
+  for _ in range(n):
+    x_min = rng.uniform(0, width - 20)
+    y_min = rng.uniform(0, height - 20)
+    ui_elements.append(
+        representation_utils.UIElement(
+            bbox_pixels=representation_utils.BoundingBox(
+                x_min=x_min,
+                x_max=x_min + rng.uniform(20, 400),
+                y_min=y_min,
+                y_max=y_min + rng.uniform(20, 200),
+            ),
+            is_visible=True,
+        )
+    )
+  return ui_elements
+
+
+def _mark_one_by_one(
+    screenshot: np.ndarray, ui_elements: list[representation_utils.UIElement]
+) -> None:
+  for index, ui_element in enumerate(ui_elements):
+    if m3a_utils.validate_ui_element(ui_element, _SCREEN_SIZE):
+      m3a_utils.add_ui_element_mark(
+          screenshot,
+          ui_element,
+          index,
+          _SCREEN_SIZE,
+          _PHYSICAL_FRAME_BOUNDARY,
+          0,
+      )
+
+
+def _mark_batch(
+    screenshot: np.ndarray, ui_elements: list[representation_utils.UIElement]
+) -> None:
+  m3a_utils.add_ui_element_marks(
+      screenshot, ui_elements, _SCREEN_SIZE, _PHYSICAL_FRAME_BOUNDARY, 0
+  )
+
+
+def main(argv: list[str]) -> None:
+  if len(argv) > 1:
+    raise app.UsageError('Too many command-line arguments.')
+  screenshot = np.zeros((_SCREEN_SIZE[1], _SCREEN_SIZE[0], 3), dtype=np.uint8)
+  for n in map(int, _ELEMENTS.value):
+    ui_elements = _ui_elements(n)
+    timings = {}
+    for name, mark in [
+        ('one by one', _mark_one_by_one),
+        ('batch', _mark_batch),
+    ]:
+      mark(screenshot, ui_elements)  # Warms up the label cache.
+      timings[name] = (
+          timeit.timeit(
+              lambda mark=mark: mark(screenshot, ui_elements),
+              number=_RUNS.value,
+          )
+          / _RUNS.value
+      )
+    print(
+        f'{n:>4} elements  one by one {timings["one by one"] * 1000:7.2f} ms'
+        f'  batch {timings["batch"] * 1000:7.2f} ms'
+        f'  ({timings["one by one"] / timings["batch"]:.1f}x)'
+    )
+
+
+if __name__ == '__main__':
+  app.run(main)
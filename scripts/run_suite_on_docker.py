@@ -28,12 +28,14 @@ environment. You'll need to implement your agent logic to interact with the
 environment.
 """
 
+import base64
 import json
 import logging
 import time
 from typing import Any
 
 from android_world.env import json_action
+import cv2
 import numpy as np
 import pydantic
 import requests
@@ -43,6 +45,8 @@ logger.setLevel(logging.INFO)
 
 Params = dict[str, int | str]
 
+_HEADER_SESSION_ID = "X-Session-Id"
+
 
 class Response(pydantic.BaseModel):
   status: str
@@ -52,32 +56,107 @@ class Response(pydantic.BaseModel):
 class AndroidEnvClient:
   """Client for interacting with the Android environment server."""
 
-  def __init__(self):
+  def __init__(self, base_url: str = "http://localhost:5000"):
     logger.info(
         "Setting up Android environment using Docker - Initial setup may take"
         " 5-10 minutes. Please wait..."
     )
-    self.base_url = "http://localhost:5000"
+    self.base_url = base_url
+    # Carries the session header once a session is created.
+    self._http = requests.Session()
+
+  def create_session(self) -> str:
+    """Leases an emulator; later requests are routed to it.
+
+    Without a session, requests use the server's first emulator. Sessions let
+    several clients share a server that manages multiple emulators.
+
+    Returns:
+      The session ID.
+    """
+    response = self._http.post(f"{self.base_url}/session/create")
+    response.raise_for_status()
+    session_id = response.json()["session_id"]
+    self._http.headers[_HEADER_SESSION_ID] = session_id
+    return session_id
+
+  def release_session(self) -> None:
+    """Returns the leased emulator to the server's pool."""
+    response = self._http.post(f"{self.base_url}/session/release")
+    response.raise_for_status()
+    del self._http.headers[_HEADER_SESSION_ID]
 
   def reset(self, go_home: bool) -> Response:
     """Resets the environment."""
-    response = requests.post(
+    response = self._http.post(
         f"{self.base_url}/reset", params={"go_home": go_home}
     )
     response.raise_for_status()
     return Response(**response.json())
 
   def get_screenshot(
-      self, wait_to_stabilize: bool = False
+      self,
+      wait_to_stabilize: bool = False,
+      encoding: str = "png",
+      quality: int = 90,
+      max_side: int | None = None,
   ) -> np.ndarray[Any, Any]:
-    """Gets the current screenshot of the environment."""
-    response = requests.get(
-        f"{self.base_url}/screenshot",
-        params={"wait_to_stabilize": wait_to_stabilize},
+    """Gets the current screenshot of the environment.
+
+    Args:
+      wait_to_stabilize: Whether to wait for the screen to stabilize.
+      encoding: One of json, raw, png or jpeg. Binary encodings are much
+        cheaper to produce and transfer than the legacy json int list.
+      quality: JPEG quality.
+      max_side: If set, the server downscales the screenshot so that its
+        longest side is at most this many pixels.
+
+    Returns:
+      The screenshot as an RGB array.
+    """
+    params = {
+        "wait_to_stabilize": wait_to_stabilize,
+        "encoding": encoding,
+        "quality": quality,
+    }
+    if max_side is not None:
+      params["max_side"] = max_side
+    response = self._http.get(f"{self.base_url}/screenshot", params=params)
+    response.raise_for_status()
+    if encoding == "json":
+      return np.array(response.json()["pixels"])
+    return _decode_pixels(
+        response.content,
+        encoding,
+        shape=response.headers["X-Image-Shape"],
+        dtype=response.headers["X-Image-Dtype"],
     )
+
+  def get_state(
+      self,
+      wait_to_stabilize: bool = False,
+      encoding: str = "png",
+      quality: int = 90,
+      max_side: int | None = None,
+  ) -> tuple[np.ndarray[Any, Any], list[dict[str, Any]]]:
+    """Gets the screenshot and UI elements with a single request."""
+    params = {
+        "wait_to_stabilize": wait_to_stabilize,
+        "encoding": encoding,
+        "quality": quality,
+    }
+    if max_side is not None:
+      params["max_side"] = max_side
+    response = self._http.get(f"{self.base_url}/state", params=params)
     response.raise_for_status()
-    image = response.json()
-    return np.array(image["pixels"])
+    state = response.json()
+    pixels = _decode_pixels(
+        base64.b64decode(state["pixels"]),
+        state["encoding"],
+        shape=",".join(str(d) for d in state["shape"]),
+        dtype=state["dtype"],
+    )
+    return pixels, state["ui_elements"]
 
   def execute_action(
       self,
@@ -85,7 +164,7 @@ class AndroidEnvClient:
   ) -> Response:
     """Executes an action in the environment."""
     print(f"Executing action: {action.json_str()}")
-    response = requests.post(
+    response = self._http.post(
         f"{self.base_url}/execute_action", json=json.loads(action.json_str())
     )
     response.raise_for_status()
@@ -93,7 +172,7 @@ class AndroidEnvClient:
 
   def get_suite_task_list(self, max_index: int) -> list[str]:
     """Gets the list of tasks in the suite."""
-    response = requests.get(
+    response = self._http.get(
         f"{self.base_url}/suite/task_list", params={"max_index": max_index}
     )
     response.raise_for_status()
@@ -101,7 +180,7 @@ class AndroidEnvClient:
 
   def get_suite_task_length(self, task_type: str) -> int:
     """Gets the length of the suite of tasks."""
-    response = requests.get(
+    response = self._http.get(
         f"{self.base_url}/suite/task_length", params={"task_type": task_type}
     )
     response.raise_for_status()
@@ -114,7 +193,7 @@ class AndroidEnvClient:
       task_family: str = "android_world",  # Default from initial server setup.
   ) -> Response:
     """Reinitializes the suite of tasks."""
-    response = requests.get(
+    response = self._http.get(
         f"{self.base_url}/suite/reinitialize",
         params={
             "n_task_combinations": n_task_combinations,
@@ -128,47 +207,52 @@ class AndroidEnvClient:
   def initialize_task(self, task_type: str, task_idx: int) -> Response:
     """Initializes the task in the environment."""
     params: Params = {"task_type": task_type, "task_idx": task_idx}
-    response = requests.post(f"{self.base_url}/task/initialize", params=params)
+    response = self._http.post(
+        f"{self.base_url}/task/initialize", params=params
+    )
     response.raise_for_status()
     return Response(**response.json())
 
   def tear_down_task(self, task_type: str, task_idx: int) -> Response:
     """Tears down the task in the environment."""
     params: Params = {"task_type": task_type, "task_idx": task_idx}
-    response = requests.post(f"{self.base_url}/task/tear_down", params=params)
+    response = self._http.post(
+        f"{self.base_url}/task/tear_down", params=params
+    )
     response.raise_for_status()
     return Response(**response.json())
 
   def get_task_score(self, task_type: str, task_idx: int) -> float:
     """Gets the score of the current task."""
     params: Params = {"task_type": task_type, "task_idx": task_idx}
-    response = requests.get(f"{self.base_url}/task/score", params=params)
+    response = self._http.get(f"{self.base_url}/task/score", params=params)
     response.raise_for_status()
     return response.json()["score"]
 
   def get_task_goal(self, task_type: str, task_idx: int) -> str:
     """Gets the goal of the current task."""
     params: Params = {"task_type": task_type, "task_idx": task_idx}
-    response = requests.get(f"{self.base_url}/task/goal", params=params)
+    response = self._http.get(f"{self.base_url}/task/goal", params=params)
     response.raise_for_status()
     return response.json()["goal"]
 
   def get_task_template(self, task_type: str, task_idx: int) -> str:
     """Gets the template of the current task."""
     params: Params = {"task_type": task_type, "task_idx": task_idx}
-    response = requests.get(f"{self.base_url}/task/template", params=params)
+    response = self._http.get(f"{self.base_url}/task/template", params=params)
     response.raise_for_status()
     return response.json()["template"]
 
   def close(self) -> None:
-    """Closes the environment."""
-    response = requests.post(f"{self.base_url}/close")
+    """Closes the environment, ending the session if there is one."""
+    response = self._http.post(f"{self.base_url}/close")
     response.raise_for_status()
+    self._http.headers.pop(_HEADER_SESSION_ID, None)
 
   def health(self) -> bool:
     """Checks the health of the environment."""
     try:
-      response = requests.get(f"{self.base_url}/health")
+      response = self._http.get(f"{self.base_url}/health")
       response.raise_for_status()
     except Exception as e:  # pylint: disable=broad-exception-caught
       print(f"Environment is not healthy: {e}")
@@ -176,6 +260,18 @@ class AndroidEnvClient:
     return True
 
 
+def _decode_pixels(
+    data: bytes, encoding: str, shape: str, dtype: str
+) -> np.ndarray[Any, Any]:
+  """Decodes a binary screenshot returned by the server into an RGB array."""
+  if encoding == "raw":
+    return np.frombuffer(data, dtype=np.dtype(dtype)).reshape(
+        [int(d) for d in shape.split(",")]
+    )
+  image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+  return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
 if __name__ == "__main__":
   client = AndroidEnvClient()
 
@@ -186,6 +282,9 @@ if __name__ == "__main__":
     else:
       break
 
+  session_id = client.create_session()
+  print(f"session_id: {session_id}")
+
   res = client.reset(go_home=True)
   print(f"reset response: {res}")
 
@@ -242,4 +341,4 @@ if __name__ == "__main__":
       res = client.reset(go_home=True)
       print(f"reset response: {res}")
 
-  client.close()
+  client.release_session()
@@ -0,0 +1,63 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Exports or pre-generates the media fixtures used by a suite.
+
+The inputs of a fixture are drawn while a task is initialized on the device,
+so they are recorded by running the suite once. Export them from the cache of
+that run, then warm the cache of other workers before they start:
+
+python scripts/warm_fixture_cache.py --export=/path/to/suite_fixtures.jsonl
+python scripts/warm_fixture_cache.py --manifest=/path/to/suite_fixtures.jsonl
+
+The cache location and size follow the `ANDROID_WORLD_FIXTURE_CACHE_DIR` and
+`ANDROID_WORLD_FIXTURE_CACHE_MB` environment variables.
+"""
+
+from absl import app
+from absl import flags
+# Registers the fixture generators.
+from android_world.task_evals.utils import user_data_generation  # pylint: disable=unused-import
+from android_world.utils import fixture_cache
+
+_MANIFEST = flags.DEFINE_string(
+    'manifest', None, 'Manifest of fixtures to generate into the cache.'
+)
+_EXPORT = flags.DEFINE_string(
+    'export', None, 'Path to write the manifest of the cached fixtures to.'
+)
+
+
+def main(argv: list[str]) -> None:
+  if len(argv) > 1:
+    raise app.UsageError('Too many command-line arguments.')
+  if (_MANIFEST.value is None) == (_EXPORT.value is None):
+    raise app.UsageError('Pass exactly one of --manifest and --export.')
+  cache = fixture_cache.get_default_cache()
+  if cache is None:
+    raise app.UsageError('The fixture cache is disabled.')
+
+  if _EXPORT.value is not None:
+    count = cache.export_manifest(_EXPORT.value)
+    print(f'Exported {count} fixtures to {_EXPORT.value}.')
+    return
+  specs = fixture_cache.read_manifest(_MANIFEST.value)
+  generated = fixture_cache.warm(cache, specs)
+  print(
+      f'Generated {generated} of {len(specs)} fixtures in {cache.directory}.'
+  )
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -14,40 +14,411 @@
 
 """FastAPI server for managing and interacting with an Android environment.
 
-This server exposes endpoints to control an Android emulator, execute tasks,
+This server exposes endpoints to control Android emulators, execute tasks,
 and manage task execution on AndroidWorld tasks.
+
+The server manages a pool of emulators, set by the ANDROID_WORLD_NUM_EMULATORS
+environment variable. Emulator i must be running with console port 5554 + 2i
+and gRPC port 8554 + i. Clients lease an emulator with `/session/create` and
+pass the returned session ID in the `X-Session-Id` header; requests without a
+session ID use the first emulator, as a single-client server did. The first
+emulator is leased last, and requests without a session ID are rejected with
+409 while it is leased.
+
+A lease expires once its session has been idle for ANDROID_WORLD_LEASE_TTL_SEC
+seconds, and the emulator is then returned to the pool when another session
+needs one. Every request of the session renews the lease; idle clients can
+keep it with `/session/heartbeat`. `/close` also ends the session.
+
+Environment calls block, so they run on a worker thread per emulator and are
+serialized per emulator. A slow call on one emulator does not stall requests
+for the others or `/health`.
 """
 
+import asyncio
+import base64
+from concurrent import futures
 import contextlib
+import copy
+import dataclasses
+import functools
+import os
+import time
 import typing
-from typing import Any
+from typing import Any, Callable, TypeVar
+import uuid
 
 from android_world import registry as aw_registry_module
 from android_world import suite_utils
 from android_world.env import env_launcher
 from android_world.env import interface
 from android_world.env import json_action
+from android_world.env import representation_utils
+import cv2
 import fastapi
+import numpy as np
 import pydantic
 import uvicorn
 
+# Supported screenshot encodings. "json" is the legacy nested int list.
+ENCODING_JSON = "json"
+ENCODING_RAW = "raw"
+ENCODING_PNG = "png"
+ENCODING_JPEG = "jpeg"
+_MEDIA_TYPES = {
+    ENCODING_RAW: "application/octet-stream",
+    ENCODING_PNG: "image/png",
+    ENCODING_JPEG: "image/jpeg",
+}
+
+# Response headers describing binary screenshots.
+HEADER_SHAPE = "X-Image-Shape"
+HEADER_DTYPE = "X-Image-Dtype"
+HEADER_SCREEN_SIZE = "X-Screen-Size"
+
+# Request header identifying the session, and thus the emulator, to use.
+HEADER_SESSION_ID = "X-Session-Id"
+
+# Number of emulators managed by the server.
+NUM_EMULATORS_ENV_VAR = "ANDROID_WORLD_NUM_EMULATORS"
+
+# Seconds a session may be idle before its lease expires.
+LEASE_TTL_ENV_VAR = "ANDROID_WORLD_LEASE_TTL_SEC"
+_DEFAULT_LEASE_TTL_SEC = 600.0
+
+_ADB_PATH = "/opt/android/platform-tools/adb"
+_BASE_CONSOLE_PORT = 5554
+_BASE_GRPC_PORT = 8554
+
+_T = TypeVar("_T")
+
 
 class StateResponse(pydantic.BaseModel):
-  """Pydantic model for state responses, including pixels and UI elements."""
+  """Pydantic model for state responses, including pixels and UI elements.
+
+  Attributes:
+    encoding: How `pixels` is encoded; one of raw, png or jpeg.
+    pixels: Base64 encoded screenshot.
+    shape: Shape of the (possibly downscaled) screenshot array.
+    dtype: Dtype of the screenshot array.
+    screen_size: Original (width, height) of the screenshot, before
+      downscaling. UI element bounding boxes are in this coordinate space.
+    ui_elements: UI elements, with unset attributes omitted.
+  """
+
+  encoding: str
+  pixels: str
+  shape: list[int]
+  dtype: str
+  screen_size: list[int]
+  ui_elements: list[dict[str, Any]]
+
+
+def _resolve_encoding(encoding: str | None, accept: str | None) -> str:
+  """Returns the requested encoding, falling back to the Accept header."""
+  if encoding is None:
+    accept = accept or ""
+    for candidate, media_type in _MEDIA_TYPES.items():
+      if media_type in accept:
+        return candidate
+    return ENCODING_JSON
+  if encoding != ENCODING_JSON and encoding not in _MEDIA_TYPES:
+    raise fastapi.HTTPException(
+        status_code=400, detail=f"Invalid encoding: {encoding}"
+    )
+  return encoding
+
+
+def _downscale(pixels: np.ndarray, max_side: int | None) -> np.ndarray:
+  """Resizes pixels so that the longest side is at most max_side."""
+  if max_side is None or max(pixels.shape[:2]) <= max_side:
+    return pixels
+  if max_side <= 0:
+    raise fastapi.HTTPException(
+        status_code=400, detail="max_side must be a positive integer."
+    )
+  height, width = pixels.shape[:2]
+  scale = max_side / max(height, width)
+  return cv2.resize(
+      pixels,
+      (max(1, round(width * scale)), max(1, round(height * scale))),
+      interpolation=cv2.INTER_AREA,
+  )
+
+
+def _encode_pixels(pixels: np.ndarray, encoding: str, quality: int) -> bytes:
+  """Encodes an RGB array as raw bytes, PNG or JPEG."""
+  if encoding == ENCODING_RAW:
+    return np.ascontiguousarray(pixels).tobytes()
+  if encoding == ENCODING_PNG:
+    ok, buffer = cv2.imencode(".png", cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR))
+  else:
+    ok, buffer = cv2.imencode(
+        ".jpg",
+        cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR),
+        [cv2.IMWRITE_JPEG_QUALITY, quality],
+    )
+  if not ok:
+    raise fastapi.HTTPException(
+        status_code=500, detail=f"Failed to encode screenshot as {encoding}."
+    )
+  return buffer.tobytes()
+
+
+def _compact_ui_element(
+    element: representation_utils.UIElement,
+) -> dict[str, Any]:
+  """Converts a UI element to a dict, dropping attributes that are unset."""
+  return {
+      key: value
+      for key, value in dataclasses.asdict(element).items()
+      if value is not None
+  }
+
+
+@dataclasses.dataclass
+class EmulatorSlot:
+  """An emulator in the pool.
+
+  Attributes:
+    console_port: The console port of the emulator.
+    grpc_port: The gRPC port of the emulator.
+    env: The environment, or None if it is not loaded or was closed.
+    lock: Serializes calls to the environment.
+    session_id: The session that leased the emulator, if any.
+    suite: The task suite of the session. Task instances hold state between
+      initialization and scoring, so each session gets its own copy.
+    expires_at: The `time.monotonic()` time at which the lease expires, if the
+      emulator is leased.
+  """
+
+  console_port: int
+  grpc_port: int
+  env: interface.AsyncEnv | None = None
+  lock: asyncio.Lock = dataclasses.field(default_factory=asyncio.Lock)
+  session_id: str | None = None
+  suite: suite_utils.Suite | None = None
+  expires_at: float | None = None
+
+  @property
+  def is_expired(self) -> bool:
+    """Whether the lease expired and no call of the session is running."""
+    return (
+        self.expires_at is not None
+        and self.expires_at <= time.monotonic()
+        and not self.lock.locked()
+    )
+
+
+class EmulatorPool:
+  """A pool of emulators leased to sessions."""
+
+  def __init__(
+      self,
+      num_emulators: int,
+      adb_path: str = _ADB_PATH,
+      lease_ttl_sec: float = _DEFAULT_LEASE_TTL_SEC,
+  ):
+    if num_emulators < 1:
+      raise ValueError("The pool needs at least one emulator.")
+    if lease_ttl_sec <= 0:
+      raise ValueError("The lease TTL must be positive.")
+    self.adb_path = adb_path
+    self.lease_ttl_sec = lease_ttl_sec
+    self.slots = [
+        EmulatorSlot(
+            console_port=_BASE_CONSOLE_PORT + 2 * i,
+            grpc_port=_BASE_GRPC_PORT + i,
+        )
+        for i in range(num_emulators)
+    ]
+    # Calls are serialized per emulator, so one worker per emulator suffices.
+    self._executor = futures.ThreadPoolExecutor(
+        max_workers=num_emulators, thread_name_prefix="android_env"
+    )
+
+  async def _call(self, slot: EmulatorSlot, fn: Callable[[], _T]) -> _T:
+    """Runs a blocking call on a worker thread, holding the slot's lock."""
+    async with slot.lock:
+      return await asyncio.get_running_loop().run_in_executor(
+          self._executor, fn
+      )
+
+  async def run(
+      self,
+      slot: EmulatorSlot,
+      fn: Callable[[interface.AsyncEnv], _T],
+  ) -> _T:
+    """Runs `fn(env)` for the slot's environment on a worker thread.
+
+    Args:
+      slot: The emulator to run on.
+      fn: The blocking function to call with the environment.
+
+    Returns:
+      The result of `fn`.
+
+    Raises:
+      HTTPException: If the environment is not available.
+    """
+
+    def call() -> _T:
+      if slot.env is None:
+        raise fastapi.HTTPException(
+            status_code=503, detail="Environment not initialized"
+        )
+      return fn(slot.env)
+
+    try:
+      return await self._call(slot, call)
+    finally:
+      # A long call must not count as idle time.
+      self.renew(slot)
+
+  async def load(self) -> None:
+    """Loads and sets up all environments concurrently."""
+
+    def load_slot(slot: EmulatorSlot) -> None:
+      slot.env = env_launcher.load_and_setup_env(
+          console_port=slot.console_port,
+          emulator_setup=True,
+          freeze_datetime=True,
+          adb_path=self.adb_path,
+          grpc_port=slot.grpc_port,
+      )
+
+    await asyncio.gather(*(
+        self._call(slot, functools.partial(load_slot, slot))
+        for slot in self.slots
+    ))
+
+  async def close(self) -> None:
+    """Closes all environments and stops the workers."""
+
+    def close_slot(slot: EmulatorSlot) -> None:
+      if slot.env is not None:
+        slot.env.close()
+        slot.env = None
+
+    await asyncio.gather(*(
+        self._call(slot, functools.partial(close_slot, slot))
+        for slot in self.slots
+    ))
+    self._executor.shutdown()
+
+  def lease(self, suite: suite_utils.Suite) -> EmulatorSlot:
+    """Leases a free emulator to a new session.
+
+    Args:
+      suite: The suite to copy for the session.
+
+    Returns:
+      The leased emulator.
+
+    Raises:
+      HTTPException: If all emulators are leased.
+    """
+    self._expire_leases()
+    # The first emulator serves requests without a session, so it goes last.
+    for slot in self.slots[1:] + self.slots[:1]:
+      if slot.session_id is None and slot.env is not None:
+        slot.session_id = uuid.uuid4().hex
+        slot.suite = copy.deepcopy(suite)
+        self.renew(slot)
+        return slot
+    raise fastapi.HTTPException(
+        status_code=503, detail="All emulators are leased."
+    )
+
+  def renew(self, slot: EmulatorSlot) -> None:
+    """Extends the lease of a leased emulator by the lease TTL."""
+    if slot.session_id is not None:
+      slot.expires_at = time.monotonic() + self.lease_ttl_sec
+
+  def _expire_leases(self) -> None:
+    """Returns emulators with expired leases to the pool."""
+    for slot in self.slots:
+      if slot.is_expired:
+        slot.session_id = None
+        slot.suite = None
+        slot.expires_at = None
+
+  def get(self, session_id: str | None) -> EmulatorSlot:
+    """Returns the emulator of a session, or the first one if None.
+
+    Looking up a session renews its lease.
+
+    Args:
+      session_id: The session ID.
+
+    Returns:
+      The emulator the session leased.
+
+    Raises:
+      HTTPException: If the session does not exist or expired, or if there is
+        no session and the first emulator is leased to one.
+    """
+    self._expire_leases()
+    if session_id is None:
+      if self.slots[0].session_id is not None:
+        raise fastapi.HTTPException(
+            status_code=409,
+            detail=(
+                "The default emulator is leased to a session; pass"
+                f" {HEADER_SESSION_ID}."
+            ),
+        )
+      return self.slots[0]
+    for slot in self.slots:
+      if slot.session_id == session_id:
+        self.renew(slot)
+        return slot
+    raise fastapi.HTTPException(
+        status_code=404, detail=f"Unknown session: {session_id}"
+    )
+
+  async def set_suite(
+      self, slot: EmulatorSlot, suite: suite_utils.Suite
+  ) -> None:
+    """Replaces the suite of a leased emulator once its pending calls finish.
+
+    Args:
+      slot: The emulator of the session.
+      suite: The new suite of the session.
+
+    Raises:
+      HTTPException: If the session ended in the meantime.
+    """
+    session_id = slot.session_id
+    async with slot.lock:
+      if slot.session_id is None or slot.session_id != session_id:
+        raise fastapi.HTTPException(
+            status_code=404, detail=f"Unknown session: {session_id}"
+        )
+      slot.suite = suite
+
+  async def release(self, slot: EmulatorSlot) -> None:
+    """Returns a leased emulator to the pool once its pending calls finish."""
+    async with slot.lock:
+      slot.session_id = None
+      slot.suite = None
+      slot.expires_at = None
+
 
-  pixels: list[int]
-  ui_elements: list[Any]
+def _num_emulators() -> int:
+  return int(os.environ.get(NUM_EMULATORS_ENV_VAR, "1"))
+
+
+def _lease_ttl_sec() -> float:
+  return float(os.environ.get(LEASE_TTL_ENV_VAR, _DEFAULT_LEASE_TTL_SEC))
 
 
 @contextlib.asynccontextmanager
 async def lifespan(fast_api_app: fastapi.FastAPI):
-  """Manages the lifecycle of the Android environment and task suite."""
-  fast_api_app.state.app_android_env = env_launcher.load_and_setup_env(
-      console_port=5554,
-      emulator_setup=True,
-      freeze_datetime=True,
-      adb_path="/opt/android/platform-tools/adb",
-  )
+  """Manages the lifecycle of the emulator pool and task suite."""
+  pool = EmulatorPool(_num_emulators(), lease_ttl_sec=_lease_ttl_sec())
+  fast_api_app.state.pool = pool
+  await pool.load()
   task_registry = aw_registry_module.TaskRegistry()
   aw_registry = task_registry.get_registry(task_registry.ANDROID_WORLD_FAMILY)
   initial_suite = suite_utils.create_suite(
@@ -59,37 +430,82 @@ async def lifespan(fast_api_app: fastapi.FastAPI):
   fast_api_app.state.task_registry = task_registry
   yield
   # Shutdown
-  if fast_api_app.state.app_android_env is not None:
-    fast_api_app.state.app_android_env.close()
+  await pool.close()
 
 
 app = fastapi.FastAPI(lifespan=lifespan)
+session_router = fastapi.APIRouter(prefix="/session", tags=["session"])
 suite_router = fastapi.APIRouter(prefix="/suite", tags=["suite"])
 task_router = fastapi.APIRouter(prefix="/task", tags=["task"])
 
 
-def get_app_android_env(request: fastapi.Request) -> interface.AsyncEnv:
-  """Dependency to get the application's Android environment instance."""
-  return request.app.state.app_android_env
+def get_pool(request: fastapi.Request) -> EmulatorPool:
+  """Dependency to get the application's emulator pool."""
+  return request.app.state.pool
 
 
-def get_app_suite(request: fastapi.Request) -> suite_utils.Suite:
-  """Dependency to get the application's task suite instance."""
+def get_emulator(
+    request: fastapi.Request,
+    session_id: typing.Annotated[
+        str | None, fastapi.Header(alias=HEADER_SESSION_ID)
+    ] = None,
+) -> EmulatorSlot:
+  """Dependency to get the emulator of the request's session."""
+  return request.app.state.pool.get(session_id)
+
+
+def get_app_suite(
+    request: fastapi.Request,
+    emulator: typing.Annotated[EmulatorSlot, fastapi.Depends(get_emulator)],
+) -> suite_utils.Suite:
+  """Dependency to get the task suite of the request's session."""
+  if emulator.suite is not None:
+    return emulator.suite
   return request.app.state.suite
 
 
-AndroidEnv = typing.Annotated[
-    interface.AsyncEnv, fastapi.Depends(get_app_android_env)
-]
+Pool = typing.Annotated[EmulatorPool, fastapi.Depends(get_pool)]
+Emulator = typing.Annotated[EmulatorSlot, fastapi.Depends(get_emulator)]
 AndroidSuite = typing.Annotated[
     suite_utils.Suite, fastapi.Depends(get_app_suite)
 ]
 
 
+@session_router.post("/create")
+async def create_session(request: fastapi.Request, pool: Pool):
+  """Leases a free emulator and returns the ID of the new session."""
+  slot = pool.lease(request.app.state.suite)
+  return {
+      "session_id": slot.session_id,
+      "console_port": slot.console_port,
+  }
+
+
+@session_router.post("/heartbeat")
+async def heartbeat_session(pool: Pool, emulator: Emulator):
+  """Keeps the lease of an idle session; looking up the session renews it."""
+  if emulator.session_id is None:
+    raise fastapi.HTTPException(
+        status_code=400, detail=f"Missing {HEADER_SESSION_ID} header."
+    )
+  return {"status": "success", "lease_ttl_sec": pool.lease_ttl_sec}
+
+
+@session_router.post("/release")
+async def release_session(pool: Pool, emulator: Emulator):
+  """Ends the session, returning its emulator to the pool."""
+  if emulator.session_id is None:
+    raise fastapi.HTTPException(
+        status_code=400, detail=f"Missing {HEADER_SESSION_ID} header."
+    )
+  await pool.release(emulator)
+  return {"status": "success", "message": "Session released."}
+
+
 @app.post("/reset")
-async def reset(go_home: bool, app_android_env: AndroidEnv):
+async def reset(go_home: bool, pool: Pool, emulator: Emulator):
   """Resets the Android environment, optionally returning to the home screen."""
-  app_android_env.reset(go_home=go_home)
+  await pool.run(emulator, lambda env: env.reset(go_home=go_home))
   return {
       "status": "success",
       "message": f"Environment reset with go_home={go_home}.",
@@ -97,19 +513,104 @@ async def reset(go_home: bool, app_android_env: AndroidEnv):
 
 
 @app.get("/screenshot")
-async def get_screenshot(wait_to_stabilize: bool, app_android_env: AndroidEnv):
-  """Captures and returns the current screenshot of the Android environment."""
-  state = app_android_env.get_state(wait_to_stabilize=wait_to_stabilize)
-  return {"pixels": state.pixels.tolist()}
+async def get_screenshot(
+    wait_to_stabilize: bool,
+    pool: Pool,
+    emulator: Emulator,
+    encoding: str | None = None,
+    quality: int = fastapi.Query(default=90, ge=1, le=100),
+    max_side: int | None = None,
+    accept: typing.Annotated[str | None, fastapi.Header()] = None,
+):
+  """Captures and returns the current screenshot of the Android environment.
+
+  The encoding is taken from the `encoding` query parameter or, if absent,
+  negotiated from the Accept header. The default is the legacy JSON int list.
+  Binary encodings are returned as the response body, with the array shape,
+  dtype and original screen size in the `X-Image-*` and `X-Screen-Size`
+  headers.
+
+  Args:
+    wait_to_stabilize: Whether to wait for the screen to stabilize.
+    pool: The emulator pool.
+    emulator: The emulator of the request's session.
+    encoding: One of json, raw, png or jpeg.
+    quality: JPEG quality.
+    max_side: If set, the screenshot is downscaled so its longest side is at
+      most this many pixels.
+    accept: The Accept header.
+  """
+  encoding = _resolve_encoding(encoding, accept)
+
+  def capture(env: interface.AsyncEnv):
+    state = env.get_state(wait_to_stabilize=wait_to_stabilize)
+    height, width = state.pixels.shape[:2]
+    pixels = _downscale(state.pixels, max_side)
+    if encoding == ENCODING_JSON:
+      return {"pixels": pixels.tolist()}
+    return fastapi.Response(
+        content=_encode_pixels(pixels, encoding, quality),
+        media_type=_MEDIA_TYPES[encoding],
+        headers={
+            HEADER_SHAPE: ",".join(str(d) for d in pixels.shape),
+            HEADER_DTYPE: str(pixels.dtype),
+            HEADER_SCREEN_SIZE: f"{width},{height}",
+        },
+    )
+
+  return await pool.run(emulator, capture)
+
+
+@app.get("/state")
+async def get_state(
+    wait_to_stabilize: bool,
+    pool: Pool,
+    emulator: Emulator,
+    encoding: str = ENCODING_PNG,
+    quality: int = fastapi.Query(default=90, ge=1, le=100),
+    max_side: int | None = None,
+) -> StateResponse:
+  """Returns the screenshot and UI elements from a single observation.
+
+  Args:
+    wait_to_stabilize: Whether to wait for the screen to stabilize.
+    pool: The emulator pool.
+    emulator: The emulator of the request's session.
+    encoding: One of raw, png or jpeg.
+    quality: JPEG quality.
+    max_side: If set, the screenshot is downscaled so its longest side is at
+      most this many pixels.
+  """
+  if encoding not in _MEDIA_TYPES:
+    raise fastapi.HTTPException(
+        status_code=400, detail=f"Invalid encoding: {encoding}"
+    )
+
+  def observe(env: interface.AsyncEnv) -> StateResponse:
+    state = env.get_state(wait_to_stabilize=wait_to_stabilize)
+    height, width = state.pixels.shape[:2]
+    pixels = _downscale(state.pixels, max_side)
+    return StateResponse(
+        encoding=encoding,
+        pixels=base64.b64encode(
+            _encode_pixels(pixels, encoding, quality)
+        ).decode("ascii"),
+        shape=list(pixels.shape),
+        dtype=str(pixels.dtype),
+        screen_size=[width, height],
+        ui_elements=[_compact_ui_element(e) for e in state.ui_elements],
+    )
+
+  return await pool.run(emulator, observe)
 
 
 @app.post("/execute_action")
 async def execute_action(
-    action_dict: dict[str, typing.Any], app_android_env: AndroidEnv
+    action_dict: dict[str, typing.Any], pool: Pool, emulator: Emulator
 ):
   """Executes a given JSON-formatted action in the Android environment."""
   action = json_action.JSONAction(**action_dict)
-  app_android_env.execute_action(action)
+  await pool.run(emulator, lambda env: env.execute_action(action))
   return {"status": "success", "message": f"Action {action} executed."}
 
 
@@ -128,13 +629,19 @@ async def suite_task_length(task_type: str, app_suite: AndroidSuite):
 
 
 @suite_router.get("/reinitialize")
-def reinitialize_suite(
+async def reinitialize_suite(
     request: fastapi.Request,
+    pool: Pool,
+    emulator: Emulator,
     n_task_combinations: int = 2,  # Default from initial lifespan setup
     seed: int = 42,  # Default from initial lifespan setup
     task_family: str = "android_world",
 ):
-  """Re-initializes the task suite with new parameters."""
+  """Re-initializes the task suite of the session with new parameters.
+
+  Without a session, the default suite is re-initialized; it is used by
+  requests without a session and copied into new sessions.
+  """
   task_registry = request.app.state.task_registry
   try:
     current_aw_registry = task_registry.get_registry(task_family)
@@ -142,12 +649,16 @@ def reinitialize_suite(
     raise fastapi.HTTPException(
         status_code=400, detail=f"Invalid task family: {task_family}"
     ) from exc
-  new_suite = suite_utils.create_suite(
+  new_suite = await asyncio.to_thread(
+      suite_utils.create_suite,
       task_registry=current_aw_registry,
       n_task_combinations=n_task_combinations,
       seed=seed,
   )
-  request.app.state.suite = new_suite
+  if emulator.session_id is not None:
+    await pool.set_suite(emulator, new_suite)
+  else:
+    request.app.state.suite = new_suite
   return {
       "status": "success",
       "message": (
@@ -161,11 +672,12 @@ def reinitialize_suite(
 async def initialize_task(
     task_type: str,
     task_idx: int,
-    app_android_env: AndroidEnv,
+    pool: Pool,
+    emulator: Emulator,
     app_suite: AndroidSuite,
 ):
   """Initializes a specific task in the Android environment."""
-  app_suite[task_type][task_idx].initialize_task(app_android_env)
+  await pool.run(emulator, app_suite[task_type][task_idx].initialize_task)
   return {
       "status": "success",
       "message": f"Task {task_type} {task_idx} initialized.",
@@ -176,11 +688,12 @@ async def initialize_task(
 async def tear_down_task(
     task_type: str,
     task_idx: int,
-    app_android_env: AndroidEnv,
+    pool: Pool,
+    emulator: Emulator,
     app_suite: AndroidSuite,
 ):
   """Tears down a specific task in the Android environment."""
-  app_suite[task_type][task_idx].tear_down(app_android_env)
+  await pool.run(emulator, app_suite[task_type][task_idx].tear_down)
   return {
       "status": "success",
       "message": f"Task {task_type} {task_idx} torn down.",
@@ -191,12 +704,15 @@ async def tear_down_task(
 async def get_task_score(
     task_type: str,
     task_idx: int,
-    app_android_env: AndroidEnv,
+    pool: Pool,
+    emulator: Emulator,
     app_suite: AndroidSuite,
 ):
   """Gets the success status (score) of a specific task."""
   return {
-      "score": app_suite[task_type][task_idx].is_successful(app_android_env)
+      "score": await pool.run(
+          emulator, app_suite[task_type][task_idx].is_successful
+      )
   }
 
 
@@ -215,22 +731,40 @@ async def get_task_template(
 
 
 @app.post("/close")
-async def close(app_android_env: AndroidEnv):
-  """Closes the Android environment."""
-  app_android_env.close()
+async def close(pool: Pool, emulator: Emulator):
+  """Closes the Android environment of the session and ends the session."""
+
+  def close_env(env: interface.AsyncEnv) -> None:
+    env.close()
+    emulator.env = None
+
+  await pool.run(emulator, close_env)
+  if emulator.session_id is not None:
+    await pool.release(emulator)
   return {"status": "success"}
 
 
 @app.get("/health")
-async def health(app_android_env: AndroidEnv):
-  """Checks the health of the Android environment server."""
-  if isinstance(app_android_env, interface.AsyncEnv):
-    return {"status": "success"}
-  raise fastapi.HTTPException(
-      status_code=500, detail="Environment not initialized"
-  )
+async def health(pool: Pool):
+  """Checks the health of the Android environment server.
+
+  This never waits on environment calls, so it stays responsive while
+  emulators are busy.
+  """
+  ready = [slot for slot in pool.slots if slot.env is not None]
+  if not ready:
+    raise fastapi.HTTPException(
+        status_code=500, detail="Environment not initialized"
+    )
+  return {
+      "status": "success",
+      "num_emulators": len(pool.slots),
+      "num_ready": len(ready),
+      "num_free": sum(slot.session_id is None for slot in ready),
+  }
 
 
+app.include_router(session_router)
 app.include_router(suite_router)
 app.include_router(task_router)
 
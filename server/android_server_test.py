@@ -0,0 +1,169 @@
+# Copyright 2026 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from unittest import mock
+
+from absl.testing import absltest
+import android_server
+import fastapi
+from fastapi import testclient
+
+
+def _pool(num_emulators: int) -> android_server.EmulatorPool:
+  pool = android_server.EmulatorPool(num_emulators)
+  for slot in pool.slots:
+    slot.env = mock.MagicMock()
+  return pool
+
+
+class EmulatorPoolTest(absltest.TestCase):
+
+  def test_leases_default_emulator_last(self):
+    pool = _pool(2)
+
+    first = pool.lease({})
+    second = pool.lease({})
+
+    self.assertIs(first, pool.slots[1])
+    self.assertIs(second, pool.slots[0])
+    with self.assertRaises(fastapi.HTTPException) as e:
+      pool.lease({})
+    self.assertEqual(e.exception.status_code, 503)
+
+  def test_no_session_conflicts_with_leased_default_emulator(self):
+    pool = _pool(1)
+    self.assertIs(pool.get(None), pool.slots[0])
+
+    slot = pool.lease({})
+
+    with self.assertRaises(fastapi.HTTPException) as e:
+      pool.get(None)
+    self.assertEqual(e.exception.status_code, 409)
+    self.assertIs(pool.get(slot.session_id), slot)
+
+    asyncio.run(pool.release(slot))
+
+    self.assertIs(pool.get(None), pool.slots[0])
+
+  def test_set_suite_fails_once_session_ended(self):
+    pool = _pool(1)
+    slot = pool.lease({})
+    asyncio.run(pool.set_suite(slot, {'task': []}))
+    self.assertEqual(slot.suite, {'task': []})
+
+    async def release_then_set_suite():
+      await slot.lock.acquire()
+      set_suite = asyncio.create_task(pool.set_suite(slot, {}))
+      await asyncio.sleep(0)
+      slot.session_id = None
+      slot.lock.release()
+      await set_suite
+
+    with self.assertRaises(fastapi.HTTPException) as e:
+      asyncio.run(release_then_set_suite())
+    self.assertEqual(e.exception.status_code, 404)
+
+  @mock.patch.object(android_server.time, 'monotonic', autospec=True)
+  def test_lease_expires_when_idle(self, mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    pool = android_server.EmulatorPool(1, lease_ttl_sec=10.0)
+    pool.slots[0].env = mock.MagicMock()
+    slot = pool.lease({})
+    session_id = slot.session_id
+
+    mock_monotonic.return_value = 105.0
+    self.assertIs(pool.get(session_id), slot)
+    mock_monotonic.return_value = 114.0
+    self.assertIs(pool.get(session_id), slot)
+    mock_monotonic.return_value = 124.0
+
+    with self.assertRaises(fastapi.HTTPException) as e:
+      pool.get(session_id)
+    self.assertEqual(e.exception.status_code, 404)
+    self.assertIs(pool.lease({}), slot)
+    self.assertNotEqual(slot.session_id, session_id)
+
+  @mock.patch.object(android_server.time, 'monotonic', autospec=True)
+  def test_lease_does_not_expire_during_call(self, mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    pool = android_server.EmulatorPool(1, lease_ttl_sec=10.0)
+    pool.slots[0].env = mock.MagicMock()
+    slot = pool.lease({})
+    session_id = slot.session_id
+
+    def slow_call(unused_env):
+      mock_monotonic.return_value = 200.0
+      self.assertIs(pool.get(session_id), slot)
+
+    asyncio.run(pool.run(slot, slow_call))
+    mock_monotonic.return_value = 205.0
+
+    self.assertIs(pool.get(session_id), slot)
+
+  def test_request_without_session_is_rejected_while_leased(self):
+    pool = _pool(1)
+    android_server.app.state.pool = pool
+    client = testclient.TestClient(android_server.app)
+    session_id = pool.lease({}).session_id
+
+    response = client.post('/reset', params={'go_home': True})
+    leased_response = client.post(
+        '/reset',
+        params={'go_home': True},
+        headers={android_server.HEADER_SESSION_ID: session_id},
+    )
+
+    self.assertEqual(response.status_code, 409)
+    self.assertEqual(leased_response.status_code, 200)
+    pool.slots[0].env.reset.assert_called_once_with(go_home=True)
+
+  def test_close_ends_session(self):
+    pool = _pool(2)
+    android_server.app.state.pool = pool
+    client = testclient.TestClient(android_server.app)
+    slot = pool.lease({})
+    env = slot.env
+
+    response = client.post(
+        '/close', headers={android_server.HEADER_SESSION_ID: slot.session_id}
+    )
+
+    self.assertEqual(response.status_code, 200)
+    env.close.assert_called_once()
+    self.assertIsNone(slot.env)
+    self.assertIsNone(slot.session_id)
+    self.assertIsNone(slot.expires_at)
+
+  def test_heartbeat_of_unknown_session_fails(self):
+    pool = _pool(1)
+    android_server.app.state.pool = pool
+    client = testclient.TestClient(android_server.app)
+    session_id = pool.lease({}).session_id
+
+    response = client.post(
+        '/session/heartbeat',
+        headers={android_server.HEADER_SESSION_ID: session_id},
+    )
+    unleased_response = client.post(
+        '/session/heartbeat',
+        headers={android_server.HEADER_SESSION_ID: 'unknown'},
+    )
+
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(unleased_response.status_code, 404)
+
+
+if __name__ == '__main__':
+  absltest.main()